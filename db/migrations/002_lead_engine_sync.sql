@@ -0,0 +1,23 @@
+-- Lead engine sync (scripts/lead_engine/modules/data/sync.py)
+-- Upserts match on (name, service_area); delta pulls page on (updated_at, id),
+-- so updated_at must come from the server clock, never from the client.
+
+ALTER TABLE leads
+    ADD COLUMN IF NOT EXISTS name TEXT,
+    ADD COLUMN IF NOT EXISTS service_area TEXT;
+
+ALTER TABLE leads
+    ADD CONSTRAINT leads_name_service_area_key UNIQUE (name, service_area);
+
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER leads_set_updated_at
+    BEFORE INSERT OR UPDATE ON leads
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+CREATE INDEX idx_leads_updated_at_id ON leads (updated_at, id);
@@ -6,53 +6,40 @@ Contractor Lead Engine: Advanced Enrichment
 - Normalizes, deduplicates, validates, and inserts into Supabase
 - Confidence scoring based on enrichment depth
 - Logs all actions and errors
+
+Importing this module has no side effects: the Places client, website crawler
+and Supabase client are created lazily on first use. Run it as a script (or call
+`main()`) for the CLI, which loads `.env` and configures logging.
 """
-import os
-import re
-import time
+import argparse
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any, List, Optional
 
-import requests
-from bs4 import BeautifulSoup
-from supabase import create_client, Client
-from dotenv import load_dotenv
-# NLP for keyword extraction
-try:
-    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfVectorizer
-except ImportError:
-    ENGLISH_STOP_WORDS = set()
-    TfidfVectorizer = None
-
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "15"))
-MAX_PLACES_PER_CITY = int(os.getenv("MAX_PLACES_PER_CITY", "50"))
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-logging.basicConfig(filename="lead_engine.log", level=logging.INFO,
-                    format="%(asctime)s %(levelname)s %(message)s")
-
-# Load all Canadian municipalities from file
+from modules.data.business_counts import record_inserts
+from modules.data.scoring import score_lead
+from scraping.google_places import PlacesClient
+from scraping.website_crawler import DomainThrottle, KeywordIDF, ValidatorCache, WebsiteCrawler
+
+logger = logging.getLogger("Contractor_Lead_Engine")
+
 CITIES_FILE = os.path.join(os.path.dirname(__file__), "canada_municipalities.txt")
-def load_canada_cities() -> List[str]:
-    if os.path.exists(CITIES_FILE):
-        with open(CITIES_FILE, "r", encoding="utf-8") as f:
+DEFAULT_CITIES = ["Toronto", "Mississauga", "Scarborough", "Barrie", "Hamilton"]
+SEARCH_QUERY = "masonry contractor near {city}"
+SUPABASE_TABLE = "contractors_prospects"
+
+
+def load_canada_cities(path: str = CITIES_FILE) -> List[str]:
+    """Load all Canadian municipalities from file (one per line, # for comments)"""
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
             cities = [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
         if cities:
             return cities
     # Fallback (minimal set)
-    return ["Toronto", "Mississauga", "Scarborough", "Barrie", "Hamilton"]
-
-CITIES = load_canada_cities()
-
-EMAIL_REGEX = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
-SOCIAL_DOMAINS = ["instagram.com", "facebook.com", "tiktok.com", "linkedin.com", "x.com", "twitter.com", "youtube.com"]
-IMAGE_REGEX = re.compile(r'<img[^>]+src=["\']([^"\'>]+)["\']', re.IGNORECASE)
-KEYWORD_SERVICE_HINTS = ["masonry", "stone", "chimney", "fireplace", "restoration", "repair", "construction", "facade", "foundation", "wall", "patio", "outdoor", "indoor", "limestone", "granite", "marble", "veneer", "custom"]
+    return list(DEFAULT_CITIES)
 
 
 def normalize_phone(phone: Optional[str]) -> Optional[str]:
@@ -62,313 +49,218 @@ def normalize_phone(phone: Optional[str]) -> Optional[str]:
     return f"+1{digits[-10:]}" if len(digits) >= 10 else None
 
 
-def deduplicate(existing: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    existing_names = {e.get("name", "").strip().lower() for e in existing}
-    return [n for n in new if n.get("name", "").strip().lower() not in existing_names]
+def normalize_hours(hours: Any) -> Optional[List[str]]:
+    if not hours:
+        return None
+    if isinstance(hours, dict) and "weekday_text" in hours:
+        return hours["weekday_text"]
+    if isinstance(hours, list):
+        return [str(h) for h in hours]
+    if isinstance(hours, str):
+        return [hours]
+    return None
 
 
-def google_text_search(city: str) -> List[Dict[str, Any]]:
-    url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-    params = {
-        "query": f"masonry contractor near {city}",
-        "key": GOOGLE_API_KEY,
+def deduplicate(existing: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    existing_names = {(e.get("name") or "").strip().lower() for e in existing}
+    return [n for n in new if (n.get("name") or "").strip().lower() not in existing_names]
+
+
+def calc_confidence(record: Dict[str, Any]) -> int:
+    return score_lead(record, "confidence")
+
+
+def build_contractor_record(city: str, details: Dict[str, Any], enrichment: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build a prospect record from merged Places data and website enrichment
+
+    Args:
+        city: Service area the place was found for
+        details: Text-search result overlaid with Place Details
+        enrichment: Website enrichment payload, if the site was crawled
+
+    Returns:
+        Record ready for insertion into Supabase
+    """
+    website = details.get("website")
+    phone = details.get("formatted_phone_number") or details.get("international_phone_number")
+    socials_payload: Dict[str, Any] = {
+        "google": {
+            "place_id": details.get("place_id"),
+            "url": details.get("url"),
+            "rating": details.get("rating"),
+            "reviews_count": details.get("user_ratings_total"),
+            "types": details.get("types"),
+            "opening_hours": normalize_hours(details.get("opening_hours", {})),
+        }
     }
-    out = []
-    next_page_token = None
-    pages = 0
-    while True:
-        if next_page_token:
-            params["pagetoken"] = next_page_token
-            # per docs, wait a bit before using page token
-            time.sleep(2)
-        resp = requests.get(url, params=params, timeout=REQUEST_TIMEOUT)
-        resp.raise_for_status()
-        data = resp.json()
-        out.extend(data.get("results", []))
-        pages += 1
-        if len(out) >= MAX_PLACES_PER_CITY:
-            break
-        next_page_token = data.get("next_page_token")
-        if not next_page_token or pages >= 3:
-            import os
-            import re
-            import time
-            import logging
-            from typing import Dict, Any, List, Optional
-
-            import requests
-            from bs4 import BeautifulSoup
-            from supabase import create_client, Client
-            from dotenv import load_dotenv
-
-            # Optional: Advanced keyword extraction
+    if not (website and enrichment):
+        enrichment = None
+    if enrichment:
+        socials_payload.update(enrichment)
+
+    emails = (enrichment or {}).get("emails") or []
+    record = {
+        "name": details.get("name"),
+        "phone": normalize_phone(phone),
+        "email": emails[0] if emails else None,
+        "website": website,
+        "socials": socials_payload,
+        "logo": enrichment.get("logo") if enrichment else None,
+        "service_keywords": enrichment.get("service_keywords") if enrichment else [],
+        "recent_activity": enrichment.get("recent_activity") if enrichment else None,
+        "address": details.get("formatted_address"),
+        "service_area": city,
+        "source": "google",
+        "status": "prospect",
+        "score": 0,
+        "confidence": 0,
+    }
+    record["confidence"] = calc_confidence(record)
+    return record
+
+
+class ContractorLeadEngine:
+    """Places discovery, website enrichment and Supabase persistence
+
+    Clients are created once, on first use, and shared across worker threads.
+    """
+
+    def __init__(
+        self,
+        google_api_key: Optional[str] = None,
+        supabase_url: Optional[str] = None,
+        supabase_key: Optional[str] = None,
+        request_timeout: Optional[int] = None,
+        max_places_per_city: Optional[int] = None,
+        city_workers: int = 4,
+        places: Optional[PlacesClient] = None,
+    ):
+        self.google_api_key = google_api_key or os.getenv("GOOGLE_API_KEY")
+        self.supabase_url = supabase_url or os.getenv("SUPABASE_URL")
+        self.supabase_key = supabase_key or os.getenv("SUPABASE_KEY")
+        self.request_timeout = request_timeout or int(os.getenv("REQUEST_TIMEOUT", "15"))
+        self.max_places_per_city = max_places_per_city or int(os.getenv("MAX_PLACES_PER_CITY", "50"))
+        self.city_workers = max(1, city_workers)
+        self._lock = threading.Lock()
+        self._places: Optional[PlacesClient] = places
+        self._supabase = None
+        self._crawl_state = None
+
+    @property
+    def places(self) -> PlacesClient:
+        with self._lock:
+            if self._places is None:
+                self._places = PlacesClient(api_key=self.google_api_key, timeout=self.request_timeout)
+            return self._places
+
+    @property
+    def supabase(self):
+        with self._lock:
+            if self._supabase is None:
+                from supabase import create_client
+                self._supabase = create_client(self.supabase_url, self.supabase_key)
+            return self._supabase
+
+    @property
+    def crawl_state(self):
+        """IDF table, validator cache and per-domain throttle shared by the per-city crawlers"""
+        with self._lock:
+            if self._crawl_state is None:
+                self._crawl_state = (KeywordIDF(), ValidatorCache(), DomainThrottle())
+            return self._crawl_state
+
+    def fetch_contractors(self, city: str) -> List[Dict[str, Any]]:
+        """Discover, detail and website-enrich contractors for one city"""
+        basics = self.places.text_search(SEARCH_QUERY.format(city=city), max_results=self.max_places_per_city)
+        # Detail lookups run concurrently and only request fields the search result lacks
+        detailed = self.places.details_for(basics)
+
+        # Crawl every website for the city in one concurrent, per-domain-polite batch
+        websites = [d["website"] for d in detailed if d.get("website")]
+        crawled: Dict[str, Dict[str, Any]] = {}
+        if websites:
+            idf, validators, throttle = self.crawl_state
+            crawler = WebsiteCrawler(timeout=self.request_timeout, idf=idf, validators=validators, throttle=throttle)
+            crawled = crawler.crawl_sync(websites)
+            logger.info(
+                f"{city}: crawled {len(websites)} sites, {crawler.stats['not_modified']} not modified, "
+                f"{crawler.stats['unchanged']} unchanged, {crawler.stats['bytes_saved']} bytes saved"
+            )
+
+        contractors: List[Dict[str, Any]] = []
+        for details in detailed:
+            try:
+                contractors.append(build_contractor_record(city, details, crawled.get(details.get("website"))))
+            except Exception as e:
+                logger.error(f"Error building record for {details.get('name')}: {e}")
+        return contractors
+
+    def insert_to_supabase(self, contractors: List[Dict[str, Any]]) -> int:
+        inserted = []
+        for contractor in contractors:
             try:
-                import importlib
-                module = importlib.import_module("sklearn.feature_extraction.text")
-                ENGLISH_STOP_WORDS = getattr(module, "ENGLISH_STOP_WORDS", set())
-                TfidfVectorizer = getattr(module, "TfidfVectorizer", None)
-            except Exception:
-                ENGLISH_STOP_WORDS = set()
-                TfidfVectorizer = None
-
-            # Load environment variables
-            load_dotenv()
-            SUPABASE_URL = os.getenv("SUPABASE_URL")
-            SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-            GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-            REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "15"))
-            MAX_PLACES_PER_CITY = int(os.getenv("MAX_PLACES_PER_CITY", "50"))
-
-            supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-            logging.basicConfig(filename="lead_engine.log", level=logging.INFO,
-                                format="%(asctime)s %(levelname)s %(message)s")
-
-            # Load full list of Ontario municipalities from a file (one city/town per line).
-            # Create a file named "ontario_municipalities.txt" next to this script with all municipalities,
-            # or keep the fallback list below for a minimal set.
-            CITIES_FILE = os.path.join(os.path.dirname(__file__), "canada_municipalities.txt")
-
-            def load_ontario_cities() -> List[str]:
-                if os.path.exists(CITIES_FILE):
-                    with open(CITIES_FILE, "r", encoding="utf-8") as f:
-                        cities = [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
-                    if cities:
-                        return cities
-                # Fallback (will be used if the file is missing or empty)
-                return ["Toronto", "Mississauga", "Scarborough", "Barrie", "Hamilton"]
-
-            CITIES = load_ontario_cities()
-
-            EMAIL_REGEX = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
-            SOCIAL_DOMAINS = ["instagram.com", "facebook.com", "tiktok.com", "linkedin.com", "x.com", "twitter.com", "youtube.com"]
-            IMAGE_REGEX = re.compile(r'<img[^>]+src=["\']([^"\'>]+)["\']', re.IGNORECASE)
-            KEYWORD_SERVICE_HINTS = [
-                "masonry", "stone", "chimney", "fireplace", "restoration", "repair", "construction",
-                "facade", "foundation", "wall", "patio", "outdoor", "indoor", "limestone", "granite",
-                "marble", "veneer", "custom"
-            ]
-
-            def normalize_phone(phone: Optional[str]) -> Optional[str]:
-                if not phone:
-                    return None
-                digits = ''.join(filter(str.isdigit, phone))
-                return f"+1{digits[-10:]}" if len(digits) >= 10 else None
-
-            def deduplicate(existing: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-                existing_names = {e.get("name", "").strip().lower() for e in existing}
-                return [n for n in new if n.get("name", "").strip().lower() not in existing_names]
-
-            def google_text_search(city: str) -> List[Dict[str, Any]]:
-                url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-                params = {
-                    "query": f"masonry contractor near {city}",
-                    "key": GOOGLE_API_KEY,
-                }
-                out = []
-                next_page_token = None
-                pages = 0
-                while True:
-                    if next_page_token:
-                        params["pagetoken"] = next_page_token
-                        time.sleep(2)
-                    resp = requests.get(url, params=params, timeout=REQUEST_TIMEOUT)
-                    resp.raise_for_status()
-                    data = resp.json()
-                    out.extend(data.get("results", []))
-                    pages += 1
-                    if len(out) >= MAX_PLACES_PER_CITY:
-                        break
-                    next_page_token = data.get("next_page_token")
-                    if not next_page_token or pages >= 3:
-                        break
-                return out[:MAX_PLACES_PER_CITY]
-
-            def google_place_details(place_id: str) -> Dict[str, Any]:
-                url = "https://maps.googleapis.com/maps/api/place/details/json"
-                fields = (
-                    "name,formatted_address,formatted_phone_number,international_phone_number,website,"\
-                    "rating,user_ratings_total,url,types,opening_hours"
-                )
-                params = {"place_id": place_id, "key": GOOGLE_API_KEY, "fields": fields}
-                resp = requests.get(url, params=params, timeout=REQUEST_TIMEOUT)
-                resp.raise_for_status()
-                return resp.json().get("result", {})
-
-            def fetch_website_enrichment(website: str) -> Dict[str, Any]:
-                enrichment: Dict[str, Any] = {"emails": [], "links": {}, "logo": None, "service_keywords": [], "recent_activity": None}
+                self.supabase.table(SUPABASE_TABLE).insert(contractor).execute()
+                inserted.append(contractor)
+                logger.info(f"Inserted: {contractor.get('name')}")
+            except Exception as e:
+                logger.error(f"Error inserting {contractor.get('name')}: {e}")
+        record_inserts(inserted)
+        return len(inserted)
+
+    def run(self, cities: List[str], insert: bool = True) -> Dict[str, Any]:
+        """Process cities in parallel; dedup and inserts happen as each city completes
+
+        Args:
+            cities: Cities to search
+            insert: Insert new contractors into Supabase
+
+        Returns:
+            Dictionary with run statistics and the collected contractors
+        """
+        all_contractors: List[Dict[str, Any]] = []
+        stats = {"cities_processed": 0, "cities_failed": 0, "found": 0, "inserted": 0}
+        with ThreadPoolExecutor(max_workers=min(self.city_workers, len(cities) or 1)) as pool:
+            futures = {pool.submit(self.fetch_contractors, city): city for city in cities}
+            for future in as_completed(futures):
+                city = futures[future]
                 try:
-                    r = requests.get(website, timeout=REQUEST_TIMEOUT, headers={"User-Agent": "Mozilla/5.0"})
-                    r.raise_for_status()
-                    html = r.text
-                    # Emails
-                    emails = list(set(EMAIL_REGEX.findall(html)))
-                    enrichment["emails"] = emails
-                    # Social links
-                    soup = BeautifulSoup(html, "html.parser")
-                    links = {}
-                    for a in soup.find_all("a", href=True):
-                        href = a["href"].strip()
-                        for domain in SOCIAL_DOMAINS:
-                            if domain in href:
-                                links[domain.split(".")[0]] = href
-                    enrichment["links"] = links
-                    # Logo/Image extraction
-                    logo_url = None
-                    for img in soup.find_all("img", src=True):
-                        src = img["src"]
-                        if "logo" in src.lower() or "header" in src.lower():
-                            logo_url = src
-                            break
-                    if not logo_url:
-                        imgs = IMAGE_REGEX.findall(html)
-                        if imgs:
-                            logo_url = imgs[0]
-                    enrichment["logo"] = logo_url
-                    # Service keywords extraction
-                    text = soup.get_text(" ", strip=True)
-                    found_keywords = set()
-                    for kw in KEYWORD_SERVICE_HINTS:
-                        if kw in text.lower():
-                            found_keywords.add(kw)
-                    if TfidfVectorizer:
-                        try:
-                            vectorizer = TfidfVectorizer(stop_words="english")
-                            X = vectorizer.fit_transform([text])
-                            features = vectorizer.get_feature_names_out()
-                            scores = X.toarray()[0]
-                            top_indices = scores.argsort()[-5:][::-1]
-                            for idx in top_indices:
-                                word = features[idx]
-                                if word not in ENGLISH_STOP_WORDS and len(word) > 3:
-                                    found_keywords.add(word)
-                        except Exception:
-                            pass
-                    enrichment["service_keywords"] = list(found_keywords)
-                    # Recent activity signal
-                    recent = None
-                    for a in soup.find_all("a", href=True):
-                        href = a["href"].lower()
-                        if any(x in href for x in ["blog", "news", "post", "update"]):
-                            recent = href
-                            break
-                    enrichment["recent_activity"] = recent
+                    contractors = future.result()
                 except Exception as e:
-                    logging.warning(f"Website enrichment failed for {website}: {e}")
-                return enrichment
-
-            def normalize_hours(hours: Any) -> Optional[List[str]]:
-                if not hours:
-                    return None
-                if isinstance(hours, dict) and "weekday_text" in hours:
-                    return hours["weekday_text"]
-                if isinstance(hours, list):
-                    return [str(h) for h in hours]
-                if isinstance(hours, str):
-                    return [hours]
-                return None
-
-            def calc_confidence(record: Dict[str, Any]) -> int:
-                score = 0
-                if record.get("phone"): score += 1
-                if record.get("email"): score += 2
-                if record.get("website"): score += 1
-                if record.get("socials", {}).get("logo"): score += 1
-                if record.get("socials", {}).get("service_keywords"): score += 1
-                if record.get("socials", {}).get("recent_activity"): score += 1
-                if record.get("socials", {}).get("google", {}).get("rating"): score += 1
-                if record.get("socials", {}).get("google", {}).get("reviews_count"): score += 1
-                return score
-
-            def build_contractor_record(city: str, basic: Dict[str, Any]) -> Dict[str, Any]:
-                place_id = basic.get("place_id")
-                details = google_place_details(place_id) if place_id else {}
-                name = details.get("name") or basic.get("name")
-                website = details.get("website")
-                phone = details.get("formatted_phone_number") or details.get("international_phone_number")
-                address = details.get("formatted_address") or basic.get("formatted_address")
-                rating = details.get("rating")
-                reviews = details.get("user_ratings_total")
-                g_url = details.get("url")
-                types = details.get("types")
-                opening_hours = details.get("opening_hours", {})
-
-                socials_payload: Dict[str, Any] = {
-                    "google": {
-                        "place_id": place_id,
-                        "url": g_url,
-                        "rating": rating,
-                        "reviews_count": reviews,
-                        "types": types,
-                        "opening_hours": normalize_hours(opening_hours),
-                    }
-                }
-                enrichment = None
-                if website:
-                    enrichment = fetch_website_enrichment(website)
-                    socials_payload.update(enrichment)
-
-                record = {
-                    "name": name,
-                    "phone": normalize_phone(phone),
-                    "email": None,
-                    "website": website,
-                    "socials": socials_payload,
-                    "logo": enrichment.get("logo") if enrichment else None,
-                    "service_keywords": enrichment.get("service_keywords") if enrichment else [],
-                    "recent_activity": enrichment.get("recent_activity") if enrichment else None,
-                    "address": address,
-                    "service_area": city,
-                    "source": "google",
-                    "status": "prospect",
-                    "score": 0,
-                    "confidence": 0,
-                }
-                try:
-                    emails = socials_payload.get("emails", [])
-                    if emails:
-                        record["email"] = emails[0]
-                except Exception:
-                    pass
-                record["confidence"] = calc_confidence(record)
-                return record
-
-            def fetch_contractors(city: str) -> List[Dict[str, Any]]:
-                basics = google_text_search(city)
-                contractors: List[Dict[str, Any]] = []
-                for b in basics:
-                    try:
-                        contractors.append(build_contractor_record(city, b))
-                        time.sleep(0.2)
-                    except Exception as e:
-                        logging.error(f"Error building record for {b.get('name')}: {e}")
-                return contractors
-
-            def insert_to_supabase(contractors: List[Dict[str, Any]]) -> int:
-                inserted = 0
-                for contractor in contractors:
-                    try:
-                        supabase.table("contractors_prospects").insert(contractor).execute()
-                        inserted += 1
-                        logging.info(f"Inserted: {contractor.get('name')}")
-                    except Exception as e:
-                        logging.error(f"Error inserting {contractor.get('name')}: {e}")
-                return inserted
-
-            if __name__ == "__main__":
-                all_contractors: List[Dict[str, Any]] = []
-                total_inserted = 0
-                for city in CITIES:
-                    contractors = fetch_contractors(city)
-                    contractors = deduplicate(all_contractors, contractors)
-                    all_contractors.extend(contractors)
-                    total_inserted += insert_to_supabase(contractors)
-                print(f"Inserted {total_inserted} enriched contractors into Supabase.")
-    all_contractors: List[Dict[str, Any]] = []
-    total_inserted = 0
-    for city in CITIES:
-        contractors = fetch_contractors(city)
-        contractors = deduplicate(all_contractors, contractors)
-        all_contractors.extend(contractors)
-        total_inserted += insert_to_supabase(contractors)
-    print(f"Inserted {total_inserted} enriched contractors into Supabase.")
+                    stats["cities_failed"] += 1
+                    logger.error(f"Error processing {city}: {e}")
+                    continue
+                stats["cities_processed"] += 1
+                contractors = deduplicate(all_contractors, contractors)
+                all_contractors.extend(contractors)
+                stats["found"] += len(contractors)
+                if insert:
+                    stats["inserted"] += self.insert_to_supabase(contractors)
+        stats["contractors"] = all_contractors
+        return stats
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Discover and enrich masonry contractors via Google Places")
+    parser.add_argument("--cities", nargs="+", help="Cities to process (default: all municipalities)")
+    parser.add_argument("--workers", type=int, default=4, help="Cities processed in parallel")
+    parser.add_argument("--dry-run", action="store_true", help="Skip Supabase inserts")
+    parser.add_argument("--log-file", default="lead_engine.log", help="Log file path")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    logging.basicConfig(filename=args.log_file, level=logging.INFO,
+                        format="%(asctime)s %(levelname)s %(message)s")
+
+    engine = ContractorLeadEngine(city_workers=args.workers)
+    stats = engine.run(args.cities or load_canada_cities(), insert=not args.dry_run)
+    if args.dry_run:
+        print(f"Found {stats['found']} enriched contractors (dry run, nothing inserted).")
+    else:
+        print(f"Inserted {stats['inserted']} enriched contractors into Supabase.")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,155 +4,246 @@ Production-grade Contractor RAG Pipeline
 - Integrates Ollama for LLM-powered enrichment/ranking
 - Dash app for interactive review/approval
 - Pushes approved data to Supabase
+- Importing is side-effect free: data files, Supabase, Chroma and the LLM
+  gateway load lazily (or in a background warm-up started by `main()`)
 
 Requirements:
-- uv pip install chromadb dash supabase ollama python-dotenv
+- uv pip install chromadb dash supabase python-dotenv
 - Ollama server running locally (https://ollama.com)
 """
 
 import os
+import re
 import time
+import functools
 import threading
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
 load_dotenv()
-import chromadb
-from chromadb.config import Settings
 from dash import Dash, html, dcc, Input, Output, State, callback_context
 import dash_cytoscape as cyto
-import pandas as pd
-from supabase import create_client, Client
-from ollama import Client as OllamaClient
-import csv
 import json
 import requests
 import logging
 
 import hashlib
 
+from modules.data.business_counts import load_business_count_map, record_inserts
+from modules.data.census_store import CensusStore
+from modules.data.scoring import apply_scores, score_lead
+from modules.data.municipal_features import FEATURE_NAMES, MunicipalFeatures, build_municipal_features
+from modules.data.geography import get_province_for_municipality, get_resolver
+from modules.data.snapshot import Snapshot, load_snapshot
+from enrichers.llm_gateway import INTERACTIVE, SCORING, get_gateway
+from enrichers.structured_output import (
+    CONTRACTOR_ANALYSIS_SCHEMA,
+    LEAD_SCORE_SCHEMA,
+    StructuredOutputError,
+    generate_structured,
+    parse_json_response,
+    schema_defaults,
+    schema_prompt_hint,
+    validate_against_schema,
+)
+
 
 # Load municipalities and filter for high conversion (population > 10,000)
 MUNICIPALITIES_FILE = os.path.join(os.path.dirname(__file__), "canada_municipalities.txt")
 POPULATION_FILE = os.path.join(os.path.dirname(__file__), "canada_municipalities_population.csv")
 CENSUS_WIDE_FILE = os.path.join(os.path.dirname(__file__), "census_province_wide.csv")
-
-# Load population data if available
-pop_map = {}
-if os.path.exists(POPULATION_FILE):
-    with open(POPULATION_FILE, "r", encoding="utf-8") as pf:
-        reader = csv.DictReader(pf)
-        for row in reader:
-            name = row.get("municipality")
-            try:
-                pop = int(row.get("population", "0"))
-            except Exception:
-                pop = 0
-            if name:
-                if name in pop_map:
-                    pop_map[name] = max(pop_map[name], pop)
-                else:
-                    pop_map[name] = pop
-
-# Load census wide data for province/territory enrichment
-census_map = {}
-census_columns = []
-if os.path.exists(CENSUS_WIDE_FILE):
-    with open(CENSUS_WIDE_FILE, "r", encoding="utf-8") as cf:
-        reader = csv.DictReader(cf)
-        census_columns = reader.fieldnames[1:] if reader.fieldnames else []
-        for row in reader:
-            province = row[reader.fieldnames[0]]
-            census_map[province] = {col: row[col] for col in census_columns}
-
-# Municipality to province/territory mapping (simple heuristic: last word for most, manual for edge cases)
-def get_province_for_municipality(muni):
-    # Manual overrides for edge cases
-    manual = {
-        "Toronto": "Ontario",
-        "Montreal": "Quebec",
-        "Vancouver": "British Columbia",
-        "Calgary": "Alberta",
-        "Edmonton": "Alberta",
-        "Ottawa": "Ontario",
-        "Winnipeg": "Manitoba",
-        "Halifax": "Nova Scotia",
-        "St. John's": "Newfoundland and Labrador",
-        "Charlottetown": "Prince Edward Island",
-        "Fredericton": "New Brunswick",
-        "Regina": "Saskatchewan",
-        "Yellowknife": "Northwest Territories",
-        "Whitehorse": "Yukon",
-        "Iqaluit": "Nunavut"
-    }
-    if muni in manual:
-        return manual[muni]
-    # Heuristic: last word is province/territory
-    for prov in census_map.keys():
-        if muni.endswith(prov):
-            return prov
-    # Fallback: Ontario (most populous)
-    return "Ontario"
-
-# Load OSM business counts from log
 OSM_LOG_FILE = os.path.join(os.path.dirname(__file__), "osm_scraper.log")
-business_count_map = {}
-import re
-if os.path.exists(OSM_LOG_FILE):
-    with open(OSM_LOG_FILE, "r", encoding="utf-8") as lf:
-        for line in lf:
-            m = re.match(r".*INFO ([^:]+): inserted (\d+)", line)
-            if m:
-                city = m.group(1).strip()
-                count = int(m.group(2))
-                business_count_map[city] = count
-
-with open(MUNICIPALITIES_FILE, "r", encoding="utf-8") as f:
-    municipalities = [line.strip() for line in f if line.strip() and not line.startswith("#")]
-
-def normalize_name(s: str) -> str:
-    return (s or "").strip().lower()
-
-# Build normalized population map to improve matching
-pop_map_norm = {normalize_name(k): v for k, v in pop_map.items()}
-
+CHROMA_PERSIST_DIR = os.path.join(os.path.dirname(__file__), "chroma_db")
 
 # Filter for target cluster (population between 50,000 and 100,000)
 MIN_POP = int(os.getenv("MIN_CLUSTER_POP", "50000"))
 MAX_POP = int(os.getenv("MAX_CLUSTER_POP", "2000000"))
-cluster_municipalities = [m for m in municipalities if MIN_POP <= pop_map_norm.get(normalize_name(m), 0) < MAX_POP]
-if not cluster_municipalities:
-    print(f"[Warning] No municipalities in population range {MIN_POP}-{MAX_POP}. Showing all.")
-    cluster_municipalities = municipalities
-print(f"[Startup] Municipalities loaded: {len(municipalities)} | In cluster: {len(cluster_municipalities)}")
-
 
-"""Initialize Supabase before indexing contractor leads"""
 # Supabase setup
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-print(f"[Startup] Supabase URL configured: {bool(SUPABASE_URL)} | Key present: {bool(SUPABASE_KEY)}")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# Unified Chroma index for municipalities and contractor/business leads
-persist_dir = os.path.join(os.path.dirname(__file__), "chroma_db")
-print(f"[Startup] Initializing Chroma (persist: {persist_dir})...")
-chroma_client = chromadb.Client(Settings(persist_directory=persist_dir))
-collection = chroma_client.get_or_create_collection("leads")
 
 # Optionally limit first-time indexing to speed up startup
 index_limit = int(os.getenv("CHROMA_INDEX_LIMIT", "500"))
-print(f"[Startup] Preparing high-conversion municipality index (limit={index_limit})...")
+
+# Nothing below is loaded at import time. Each dataset/client is built once, on
+# first use (or by the background warm-up started in main), and its load time is
+# recorded so slow phases are visible in the startup log.
+_lazy_values: Dict[str, Any] = {}
+_lazy_locks: Dict[str, threading.Lock] = {}
+_lazy_registry_lock = threading.Lock()
+startup_timings: Dict[str, float] = {}
+
+
+def _lazy(loader):
+    """Decorator: run a zero-argument loader once, cache the result, log its timing"""
+    name = loader.__name__.replace("get_", "", 1)
+
+    @functools.wraps(loader)
+    def getter():
+        if name in _lazy_values:
+            return _lazy_values[name]
+        with _lazy_registry_lock:
+            lock = _lazy_locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in _lazy_values:
+                start = time.perf_counter()
+                _lazy_values[name] = loader()
+                startup_timings[name] = round(time.perf_counter() - start, 3)
+                print(f"[Startup] {name} ready in {startup_timings[name]:.3f}s")
+        return _lazy_values[name]
+
+    return getter
+
+
+def normalize_name(s: str) -> str:
+    return (s or "").strip().lower()
+
+
+@_lazy
+def get_snapshot() -> Snapshot:
+    """Compiled population/census/municipality snapshot (rebuilt when sources change)"""
+    return load_snapshot(sources={
+        "population": POPULATION_FILE,
+        "census": CENSUS_WIDE_FILE,
+        "municipalities": MUNICIPALITIES_FILE,
+    })
+
+
+@_lazy
+def get_pop_map() -> Dict[str, int]:
+    """Population by municipality name (largest value wins for duplicates)"""
+    return get_snapshot().pop_map()
+
+
+@_lazy
+def get_census():
+    """Census wide data for province/territory enrichment: (census_map, census_columns)"""
+    snapshot = get_snapshot()
+    return snapshot.census_map(), snapshot.census_columns
+
+
+@_lazy
+def get_business_count_map() -> Dict[str, int]:
+    """Business counts per municipality from the scraper-maintained counter table"""
+    return load_business_count_map(OSM_LOG_FILE)
+
+
+@_lazy
+def get_municipalities() -> List[str]:
+    return get_snapshot().municipalities
+
+
+@_lazy
+def get_cluster_municipalities() -> List[str]:
+    municipalities = get_municipalities()
+    # Build normalized population map to improve matching
+    pop_map_norm = {normalize_name(k): v for k, v in get_pop_map().items()}
+    cluster = [m for m in municipalities if MIN_POP <= pop_map_norm.get(normalize_name(m), 0) < MAX_POP]
+    if not cluster:
+        print(f"[Warning] No municipalities in population range {MIN_POP}-{MAX_POP}. Showing all.")
+        cluster = municipalities
+    print(f"[Startup] Municipalities loaded: {len(municipalities)} | In cluster: {len(cluster)}")
+    return cluster
+
+
+@_lazy
+def get_supabase():
+    from supabase import create_client
+    print(f"[Startup] Supabase URL configured: {bool(SUPABASE_URL)} | Key present: {bool(SUPABASE_KEY)}")
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+
+@_lazy
+def get_collection():
+    """Unified Chroma index for municipalities and contractor/business leads"""
+    import chromadb
+    from chromadb.config import Settings
+    print(f"[Startup] Initializing Chroma (persist: {CHROMA_PERSIST_DIR})...")
+    chroma_client = chromadb.Client(Settings(persist_directory=CHROMA_PERSIST_DIR))
+    collection = chroma_client.get_or_create_collection("leads")
+
+    # Only add if collection is empty (avoid duplicate ids)
+    try:
+        existing_count = collection.count()
+    except Exception:
+        existing_count = 0
+    if existing_count:
+        print(f"[Startup] Using existing Chroma collection with {existing_count} items.")
+        return collection
+
+    to_index = get_cluster_municipalities()[:min(index_limit, 50)]  # Start with smaller batch
+    print(f"[Startup] Indexing {len(to_index)} municipalities into Chroma...")
+    # Local census feature vectors ride along as feat_* metadata
+    features = get_municipal_features()
+    metadatas = {city: dict(features.metadata(city), name=city, type="municipality") for city in to_index}
+    try:
+        collection.add(
+            documents=list(to_index),
+            metadatas=[metadatas[city] for city in to_index],
+            ids=[f"muni:{city}" for city in to_index],
+        )
+    except Exception:
+        # Fall back to per-item adds so one bad record does not block the rest
+        for city in to_index:
+            try:
+                collection.add(documents=[city], metadatas=[metadatas[city]], ids=[f"muni:{city}"])
+            except Exception as e:
+                print(f"[Warning] Failed to index municipality '{city}': {e}")
+    # Contractor/business leads are indexed by the automated scraping worker
+    return collection
+
+
+@_lazy
+def get_ollama():
+    # Shared gateway: QA is served ahead of scoring and batch enrichment
+    return get_gateway()
+
+
+@_lazy
+def get_municipal_features() -> MunicipalFeatures:
+    """Municipality-level census feature vectors (CSD rows, province fallback)"""
+    snapshot = get_snapshot()
+    return build_municipal_features(get_municipalities(), get_province_for_municipality, snapshot.population)
+
+
+@_lazy
+def get_census_store() -> CensusStore:
+    """Columnar census matrix joined to municipalities for vectorized filtering"""
+    return CensusStore.from_snapshot(get_snapshot(), get_municipalities(), get_province_for_municipality)
+
+
+def get_census_map() -> Dict[str, Dict[str, str]]:
+    return get_census()[0]
+
+
+def get_census_columns() -> List[str]:
+    return get_census()[1]
+
+
+def start_background_loading() -> threading.Thread:
+    """Warm every dataset and client in a background thread, cheapest first"""
+    def warm():
+        start = time.perf_counter()
+        for getter in (get_census, get_pop_map, get_municipalities, get_cluster_municipalities,
+                       get_resolver, get_census_store, get_municipal_features, get_business_count_map, get_ollama, get_supabase, get_collection):
+            try:
+                getter()
+            except Exception as e:
+                print(f"[Warning] Background load of {getter.__name__} failed: {e}")
+        print(f"[Startup] Background warm-up finished in {time.perf_counter() - start:.3f}s | {startup_timings}")
+
+    thread = threading.Thread(target=warm, name="pipeline-warmup", daemon=True)
+    thread.start()
+    return thread
+
 
 # Load contractor/business leads from Supabase (self-contained)
 def load_contractor_leads():
     try:
-        url = os.getenv("SUPABASE_URL")
-        key = os.getenv("SUPABASE_KEY")
-        if not url or not key:
+        if not SUPABASE_URL or not SUPABASE_KEY:
             return []
-        sb: Client = create_client(url, key)
-        resp = sb.table("contractors_prospects").select("*").execute()
+        resp = get_supabase().table("contractors_prospects").select("*").execute()
         data = resp.data if hasattr(resp, "data") else resp
         leads = data or []
         # Only actionable leads: at least one of phone/email/website/socials
@@ -165,38 +256,6 @@ def load_contractor_leads():
         print(f"[Warning] Failed to load contractor leads from Supabase: {e}")
         return []
 
-# Only add if collection is empty (avoid duplicate ids)
-existing_count = 0
-try:
-    existing_count = collection.count()
-except Exception:
-    existing_count = 0
-
-if existing_count == 0:
-    to_index = cluster_municipalities[:min(index_limit, 50)]  # Start with smaller batch
-    print(f"[Startup] Indexing {len(to_index)} municipalities into Chroma (batch processing)...")
-    batch_size = 10
-    for i in range(0, len(to_index), batch_size):
-        batch = to_index[i:i+batch_size]
-        print(f"[Startup] Processing batch {i//batch_size + 1}/{(len(to_index)-1)//batch_size + 1}...")
-        for city in batch:
-            try:
-                collection.add(documents=[city], metadatas=[{"name": city, "type": "municipality"}], ids=[f"muni:{city}"])
-            except Exception as e:
-                print(f"[Warning] Failed to index municipality '{city}': {e}")
-                continue
-        time.sleep(0.1)  # Small delay between batches
-    
-    # Index contractor/business leads from Supabase with error handling
-    print("[Startup] Skipping existing contractor indexing - will be handled by automated scraping")
-    # contractor_leads = load_contractor_leads()
-    # ... contractor indexing code moved to automated scraping
-    print("[Startup] Initial indexing complete. Automated scraping will add more data.")
-else:
-    print(f"[Startup] Using existing Chroma collection with {existing_count} items.")
-
-# Ollama setup
-ollama = OllamaClient()
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1:8b")  # Can be overridden via env
 
 # Automated Scraping Configuration
@@ -292,16 +351,11 @@ def scrape_contractors_in_city(city_name: str, bbox: tuple) -> List[Dict[str, An
                         "craft_type": f"{tag_key}:{tag_value}",
                         "source": "OSM_Auto",
                         "status": "scraped",
-                        "score": 5,  # Base score
                         "latitude": lat,
                         "longitude": lon,
                         "scraped_at": datetime.now().isoformat()
                     }
                     
-                    # Score based on available contact info
-                    if contractor["phone"]: contractor["score"] += 2
-                    if contractor["email"]: contractor["score"] += 2
-                    if contractor["website"]: contractor["score"] += 3
                     
                     contractors.append(contractor)
                     
@@ -311,7 +365,7 @@ def scrape_contractors_in_city(city_name: str, bbox: tuple) -> List[Dict[str, An
             print(f"[Warning] Failed OSM query {tag_key}={tag_value} in {city_name}: {e}")
             continue
     
-    return contractors[:MAX_PER_CITY]
+    return apply_scores(contractors[:MAX_PER_CITY], "contact")
 
 def automated_scraping_worker():
     """Background worker that continuously scrapes new businesses"""
@@ -327,6 +381,7 @@ def automated_scraping_worker():
             
             # Get batch of cities to process
             start_idx = scraping_stats["next_city_index"]
+            cluster_municipalities = get_cluster_municipalities()
             cities_batch = cluster_municipalities[start_idx:start_idx + SCRAPE_BATCH_SIZE]
             
             if not cities_batch:
@@ -349,18 +404,20 @@ def automated_scraping_worker():
                     contractors = scrape_contractors_in_city(city, bbox)
                     
                     # Insert into Supabase with deduplication
+                    inserted = []
                     for contractor in contractors:
                         try:
                             # Check if already exists
-                            existing = supabase.table("contractors_prospects").select("id").eq("name", contractor["name"]).eq("service_area", city).execute()
+                            existing = get_supabase().table("contractors_prospects").select("id").eq("name", contractor["name"]).eq("service_area", city).execute()
                             
                             if not existing.data:
                                 # Insert new contractor
-                                supabase.table("contractors_prospects").insert(contractor).execute()
+                                get_supabase().table("contractors_prospects").insert(contractor).execute()
+                                inserted.append(contractor)
                                 
                                 # Add to Chroma for immediate searchability
                                 try:
-                                    collection.add(
+                                    get_collection().add(
                                         documents=[contractor["name"]], 
                                         metadatas=[{k: v for k, v in contractor.items() if isinstance(v, (str, int, float, bool))}], 
                                         ids=[f"auto_contractor:{contractor['name']}:{city}"]
@@ -373,6 +430,7 @@ def automated_scraping_worker():
                         except Exception as insert_e:
                             print(f"[Warning] Failed to insert {contractor['name']}: {insert_e}")
                             continue
+                    record_inserts(inserted, city)
                     
                     scraping_stats["cities_processed"] += 1
                     
@@ -418,26 +476,32 @@ def stop_automated_scraping():
 
 def validate_social_media(website, socials):
     """Enhanced social media background check"""
-    social_score = 0
-    social_details = {}
     try:
-        if website:
-            social_score += 3
-            social_details["website"] = "active"
-        if socials:
-            platforms = socials.lower()
-            if "facebook" in platforms: 
-                social_score += 2
-                social_details["facebook"] = "present"
-            if "instagram" in platforms: 
-                social_score += 2
-                social_details["instagram"] = "present"
-            if "linkedin" in platforms: 
-                social_score += 3
-                social_details["linkedin"] = "present"
-        return social_score, social_details
+        social_score = score_lead({"website": website, "socials": socials}, "social")
     except Exception:
         return 0, {}
+    social_details = {}
+    if website:
+        social_details["website"] = "active"
+    platforms = str(socials or "").lower()
+    for platform in ("facebook", "instagram", "linkedin"):
+        if platform in platforms:
+            social_details[platform] = "present"
+    return social_score, social_details
+
+def _ollama_json(prompt: str) -> str:
+    """Generate with Ollama in JSON mode and return the raw response text"""
+    resp = get_ollama().generate(model=OLLAMA_MODEL, prompt=prompt, format="json", priority=SCORING)
+    return resp.get("response", "")
+
+def score_with_llm(prompt: str):
+    """Ask the LLM for a JSON {score, rationale} and return them as a tuple"""
+    prompt = f"{prompt}\n{schema_prompt_hint(LEAD_SCORE_SCHEMA)}"
+    try:
+        data = generate_structured(_ollama_json, prompt, LEAD_SCORE_SCHEMA, model=f"ollama:{OLLAMA_MODEL}")
+        return data["score"], data["rationale"]
+    except StructuredOutputError as e:
+        return LEAD_SCORE_SCHEMA["properties"]["score"]["default"], f"[Unparsed LLM output: {e}]"
 
 def enrich_contractor_with_llm(meta: dict):
     name = meta.get("name", "Unknown")
@@ -455,19 +519,10 @@ def enrich_contractor_with_llm(meta: dict):
         f"Return JSON with keys: job_types (array of strings), est_revenue_low (number), est_revenue_high (number), pitch (string), score (1-10), rationale (string)."
     )
     try:
-        resp = ollama.generate(model=OLLAMA_MODEL, prompt=prompt)
-        text = resp.get("response", "{}")
-        try:
-            data = json.loads(text)
-        except Exception:
-            data = {
-                "job_types": [],
-                "est_revenue_low": 0,
-                "est_revenue_high": 0,
-                "pitch": text[:500],
-                "score": 5,
-                "rationale": text[:500]
-            }
+        return generate_structured(_ollama_json, prompt, CONTRACTOR_ANALYSIS_SCHEMA, model=f"ollama:{OLLAMA_MODEL}")
+    except StructuredOutputError as e:
+        data = schema_defaults(CONTRACTOR_ANALYSIS_SCHEMA)
+        data["rationale"] = f"LLM output could not be parsed: {e}"
         return data
     except Exception as e:
         return {
@@ -479,106 +534,112 @@ def enrich_contractor_with_llm(meta: dict):
             "rationale": ""
         }
 
-# Dash app
-app = Dash(__name__)
-app.layout = html.Div([
-    html.H1("Contractor Lead Engine (Municipalities & Businesses)"),
-    dcc.Dropdown(
-        id="lead-type-dropdown",
-        options=[{"label": "Municipality", "value": "municipality"}, {"label": "Contractor/Business", "value": "contractor"}],
-        value="municipality",
-        clearable=False,
-        style={"width": "300px", "marginBottom": "20px"}
-    ),
-    dcc.Input(id="search-box", type="text", placeholder="Search..."),
-    dcc.Input(id="batch-start", type="number", value=0, min=0, step=50, placeholder="Batch start index (0, 50, ...)",),
-    html.Div([
-        html.Label("Filter by Census Variable (municipality only):"),
+def serve_layout():
+    """Build the Dash layout per page load, so census options come from the lazy loader"""
+    census_map, census_columns = get_census()
+    return html.Div([
+        html.H1("Contractor Lead Engine (Municipalities & Businesses)"),
         dcc.Dropdown(
-            id="census-var-dropdown",
-            options=[{"label": col, "value": col} for col in census_columns[:50]],
-            multi=True,
-            placeholder="Select census variables to filter..."
+            id="lead-type-dropdown",
+            options=[{"label": "Municipality", "value": "municipality"}, {"label": "Contractor/Business", "value": "contractor"}],
+            value="municipality",
+            clearable=False,
+            style={"width": "300px", "marginBottom": "20px"}
         ),
-        dcc.Input(id="census-var-threshold", type="text", placeholder="Threshold (e.g. >100000)")
-    ], style={"marginBottom": "20px"}),
-    html.Div([
-        html.Label("Province/Territory (for census context, municipality only):"),
-        dcc.Dropdown(
-            id="census-province-dropdown",
-            options=[{"label": p, "value": p} for p in sorted(census_map.keys())],
-            placeholder="Select a province/territory for census context"
-        )
-    ], style={"marginBottom": "20px"}),
-    html.Button("Search", id="search-btn"),
-    dcc.Loading(id="loading-results", type="default", children=html.Div(id="results")),
-    html.Button("Push Approved to Supabase", id="push-btn"),
-    html.Div(id="push-status"),
-    html.Hr(),
-    html.H2("RAG Graph"),
-    html.P("Visualize how provinces, municipalities, and contractors connect."),
-    html.Button("Refresh Graph", id="refresh-graph-btn"),
-    cyto.Cytoscape(
-        id="rag-graph",
-        layout={"name": "cose", "animate": False},
-        style={"width": "100%", "height": "600px", "border": "1px solid #ddd"},
-        elements=[],
-        stylesheet=[
-            {"selector": "node", "style": {"label": "data(label)", "font-size": 10, "text-valign": "center", "text-halign": "center"}},
-            {"selector": "node[type='province']", "style": {"background-color": "#1f77b4", "shape": "round-rectangle"}},
-            {"selector": "node[type='municipality']", "style": {"background-color": "#2ca02c"}},
-            {"selector": "node[type='contractor']", "style": {"background-color": "#ff7f0e", "shape": "triangle"}},
-            {"selector": "edge", "style": {"line-color": "#bbb", "width": 2, "curve-style": "bezier", "target-arrow-shape": "triangle", "target-arrow-color": "#bbb"}},
-        ],
-    ),
-    html.Hr(),
-    html.H2("Census Data Summary (Pre-loaded)"),
-    html.Label("Province/Territory:"),
-    dcc.Dropdown(id="census-table-province", options=[{"label": p, "value": p} for p in sorted(census_map.keys())], placeholder="Select province/territory", style={"width": "300px"}),
-    html.Label("Census Variable:"),
-    dcc.Dropdown(id="census-table-var", options=[{"label": col, "value": col} for col in census_columns], placeholder="Select census variable", style={"width": "300px"}),
-    dcc.Loading(id="census-table-loading", type="default", children=html.Div(id="census-table")),
-    html.Hr(),
+        dcc.Input(id="search-box", type="text", placeholder="Search..."),
+        dcc.Input(id="batch-start", type="number", value=0, min=0, step=50, placeholder="Batch start index (0, 50, ...)",),
+        html.Div([
+            html.Label("Filter by Local Census Feature (municipality only):"),
+            dcc.Dropdown(
+                id="census-var-dropdown",
+                options=[{"label": f, "value": f} for f in FEATURE_NAMES],
+                multi=True,
+                placeholder="Select census features to filter..."
+            ),
+            dcc.Input(id="census-var-threshold", type="text", placeholder="Threshold (e.g. >100000)")
+        ], style={"marginBottom": "20px"}),
+        html.Div([
+            html.Label("Province/Territory (for census context, municipality only):"),
+            dcc.Dropdown(
+                id="census-province-dropdown",
+                options=[{"label": p, "value": p} for p in sorted(census_map.keys())],
+                placeholder="Select a province/territory for census context"
+            )
+        ], style={"marginBottom": "20px"}),
+        html.Button("Search", id="search-btn"),
+        dcc.Loading(id="loading-results", type="default", children=html.Div(id="results")),
+        html.Button("Push Approved to Supabase", id="push-btn"),
+        html.Div(id="push-status"),
+        html.Hr(),
+        html.H2("RAG Graph"),
+        html.P("Visualize how provinces, municipalities, and contractors connect."),
+        html.Button("Refresh Graph", id="refresh-graph-btn"),
+        cyto.Cytoscape(
+            id="rag-graph",
+            layout={"name": "cose", "animate": False},
+            style={"width": "100%", "height": "600px", "border": "1px solid #ddd"},
+            elements=[],
+            stylesheet=[
+                {"selector": "node", "style": {"label": "data(label)", "font-size": 10, "text-valign": "center", "text-halign": "center"}},
+                {"selector": "node[type='province']", "style": {"background-color": "#1f77b4", "shape": "round-rectangle"}},
+                {"selector": "node[type='municipality']", "style": {"background-color": "#2ca02c"}},
+                {"selector": "node[type='contractor']", "style": {"background-color": "#ff7f0e", "shape": "triangle"}},
+                {"selector": "edge", "style": {"line-color": "#bbb", "width": 2, "curve-style": "bezier", "target-arrow-shape": "triangle", "target-arrow-color": "#bbb"}},
+            ],
+        ),
+        html.Hr(),
+        html.H2("Census Data Summary (Pre-loaded)"),
+        html.Label("Province/Territory:"),
+        dcc.Dropdown(id="census-table-province", options=[{"label": p, "value": p} for p in sorted(census_map.keys())], placeholder="Select province/territory", style={"width": "300px"}),
+        html.Label("Census Variable:"),
+        dcc.Dropdown(id="census-table-var", options=[{"label": col, "value": col} for col in census_columns], placeholder="Select census variable", style={"width": "300px"}),
+        dcc.Loading(id="census-table-loading", type="default", children=html.Div(id="census-table")),
+        html.Hr(),
     
-    # 🤖 Automated Scraping Panel
-    html.H2("🤖 Automated Business Discovery"),
-    html.Div(id="scrape-status", children="Status: Ready", style={"marginBottom": "10px", "padding": "10px", "backgroundColor": "#ecf0f1", "borderRadius": "5px"}),
-    html.Div([
-        html.Button("▶️ Start Auto-Scraping", id="start-scrape-btn", n_clicks=0, style={"marginRight": "10px", "backgroundColor": "#27ae60", "color": "white", "border": "none", "padding": "10px", "borderRadius": "5px"}),
-        html.Button("⏹️ Stop Auto-Scraping", id="stop-scrape-btn", n_clicks=0, style={"marginRight": "10px", "backgroundColor": "#e74c3c", "color": "white", "border": "none", "padding": "10px", "borderRadius": "5px"}),
-        html.Button("📊 Refresh Stats", id="refresh-scrape-btn", n_clicks=0, style={"marginRight": "10px", "backgroundColor": "#3498db", "color": "white", "border": "none", "padding": "10px", "borderRadius": "5px"}),
-        html.Button("🧪 Test Scraping", id="test-scrape-btn", n_clicks=0, style={"backgroundColor": "#f39c12", "color": "white", "border": "none", "padding": "10px", "borderRadius": "5px"})
-    ], style={"marginBottom": "15px"}),
-    html.Div(id="test-scrape-status", children="Click to test scraping", style={"marginBottom": "10px", "padding": "8px", "backgroundColor": "#fff3cd", "borderRadius": "5px", "fontSize": "12px"}),
-    html.Div([
-        html.P("🔄 Interval: Every hour | 🏘️ Batch Size: 5 cities | 🏢 Max per city: 50 businesses", style={"fontSize": "12px", "color": "#7f8c8d", "margin": "0"}),
-        html.P("📍 Sources: OpenStreetMap (stonemasons, carpenters, builders, contractors)", style={"fontSize": "12px", "color": "#7f8c8d", "margin": "0"})
-    ]),
-    html.Hr(),
+        # 🤖 Automated Scraping Panel
+        html.H2("🤖 Automated Business Discovery"),
+        html.Div(id="scrape-status", children="Status: Ready", style={"marginBottom": "10px", "padding": "10px", "backgroundColor": "#ecf0f1", "borderRadius": "5px"}),
+        html.Div([
+            html.Button("▶️ Start Auto-Scraping", id="start-scrape-btn", n_clicks=0, style={"marginRight": "10px", "backgroundColor": "#27ae60", "color": "white", "border": "none", "padding": "10px", "borderRadius": "5px"}),
+            html.Button("⏹️ Stop Auto-Scraping", id="stop-scrape-btn", n_clicks=0, style={"marginRight": "10px", "backgroundColor": "#e74c3c", "color": "white", "border": "none", "padding": "10px", "borderRadius": "5px"}),
+            html.Button("📊 Refresh Stats", id="refresh-scrape-btn", n_clicks=0, style={"marginRight": "10px", "backgroundColor": "#3498db", "color": "white", "border": "none", "padding": "10px", "borderRadius": "5px"}),
+            html.Button("🧪 Test Scraping", id="test-scrape-btn", n_clicks=0, style={"backgroundColor": "#f39c12", "color": "white", "border": "none", "padding": "10px", "borderRadius": "5px"})
+        ], style={"marginBottom": "15px"}),
+        html.Div(id="test-scrape-status", children="Click to test scraping", style={"marginBottom": "10px", "padding": "8px", "backgroundColor": "#fff3cd", "borderRadius": "5px", "fontSize": "12px"}),
+        html.Div([
+            html.P("🔄 Interval: Every hour | 🏘️ Batch Size: 5 cities | 🏢 Max per city: 50 businesses", style={"fontSize": "12px", "color": "#7f8c8d", "margin": "0"}),
+            html.P("📍 Sources: OpenStreetMap (stonemasons, carpenters, builders, contractors)", style={"fontSize": "12px", "color": "#7f8c8d", "margin": "0"})
+        ]),
+        html.Hr(),
     
-    html.H2("Ask the RAG (Natural Language QA)"),
-    dcc.Input(id="qa-input", type="text", placeholder="Ask anything about contractors, municipalities, or census...", style={"width": "60%"}),
-    html.Button("Ask", id="qa-btn"),
-    html.Button("Export Results to CSV", id="export-csv-btn", style={"marginLeft": "10px"}),
-    dcc.Loading(id="qa-loading", type="default", children=html.Div(id="qa-answer")),
-    html.Div(id="qa-status", style={"marginTop": "10px", "color": "#007700"}),
-    html.H3("Matching Leads & Census Data"),
-    html.Div(id="qa-leads-table"),
-    dcc.Download(id="download-csv"),
-    cyto.Cytoscape(
-        id="qa-graph",
-        layout={"name": "cose", "animate": False},
-        style={"width": "100%", "height": "400px", "border": "1px solid #eee"},
-        elements=[],
-        stylesheet=[
-            {"selector": "node", "style": {"label": "data(label)", "font-size": 10, "text-valign": "center", "text-halign": "center"}},
-            {"selector": "node[type='province']", "style": {"background-color": "#1f77b4", "shape": "round-rectangle"}},
-            {"selector": "node[type='municipality']", "style": {"background-color": "#2ca02c"}},
-            {"selector": "node[type='contractor']", "style": {"background-color": "#ff7f0e", "shape": "triangle"}},
-            {"selector": "edge", "style": {"line-color": "#bbb", "width": 2, "curve-style": "bezier", "target-arrow-shape": "triangle", "target-arrow-color": "#bbb"}},
-        ],
-    )
-])
+        html.H2("Ask the RAG (Natural Language QA)"),
+        dcc.Input(id="qa-input", type="text", placeholder="Ask anything about contractors, municipalities, or census...", style={"width": "60%"}),
+        html.Button("Ask", id="qa-btn"),
+        html.Button("Export Results to CSV", id="export-csv-btn", style={"marginLeft": "10px"}),
+        dcc.Loading(id="qa-loading", type="default", children=html.Div(id="qa-answer")),
+        html.Div(id="qa-status", style={"marginTop": "10px", "color": "#007700"}),
+        html.H3("Matching Leads & Census Data"),
+        html.Div(id="qa-leads-table"),
+        dcc.Download(id="download-csv"),
+        cyto.Cytoscape(
+            id="qa-graph",
+            layout={"name": "cose", "animate": False},
+            style={"width": "100%", "height": "400px", "border": "1px solid #eee"},
+            elements=[],
+            stylesheet=[
+                {"selector": "node", "style": {"label": "data(label)", "font-size": 10, "text-valign": "center", "text-halign": "center"}},
+                {"selector": "node[type='province']", "style": {"background-color": "#1f77b4", "shape": "round-rectangle"}},
+                {"selector": "node[type='municipality']", "style": {"background-color": "#2ca02c"}},
+                {"selector": "node[type='contractor']", "style": {"background-color": "#ff7f0e", "shape": "triangle"}},
+                {"selector": "edge", "style": {"line-color": "#bbb", "width": 2, "curve-style": "bezier", "target-arrow-shape": "triangle", "target-arrow-color": "#bbb"}},
+            ],
+        )
+    ])
+
+
+# Dash app (layout is a function: the server starts without loading any data)
+app = Dash(__name__)
+app.layout = serve_layout
 
 
 # Unified search callback for both lead types
@@ -593,31 +654,24 @@ app.layout = html.Div([
     State("census-province-dropdown", "value")
 )
 def search_leads(n_clicks, query, lead_type, batch_start, census_vars_selected, census_var_threshold, selected_province):
+    census_map, census_columns = get_census()
+    pop_map = get_pop_map()
+    business_count_map = get_business_count_map()
+    municipal_features = get_municipal_features()
     if not query:
         return "Enter a search term."
     batch_start = batch_start or 0
     items = []
     # Municipality search
     if lead_type == "municipality":
-        batch_munis = cluster_municipalities[batch_start:batch_start+50]
-        filtered_munis = []
-        for m in batch_munis:
-            census_vars = census_map.get(selected_province, {}) if selected_province else {}
-            passed = True
-            for var in census_vars_selected or []:
-                val = census_vars.get(var, "")
-                if census_var_threshold:
-                    try:
-                        if census_var_threshold.startswith('>'):
-                            if float(val or 0) <= float(census_var_threshold[1:]):
-                                passed = False
-                        elif census_var_threshold.startswith('<'):
-                            if float(val or 0) >= float(census_var_threshold[1:]):
-                                passed = False
-                    except Exception:
-                        passed = False
-            if passed:
-                filtered_munis.append(m)
+        batch_munis = get_cluster_municipalities()[batch_start:batch_start+50]
+        filtered_munis = batch_munis
+        if census_vars_selected and census_var_threshold:
+            # Each municipality's own census features, not its province's
+            try:
+                filtered_munis = municipal_features.filter(batch_munis, census_vars_selected, census_var_threshold)
+            except ValueError:
+                filtered_munis = []
         if not filtered_munis:
             filtered_munis = batch_munis
         # Chroma expects $in to be an operator dict, not a raw list
@@ -630,7 +684,7 @@ def search_leads(n_clicks, query, lead_type, batch_start, census_vars_selected,
             where_filter = {"type": {"$eq": "municipality"}}
         query_kwargs = {"query_texts": [query], "n_results": 50, "where": where_filter}
         try:
-            results = collection.query(**query_kwargs)
+            results = get_collection().query(**query_kwargs)
         except Exception as e:
             return f"[Error] Chroma query failed: {e}"
         docs = results.get("documents", [])
@@ -639,7 +693,10 @@ def search_leads(n_clicks, query, lead_type, batch_start, census_vars_selected,
             docs = docs[0]
         if metas and isinstance(metas[0], list):
             metas = metas[0]
-        for doc, meta in zip(docs, metas):
+        # Rank on local census features before any LLM call
+        local_scores = dict(municipal_features.rank([m.get("name", "Unknown") for m in metas]))
+        ranked = sorted(zip(docs, metas), key=lambda dm: local_scores.get(dm[1].get("name", "Unknown"), 0.0), reverse=True)
+        for doc, meta in ranked:
             name = meta.get("name", "Unknown")
             pop = pop_map.get(name, "N/A")
             business_count = business_count_map.get(name, "N/A")
@@ -652,13 +709,13 @@ def search_leads(n_clicks, query, lead_type, batch_start, census_vars_selected,
                     f"Population: {pop}\n"
                     f"Business count: {business_count}\n"
                     f"Province: {province}\n"
-                    f"Key census: {str(census_vars)[:300]}\n"
+                    f"Local census signals: {municipal_features.describe(name)}\n"
+                    f"Province census (context): {str(census_vars)[:200]}\n"
                     f"OSM density: {business_count}\n"
                     f"Consider economic activity, construction signals, and local business density.\n"
                     f"Return a score 1-10 and a short rationale."
                 )
-                response = ollama.generate(model=OLLAMA_MODEL, prompt=prompt)
-                score, rationale = parse_llm_response(response["response"])
+                score, rationale = score_with_llm(prompt)
                 census_display = html.Details([
                     html.Summary("Census Variables"),
                     html.Ul([html.Li(f"{col}: {census_vars.get(col, '')}") for col in census_columns[:20]])
@@ -694,7 +751,7 @@ def search_leads(n_clicks, query, lead_type, batch_start, census_vars_selected,
         where_filter = {"type": "contractor"}
         query_kwargs = {"query_texts": [query], "n_results": 50, "where": where_filter}
         try:
-            results = collection.query(**query_kwargs)
+            results = get_collection().query(**query_kwargs)
         except Exception as e:
             return f"[Error] Chroma query failed: {e}"
         docs = results.get("documents", [])
@@ -726,8 +783,7 @@ def search_leads(n_clicks, query, lead_type, batch_start, census_vars_selected,
                     f"Consider business signals, contact completeness, and local construction activity.\n"
                     f"Return a score 1-10 and a short rationale."
                 )
-                response = ollama.generate(model=OLLAMA_MODEL, prompt=prompt)
-                score, rationale = parse_llm_response(response["response"])
+                score, rationale = score_with_llm(prompt)
                 enrich = enrich_contractor_with_llm({
                     "name": name,
                     "phone": phone,
@@ -780,8 +836,13 @@ def search_leads(n_clicks, query, lead_type, batch_start, census_vars_selected,
     return items
 
 def parse_llm_response(text):
-    # Simple parser for LLM output
-    import re
+    """Parse a {score, rationale} reply, accepting JSON or free-form prose"""
+    try:
+        data, _ = parse_json_response(text)
+        data = validate_against_schema(data, LEAD_SCORE_SCHEMA)
+        return data["score"], data["rationale"] or text
+    except StructuredOutputError:
+        pass
     match = re.search(r"score\s*[:=]\s*(\d+)", text, re.I)
     score = int(match.group(1)) if match else 5
     rationale = text
@@ -814,6 +875,7 @@ def push_to_supabase(n_clicks, results):
     except Exception:
         already_added = set()
     new_added = []
+    inserted = []
     for token in approved:
         try:
             data = json.loads(token)
@@ -837,7 +899,8 @@ def push_to_supabase(n_clicks, results):
                 "service_keywords": ", ".join(data.get("job_types", [])) or None,
                 "recent_activity": data.get("pitch", None),
             }
-            supabase.table("contractors_prospects").insert(record).execute()
+            get_supabase().table("contractors_prospects").insert(record).execute()
+            inserted.append(record)
         else:
             name = data.get("name")
             record = {
@@ -856,8 +919,10 @@ def push_to_supabase(n_clicks, results):
                 "score": data.get("score", 0),
                 "confidence": 0
             }
-            supabase.table("contractors_prospects").insert(record).execute()
+            get_supabase().table("contractors_prospects").insert(record).execute()
         new_added.append(name_hash)
+    # Only contractors are businesses; municipality rows are not counted
+    record_inserts(inserted)
     # Save new hashes
     if new_added:
         with open(rag_hash_file, "a", encoding="utf-8") as f:
@@ -865,32 +930,25 @@ def push_to_supabase(n_clicks, results):
                 f.write(h + "\n")
     return f"Pushed {len(new_added)} new municipalities to Supabase. (Duplicates skipped)"
 
-if __name__ == "__main__":
-    print("[Startup] Dash starting at http://127.0.0.1:8050/ ...")
-    # Disable debug/reloader to prevent duplicate server threads on Windows
-    app.run(debug=False, use_reloader=False)
-
 # Census table callback: show top 20 municipalities for selected province and variable
 @app.callback(
     Output("census-table", "children"),
     [Input("census-table-province", "value"), Input("census-table-var", "value")]
 )
 def census_table_callback(selected_province, selected_var):
+    census_map = get_census_map()
+    pop_map = get_pop_map()
     try:
-        # Filter municipalities by province
+        # Most populous municipalities (optionally within one province), ranked in NumPy
+        store = get_census_store()
         rows = []
-        for m in municipalities:
-            prov = get_province_for_municipality(m)
-            if selected_province and prov != selected_province:
-                continue
+        for i in store.top_by_population(selected_province or None, limit=20):
+            m = store.municipalities[i]
+            prov = store.province_of(i)
             census_vars = census_map.get(prov, {})
             pop = pop_map.get(m, "N/A")
             val = census_vars.get(selected_var, "N/A") if selected_var else "N/A"
             rows.append({"Municipality": m, "Province": prov, "Population": pop, selected_var or "Census": val})
-        # Sort by population descending
-        rows = sorted(rows, key=lambda r: int(r["Population"]) if str(r["Population"]).isdigit() else 0, reverse=True)
-        # Show top 20
-        rows = rows[:20]
         if not rows:
             return html.P("No municipalities found for selection.")
         header = [html.Th(col) for col in rows[0].keys()]
@@ -909,11 +967,14 @@ def census_table_callback(selected_province, selected_var):
     State("qa-input", "value")
 )
 def qa_callback(n_clicks, question):
+    pop_map = get_pop_map()
+    business_count_map = get_business_count_map()
+    municipal_features = get_municipal_features()
     if not question:
         return "Enter a question.", []
     try:
         # Query Chroma for top relevant entities (municipalities + contractors)
-        results = collection.query(query_texts=[question], n_results=10)
+        results = get_collection().query(query_texts=[question], n_results=10)
         docs = results.get("documents", [])
         metas = results.get("metadatas", [])
         if docs and isinstance(docs[0], list):
@@ -927,10 +988,9 @@ def qa_callback(n_clicks, question):
             name = meta.get("name", "Unknown")
             if t == "municipality":
                 prov = get_province_for_municipality(name)
-                census_vars = census_map.get(prov, {})
                 pop = pop_map.get(name, "N/A")
                 business_count = business_count_map.get(name, "N/A")
-                enriched_context.append(f"Municipality: {name}, Province: {prov}, Population: {pop}, Business Count: {business_count}, Census: {str(census_vars)[:200]}")
+                enriched_context.append(f"Municipality: {name}, Province: {prov}, Population: {pop}, Business Count: {business_count}, Census: {municipal_features.describe(name)}")
             elif t == "contractor":
                 social_score, social_details = validate_social_media(meta.get("website", ""), meta.get("socials", ""))
                 enriched_context.append(f"Contractor: {name}, Service Area: {meta.get('service_area', '')}, Phone: {meta.get('phone', '')}, Email: {meta.get('email', '')}, Website: {meta.get('website', '')}, Social Score: {social_score}")
@@ -942,7 +1002,7 @@ def qa_callback(n_clicks, question):
             f"Question: {question}\n"
             f"Provide a comprehensive answer with specific insights about lead quality, market opportunities, census demographics, and actionable recommendations."
         )
-        resp = ollama.generate(model=OLLAMA_MODEL, prompt=prompt)
+        resp = get_ollama().generate(model=OLLAMA_MODEL, prompt=prompt, priority=INTERACTIVE)
         answer = resp.get("response", "No answer.")
         # Build enhanced subgraph with tooltips and validation
         elements = []
@@ -990,16 +1050,20 @@ def qa_callback(n_clicks, question):
         batch = list(unique.values())
         pushed = 0
         audit_log = []
+        inserted = []
         
         # Enhanced batch insert with detailed audit trail
         for item in batch:
             try:
-                supabase.table("contractors_prospects").insert(item).execute()
-                collection.add(documents=[item["name"]], metadatas=[item], ids=[f"{item['type']}:{item['name']}"])
+                get_supabase().table("contractors_prospects").insert(item).execute()
+                if item.get("type") != "municipality":
+                    inserted.append(item)
+                get_collection().add(documents=[item["name"]], metadatas=[item], ids=[f"{item['type']}:{item['name']}"])
                 pushed += 1
                 audit_log.append(f"✓ Pushed: {item['type']} - {item['name']}")
             except Exception as e:
                 audit_log.append(f"✗ Skipped: {item.get('type','')} - {item.get('name','')} ({str(e)[:50]})")
+        record_inserts(inserted)
         # Build comprehensive leads table
         table_rows = []
         for meta in metas:
@@ -1007,13 +1071,13 @@ def qa_callback(n_clicks, question):
             t = meta.get("type", "unknown")
             if t == "municipality":
                 prov = get_province_for_municipality(name)
-                census_vars = census_map.get(prov, {})
                 pop = pop_map.get(name, "N/A")
                 business_count = business_count_map.get(name, "N/A")
                 table_rows.append({
                     "Name": name, "Type": "Municipality", "Province": prov, 
                     "Population": pop, "Business Count": business_count,
-                    "Income": str(census_vars.get("Total - Household total income groups in 2020 for private households - 100% data", "N/A"))[:50],
+                    "Income": municipal_features.features(name).get("median_household_income", "N/A"),
+                    "Local Score": municipal_features.score(name),
                     "Score": meta.get("score", 0)
                 })
             elif t == "contractor":
@@ -1056,6 +1120,7 @@ def qa_callback(n_clicks, question):
     State("census-province-dropdown", "value"),
 )
 def build_graph(n_clicks, lead_type, batch_start, selected_province):
+    pop_map = get_pop_map()
     try:
         elements = []
         batch_start = batch_start or 0
@@ -1069,7 +1134,7 @@ def build_graph(n_clicks, lead_type, batch_start, selected_province):
         province_nodes_added = set()
 
         # Municipalities
-        batch_munis = cluster_municipalities[batch_start:batch_start+max_munis]
+        batch_munis = get_cluster_municipalities()[batch_start:batch_start+max_munis]
         for m in batch_munis:
             prov = selected_province or get_province_for_municipality(m)
             if prov and prov not in province_nodes_added:
@@ -1137,6 +1202,7 @@ def handle_scraping_controls(start_clicks, stop_clicks, refresh_clicks):
             print("[Debug] Refreshing stats...")
             # Show detailed stats
             status = "🟢 Running" if scraping_stats["running"] else "🔴 Stopped"
+            cluster_municipalities = get_cluster_municipalities()
             next_city = cluster_municipalities[scraping_stats["next_city_index"]] if scraping_stats["next_city_index"] < len(cluster_municipalities) else "Cycle complete"
             errors_info = f" | Errors: {len(scraping_stats['errors'])}" if scraping_stats["errors"] else ""
             return f"{status} | Next: {next_city} | Total: {scraping_stats['total_scraped']} contractors | Cities: {scraping_stats['cities_processed']}{errors_info}"
@@ -1177,6 +1243,13 @@ def handle_test_scraping(n_clicks):
         return simple_test_scraping()
     return "Click to test scraping"
 
-if __name__ == "__main__":
+def main():
+    """Start the Dash server immediately and warm data/clients in the background"""
+    start_background_loading()
     print("[Startup] Dash starting at http://127.0.0.1:8050/ ...")
-    app.run(debug=True, host="127.0.0.1", port=8050)
+    # Disable the reloader to prevent duplicate server threads (and duplicate warm-ups)
+    app.run(debug=True, host="127.0.0.1", port=8050, use_reloader=False)
+
+
+if __name__ == "__main__":
+    main()
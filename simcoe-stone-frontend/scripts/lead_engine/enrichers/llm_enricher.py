@@ -13,6 +13,10 @@ import os
 import re
 from typing import Dict, Any
 
+from modules.data.scoring import score_lead
+
+from .structured_output import LEAD_ENRICHMENT_SCHEMA, generate_structured
+
 
 def _normalize_phone(phone: str) -> str:
     if not phone:
@@ -25,6 +29,28 @@ def _normalize_phone(phone: str) -> str:
     return phone
 
 
+def heuristic_confidence(lead: Dict[str, Any]) -> float:
+    """Estimate how trustworthy the heuristic category is for a lead (0-1)
+
+    Strong, explicit signals (e.g. "stone" in the name and a stonemason craft tag)
+    score high; leads that only fall through to the generic default score low.
+    """
+    name = (lead.get("name") or "").lower()
+    craft_type = (lead.get("craft_type") or "").lower()
+    if "stone" in name and "stone" in craft_type:
+        return 0.95
+    if "stone" in craft_type:
+        return 0.9
+    if "stone" in name:
+        return 0.8
+    if "construction" in craft_type:
+        return 0.65 if "construction" in name or "contract" in name else 0.55
+    if any(k in craft_type for k in ("tile", "roof", "carpent")):
+        # Specialised trade the heuristic cannot label; the LLM can
+        return 0.2
+    return 0.35
+
+
 def _heuristic_enrich(lead: Dict[str, Any]) -> Dict[str, Any]:
     enriched = dict(lead)
     name = (lead.get("name") or "").strip()
@@ -36,14 +62,7 @@ def _heuristic_enrich(lead: Dict[str, Any]) -> Dict[str, Any]:
         "construction" if "construction" in craft_type.lower() else "general_contractor"
     )
 
-    score = lead.get("score", 5)
-    if phone:
-        score += 1
-    if website:
-        score += 1
-    if any(k in (lead.get("email") or "") for k in ["@gmail.com", "@outlook.com", "@yahoo.com"]):
-        score += 0  # neutral
-    score = int(max(1, min(10, score)))
+    score = score_lead({**lead, "phone": phone, "website": website}, "quality")
 
     enriched.update({
         "phone": phone,
@@ -68,34 +87,30 @@ def _openai_enrich(lead: Dict[str, Any]) -> Dict[str, Any]:
         return _heuristic_enrich(lead)
 
     client = OpenAI(api_key=api_key)
+    model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     prompt = (
         "You are a data enricher. Given a contractor lead JSON, return a compact JSON with fields: "
         "category(one of: stone_masonry, construction, general_contractor, tile, roofer, carpenter), "
         "quality_score(1-10), normalized_phone, short_profile(<=160 chars).\n\nLead: "
-        + json.dumps(lead)
+        + json.dumps(lead, default=str)
     )
 
-    try:
+    def _generate(p: str) -> str:
         resp = client.chat.completions.create(
-            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-            messages=[{"role": "user", "content": prompt}],
+            model=model,
+            messages=[{"role": "user", "content": p}],
             temperature=0.2,
+            response_format={"type": "json_object"},
         )
-        content = resp.choices[0].message.content.strip()
-        data = {}
-        try:
-            data = json.loads(content)
-        except Exception:
-            # fallback if model returned prose; try to extract JSON
-            import re as _re
-            m = _re.search(r"\{[\s\S]*\}", content)
-            if m:
-                data = json.loads(m.group(0))
+        return (resp.choices[0].message.content or "").strip()
+
+    try:
+        data = generate_structured(_generate, prompt, LEAD_ENRICHMENT_SCHEMA, model=f"openai:{model}")
         enriched = dict(lead)
         enriched.update({
             "phone": data.get("normalized_phone") or _normalize_phone(lead.get("phone", "")),
             "category": data.get("category"),
-            "quality_score": int(data.get("quality_score", lead.get("score", 5)) or 5),
+            "quality_score": data.get("quality_score", lead.get("score", 5)),
             "profile": data.get("short_profile"),
             "enriched_by": "openai",
         })
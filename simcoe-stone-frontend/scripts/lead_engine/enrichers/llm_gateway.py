@@ -0,0 +1,288 @@
+"""
+Local LLM Gateway
+
+In-process multiplexer in front of a local Ollama server:
+- Priority lanes: interactive (Dash/Streamlit QA) > scoring > batch enrichment
+- Per-model concurrency caps so batch work cannot occupy every slot
+- Keep-alive on every request plus optional warm-up/pinning of models
+- Queue depth, wait time and in-flight metrics per lane and model
+
+`generate()` mirrors `ollama.Client.generate()` and returns the Ollama response
+dict, so existing call sites can switch by swapping the client object.
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import requests
+
+logger = logging.getLogger("LLMGateway")
+
+# Priority lanes (lower value is served first)
+INTERACTIVE = 0
+SCORING = 1
+BATCH = 2
+LANE_NAMES = {INTERACTIVE: "interactive", SCORING: "scoring", BATCH: "batch"}
+
+
+def _default_host() -> str:
+    return os.getenv("OLLAMA_HOST", "http://localhost:11434")
+
+
+class _Job:
+    __slots__ = ("model", "payload", "priority", "timeout", "future", "enqueued_at")
+
+    def __init__(self, model: str, payload: Dict[str, Any], priority: int, timeout: float):
+        self.model = model
+        self.payload = payload
+        self.priority = priority
+        self.timeout = timeout
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class LLMGateway:
+    """Priority-scheduled, concurrency-capped client for a local Ollama server"""
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        workers: int = 4,
+        max_concurrency_per_model: int = 1,
+        keep_alive: str = "30m",
+        timeout: float = 120,
+    ):
+        """
+        Args:
+            host: Ollama base URL (defaults to OLLAMA_HOST or localhost)
+            workers: Maximum requests in flight across all models
+            max_concurrency_per_model: Requests allowed in flight per model;
+                match Ollama's OLLAMA_NUM_PARALLEL
+            keep_alive: How long Ollama keeps a model loaded after each request
+            timeout: Default per-request HTTP timeout in seconds
+        """
+        self.host = (host or _default_host()).rstrip("/")
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.max_concurrency_per_model = max(1, int(max_concurrency_per_model))
+        self.workers = max(1, int(workers))
+        self._session = requests.Session()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        # Jobs wait in per-model heaps and are only dispatched once a slot is
+        # free, so a late interactive request still overtakes queued batch work
+        self._cond = threading.Condition(self._lock)
+        self._pending: Dict[str, list] = {}
+        self._active: Dict[str, int] = {}
+        self._closed = False
+        self._pinned: Dict[str, Any] = {}
+        self._metrics: Dict[str, Any] = {
+            "submitted": {name: 0 for name in LANE_NAMES.values()},
+            "completed": {name: 0 for name in LANE_NAMES.values()},
+            "errors": {name: 0 for name in LANE_NAMES.values()},
+            "cancelled": {name: 0 for name in LANE_NAMES.values()},
+            "queued": {name: 0 for name in LANE_NAMES.values()},
+            "wait_ms_total": {name: 0.0 for name in LANE_NAMES.values()},
+            "max_queue_depth": 0,
+            "in_flight": {},
+        }
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="llm-gateway")
+        self._dispatcher = threading.Thread(target=self._dispatch, name="llm-gateway-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    # ---- public API -------------------------------------------------------
+
+    def submit(
+        self,
+        model: str,
+        prompt: str,
+        priority: int = BATCH,
+        format: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Future:
+        """Queue a generation and return a Future resolving to the Ollama response dict"""
+        with self._lock:
+            keep_alive = self._pinned.get(model, self.keep_alive)
+        payload: Dict[str, Any] = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": keep_alive,
+        }
+        if format:
+            payload["format"] = format
+        if options:
+            payload["options"] = options
+        lane = LANE_NAMES.get(priority, "batch")
+        job = _Job(model, payload, priority if priority in LANE_NAMES else BATCH, timeout or self.timeout)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("LLM gateway is shut down")
+            self._metrics["submitted"][lane] += 1
+            self._metrics["queued"][lane] += 1
+            depth = sum(self._metrics["queued"].values())
+            self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], depth)
+            heapq.heappush(self._pending.setdefault(model, []), (job.priority, next(self._seq), job))
+            self._cond.notify_all()
+        return job.future
+
+    def generate(
+        self,
+        model: str,
+        prompt: str,
+        priority: int = BATCH,
+        format: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Blocking generation; same return shape as `ollama.Client.generate()`"""
+        future = self.submit(model, prompt, priority=priority, format=format, options=options, timeout=timeout)
+        return future.result()
+
+    def warm(self, model: str, keep_alive: Optional[Any] = None) -> bool:
+        """Load a model into memory ahead of the first real request
+
+        Args:
+            model: Model name
+            keep_alive: Override keep-alive; -1 pins the model until unpinned
+
+        Returns:
+            True if Ollama accepted the load request
+        """
+        with self._lock:
+            if keep_alive is not None:
+                self._pinned[model] = keep_alive
+            payload = {"model": model, "keep_alive": self._pinned.get(model, self.keep_alive)}
+        try:
+            resp = self._session.post(f"{self.host}/api/generate", json=payload, timeout=self.timeout)
+            resp.raise_for_status()
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to warm model {model}: {e}")
+            return False
+
+    def pin(self, model: str) -> bool:
+        """Keep a model loaded indefinitely"""
+        return self.warm(model, keep_alive=-1)
+
+    def unpin(self, model: str):
+        """Return a pinned model to the default keep-alive"""
+        with self._lock:
+            self._pinned.pop(model, None)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get queue depth, throughput and wait-time figures per lane"""
+        with self._lock:
+            m = {
+                "queue_depth": dict(self._metrics["queued"]),
+                "max_queue_depth": self._metrics["max_queue_depth"],
+                "submitted": dict(self._metrics["submitted"]),
+                "completed": dict(self._metrics["completed"]),
+                "errors": dict(self._metrics["errors"]),
+                "cancelled": dict(self._metrics["cancelled"]),
+                "in_flight": dict(self._metrics["in_flight"]),
+                "pinned": list(self._pinned),
+            }
+            # Every dispatched job adds to the wait total, cancelled ones included
+            m["avg_wait_ms"] = {
+                lane: round(self._metrics["wait_ms_total"][lane] / done, 2) if done else 0.0
+                for lane, done in (
+                    (lane, sum(self._metrics[k][lane] for k in ("completed", "errors", "cancelled")))
+                    for lane in LANE_NAMES.values()
+                )
+            }
+        return m
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work; queued jobs are still dispatched before exit"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            self._dispatcher.join()
+            self._executor.shutdown(wait=True)
+
+    # ---- internals --------------------------------------------------------
+
+    def _next_job(self) -> Optional[_Job]:
+        """Pop the highest-priority job whose model has a free slot (lock held)"""
+        if sum(self._active.values()) >= self.workers:
+            return None
+        best = None
+        for model, heap in self._pending.items():
+            if heap and self._active.get(model, 0) < self.max_concurrency_per_model:
+                if best is None or heap[0][:2] < self._pending[best][0][:2]:
+                    best = model
+        if best is None:
+            return None
+        return heapq.heappop(self._pending[best])[2]
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    if self._closed and not any(self._pending.values()):
+                        return
+                    self._cond.wait()
+                    job = self._next_job()
+                lane = LANE_NAMES[job.priority]
+                self._active[job.model] = self._active.get(job.model, 0) + 1
+                self._metrics["queued"][lane] -= 1
+                self._metrics["wait_ms_total"][lane] += (time.monotonic() - job.enqueued_at) * 1000
+                self._metrics["in_flight"][job.model] = self._active[job.model]
+            self._executor.submit(self._run, job)
+
+    def _run(self, job: _Job):
+        lane = LANE_NAMES[job.priority]
+        try:
+            if job.future.set_running_or_notify_cancel():
+                resp = self._session.post(f"{self.host}/api/generate", json=job.payload, timeout=job.timeout)
+                resp.raise_for_status()
+                job.future.set_result(resp.json() or {})
+                with self._lock:
+                    self._metrics["completed"][lane] += 1
+            else:
+                with self._lock:
+                    self._metrics["cancelled"][lane] += 1
+        except Exception as e:
+            logger.warning(f"{lane} request for {job.model} failed: {e}")
+            with self._lock:
+                self._metrics["errors"][lane] += 1
+            job.future.set_exception(e)
+        finally:
+            with self._cond:
+                self._active[job.model] -= 1
+                self._metrics["in_flight"][job.model] = self._active[job.model]
+                self._cond.notify_all()
+
+
+_gateways: Dict[str, LLMGateway] = {}
+_gateways_lock = threading.Lock()
+
+
+def get_gateway(host: Optional[str] = None) -> LLMGateway:
+    """Get the shared gateway for an Ollama host (one per process per host)
+
+    Sizing comes from LLM_GATEWAY_WORKERS, OLLAMA_NUM_PARALLEL and
+    OLLAMA_KEEP_ALIVE so the gateway matches the server configuration.
+    """
+    host = (host or _default_host()).rstrip("/")
+    with _gateways_lock:
+        gw = _gateways.get(host)
+        if gw is None:
+            gw = LLMGateway(
+                host=host,
+                workers=int(os.getenv("LLM_GATEWAY_WORKERS", "4")),
+                max_concurrency_per_model=int(os.getenv("OLLAMA_NUM_PARALLEL", "1")),
+                keep_alive=os.getenv("OLLAMA_KEEP_ALIVE", "30m"),
+            )
+            _gateways[host] = gw
+        return gw
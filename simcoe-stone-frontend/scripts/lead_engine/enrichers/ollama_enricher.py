@@ -3,12 +3,22 @@ Ollama Enricher for Lead Records
 
 Uses a local Ollama server to enrich lead dictionaries.
 Default host: http://localhost:11434, model configurable (e.g., llama3.1, mistral, qwen2.5).
+Responses are requested in JSON mode and validated via the structured output layer.
+Requests go through the shared LLM gateway on the batch lane so interactive QA
+is served first.
 """
 
 import os
 import json
 from typing import Dict, Any, Optional
-import requests
+
+from .llm_gateway import BATCH, get_gateway
+from .structured_output import (
+    LEAD_ENRICHMENT_SCHEMA,
+    StructuredOutputError,
+    generate_structured,
+    schema_prompt_hint,
+)
 
 
 def _default_host() -> str:
@@ -20,55 +30,67 @@ def _prompt_for_lead(lead: Dict[str, Any]) -> str:
         "You are a data enricher. Given a contractor lead JSON, respond ONLY with JSON containing: "
         "category(one of: stone_masonry, construction, general_contractor, tile, roofer, carpenter), "
         "quality_score(1-10), normalized_phone, short_profile(<=160 chars).\n\nLead: "
-        + json.dumps(lead)
+        + json.dumps(lead, default=str)
     )
 
 
+def _norm(phone: str) -> str:
+    import re as _re
+    if not phone:
+        return ""
+    d = _re.sub(r"\D", "", phone)
+    if len(d) == 10:
+        return f"({d[:3]}) {d[3:6]}-{d[6:]}"
+    if len(d) == 11 and d.startswith("1"):
+        return f"+1 ({d[1:4]}) {d[4:7]}-{d[7:]}"
+    return phone
+
+
+def ollama_generate_json(
+    prompt: str,
+    model: str,
+    host: Optional[str] = None,
+    timeout: int = 60,
+    priority: int = BATCH,
+) -> str:
+    """Run a non-streaming JSON-mode generation against Ollama and return the raw text"""
+    data = get_gateway(host or _default_host()).generate(
+        model,
+        prompt,
+        priority=priority,
+        format="json",
+        options={"temperature": 0.2},
+        timeout=timeout,
+    )
+    return (data or {}).get("response", "").strip()
+
+
 def enrich_lead_ollama(lead: Dict[str, Any], model: str = "llama3.1", host: Optional[str] = None, timeout: int = 60) -> Dict[str, Any]:
-    host = host or _default_host()
-    url = f"{host}/api/generate"
-    payload = {
-        "model": model,
-        "prompt": _prompt_for_lead(lead),
-        "stream": False,
-        "options": {"temperature": 0.2}
-    }
+    prompt = f"{_prompt_for_lead(lead)}\n\n{schema_prompt_hint(LEAD_ENRICHMENT_SCHEMA)}"
     try:
-        resp = requests.post(url, json=payload, timeout=timeout)
-        resp.raise_for_status()
-        data = resp.json()
-        content = (data or {}).get("response", "").strip()
-        parsed = {}
-        try:
-            parsed = json.loads(content)
-        except Exception:
-            # naive JSON extraction
-            import re
-            m = re.search(r"\{[\s\S]*\}", content)
-            if m:
-                parsed = json.loads(m.group(0))
+        parsed = generate_structured(
+            lambda p: ollama_generate_json(p, model=model, host=host, timeout=timeout),
+            prompt,
+            LEAD_ENRICHMENT_SCHEMA,
+            model=f"ollama:{model}",
+        )
+    except StructuredOutputError:
+        # Model kept returning unusable output; let the caller decide on a fallback
         enriched = dict(lead)
-        # basic phone normalization
-        def _norm(phone: str) -> str:
-            import re as _re
-            if not phone:
-                return ""
-            d = _re.sub(r"\D", "", phone)
-            if len(d) == 10:
-                return f"({d[:3]}) {d[3:6]}-{d[6:]}"
-            if len(d) == 11 and d.startswith("1"):
-                return f"+1 ({d[1:4]}) {d[4:7]}-{d[7:]}"
-            return phone
-        enriched.update({
-            "phone": parsed.get("normalized_phone") or _norm(lead.get("phone", "")),
-            "category": parsed.get("category"),
-            "quality_score": int(parsed.get("quality_score", lead.get("score", 5)) or 5),
-            "profile": parsed.get("short_profile"),
-            "enriched_by": f"ollama:{model}",
-        })
+        enriched.setdefault("enriched_by", "ollama_parse_error")
         return enriched
     except Exception:
         # On any error, just return original lead (caller may fallback)
         enriched = dict(lead)
         enriched.setdefault("enriched_by", "ollama_error")
         return enriched
+
+    enriched = dict(lead)
+    enriched.update({
+        "phone": parsed.get("normalized_phone") or _norm(lead.get("phone", "")),
+        "category": parsed.get("category"),
+        "quality_score": parsed.get("quality_score", lead.get("score", 5)),
+        "profile": parsed.get("short_profile"),
+        "enriched_by": f"ollama:{model}",
+    })
+    return enriched
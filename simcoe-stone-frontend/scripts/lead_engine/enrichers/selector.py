@@ -2,22 +2,41 @@
 Central enrichment selector
 
 Chooses between OpenAI, Ollama, or heuristic enrichment based on config and env.
+
+With `"enrichment_cascade": true` in config, every lead is first enriched by the
+heuristic and only escalated to the configured LLM provider when the heuristic
+confidence is below `cascade_threshold`.
 """
 
 import os
 import json
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Optional
 
 try:
     from .llm_enricher import enrich_lead as openai_enrich
+    from .llm_enricher import _heuristic_enrich, heuristic_confidence
 except Exception:
     openai_enrich = None
+    _heuristic_enrich = None
+    heuristic_confidence = None
 
 try:
     from .ollama_enricher import enrich_lead_ollama
 except Exception:
     enrich_lead_ollama = None
 
+DEFAULT_CASCADE_THRESHOLD = 0.75
+
+# Cascade counters (process-wide)
+_cascade_lock = threading.Lock()
+_cascade_stats: Dict[str, Any] = {
+    "total": 0,
+    "escalated": 0,
+    "escalation_failed": 0,
+    "threshold": DEFAULT_CASCADE_THRESHOLD,
+}
+
 
 def _load_config(config_path: str) -> Dict[str, Any]:
     try:
@@ -29,10 +48,21 @@ def _load_config(config_path: str) -> Dict[str, Any]:
     return {}
 
 
-def enrich_lead_with_selector(lead: Dict[str, Any], config_path: str) -> Dict[str, Any]:
-    cfg = _load_config(config_path)
-    provider = (cfg.get("enrichment_provider") or "heuristic").lower()
+def get_cascade_stats() -> Dict[str, Any]:
+    """Get cascade counters, including the current threshold and escalation rate"""
+    with _cascade_lock:
+        stats = dict(_cascade_stats)
+    stats["escalation_rate"] = round(stats["escalated"] / stats["total"], 4) if stats["total"] else 0.0
+    return stats
 
+
+def reset_cascade_stats():
+    """Reset cascade counters (threshold is kept)"""
+    with _cascade_lock:
+        _cascade_stats.update({"total": 0, "escalated": 0, "escalation_failed": 0})
+
+
+def _llm_enrich(lead: Dict[str, Any], cfg: Dict[str, Any], provider: str) -> Optional[Dict[str, Any]]:
     if provider == "openai" and openai_enrich and os.getenv("OPENAI_API_KEY"):
         return openai_enrich(lead)
 
@@ -41,6 +71,45 @@ def enrich_lead_with_selector(lead: Dict[str, Any], config_path: str) -> Dict[st
         host = os.getenv("OLLAMA_HOST") or cfg.get("ollama_host")
         return enrich_lead_ollama(lead, model=model, host=host)
 
+    return None
+
+
+def _cascade_enrich(lead: Dict[str, Any], cfg: Dict[str, Any], provider: str) -> Dict[str, Any]:
+    threshold = float(cfg.get("cascade_threshold", DEFAULT_CASCADE_THRESHOLD))
+    confidence = heuristic_confidence(lead)
+    heuristic = _heuristic_enrich(lead)
+    heuristic["cascade_confidence"] = confidence
+
+    escalate = confidence < threshold
+    with _cascade_lock:
+        _cascade_stats["threshold"] = threshold
+        _cascade_stats["total"] += 1
+        if escalate:
+            _cascade_stats["escalated"] += 1
+    if not escalate:
+        return heuristic
+
+    enriched = _llm_enrich(lead, cfg, provider)
+    if not enriched or str(enriched.get("enriched_by", "")).endswith(("_error", "heuristic")):
+        # LLM unavailable or unusable: the heuristic answer is still the best we have
+        with _cascade_lock:
+            _cascade_stats["escalation_failed"] += 1
+        return heuristic
+    enriched["cascade_confidence"] = confidence
+    return enriched
+
+
+def enrich_lead_with_selector(lead: Dict[str, Any], config_path: str) -> Dict[str, Any]:
+    cfg = _load_config(config_path)
+    provider = (cfg.get("enrichment_provider") or "heuristic").lower()
+
+    if cfg.get("enrichment_cascade") and heuristic_confidence and provider != "heuristic":
+        return _cascade_enrich(lead, cfg, provider)
+
+    enriched = _llm_enrich(lead, cfg, provider)
+    if enriched is not None:
+        return enriched
+
     # fallback heuristic via llm_enricher (it contains heuristic internally)
     if openai_enrich:
         return openai_enrich(lead)
@@ -0,0 +1,361 @@
+"""
+Structured Output Layer for LLM Enrichers
+
+Shared helpers for getting JSON out of an LLM reliably:
+- Requests JSON-constrained output (Ollama `format: json`, OpenAI `json_object`)
+- Cheap local repairs (code fences, prose around the object, trailing commas,
+  single quotes, Python literals, truncated braces) before spending a retry
+- Validates and coerces the result against a small JSON-Schema subset
+- Tracks parse outcomes per model so failure rates are visible
+"""
+
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a response cannot be parsed or validated against a schema"""
+
+
+# Schemas used by the enrichers (JSON-Schema subset: type, properties, required,
+# enum, minimum, maximum, maxLength, items, default)
+LEAD_ENRICHMENT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "category": {
+            "type": "string",
+            "enum": ["stone_masonry", "construction", "general_contractor", "tile", "roofer", "carpenter"],
+            "default": "general_contractor",
+        },
+        "quality_score": {"type": "integer", "minimum": 1, "maximum": 10, "default": 5},
+        "normalized_phone": {"type": "string", "default": ""},
+        "short_profile": {"type": "string", "maxLength": 160, "default": ""},
+    },
+    "required": ["category", "quality_score"],
+}
+
+CONTRACTOR_ANALYSIS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "job_types": {"type": "array", "items": {"type": "string"}, "default": []},
+        "est_revenue_low": {"type": "number", "minimum": 0, "default": 0},
+        "est_revenue_high": {"type": "number", "minimum": 0, "default": 0},
+        "pitch": {"type": "string", "default": ""},
+        "score": {"type": "integer", "minimum": 1, "maximum": 10, "default": 5},
+        "rationale": {"type": "string", "default": ""},
+    },
+    "required": ["score"],
+}
+
+LEAD_SCORE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "integer", "minimum": 1, "maximum": 10, "default": 5},
+        "rationale": {"type": "string", "default": ""},
+    },
+    "required": ["score"],
+}
+
+# Per-model parse outcome counters
+_stats_lock = threading.Lock()
+_parse_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _record(model: str, outcome: str):
+    with _stats_lock:
+        entry = _parse_stats.setdefault(model or "unknown", {
+            "attempts": 0, "parsed": 0, "repaired": 0, "retried": 0, "failed": 0
+        })
+        entry[outcome] += 1
+
+
+def get_parse_stats() -> Dict[str, Dict[str, Any]]:
+    """Get parse outcome counters and failure rate per model"""
+    with _stats_lock:
+        out = {}
+        for model, entry in _parse_stats.items():
+            attempts = entry["attempts"] or 1
+            out[model] = dict(entry)
+            out[model]["failure_rate"] = round(entry["failed"] / attempts, 4)
+            out[model]["repair_rate"] = round(entry["repaired"] / attempts, 4)
+        return out
+
+
+def reset_parse_stats():
+    """Clear all per-model parse counters"""
+    with _stats_lock:
+        _parse_stats.clear()
+
+
+def _strip_code_fences(text: str) -> str:
+    m = re.search(r"```(?:json)?\s*([\s\S]*?)```", text, re.I)
+    return m.group(1) if m else text
+
+
+def _first_json_object(text: str) -> Optional[str]:
+    """Return the first balanced {...} block (string-aware), or the unterminated tail"""
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    in_str = False
+    quote = ""
+    escape = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_str:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == quote:
+                in_str = False
+            continue
+        if ch in ("\"", "'"):
+            in_str = True
+            quote = ch
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    # Truncated output: hand back what we have and let repair close it
+    return text[start:]
+
+
+def _close_truncated(candidate: str) -> str:
+    stack: List[str] = []
+    in_str = False
+    escape = False
+    for ch in candidate:
+        if in_str:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == "\"":
+                in_str = False
+            continue
+        if ch == "\"":
+            in_str = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+    if in_str:
+        candidate += "\""
+    candidate = re.sub(r",\s*$", "", candidate.rstrip())
+    return candidate + "".join(reversed(stack))
+
+
+# A double-quoted JSON string, or the unterminated tail of one
+_JSON_STRING = re.compile(r'"(?:[^"\\]|\\.)*(?:"|\\?$)', re.DOTALL)
+
+_OUTSIDE_STRING_FIXES = [
+    # Python literals
+    (re.compile(r"\bTrue\b"), "true"),
+    (re.compile(r"\bFalse\b"), "false"),
+    (re.compile(r"\bNone\b"), "null"),
+    # Unquoted keys: {score: 5}
+    (re.compile(r"([{,]\s*)([A-Za-z_][A-Za-z0-9_]*)(\s*:)"), r'\1"\2"\3'),
+]
+
+
+def _sub_outside_strings(text: str, fixes: List[Tuple[re.Pattern, str]]) -> str:
+    """Apply regex substitutions to the text between string literals only"""
+    def fix(segment: str) -> str:
+        for pattern, replacement in fixes:
+            segment = pattern.sub(replacement, segment)
+        return segment
+
+    parts: List[str] = []
+    pos = 0
+    for match in _JSON_STRING.finditer(text):
+        parts.append(fix(text[pos:match.start()]))
+        parts.append(match.group())
+        pos = match.end()
+    parts.append(fix(text[pos:]))
+    return "".join(parts)
+
+
+def _repair(candidate: str) -> str:
+    fixed = candidate.strip()
+    # Single-quoted keys/strings (only when no double quotes are present)
+    if "\"" not in fixed and "'" in fixed:
+        fixed = fixed.replace("'", "\"")
+    # String contents ("None yet", "call: 9am, ask: Bob") are left alone
+    fixed = _sub_outside_strings(fixed, _OUTSIDE_STRING_FIXES)
+    fixed = _close_truncated(fixed)
+    # Trailing commas before a closing bracket
+    return _sub_outside_strings(fixed, [(re.compile(r",\s*([}\]])"), r"\1")])
+
+
+def parse_json_response(text: str) -> Tuple[Dict[str, Any], bool]:
+    """Parse a JSON object out of an LLM response
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        Tuple of (parsed object, whether a repair was needed)
+
+    Raises:
+        StructuredOutputError: If no JSON object can be recovered
+    """
+    text = (text or "").strip()
+    if not text:
+        raise StructuredOutputError("Empty response")
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict):
+            return data, False
+    except Exception:
+        pass
+
+    candidate = _first_json_object(_strip_code_fences(text))
+    if candidate is None:
+        raise StructuredOutputError("No JSON object found in response")
+    # Repairs only run once the extracted object fails to parse as it is
+    for repair in (False, True):
+        try:
+            data = json.loads(_repair(candidate) if repair else candidate)
+            if isinstance(data, dict):
+                return data, True
+        except Exception:
+            continue
+    raise StructuredOutputError("Could not repair JSON response")
+
+
+def _coerce(value: Any, spec: Dict[str, Any]) -> Any:
+    expected = spec.get("type")
+    if value is None:
+        raise StructuredOutputError("null value")
+    if expected == "string":
+        value = value if isinstance(value, str) else (", ".join(map(str, value)) if isinstance(value, list) else str(value))
+        if "enum" in spec:
+            norm = value.strip().lower().replace(" ", "_").replace("-", "_")
+            if norm not in spec["enum"]:
+                raise StructuredOutputError(f"'{value}' not in enum")
+            value = norm
+        if spec.get("maxLength"):
+            value = value[:spec["maxLength"]]
+        return value
+    if expected in ("integer", "number"):
+        if isinstance(value, bool):
+            raise StructuredOutputError("boolean is not numeric")
+        if isinstance(value, str):
+            m = re.search(r"-?\d[\d,]*(?:\.\d+)?", value)
+            if not m:
+                raise StructuredOutputError(f"'{value}' is not numeric")
+            value = m.group(0).replace(",", "")
+        value = float(value)
+        if "minimum" in spec:
+            value = max(spec["minimum"], value)
+        if "maximum" in spec:
+            value = min(spec["maximum"], value)
+        return int(round(value)) if expected == "integer" else value
+    if expected == "array":
+        if isinstance(value, str):
+            value = [v.strip() for v in value.split(",") if v.strip()]
+        if not isinstance(value, list):
+            value = [value]
+        item_spec = spec.get("items")
+        return [_coerce(v, item_spec) for v in value] if item_spec else value
+    if expected == "boolean":
+        if isinstance(value, str):
+            return value.strip().lower() in ("true", "yes", "1")
+        return bool(value)
+    return value
+
+
+def validate_against_schema(data: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate and coerce a parsed object against a schema
+
+    Unknown keys are dropped, optional fields fall back to their defaults.
+
+    Raises:
+        StructuredOutputError: If a required field is missing or invalid
+    """
+    properties = schema.get("properties", {})
+    required = set(schema.get("required", []))
+    out: Dict[str, Any] = {}
+    for key, spec in properties.items():
+        if key in data and data[key] is not None:
+            try:
+                out[key] = _coerce(data[key], spec)
+                continue
+            except (StructuredOutputError, TypeError, ValueError) as e:
+                if key in required:
+                    raise StructuredOutputError(f"Invalid value for '{key}': {e}")
+        elif key in required:
+            raise StructuredOutputError(f"Missing required field '{key}'")
+        if "default" in spec:
+            out[key] = spec["default"]
+    return out
+
+
+def schema_defaults(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Get an object populated with every default in the schema"""
+    return {k: v["default"] for k, v in schema.get("properties", {}).items() if "default" in v}
+
+
+def schema_prompt_hint(schema: Dict[str, Any]) -> str:
+    """Compact description of the expected object, appended to prompts"""
+    parts = []
+    for key, spec in schema.get("properties", {}).items():
+        desc = spec.get("type", "string")
+        if "enum" in spec:
+            desc = "one of: " + ", ".join(spec["enum"])
+        elif "minimum" in spec and "maximum" in spec:
+            desc = f"{desc} {spec['minimum']}-{spec['maximum']}"
+        parts.append(f'"{key}": {desc}')
+    return "Respond ONLY with a JSON object: {" + ", ".join(parts) + "}"
+
+
+def generate_structured(
+    generate_fn: Callable[[str], str],
+    prompt: str,
+    schema: Dict[str, Any],
+    model: str,
+    max_retries: int = 1,
+) -> Dict[str, Any]:
+    """Run a generation and return a schema-validated object
+
+    Args:
+        generate_fn: Callable that takes a prompt and returns raw model text.
+            The caller is responsible for asking the backend for JSON output.
+        prompt: Prompt text
+        schema: Expected object schema
+        model: Model name (used for per-model parse stats)
+        max_retries: Extra generations allowed after local repair fails
+
+    Returns:
+        Validated dictionary
+
+    Raises:
+        StructuredOutputError: If every attempt fails to parse/validate
+        Exception: Transport errors from generate_fn are propagated
+    """
+    last_error: Optional[Exception] = None
+    attempt_prompt = prompt
+    for attempt in range(max_retries + 1):
+        _record(model, "attempts")
+        if attempt > 0:
+            _record(model, "retried")
+        text = generate_fn(attempt_prompt)
+        try:
+            data, repaired = parse_json_response(text)
+            result = validate_against_schema(data, schema)
+            _record(model, "repaired" if repaired else "parsed")
+            return result
+        except StructuredOutputError as e:
+            last_error = e
+            _record(model, "failed")
+            attempt_prompt = (
+                f"{prompt}\n\nYour previous reply was not valid JSON ({e}). "
+                f"{schema_prompt_hint(schema)}"
+            )
+    raise StructuredOutputError(str(last_error))
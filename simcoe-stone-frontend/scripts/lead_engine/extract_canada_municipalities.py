@@ -2,37 +2,50 @@
 Extract all Canadian municipalities from the official GeoNames dataset and generate canada_municipalities.txt
 
 Instructions:
-1. Place the file 'CA.zip' in the docs folder: C:/Users/16479/Desktop/Simcoe Stone/simcoe-stone-frontend/docs/CA.zip
-2. Run this script in your venv: python extract_canada_municipalities.py
+1. Download the GeoNames Canada dump (CA.zip) into simcoe-stone-frontend/docs/, or anywhere else
+2. Run this script in your venv: python extract_canada_municipalities.py [--zip path/to/CA.zip]
 3. The output file 'canada_municipalities.txt' will contain every city/town/village/hamlet in Canada, one per line.
+4. 'canada_municipality_provinces.csv' maps each place to its province/territory (GeoNames admin1 code),
+   and is the index behind modules/data/geography.py.
 """
+import argparse
 import os
 import zipfile
 
-DOCS_ZIP = os.path.normpath(r"C:\Users\16479\Desktop\Simcoe Stone\simcoe-stone-frontend\docs\CA.zip")
+DOCS_ZIP = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "docs", "CA.zip"))
 INPUT_FILE = os.path.join(os.path.dirname(__file__), "CA.txt")
 OUTPUT_FILE = os.path.join(os.path.dirname(__file__), "canada_municipalities.txt")
+PROVINCES_FILE = os.path.join(os.path.dirname(__file__), "canada_municipality_provinces.csv")
+
+# GeoNames admin1 codes for Canadian provinces/territories
+ADMIN1_PROVINCES = {
+    "01": "Alberta", "02": "British Columbia", "03": "Manitoba", "04": "New Brunswick",
+    "05": "Newfoundland and Labrador", "07": "Nova Scotia", "08": "Ontario",
+    "09": "Prince Edward Island", "10": "Quebec", "11": "Saskatchewan", "12": "Yukon",
+    "13": "Northwest Territories", "14": "Nunavut",
+}
 
 # GeoNames feature codes for populated places
 FEATURE_CODES = {"PPL", "PPLA", "PPLA2", "PPLA3", "PPLA4", "PPLC", "PPLF", "PPLG", "PPLL", "PPLR", "PPLS", "PPLX", "STLMT"}
 
-def unzip_ca_zip():
-    if not os.path.exists(DOCS_ZIP):
-        print(f"Missing CA.zip in docs folder: {DOCS_ZIP}")
+def unzip_ca_zip(zip_path=DOCS_ZIP):
+    if not os.path.exists(zip_path):
+        print(f"Missing CA.zip: {zip_path}")
         return False
-    with zipfile.ZipFile(DOCS_ZIP, "r") as zip_ref:
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
         zip_ref.extract("CA.txt", os.path.dirname(__file__))
     print(f"Extracted CA.txt from CA.zip to {os.path.dirname(__file__)}")
     return True
 
-def extract_municipalities():
+def extract_municipalities(zip_path=DOCS_ZIP):
     if not os.path.exists(INPUT_FILE):
         print(f"CA.txt not found, attempting to unzip CA.zip...")
-        if not unzip_ca_zip():
-            print("Failed to extract CA.txt. Please ensure CA.zip is present in the docs folder.")
+        if not unzip_ca_zip(zip_path):
+            print("Failed to extract CA.txt. Pass the GeoNames dump with --zip path/to/CA.zip.")
             return
     names = set()
     population_rows = []
+    province_rows = []
     total_lines = 0
     ppl_count = 0
     with open(INPUT_FILE, "r", encoding="utf-8") as f:
@@ -43,11 +56,15 @@ def extract_municipalities():
                 continue
             name = parts[1]
             feature_code = parts[7]
+            admin1 = parts[10]
             population = parts[14] if parts[14] else "0"
             if feature_code == "PPL":
                 ppl_count += 1
                 names.add(name)
                 population_rows.append((name, population))
+                province = ADMIN1_PROVINCES.get(admin1)
+                if province:
+                    province_rows.append((name, province, population))
     print(f"Processed {total_lines} lines. Found {ppl_count} PPL features.")
     print(f"Sample extracted rows: {population_rows[:5]}")
     sorted_names = sorted(names)
@@ -63,8 +80,18 @@ def extract_municipalities():
         writer.writerow(["municipality", "population"])
         for row in population_rows:
             writer.writerow(row)
+    # Write municipality -> province index (geography.py keeps the largest population per name/province)
+    with open(PROVINCES_FILE, "w", newline='', encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["municipality", "province", "population"])
+        for row in sorted(set(province_rows)):
+            writer.writerow(row)
     print(f"Extracted {len(sorted_names)} municipalities to {OUTPUT_FILE}")
+    print(f"Wrote {len(set(province_rows))} municipality/province rows to {PROVINCES_FILE}")
     print(f"Extracted {len(population_rows)} municipalities with population to {population_csv_path}")
 
 if __name__ == "__main__":
-    extract_municipalities()
+    parser = argparse.ArgumentParser(description="Extract Canadian municipalities from the GeoNames CA dump")
+    parser.add_argument("--zip", default=DOCS_ZIP, help=f"Path to CA.zip (default: {DOCS_ZIP})")
+    args = parser.parse_args()
+    extract_municipalities(args.zip)
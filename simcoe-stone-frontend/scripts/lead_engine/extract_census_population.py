@@ -1,52 +1,251 @@
+"""
+Streaming extractor for the StatCan 2021 Census Profile CSV download (98-401-X2021xxx)
 
+1. Reads the data members straight out of the zip archive (nothing is unpacked);
+   regional downloads split the profile into pairs such as
+   *_CSV_data_Ontario.csv / *_Geo_starting_row_Ontario.CSV, read in turn
+2. Uses each *_Geo_starting_row member to skip directly to the geography blocks
+   it needs, without CSV-parsing the rows in between, and stops after the last block
+3. Writes each geographic level as a columnar float matrix (.npy, written through
+   a memory map) plus a JSON sidecar with geography and characteristic labels:
+     census_data/census_province.npy / .json   provinces and territories
+     census_data/census_csd.npy / .json        census subdivisions (municipalities)
+4. Keeps census_province_wide.csv (one row per province, one column per
+   characteristic name) for existing readers
 
+Peak memory is one block of rows plus the province table, whatever the size of
+the profile. Levels absent from an archive are skipped (the province/territory
+download has no CSD rows).
+
+Usage:
+    python extract_census_population.py [path/to/98-401-X2021001_eng_CSV.zip]
+The zip path can also come from CENSUS_PROFILE_ZIP.
+"""
+import argparse
+import csv
+import io
+import json
 import os
+import re
+import time
 import zipfile
-import csv
+from collections import deque
+from itertools import chain, islice
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DOCS_ZIP = os.getenv("CENSUS_PROFILE_ZIP") or os.path.normpath(
+    os.path.join(BASE_DIR, "..", "..", "docs", "98-401-X2021001_eng_CSV.zip"))
+EXTRACT_DIR = os.path.join(BASE_DIR, "census_data")
+OUTPUT_FILE = os.path.join(BASE_DIR, "census_province_wide.csv")
+
+# DGUID schema (characters 5-9 of e.g. "2021A000235") -> output level
+LEVEL_SCHEMAS = {"A0002": "province", "A0005": "csd"}
+DEFAULT_LEVELS = ("province", "csd")
+
+# Data file columns (see README_meta.txt)
+COL_DGUID, COL_GEO_NAME, COL_CHAR_ID, COL_CHAR_NAME, COL_COUNT_TOTAL = 1, 4, 8, 9, 11
+
+Block = Tuple[str, str, int, int]  # (dguid, geo name, first line, row count)
+Members = Tuple[str, str]  # (Geo_starting_row member, data member)
+
+# Member names; the optional suffix names the region of a split download
+DATA_MEMBER = re.compile(r"_CSV_data(_\w+)?\.csv$", re.IGNORECASE)
+GEO_MEMBER = re.compile(r"_Geo_starting_row(_\w+)?\.CSV$", re.IGNORECASE)
+
+
+def level_of(dguid: str) -> Optional[str]:
+    """Output level for a DGUID, or None for levels that are not extracted"""
+    return LEVEL_SCHEMAS.get(dguid[4:9])
+
+
+def member_pairs(zf: zipfile.ZipFile) -> List[Members]:
+    """(Geo_starting_row, data) member pairs, matched on their region suffix"""
+    data: Dict[str, str] = {}
+    geo: Dict[str, str] = {}
+    for name in zf.namelist():
+        for pattern, found in ((DATA_MEMBER, data), (GEO_MEMBER, geo)):
+            match = pattern.search(name)
+            if match:
+                found[(match.group(1) or "").lower()] = name
+    for region in sorted(data.keys() - geo.keys()):
+        print(f"[Warning] No Geo_starting_row member for {data[region]}; skipped")
+    pairs = [(geo[region], data[region]) for region in sorted(data.keys() & geo.keys())]
+    if not pairs:
+        raise FileNotFoundError(f"No *_CSV_data / *_Geo_starting_row members in {zf.filename}")
+    return pairs
+
+
+def read_geo_blocks(zf: zipfile.ZipFile, members: Optional[Members] = None) -> List[Block]:
+    """Geography blocks from a Geo_starting_row member, in file order
+
+    The last block is assumed to have the same length as the others; every
+    geography in a profile download carries the same characteristic list.
+
+    Args:
+        zf: Profile zip
+        members: (Geo_starting_row, data) pair; defaults to the first from member_pairs
+    """
+    geo_member, data_member = members or member_pairs(zf)[0]
+    with zf.open(geo_member) as raw:
+        reader = csv.reader(io.TextIOWrapper(raw, encoding="latin1", newline=""))
+        next(reader, None)
+        starts = sorted(((int(r[2]), r[0], r[1]) for r in reader if len(r) >= 3), key=lambda s: s[0])
+    if not starts:
+        return []
+    lengths = [b[0] - a[0] for a, b in zip(starts, starts[1:])]
+    block_len = lengths[0] if lengths else 0
+    if block_len == 0:
+        # Single-geography file: count its rows once
+        with zf.open(data_member) as raw:
+            block_len = sum(1 for _ in raw) - (starts[0][0] - 1)
+    lengths.append(block_len)
+    return [(code, name, line, n) for (line, code, name), n in zip(starts, lengths)]
+
+
+def stream_blocks(zf: zipfile.ZipFile, blocks: Sequence[Block],
+                  data_member: Optional[str] = None) -> Iterator[Tuple[Block, Iterator[List[str]]]]:
+    """Yield (block, csv rows) for the requested blocks of one data member in a single forward pass
+
+    Lines between blocks are skipped unparsed; rows a consumer leaves unread are
+    drained before moving on, so blocks can be processed partially.
+    """
+    with zf.open(data_member or member_pairs(zf)[0][1]) as raw:
+        text = io.TextIOWrapper(raw, encoding="latin1", newline="")
+        next_line = 1  # 1-based number of the next unread line (line 1 is the header)
+        for block in sorted(blocks, key=lambda b: b[2]):
+            _, _, start, count = block
+            if start < next_line:
+                raise ValueError(f"Overlapping geography blocks at line {start}")
+            deque(islice(text, start - next_line), maxlen=0)
+            lines = islice(text, count)
+            yield block, csv.reader(lines)
+            deque(lines, maxlen=0)
+            next_line = start + count
+
+
+def _to_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def extract(
+    zip_path: str = DOCS_ZIP,
+    out_dir: str = EXTRACT_DIR,
+    levels: Sequence[str] = DEFAULT_LEVELS,
+    wide_csv: Optional[str] = OUTPUT_FILE,
+) -> Dict[str, int]:
+    """Extract the requested levels from a profile zip into columnar files
+
+    Args:
+        zip_path: Census Profile CSV download (zip)
+        out_dir: Directory for census_<level>.npy/.json
+        levels: Output levels ("province", "csd")
+        wide_csv: Province wide CSV to write (None to skip)
+
+    Returns:
+        Number of geographies written per level
+    """
+    start_time = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    with zipfile.ZipFile(zip_path) as zf:
+        # Blocks per data member; a geography repeated across regional members is read once
+        seen = set()
+        member_blocks: List[Tuple[str, List[Block]]] = []
+        for members in member_pairs(zf):
+            wanted = [b for b in read_geo_blocks(zf, members) if level_of(b[0]) in levels and b[0] not in seen]
+            seen.update(b[0] for b in wanted)
+            member_blocks.append((members[1], wanted))
+        blocks = [b for _, wanted in member_blocks for b in wanted]
+        if not blocks:
+            print(f"No {'/'.join(levels)} geographies in {zip_path}")
+            return {}
+        n_chars = max(b[3] for b in blocks)
+        by_level: Dict[str, List[Block]] = {}
+        for b in blocks:
+            by_level.setdefault(level_of(b[0]), []).append(b)
+        row_of = {b[0]: i for level_blocks in by_level.values() for i, b in enumerate(level_blocks)}
+        matrices = {}
+        for level, level_blocks in by_level.items():
+            matrices[level] = open_memmap(os.path.join(out_dir, f"census_{level}.npy"), mode="w+",
+                                          dtype=np.float64, shape=(len(level_blocks), n_chars))
+            matrices[level][:] = np.nan
+
+        char_ids: List[int] = []
+        char_names: List[str] = []
+        province_wide: Dict[str, Dict[str, str]] = {}
+        streams = chain.from_iterable(stream_blocks(zf, wanted, data_member) for data_member, wanted in member_blocks)
+        for block, rows in streams:
+            dguid, geo_name, _, _ = block
+            level = level_of(dguid)
+            values = np.full(n_chars, np.nan)
+            wide = province_wide.setdefault(geo_name, {}) if level == "province" else None
+            for j, row in enumerate(rows):
+                if len(row) <= COL_COUNT_TOTAL or j >= n_chars:
+                    continue
+                if len(char_ids) < n_chars and j == len(char_ids):
+                    char_ids.append(int(row[COL_CHAR_ID]))
+                    char_names.append(row[COL_CHAR_NAME].strip())
+                value = row[COL_COUNT_TOTAL].strip()
+                values[j] = _to_float(value)
+                if wide is not None:
+                    # Repeated characteristic names keep the last value, as before
+                    wide[row[COL_CHAR_NAME].strip()] = value
+            matrices[level][row_of[dguid]] = values
+
+    counts = {}
+    for level, level_blocks in by_level.items():
+        matrices[level].flush()
+        del matrices[level]
+        sidecar = {
+            "source": os.path.basename(zip_path),
+            "level": level,
+            "geo_codes": [b[0] for b in level_blocks],
+            "geo_names": [b[1] for b in level_blocks],
+            "characteristic_ids": char_ids,
+            "characteristic_names": char_names,
+            "value_column": "C1_COUNT_TOTAL",
+        }
+        with open(os.path.join(out_dir, f"census_{level}.json"), "w", encoding="utf-8") as f:
+            json.dump(sidecar, f)
+        counts[level] = len(level_blocks)
+
+    if wide_csv and province_wide:
+        columns = sorted({name for data in province_wide.values() for name in data})
+        with open(wide_csv, "w", newline="", encoding="utf-8") as out:
+            writer = csv.writer(out)
+            writer.writerow(["province_territory"] + columns)
+            for province, data in province_wide.items():
+                writer.writerow([province] + [data.get(col, "") for col in columns])
+
+    print(f"Extracted {counts} geographies x {n_chars} characteristics in {time.perf_counter() - start_time:.2f}s")
+    return counts
+
+
+def load_level(level: str, out_dir: str = EXTRACT_DIR):
+    """Open an extracted level: (memory-mapped matrix, sidecar labels)"""
+    with open(os.path.join(out_dir, f"census_{level}.json"), "r", encoding="utf-8") as f:
+        labels = json.load(f)
+    return np.load(os.path.join(out_dir, f"census_{level}.npy"), mmap_mode="r"), labels
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Stream a StatCan Census Profile zip into columnar tables")
+    parser.add_argument("zip_path", nargs="?", default=DOCS_ZIP, help="Census Profile CSV zip (env: CENSUS_PROFILE_ZIP)")
+    parser.add_argument("--out-dir", default=EXTRACT_DIR, help="Directory for census_<level>.npy/.json")
+    parser.add_argument("--levels", nargs="+", default=list(DEFAULT_LEVELS), choices=sorted(set(LEVEL_SCHEMAS.values())))
+    parser.add_argument("--wide-csv", default=OUTPUT_FILE, help="Province wide CSV ('' to skip)")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.zip_path):
+        parser.error(f"Census zip not found: {args.zip_path}")
+    extract(args.zip_path, args.out_dir, args.levels, args.wide_csv or None)
+
 
-DOCS_ZIP = os.path.normpath(r"C:\Users\16479\Desktop\Simcoe Stone\simcoe-stone-frontend\docs\98-401-X2021001_eng_CSV.zip")
-EXTRACT_DIR = os.path.join(os.path.dirname(__file__), "census_data")
-OUTPUT_FILE = os.path.join(os.path.dirname(__file__), "census_province_wide.csv")
-
-# Step 1: Unzip the census data
-if not os.path.exists(EXTRACT_DIR):
-    os.makedirs(EXTRACT_DIR)
-with zipfile.ZipFile(DOCS_ZIP, "r") as zip_ref:
-    zip_ref.extractall(EXTRACT_DIR)
-
-# Step 2: Find the main CSV file (usually the largest or most recent)
-csv_files = [f for f in os.listdir(EXTRACT_DIR) if f.endswith('.csv')]
-if not csv_files:
-    print("No CSV files found in census data zip.")
-    exit(1)
-main_csv = max(csv_files, key=lambda f: os.path.getsize(os.path.join(EXTRACT_DIR, f)))
-main_csv_path = os.path.join(EXTRACT_DIR, main_csv)
-
-# Step 3: Parse and clean the census data for province/territory-level variables
-province_data = {}
-all_variables = set()
-with open(main_csv_path, "r", encoding="latin1") as f:
-    reader = csv.reader(f)
-    header = next(reader)
-    for row in reader:
-        if len(row) < 12:
-            continue
-        geo_level = row[3].strip()
-        geo_name = row[4].strip()
-        char_name = row[9].strip()
-        value = row[11].strip()
-        if geo_level in ["Province", "Territory"]:
-            all_variables.add(char_name)
-            if geo_name not in province_data:
-                province_data[geo_name] = {}
-            province_data[geo_name][char_name] = value
-
-# Step 4: Write wide CSV with all actionable variables
-columns = ["province_territory"] + sorted(all_variables)
-with open(OUTPUT_FILE, "w", newline='', encoding="utf-8") as out:
-    writer = csv.writer(out)
-    writer.writerow(columns)
-    for province, data in province_data.items():
-        row = [province] + [data.get(col, "") for col in columns[1:]]
-        writer.writerow(row)
-print(f"Extracted wide province/territory census data to {OUTPUT_FILE}")
+if __name__ == "__main__":
+    main()
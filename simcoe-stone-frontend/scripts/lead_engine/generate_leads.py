@@ -1,10 +1,17 @@
 """
 Lead Generation Script
 
-This script runs the actual lead generation process:
-1. Scrapes contractor data from OpenStreetMap for multiple cities
-2. Saves the results to the leads CSV file
-3. Updates the RAG database with new leads
+This script runs the actual lead generation process as checkpointed stages:
+1. scrape: contractor data from OpenStreetMap, city by city
+2. dedup: drops leads already stored or seen, applies the per-hour cap
+3. enrich: enriches the new candidates, lead by lead
+4. persist: appends them to the lead store and backs it up
+5. index: updates the RAG database with the scraped leads
+
+Each stage writes its output under data/runs/<run_id>/ before the next one
+starts; --resume continues an interrupted run from its first unfinished
+stage (scrape and enrich also skip the cities/leads they already finished).
+Per-stage timings are written to lead_generation_stats.json.
 """
 
 import os
@@ -12,7 +19,7 @@ import sys
 import json
 import logging
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Add the parent directory to the path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -24,6 +31,8 @@ if parent_dir not in sys.path:
 from scraping.osm import get_city_bbox, scrape_contractors
 
 # Import data sync module
+from modules.data.checkpoints import PipelineRun
+from modules.data.lead_store import lead_key
 from modules.data.sync import DataSyncManager
 
 # Import RAG module
@@ -37,7 +46,7 @@ except ImportError:
 # Enrichment selector (Ollama/OpenAI/heuristic)
 CONFIG_PATH = os.path.join(parent_dir, "data", "config.json")
 try:
-    from enrichers.selector import enrich_lead_with_selector
+    from enrichers.selector import enrich_lead_with_selector, get_cascade_stats, reset_cascade_stats
     ENRICH_AVAILABLE = True
 except Exception:
     ENRICH_AVAILABLE = False
@@ -58,203 +67,253 @@ DEFAULT_CITIES = [
     "Ottawa", "Montreal", "Vancouver", "Calgary", "Edmonton"
 ]
 
+STAGES = ("scrape", "dedup", "enrich", "persist", "index")
+RUNS_DIR = os.path.join(current_dir, "data", "runs")
+STATS_FILE = os.path.join(current_dir, "lead_generation_stats.json")
+
+def _scraped_leads(run: PipelineRun) -> List[Dict[str, Any]]:
+    """Leads from the scrape artifact (a city scraped twice keeps its last result)"""
+    by_city: Dict[str, List[Dict[str, Any]]] = {}
+    for record in run.records("scrape"):
+        by_city[record["city"]] = record.get("leads", [])
+    return [lead for leads in by_city.values() for lead in leads]
+
+
+def _scrape_stage(run: PipelineRun, stats: Dict[str, Any]) -> int:
+    """Scrape each city not yet recorded in scrape.jsonl (cities that errored are retried)"""
+    results: Dict[str, Dict[str, Any]] = {r["city"]: r for r in run.records("scrape")}
+    for city in run.params["cities"]:
+        if city in results and results[city]["status"] != "error":
+            continue
+        record: Dict[str, Any] = {"city": city, "status": "ok", "leads": []}
+        try:
+            print(f"Processing {city}...")
+            logger.info(f"Processing {city}")
+            
+            # Get city bounding box
+            bbox = get_city_bbox(city)
+            
+            if not bbox:
+                print(f"Could not find bounding box for {city}, skipping")
+                logger.warning(f"Could not find bounding box for {city}, skipping")
+                record["status"] = "no_bbox"
+            else:
+                # Scrape contractors in the city
+                contractors = scrape_contractors(city, bbox)
+                
+                if contractors:
+                    print(f"Found {len(contractors)} contractors in {city}")
+                    logger.info(f"Found {len(contractors)} contractors in {city}")
+                    record["leads"] = contractors
+                else:
+                    print(f"No contractors found in {city}")
+                    logger.warning(f"No contractors found in {city}")
+        
+        except Exception as e:
+            print(f"Error processing {city}: {e}")
+            logger.error(f"Error processing {city}: {e}")
+            record.update(status="error", error=str(e))
+        
+        run.append("scrape", record)
+        results[city] = record
+    
+    stats["cities_processed"] = sum(1 for r in results.values() if r["status"] == "ok")
+    stats["cities_failed"] = len(results) - stats["cities_processed"]
+    stats["total_leads"] = sum(len(r.get("leads", [])) for r in results.values())
+    return stats["total_leads"]
+
+
+def _dedup_stage(run: PipelineRun, sync_manager: DataSyncManager, stats: Dict[str, Any]) -> int:
+    """Keep scraped leads not in the store (first of each key), up to the per-hour cap"""
+    try:
+        existing_keys = sync_manager.lead_keys()
+    except Exception:
+        existing_keys = set()
+    
+    # Filter unique by (name|service_area) against existing
+    candidates: List[Dict[str, Any]] = []
+    seen = set()
+    for lead in _scraped_leads(run):
+        key = lead_key(lead.get("name"), lead.get("service_area"))
+        if key and key not in existing_keys and key not in seen:
+            candidates.append(lead)
+            seen.add(key)
+    
+    # Cap the number of new leads to process this run
+    per_hour_cap = run.params.get("per_hour_cap")
+    if per_hour_cap and len(candidates) > per_hour_cap:
+        candidates = candidates[:per_hour_cap]
+    
+    run.save("candidates", candidates)
+    stats["candidates"] = len(candidates)
+    return len(candidates)
+
+
+def _add_cascade_stats(previous: Optional[Dict[str, Any]], attempt: Dict[str, Any]) -> Dict[str, Any]:
+    """Cascade counters of earlier attempts of this run plus those of the current one"""
+    totals = dict(attempt)
+    for counter in ("total", "escalated", "escalation_failed"):
+        totals[counter] = (previous or {}).get(counter, 0) + attempt.get(counter, 0)
+    totals["escalation_rate"] = round(totals["escalated"] / totals["total"], 4) if totals["total"] else 0.0
+    return totals
+
+
+def _enrich_stage(run: PipelineRun, stats: Dict[str, Any]) -> int:
+    """Enrich each candidate not yet recorded in enriched.jsonl"""
+    candidates = run.load("candidates", [])
+    done = {r["key"] for r in run.records("enriched")}
+    if ENRICH_AVAILABLE:
+        # The selector's counters are process-wide; count this attempt only
+        reset_cascade_stats()
+    try:
+        for lead in candidates:
+            key = lead_key(lead.get("name"), lead.get("service_area"))
+            if key in done:
+                continue
+            enriched = enrich_lead_with_selector(lead, CONFIG_PATH) if ENRICH_AVAILABLE else lead
+            run.append("enriched", {"key": key, "lead": enriched})
+    finally:
+        if ENRICH_AVAILABLE:
+            # Failed attempts count too: their enriched leads are kept
+            stats["enrichment_cascade"] = _add_cascade_stats(stats.get("enrichment_cascade"), get_cascade_stats())
+    
+    stats["enriched"] = len(candidates) if ENRICH_AVAILABLE else 0
+    return len(candidates)
+
+
+def _persist_stage(run: PipelineRun, sync_manager: DataSyncManager, stats: Dict[str, Any]) -> int:
+    """Append the enriched leads to the store and back it up"""
+    saved = run.load("persist")
+    if saved is None:
+        # Without new candidates fall back to everything scraped (stored leads are skipped)
+        target_leads = [r["lead"] for r in run.records("enriched")] or _scraped_leads(run)
+        
+        # Append in one transaction; leads already in the store are skipped
+        saved = {"new_leads": sync_manager.append_leads(target_leads)}
+        run.save("persist", saved)
+    stats["new_leads"] = saved["new_leads"]
+    total = sync_manager.count_leads()
+    print(f"Saved {total} total leads to the lead store (+{stats['new_leads']} new this run)")
+    logger.info(f"Saved {total} total leads to the lead store (+{stats['new_leads']} new this run)")
+    
+    # Create backup (the only full read of the store in the pipeline)
+    sync_manager.backup_leads(sync_manager.load_leads())
+    print("Created backup of leads data")
+    return stats["new_leads"]
+
+
+def _index_stage(run: PipelineRun, stats: Dict[str, Any]) -> int:
+    """Add the scraped leads to the RAG database"""
+    rag_engine = RAGEngine()
+    print("RAG engine initialized")
+    
+    added_count = 0
+    for lead in _scraped_leads(run):
+        if rag_engine.add_contractor(lead):
+            added_count += 1
+    
+    if added_count > 0:
+        print(f"Added {added_count} leads to RAG database")
+        logger.info(f"Added {added_count} leads to RAG database")
+        stats["rag_updated"] = True
+    else:
+        print("No leads added to RAG database")
+        logger.warning("No leads added to RAG database")
+    return added_count
+
+
 def generate_leads(
     cities: List[str] = None, 
     save_to_csv: bool = True,
     update_rag: bool = True,
     per_hour_cap: int = 50,
+    resume: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Generate leads from OpenStreetMap for specified cities
     
     Args:
         cities: List of city names to scrape (default is major Canadian cities)
-        save_to_csv: Whether to save results to CSV file
+        save_to_csv: Whether to save results to the lead store
         update_rag: Whether to update the RAG database
+        per_hour_cap: Maximum number of new leads to enrich and save
+        resume: Run id to continue, or "latest" for the newest unfinished run;
+            the other arguments are then taken from that run
         
     Returns:
         Dictionary with stats about the lead generation process
     """
-    if cities is None:
-        cities = DEFAULT_CITIES
+    if resume:
+        run = PipelineRun.open(RUNS_DIR, None if resume == "latest" else resume)
+        print(f"Resuming run {run.run_id} from stage '{run.next_stage()}'")
+        logger.info(f"Resuming run {run.run_id} from stage '{run.next_stage()}'")
+    else:
+        run = PipelineRun.create(RUNS_DIR, STAGES, {
+            "cities": cities or DEFAULT_CITIES,
+            "save_to_csv": save_to_csv,
+            "update_rag": update_rag,
+            "per_hour_cap": per_hour_cap,
+        })
+    params = run.params
     
     # Initialize data sync manager
     sync_manager = DataSyncManager()
     
-    # Initialize RAG engine if available and requested
-    rag_engine = None
-    if RAG_AVAILABLE and update_rag:
-        try:
-            rag_engine = RAGEngine()
-            print("RAG engine initialized")
-        except Exception as e:
-            logger.error(f"Failed to initialize RAG engine: {e}")
-            print(f"Error initializing RAG engine: {e}")
+    # Stats tracking (kept in the run manifest across resumes)
+    stats = run.stats
+    if not stats:
+        stats.update({
+            "total_leads": 0,
+            "new_leads": 0,
+            "cities_processed": 0,
+            "cities_failed": 0,
+            "start_time": datetime.now().isoformat(),
+            "end_time": None,
+            "rag_updated": False
+        })
+    stats["run_id"] = run.run_id
     
-    # Stats tracking
-    stats = {
-        "total_leads": 0,
-        "new_leads": 0,
-        "cities_processed": 0,
-        "cities_failed": 0,
-        "start_time": datetime.now().isoformat(),
-        "end_time": None,
-        "rag_updated": False
-    }
+    if not run.is_complete("scrape"):
+        print(f"Starting lead generation for {len(params['cities'])} cities...")
+        logger.info(f"Starting lead generation for {len(params['cities'])} cities")
     
-    all_leads: List[Dict[str, Any]] = []
-    
-    print(f"Starting lead generation for {len(cities)} cities...")
-    logger.info(f"Starting lead generation for {len(cities)} cities")
-    
-    # Process each city
-    for city in cities:
-        try:
-            print(f"Processing {city}...")
-            logger.info(f"Processing {city}")
-            
-            # Get city bounding box
-            bbox = get_city_bbox(city)
-            
-            if not bbox:
-                print(f"Could not find bounding box for {city}, skipping")
-                logger.warning(f"Could not find bounding box for {city}, skipping")
-                stats["cities_failed"] += 1
-                continue
-            
-            # Scrape contractors in the city
-            contractors = scrape_contractors(city, bbox)
-            
-            if contractors:
-                print(f"Found {len(contractors)} contractors in {city}")
-                logger.info(f"Found {len(contractors)} contractors in {city}")
-                all_leads.extend(contractors)
-                stats["total_leads"] += len(contractors)
-            else:
-                print(f"No contractors found in {city}")
-                logger.warning(f"No contractors found in {city}")
-            
-            stats["cities_processed"] += 1
-            
-        except Exception as e:
-            print(f"Error processing {city}: {e}")
-            logger.error(f"Error processing {city}: {e}")
-            stats["cities_failed"] += 1
-    
-    # Apply deduplication against existing and per-hour cap, then enrich
-    new_candidates: List[Dict[str, Any]] = []
-    if all_leads:
-        try:
-            existing_leads_df = sync_manager.load_leads_from_csv()
-            import pandas as pd
-            if not existing_leads_df.empty:
-                existing_leads_df["match_key"] = existing_leads_df["name"].astype(str) + "|" + existing_leads_df["service_area"].astype(str)
-                existing_keys = set(existing_leads_df["match_key"].tolist())
-            else:
-                existing_keys = set()
-        except Exception:
-            existing_keys = set()
-
-        # Filter unique by (name|service_area) against existing
-        seen = set()
-        for lead in all_leads:
-            key = f"{lead.get('name','')}|{lead.get('service_area','')}"
-            if key and key not in existing_keys and key not in seen:
-                new_candidates.append(lead)
-                seen.add(key)
-
-        # Cap the number of new leads to process this run
-        if per_hour_cap and len(new_candidates) > per_hour_cap:
-            new_candidates = new_candidates[:per_hour_cap]
-
-        # Enrich the selected new candidates
-        enriched_count = 0
-        if ENRICH_AVAILABLE and new_candidates:
-            enriched = []
-            for lead in new_candidates:
-                enriched_lead = enrich_lead_with_selector(lead, CONFIG_PATH)
-                enriched.append(enriched_lead)
-                enriched_count += 1
-            new_candidates = enriched
-        stats["enriched"] = enriched_count
-
-    # Save results if requested
-    if save_to_csv and (new_candidates or all_leads):
-        try:
-            # Load existing leads
-            existing_leads = sync_manager.load_leads_from_csv()
-            
-            # Convert all_leads to DataFrame
-            import pandas as pd
-            # Prefer the new deduped candidates if available; else fall back to all_leads
-            target_leads = new_candidates if new_candidates else all_leads
-            new_leads_df = pd.DataFrame(target_leads)
-            
-            # Count new leads (not in existing leads)
-            if not existing_leads.empty:
-                # Create a key for matching (name + service_area)
-                new_leads_df["match_key"] = new_leads_df["name"] + "|" + new_leads_df["service_area"]
-                existing_leads["match_key"] = existing_leads["name"] + "|" + existing_leads["service_area"]
-                
-                # Find truly new leads
-                new_leads_mask = ~new_leads_df["match_key"].isin(existing_leads["match_key"])
-                truly_new_leads = new_leads_df[new_leads_mask]
-                stats["new_leads"] = len(truly_new_leads)
-                
-                # Remove temporary match_key column
-                new_leads_df = new_leads_df.drop(columns=["match_key"])
-                existing_leads = existing_leads.drop(columns=["match_key"])
-                
-                # Combine with existing leads
-                combined_leads = pd.concat([existing_leads, truly_new_leads], ignore_index=True)
-            else:
-                # All leads are new if there are no existing leads
-                stats["new_leads"] = len(new_leads_df)
-                combined_leads = new_leads_df
-            
-            # Save combined leads
-            if sync_manager.save_leads_to_csv(combined_leads):
-                print(f"Saved {len(combined_leads)} total leads to CSV (+{stats['new_leads']} new this run)")
-                logger.info(f"Saved {len(combined_leads)} total leads to CSV (+{stats['new_leads']} new this run)")
-                
-                # Create backup
-                sync_manager.backup_leads(combined_leads)
-                print("Created backup of leads data")
-            else:
-                print("Failed to save leads to CSV")
-                logger.error("Failed to save leads to CSV")
-        
-        except Exception as e:
-            print(f"Error saving leads to CSV: {e}")
-            logger.error(f"Error saving leads to CSV: {e}")
+    stages = {
+        "scrape": lambda: _scrape_stage(run, stats),
+        "dedup": lambda: _dedup_stage(run, sync_manager, stats),
+        "enrich": lambda: _enrich_stage(run, stats),
+        "persist": lambda: _persist_stage(run, sync_manager, stats),
+        "index": lambda: _index_stage(run, stats),
+    }
+    skipped = {
+        "persist": None if params["save_to_csv"] else "save_to_csv is off",
+        "index": (None if params["update_rag"] and RAG_AVAILABLE
+                  else "update_rag is off" if not params["update_rag"] else "RAG module not available"),
+    }
     
-    # Update RAG database if requested
-    if update_rag and RAG_AVAILABLE and rag_engine and all_leads:
+    for name in STAGES:
+        if run.is_complete(name):
+            continue
+        if skipped.get(name):
+            run.skip(name, skipped[name])
+            continue
         try:
-            # Add new leads to RAG database
-            added_count = 0
-            for lead in all_leads:
-                if rag_engine.add_contractor(lead):
-                    added_count += 1
-            
-            if added_count > 0:
-                print(f"Added {added_count} leads to RAG database")
-                logger.info(f"Added {added_count} leads to RAG database")
-                stats["rag_updated"] = True
-            else:
-                print("No leads added to RAG database")
-                logger.warning("No leads added to RAG database")
-        
+            with run.stage(name) as stage:
+                stage["items"] = stages[name]()
         except Exception as e:
-            print(f"Error updating RAG database: {e}")
-            logger.error(f"Error updating RAG database: {e}")
+            # The run stays resumable from this stage
+            print(f"Error in {name} stage: {e}")
+            logger.error(f"Error in {name} stage of run {run.run_id}: {e}")
+            if name in ("scrape", "dedup", "enrich"):
+                break
     
     # Update stats
     stats["end_time"] = datetime.now().isoformat()
+    stats["completed"] = run.finished
+    stats["stages"] = run.timings()
+    run.save_manifest()
     
     # Save stats to file
-    stats_file = os.path.join(current_dir, "lead_generation_stats.json")
     try:
-        with open(stats_file, 'w') as f:
+        with open(STATS_FILE, 'w') as f:
             json.dump(stats, f, indent=2)
     except Exception as e:
         logger.error(f"Error saving stats to file: {e}")
@@ -289,6 +348,13 @@ def main():
         default=50,
         help="Per-hour cap for number of leads to process (default: 50)"
     )
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        const="latest",
+        metavar="RUN_ID",
+        help="Continue an interrupted run from its last completed stage (default: the newest unfinished run)"
+    )
     
     args = parser.parse_args()
     
@@ -298,6 +364,7 @@ def main():
         save_to_csv=not args.no_csv,
         update_rag=not args.no_rag,
         per_hour_cap=args.cap,
+        resume=args.resume,
     )
     
     # Print summary
@@ -306,6 +373,9 @@ def main():
     print(f"Total leads found: {stats['total_leads']}")
     print(f"New leads added: {stats['new_leads']}")
     print(f"RAG database updated: {stats['rag_updated']}")
+    print(f"Run: {stats['run_id']} ({'complete' if stats['completed'] else 'incomplete, rerun with --resume'})")
+    for name, stage in stats["stages"].items():
+        print(f"  {name}: {stage['status']} in {stage['seconds']:.1f}s")
     print(f"Start time: {stats['start_time']}")
     print(f"End time: {stats['end_time']}")
 
@@ -5,15 +5,27 @@ import re
 import json
 from typing import Dict, List, Any, Tuple, Union
 
-# Try to import Ollama, but provide fallback if not available
+from enrichers.structured_output import (
+    CONTRACTOR_ANALYSIS_SCHEMA,
+    LEAD_SCORE_SCHEMA,
+    StructuredOutputError,
+    generate_structured,
+    parse_json_response,
+    schema_defaults,
+    validate_against_schema,
+)
+
+from ..data.scoring import score_lead
+
+# Try to set up the Ollama gateway, but provide fallback if not available
 try:
-    from ollama import Client as OllamaClient
+    from enrichers.llm_gateway import INTERACTIVE, SCORING, get_gateway
     from ..utils.config import OLLAMA_MODEL
     
-    # Initialize Ollama client
-    ollama = OllamaClient()
+    # Shared gateway: QA is served ahead of scoring and batch enrichment
+    ollama = get_gateway()
     OLLAMA_AVAILABLE = True
-    print("[Info] Ollama client initialized successfully")
+    print("[Info] Ollama gateway initialized successfully")
 except (ImportError, Exception) as e:
     print(f"[Warning] Ollama not available: {e}")
     print("[Warning] Using simulated LLM responses")
@@ -22,7 +34,13 @@ except (ImportError, Exception) as e:
     OLLAMA_AVAILABLE = False
 
 def parse_llm_response(text: str) -> Tuple[int, str]:
-    """Simple parser for LLM output"""
+    """Parse a {score, rationale} reply, accepting JSON or free-form prose"""
+    try:
+        data, _ = parse_json_response(text)
+        data = validate_against_schema(data, LEAD_SCORE_SCHEMA)
+        return data["score"], data["rationale"] or text
+    except StructuredOutputError:
+        pass
     match = re.search(r"score\s*[:=]\s*(\d+)", text, re.I)
     score = int(match.group(1)) if match else 5
     rationale = text
@@ -30,26 +48,18 @@ def parse_llm_response(text: str) -> Tuple[int, str]:
 
 def validate_social_media(website: str, socials: str) -> Tuple[int, Dict[str, str]]:
     """Enhanced social media background check"""
-    social_score = 0
-    social_details = {}
     try:
-        if website:
-            social_score += 3
-            social_details["website"] = "active"
-        if socials:
-            platforms = socials.lower()
-            if "facebook" in platforms: 
-                social_score += 2
-                social_details["facebook"] = "present"
-            if "instagram" in platforms: 
-                social_score += 2
-                social_details["instagram"] = "present"
-            if "linkedin" in platforms: 
-                social_score += 3
-                social_details["linkedin"] = "present"
-        return social_score, social_details
+        social_score = score_lead({"website": website, "socials": socials}, "social")
     except Exception:
         return 0, {}
+    social_details = {}
+    if website:
+        social_details["website"] = "active"
+    platforms = str(socials or "").lower()
+    for platform in ("facebook", "instagram", "linkedin"):
+        if platform in platforms:
+            social_details[platform] = "present"
+    return social_score, social_details
 
 def enrich_contractor_with_llm(meta: Dict[str, Any]) -> Dict[str, Any]:
     """Enrich contractor data with LLM analysis"""
@@ -63,18 +73,14 @@ def enrich_contractor_with_llm(meta: Dict[str, Any]) -> Dict[str, Any]:
     # Return simulated data if Ollama is not available
     if not OLLAMA_AVAILABLE:
         # Generate a score based on available contact info
-        score = 5  # Base score
-        if phone: score += 1
-        if email: score += 1
-        if website: score += 2
-        if address and len(address) > 10: score += 1
-        
+        score = score_lead(meta, "simulated")
+
         return {
             "job_types": ["masonry", "stonework", "facade"],
             "est_revenue_low": 50000,
             "est_revenue_high": 200000,
             "pitch": f"[Simulated] {name} in {service_area} could be a valuable partner for our stonework projects. They have established presence in the area and their services align with our offering.",
-            "score": min(score, 10),
+            "score": score,
             "rationale": f"[Simulated] {name} appears to be an established contractor with good market presence."
         }
     
@@ -86,20 +92,15 @@ def enrich_contractor_with_llm(meta: Dict[str, Any]) -> Dict[str, Any]:
         f"3) Draft a one-paragraph personalized pitch for first contact.\n"
         f"Return JSON with keys: job_types (array of strings), est_revenue_low (number), est_revenue_high (number), pitch (string), score (1-10), rationale (string)."
     )
+
+    def _generate(p: str) -> str:
+        return ollama.generate(model=OLLAMA_MODEL, prompt=p, format="json", priority=SCORING).get("response", "")
+
     try:
-        resp = ollama.generate(model=OLLAMA_MODEL, prompt=prompt)
-        text = resp.get("response", "{}")
-        try:
-            data = json.loads(text)
-        except Exception:
-            data = {
-                "job_types": [],
-                "est_revenue_low": 0,
-                "est_revenue_high": 0,
-                "pitch": text[:500],
-                "score": 5,
-                "rationale": text[:500]
-            }
+        return generate_structured(_generate, prompt, CONTRACTOR_ANALYSIS_SCHEMA, model=f"ollama:{OLLAMA_MODEL}")
+    except StructuredOutputError as e:
+        data = schema_defaults(CONTRACTOR_ANALYSIS_SCHEMA)
+        data["rationale"] = f"LLM output could not be parsed: {e}"
         return data
     except Exception as e:
         return {
@@ -129,7 +130,7 @@ def process_qa_query(question: str, context: str) -> str:
             f"Question: {question}\n"
             f"Provide a comprehensive answer with specific insights about lead quality, market opportunities, census demographics, and actionable recommendations."
         )
-        resp = ollama.generate(model=OLLAMA_MODEL, prompt=prompt)
+        resp = ollama.generate(model=OLLAMA_MODEL, prompt=prompt, priority=INTERACTIVE)
         return resp.get("response", "No answer found.")
     except Exception as e:
         return f"[Error] QA processing failed: {e}"
\ No newline at end of file
@@ -0,0 +1,256 @@
+"""
+Lead backup snapshots
+
+Compressed, deduplicated snapshots of the lead table under data/backups/:
+1. Rows are split into content-defined chunks (boundaries picked from the
+   lead key hash), so an insert or edit only changes the chunks around it
+2. Chunks are content-addressed (sha256 of their data) and stored once in
+   chunks/; a snapshot is an ordered list of chunk digests
+3. Chunks are zstd Parquet when pyarrow is installed, gzip CSV otherwise
+4. index.json lists snapshots and chunks, so listing needs no directory scans
+5. Retention keeps the newest snapshots plus one per day/week; chunks no
+   snapshot references are deleted
+
+Legacy leads_backup_*.csv files stay listed and restorable as they are;
+migrate_legacy_backups converts them into snapshots on request.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .lead_store import lead_keys
+
+try:
+    import pyarrow  # noqa: F401  (pandas Parquet engine)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+INDEX_VERSION = 1
+AVG_CHUNK_ROWS = 2048
+MIN_CHUNK_ROWS = 256
+MAX_CHUNK_ROWS = 16384
+
+# Snapshots kept by apply_retention
+RETENTION = {"keep_last": 10, "keep_daily": 7, "keep_weekly": 4}
+
+LEGACY_PATTERN = re.compile(r"^leads_backup_(\d{8}_\d{6})\.csv$")
+
+
+def chunk_bounds(df: pd.DataFrame, avg_rows: int = AVG_CHUNK_ROWS,
+                 min_rows: int = MIN_CHUNK_ROWS, max_rows: int = MAX_CHUNK_ROWS) -> List[Tuple[int, int]]:
+    """Content-defined (start, end) row ranges: a chunk ends after a row whose key hash is 0 mod avg_rows"""
+    n = len(df)
+    if n == 0:
+        return []
+    hashes = pd.util.hash_pandas_object(lead_keys(df), index=False).to_numpy()
+    cuts = np.flatnonzero(hashes % np.uint64(avg_rows) == 0) + 1
+    bounds, start = [], 0
+    for cut in cuts.tolist() + [n]:
+        if cut - start < min_rows and cut != n:
+            continue
+        while cut - start > max_rows:
+            bounds.append((start, start + max_rows))
+            start += max_rows
+        if cut > start:
+            bounds.append((start, cut))
+            start = cut
+    return bounds
+
+
+def _normalized(df: pd.DataFrame) -> pd.DataFrame:
+    return df.astype(object).where(df.notna(), None).astype(str)
+
+
+class BackupStore:
+    """Content-addressed snapshot store rooted at a backup directory"""
+
+    def __init__(self, root: str, retention: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            root: Backup directory (index.json and chunks/ live here)
+            retention: Overrides for RETENTION
+        """
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        self.chunk_dir = os.path.join(root, "chunks")
+        self.retention = dict(RETENTION, **(retention or {}))
+        self._lock = threading.Lock()
+
+    def _load_index(self) -> Dict[str, Any]:
+        if not os.path.exists(self.index_path):
+            return {"version": INDEX_VERSION, "snapshots": [], "chunks": {}}
+        with open(self.index_path, "r") as f:
+            return json.load(f)
+
+    def _save_index(self, index: Dict[str, Any]):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp, self.index_path)
+
+    def _chunk_path(self, entry: Dict[str, Any]) -> str:
+        return os.path.join(self.chunk_dir, entry["file"])
+
+    def _write_chunk(self, chunk: pd.DataFrame, digest: str) -> Dict[str, Any]:
+        name = f"{digest[:2]}/{digest}.{'parquet' if PARQUET_AVAILABLE else 'csv.gz'}"
+        path = os.path.join(self.chunk_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        if PARQUET_AVAILABLE:
+            # Parquet needs one type per column; object and string columns become text
+            objects = chunk.select_dtypes(include=["object", "string"]).columns
+            chunk = chunk.assign(**{c: chunk[c].where(chunk[c].isna(), chunk[c].astype(str)) for c in objects})
+            chunk.to_parquet(tmp, compression="zstd", index=False)
+        else:
+            chunk.to_csv(tmp, index=False, compression="gzip")
+        os.replace(tmp, path)
+        return {"file": name, "rows": len(chunk), "bytes": os.path.getsize(path)}
+
+    def _read_chunk(self, entry: Dict[str, Any]) -> pd.DataFrame:
+        path = self._chunk_path(entry)
+        if entry["file"].endswith(".parquet"):
+            return pd.read_parquet(path)
+        return pd.read_csv(path, compression="gzip")
+
+    def create(self, leads: pd.DataFrame, name: Optional[str] = None,
+               created_at: Optional[datetime] = None) -> Dict[str, Any]:
+        """Snapshot a lead frame, writing only chunks not already stored
+
+        Args:
+            leads: Leads to back up
+            name: Optional label shown in listings
+            created_at: Snapshot time (default: now)
+
+        Returns:
+            The snapshot's index entry
+        """
+        created_at = created_at or datetime.now()
+        df = leads.reset_index(drop=True)
+        columns = [str(c) for c in df.columns]
+        row_hashes = pd.util.hash_pandas_object(_normalized(df), index=False).to_numpy()
+        header = json.dumps(columns).encode()
+
+        with self._lock:
+            index = self._load_index()
+            digests, new_bytes = [], 0
+            for start, end in chunk_bounds(df):
+                digest = hashlib.sha256(header + row_hashes[start:end].tobytes()).hexdigest()
+                if digest not in index["chunks"] or not os.path.exists(self._chunk_path(index["chunks"][digest])):
+                    index["chunks"][digest] = self._write_chunk(df.iloc[start:end], digest)
+                    new_bytes += index["chunks"][digest]["bytes"]
+                digests.append(digest)
+
+            snapshot_id = created_at.strftime("%Y%m%d_%H%M%S")
+            existing = {s["id"] for s in index["snapshots"]}
+            suffix = 1
+            while snapshot_id in existing:
+                suffix += 1
+                snapshot_id = f"{created_at.strftime('%Y%m%d_%H%M%S')}_{suffix}"
+
+            snapshot = {
+                "id": snapshot_id,
+                "name": name or snapshot_id,
+                "created_at": created_at.isoformat(),
+                "rows": len(df),
+                "columns": columns,
+                "dtypes": {c: str(t) for c, t in zip(columns, df.dtypes)},
+                "chunks": digests,
+                "bytes": sum(index["chunks"][d]["bytes"] for d in digests),
+                "new_bytes": new_bytes,
+            }
+            index["snapshots"].append(snapshot)
+            self._save_index(index)
+        return snapshot
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Snapshot index entries, newest first"""
+        with self._lock:
+            snapshots = self._load_index()["snapshots"]
+        return sorted(snapshots, key=lambda s: s["created_at"], reverse=True)
+
+    def restore(self, snapshot_id: str) -> pd.DataFrame:
+        """Rebuild the lead frame of a snapshot"""
+        with self._lock:
+            index = self._load_index()
+        snapshot = next((s for s in index["snapshots"] if s["id"] == snapshot_id), None)
+        if snapshot is None:
+            raise KeyError(f"Unknown backup snapshot: {snapshot_id}")
+        frames = [self._read_chunk(index["chunks"][d]) for d in snapshot["chunks"]]
+        if not frames:
+            return pd.DataFrame(columns=snapshot["columns"])
+        df = pd.concat(frames, ignore_index=True).reindex(columns=snapshot["columns"])
+        # Chunks are typed independently; put numeric columns back to the snapshot dtype
+        for column, dtype in snapshot.get("dtypes", {}).items():
+            if dtype.startswith(("int", "float", "bool")) and df[column].dtype != dtype:
+                try:
+                    df[column] = df[column].astype(dtype)
+                except (TypeError, ValueError):
+                    pass
+        return df
+
+    def apply_retention(self) -> List[str]:
+        """Drop snapshots outside the retention policy and garbage-collect chunks
+
+        Returns:
+            Ids of removed snapshots
+        """
+        with self._lock:
+            index = self._load_index()
+            snapshots = sorted(index["snapshots"], key=lambda s: s["created_at"], reverse=True)
+            keep = {s["id"] for s in snapshots[:self.retention["keep_last"]]}
+            for period, limit in (("%Y-%m-%d", self.retention["keep_daily"]), ("%G-W%V", self.retention["keep_weekly"])):
+                seen = set()
+                for snapshot in snapshots:
+                    bucket = datetime.fromisoformat(snapshot["created_at"]).strftime(period)
+                    if bucket not in seen and len(seen) < limit:
+                        seen.add(bucket)
+                        keep.add(snapshot["id"])
+            removed = [s["id"] for s in snapshots if s["id"] not in keep]
+            if not removed:
+                return []
+
+            index["snapshots"] = [s for s in index["snapshots"] if s["id"] in keep]
+            referenced = {d for s in index["snapshots"] for d in s["chunks"]}
+            for digest in [d for d in index["chunks"] if d not in referenced]:
+                entry = index["chunks"].pop(digest)
+                try:
+                    os.remove(self._chunk_path(entry))
+                except FileNotFoundError:
+                    pass
+            self._save_index(index)
+        return removed
+
+    def disk_usage(self) -> int:
+        """Bytes used by stored chunks"""
+        with self._lock:
+            return sum(c["bytes"] for c in self._load_index()["chunks"].values())
+
+    def migrate_legacy_backups(self) -> List[str]:
+        """Convert leads_backup_<timestamp>.csv files in the root into snapshots and remove them
+
+        Returns:
+            Ids of the snapshots created
+        """
+        if not os.path.isdir(self.root):
+            return []
+        created = []
+        for filename in sorted(os.listdir(self.root)):
+            match = LEGACY_PATTERN.match(filename)
+            if not match:
+                continue
+            path = os.path.join(self.root, filename)
+            snapshot = self.create(pd.read_csv(path), name=filename,
+                                   created_at=datetime.strptime(match.group(1), "%Y%m%d_%H%M%S"))
+            os.remove(path)
+            created.append(snapshot["id"])
+        return created
@@ -0,0 +1,195 @@
+"""
+Per-municipality business counts
+
+Scrapers record every contractor they insert; counts are kept in a small SQLite
+table keyed by (municipality, craft_type), plus a running total row per
+municipality, so readers load one row per municipality instead of scanning
+scraper logs:
+1. record_inserts() increments counts in one transaction (UPSERT)
+2. totals() / by_craft() read the table
+3. backfill_from_log() optionally imports counts from osm_scraper.log, resuming
+   from the last byte offset it processed
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+from .snapshot import CACHE_DIR
+DB_FILE = os.path.join(CACHE_DIR, "business_counts.sqlite3")
+
+TOTAL = ""  # craft_type of the per-municipality total row
+UNKNOWN_CRAFT = "unknown"
+
+# Log lines written by the OSM scrapers over time
+_LOG_PATTERNS = [
+    re.compile(r"Found (\d+) contractors in (.+)"),
+    re.compile(r"INFO ([^:]+): inserted (\d+)"),
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS business_counts (
+    municipality TEXT NOT NULL,
+    craft_type TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (municipality, craft_type)
+);
+CREATE TABLE IF NOT EXISTS log_offsets (
+    path TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL
+);
+"""
+_UPSERT = """
+INSERT INTO business_counts (municipality, craft_type, count, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (municipality, craft_type) DO UPDATE SET
+    count = count + excluded.count, updated_at = excluded.updated_at
+"""
+
+
+class BusinessCountStore:
+    """SQLite-backed business counter, safe to share across threads"""
+
+    def __init__(self, path: str = DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def record_inserts(self, records: Iterable[Dict[str, Any]], municipality: Optional[str] = None) -> int:
+        """Count newly inserted contractors
+
+        Args:
+            records: Inserted contractor records (craft_type is read from each)
+            municipality: Municipality for all records (defaults to each record's service_area)
+
+        Returns:
+            Number of records counted
+        """
+        counts: Counter = Counter()
+        for record in records:
+            area = (municipality or record.get("service_area") or "").strip()
+            if not area:
+                continue
+            counts[(area, (record.get("craft_type") or UNKNOWN_CRAFT).strip())] += 1
+        if not counts:
+            return 0
+        totals: Counter = Counter()
+        for (area, _), n in counts.items():
+            totals[area] += n
+        now = time.time()
+        rows = [(area, craft, n, now) for (area, craft), n in counts.items()]
+        rows += [(area, TOTAL, n, now) for area, n in totals.items()]
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT, rows)
+        return sum(totals.values())
+
+    def totals(self) -> Dict[str, int]:
+        """Total business count per municipality"""
+        with self._lock:
+            cur = self._conn.execute("SELECT municipality, count FROM business_counts WHERE craft_type = ?", (TOTAL,))
+            return dict(cur.fetchall())
+
+    def by_craft(self, municipality: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Counts by craft_type, per municipality (optionally just one)"""
+        sql = "SELECT municipality, craft_type, count FROM business_counts WHERE craft_type != ?"
+        params: tuple = (TOTAL,)
+        if municipality is not None:
+            sql += " AND municipality = ?"
+            params += (municipality,)
+        out: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            for area, craft, n in self._conn.execute(sql, params):
+                out.setdefault(area, {})[craft] = n
+        return out
+
+    def backfill_from_log(self, log_path: str) -> int:
+        """Import totals from a scraper log for municipalities not yet counted
+
+        Only the part of the log added since the previous call is read. The last
+        count logged for a municipality wins, matching the old log-scan readers.
+
+        Returns:
+            Number of municipalities imported
+        """
+        if not os.path.exists(log_path):
+            return 0
+        key = os.path.abspath(log_path)
+        with self._lock:
+            row = self._conn.execute("SELECT offset FROM log_offsets WHERE path = ?", (key,)).fetchone()
+        offset = row[0] if row else 0
+        if offset > os.path.getsize(log_path):
+            offset = 0  # Log was rotated/truncated
+        found: Dict[str, int] = {}
+        with open(log_path, "rb") as f:
+            f.seek(offset)
+            for raw in f:
+                line = raw.decode("utf-8", errors="replace")
+                for i, pattern in enumerate(_LOG_PATTERNS):
+                    match = pattern.search(line)
+                    if match:
+                        count, city = match.groups() if i == 0 else reversed(match.groups())
+                        found[city.strip()] = int(count)
+                        break
+            offset = f.tell()
+        now = time.time()
+        with self._lock, self._conn:
+            existing = {r[0] for r in self._conn.execute(
+                "SELECT municipality FROM business_counts WHERE craft_type = ?", (TOTAL,))}
+            rows = [(city, TOTAL, n, now) for city, n in found.items() if city not in existing]
+            self._conn.executemany(
+                "INSERT INTO business_counts (municipality, craft_type, count, updated_at) VALUES (?, ?, ?, ?)", rows)
+            self._conn.execute("INSERT OR REPLACE INTO log_offsets (path, offset) VALUES (?, ?)", (key, offset))
+        return len(rows)
+
+
+_store: Optional[BusinessCountStore] = None
+_store_lock = threading.Lock()
+
+
+def get_business_count_store() -> BusinessCountStore:
+    """Process-wide store for DB_FILE"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = BusinessCountStore()
+    return _store
+
+
+def record_inserts(records: Iterable[Dict[str, Any]], municipality: Optional[str] = None) -> int:
+    """Count inserted records in the shared store, never raising into the scraper"""
+    try:
+        return get_business_count_store().record_inserts(records, municipality)
+    except Exception as e:
+        print(f"[Warning] Failed to update business counts: {e}")
+        return 0
+
+
+def load_business_count_map(log_path: Optional[str] = None) -> Dict[str, int]:
+    """Business totals per municipality, importing any new scraper-log lines first"""
+    store = get_business_count_store()
+    if log_path:
+        store.backfill_from_log(log_path)
+    return store.totals()
+
+
+def close_store():
+    """Close the shared store (tests / shutdown)"""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
@@ -2,10 +2,14 @@
 Census data handling module for the Contractor Lead Engine
 """
 import os
-import csv
 from typing import Dict, List, Any
 
 from ..utils.config import get_data_path
+from .business_counts import load_business_count_map
+from .census_store import CensusStore
+from .geography import get_province_for_municipality
+from .municipal_features import build_municipal_features
+from .snapshot import Snapshot, load_snapshot
 
 # Census data mappings
 pop_map: Dict[str, int] = {}
@@ -13,87 +17,33 @@ census_map: Dict[str, Dict[str, str]] = {}
 census_columns: List[str] = []
 business_count_map: Dict[str, int] = {}
 
+def _get_snapshot() -> Snapshot:
+    return load_snapshot(sources={
+        "population": get_data_path("canada_municipalities_population.csv"),
+        "census": get_data_path("census_province_wide.csv"),
+        "municipalities": get_data_path("canada_municipalities.txt"),
+    })
+
 def load_census_data():
     """Load census data from files"""
     global pop_map, census_map, census_columns, business_count_map
     
-    # Load population data
-    population_file = get_data_path("canada_municipalities_population.csv")
-    if os.path.exists(population_file):
-        with open(population_file, "r", encoding="utf-8") as pf:
-            reader = csv.DictReader(pf)
-            for row in reader:
-                name = row.get("municipality")
-                try:
-                    pop = int(row.get("population", "0"))
-                except Exception:
-                    pop = 0
-                if name:
-                    if name in pop_map:
-                        pop_map[name] = max(pop_map[name], pop)
-                    else:
-                        pop_map[name] = pop
-    
-    # Load census wide data
-    census_file = get_data_path("census_province_wide.csv")
-    if os.path.exists(census_file):
-        with open(census_file, "r", encoding="utf-8") as cf:
-            reader = csv.DictReader(cf)
-            census_columns = reader.fieldnames[1:] if reader.fieldnames else []
-            for row in reader:
-                province = row[reader.fieldnames[0]]
-                census_map[province] = {col: row[col] for col in census_columns}
+    # Population and census wide data come from the compiled snapshot, which is
+    # rebuilt automatically when any of the source files change
+    snapshot = _get_snapshot()
+    pop_map.update(snapshot.pop_map())
+    census_map.update(snapshot.census_map())
+    census_columns = snapshot.census_columns
     
-    # Load OSM business counts from log
-    business_log = get_data_path("osm_scraper.log")
-    import re
-    if os.path.exists(business_log):
-        with open(business_log, "r", encoding="utf-8") as f:
-            for line in f:
-                match = re.search(r"Found (\d+) contractors in (.+)", line)
-                if match:
-                    count, city = match.groups()
-                    business_count_map[city.strip()] = int(count)
-
-def get_province_for_municipality(muni: str) -> str:
-    """Determine province for a municipality"""
-    # Manual overrides for edge cases
-    manual = {
-        "Toronto": "Ontario",
-        "Montreal": "Quebec",
-        "Vancouver": "British Columbia",
-        "Calgary": "Alberta",
-        "Edmonton": "Alberta",
-        "Ottawa": "Ontario",
-        "Winnipeg": "Manitoba",
-        "Halifax": "Nova Scotia",
-        "St. John's": "Newfoundland and Labrador",
-        "Charlottetown": "Prince Edward Island",
-        "Fredericton": "New Brunswick",
-        "Regina": "Saskatchewan",
-        "Yellowknife": "Northwest Territories",
-        "Whitehorse": "Yukon",
-        "Iqaluit": "Nunavut"
-    }
-    if muni in manual:
-        return manual[muni]
-    # Heuristic: last word is province/territory
-    for prov in census_map.keys():
-        if muni.endswith(prov):
-            return prov
-    # Fallback: Ontario (most populous)
-    return "Ontario"
+    # Business counts are maintained by the scrapers; the log only seeds
+    # municipalities the counter table has not seen yet
+    business_count_map.update(load_business_count_map(get_data_path("osm_scraper.log")))
 
 def load_municipalities() -> List[str]:
     """Load municipalities from file"""
-    municipalities_file = get_data_path("canada_municipalities.txt")
     municipalities = []
     try:
-        with open(municipalities_file, "r", encoding="utf-8") as f:
-            for line in f:
-                muni = line.strip()
-                if muni:
-                    municipalities.append(muni)
+        municipalities = _get_snapshot().municipalities
     except Exception as e:
         print(f"[Warning] Failed to load municipalities: {e}")
     
@@ -123,4 +73,8 @@ def load_municipalities() -> List[str]:
 
 # Initialize data
 load_census_data()
-municipalities, cluster_municipalities = load_municipalities()
\ No newline at end of file
+municipalities, cluster_municipalities = load_municipalities()
+census_store = CensusStore.from_snapshot(_get_snapshot(), municipalities, get_province_for_municipality)
+municipal_features = build_municipal_features(
+    municipalities, get_province_for_municipality, lambda m: pop_map.get(m, 0)
+)
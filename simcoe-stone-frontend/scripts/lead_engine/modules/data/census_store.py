@@ -0,0 +1,202 @@
+"""
+Columnar census store with vectorized threshold filtering
+
+Census variables are published per province/territory, so the store keeps:
+1. A province x variable float matrix (parsed once; NaN where a cell is not numeric)
+2. A municipality -> province row index and a municipality population column
+3. Threshold expressions compiled to NumPy predicates
+
+Filtering evaluates the predicate on the province matrix and gathers the result
+through the municipality index, so one call covers every municipality and
+every selected variable without a Python-level loop.
+
+Threshold syntax (case-insensitive):
+    >100000, >=5, <20, <=7.5, =0, !=0     comparisons
+    1000..5000                            inclusive range
+    >1000 and <5000                       AND binds tighter than OR
+    <10 or 1000..5000
+"""
+import operator
+import re
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+Predicate = Callable[[np.ndarray], np.ndarray]
+
+POPULATION = "population"
+
+_OPS = {
+    ">=": operator.ge, "<=": operator.le, "!=": operator.ne,
+    ">": operator.gt, "<": operator.lt, "=": operator.eq, "==": operator.eq,
+}
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_COMPARISON = re.compile(rf"^(>=|<=|!=|==|>|<|=)\s*({_NUMBER})$")
+_RANGE = re.compile(rf"^({_NUMBER})\s*\.\.\s*({_NUMBER})$")
+
+
+def _compile_term(term: str) -> Predicate:
+    term = term.strip().replace(",", "")
+    match = _COMPARISON.match(term)
+    if match:
+        op, bound = _OPS[match.group(1)], float(match.group(2))
+        return lambda values: op(values, bound)
+    match = _RANGE.match(term)
+    if match:
+        low, high = sorted((float(match.group(1)), float(match.group(2))))
+        return lambda values: (values >= low) & (values <= high)
+    raise ValueError(f"Invalid threshold term: {term!r}")
+
+
+def compile_threshold(expression: str) -> Predicate:
+    """Compile a threshold expression into an element-wise predicate
+
+    Args:
+        expression: e.g. ">100000", "1000..5000", ">10 and <50 or =0"
+
+    Returns:
+        Function mapping a float array to a boolean array of the same shape
+        (NaN never matches)
+
+    Raises:
+        ValueError: If the expression cannot be parsed
+    """
+    if not expression or not expression.strip():
+        raise ValueError("Empty threshold expression")
+    clauses = []
+    for clause in re.split(r"\s+or\s+|\s*\|\|\s*", expression.strip(), flags=re.IGNORECASE):
+        terms = [_compile_term(t) for t in re.split(r"\s+and\s+|\s*&&\s*", clause, flags=re.IGNORECASE)]
+        clauses.append(terms)
+
+    def predicate(values: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid="ignore"):
+            result = np.zeros(values.shape, dtype=bool)
+            # Every comparison is false for NaN except !=, so mask NaN up front
+            known = ~np.isnan(values) if np.issubdtype(values.dtype, np.floating) else np.ones(values.shape, dtype=bool)
+            for terms in clauses:
+                clause_mask = known.copy()
+                for term in terms:
+                    clause_mask &= term(values)
+                result |= clause_mask
+        return result
+
+    return predicate
+
+
+class CensusStore:
+    """Province census matrix joined to municipalities by row index"""
+
+    def __init__(
+        self,
+        provinces: Sequence[str],
+        columns: Sequence[str],
+        values: np.ndarray,
+        municipalities: Sequence[str],
+        muni_provinces: Sequence[Optional[str]],
+        populations: Optional[Sequence[int]] = None,
+    ):
+        self.provinces = list(provinces)
+        self.columns = list(columns)
+        self.values = np.asarray(values, dtype=np.float64).reshape(len(self.provinces), len(self.columns))
+        self.municipalities = list(municipalities)
+        self._province_index: Dict[str, int] = {p: i for i, p in enumerate(self.provinces)}
+        self._column_index: Dict[str, int] = {c: i for i, c in enumerate(self.columns)}
+        self._muni_index: Dict[str, int] = {m: i for i, m in enumerate(self.municipalities)}
+        # -1 marks municipalities whose province has no census row
+        self.muni_province = np.array([self._province_index.get(p, -1) for p in muni_provinces], dtype=np.int64)
+        if populations is None:
+            populations = np.zeros(len(self.municipalities))
+        self.population = np.asarray(populations, dtype=np.float64)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, municipalities: Sequence[str],
+                      province_of: Callable[[str], Optional[str]]) -> "CensusStore":
+        """Build the store from a compiled snapshot (see modules.data.snapshot)
+
+        Args:
+            snapshot: Loaded Snapshot
+            municipalities: Municipality names, in display order
+            province_of: Resolver from municipality name to province/territory
+        """
+        names = snapshot.muni_names
+        munis = np.array(list(municipalities), dtype=str)
+        populations = np.zeros(len(munis), dtype=np.int64)
+        if len(names) and len(munis):
+            # Vectorized name lookup against the snapshot's sorted index
+            pos = np.clip(np.searchsorted(names, munis), 0, len(names) - 1)
+            found = names[pos] == munis
+            populations[found] = np.asarray(snapshot.muni_population)[pos[found]]
+        return cls(
+            snapshot.census_provinces.tolist(),
+            snapshot.census_columns,
+            np.asarray(snapshot.census_values),
+            list(municipalities),
+            [province_of(m) for m in municipalities],
+            populations,
+        )
+
+    def column_values(self, variables: Sequence[str]) -> np.ndarray:
+        """Province x len(variables) matrix; unknown variables are all-NaN"""
+        out = np.full((len(self.provinces), len(variables)), np.nan)
+        for j, var in enumerate(variables):
+            i = self._column_index.get(var)
+            if i is not None:
+                out[:, j] = self.values[:, i]
+        return out
+
+    def filter_mask(self, variables: Sequence[str], threshold: str, province: Optional[str] = None,
+                    match: str = "all") -> np.ndarray:
+        """Boolean mask over municipalities passing the threshold
+
+        Args:
+            variables: Census variables (or "population") the threshold applies to
+            threshold: Threshold expression (see compile_threshold)
+            province: Evaluate every municipality against this province's census row
+                instead of its own
+            match: "all" requires every variable to pass, "any" requires one
+
+        Returns:
+            Boolean array aligned with self.municipalities
+        """
+        predicate = compile_threshold(threshold)
+        n = len(self.municipalities)
+        census_vars = [v for v in variables if v != POPULATION]
+        combine = np.logical_and if match == "all" else np.logical_or
+        mask = np.full(n, match == "all")
+
+        if census_vars:
+            passed = predicate(self.column_values(census_vars))
+            prov_mask = passed.all(axis=1) if match == "all" else passed.any(axis=1)
+            if province is not None:
+                idx = self._province_index.get(province, -1)
+                rows = np.full(n, idx, dtype=np.int64)
+            else:
+                rows = self.muni_province
+            # Append a False row so index -1 (unknown province) never passes
+            mask = combine(mask, np.append(prov_mask, False)[rows])
+        if POPULATION in variables:
+            mask = combine(mask, predicate(self.population))
+        return mask
+
+    def filter(self, variables: Sequence[str], threshold: str, province: Optional[str] = None,
+               names: Optional[Sequence[str]] = None, match: str = "all") -> List[str]:
+        """Municipalities passing the threshold, optionally restricted to `names` (order kept)"""
+        mask = self.filter_mask(variables, threshold, province, match)
+        if names is None:
+            return [m for m, ok in zip(self.municipalities, mask) if ok]
+        idx = np.array([self._muni_index.get(m, -1) for m in names], dtype=np.int64)
+        keep = np.append(mask, False)[idx]
+        return [m for m, ok in zip(names, keep) if ok]
+
+    def top_by_population(self, province: Optional[str] = None, limit: int = 20) -> List[int]:
+        """Indices of the most populous municipalities, optionally within one province"""
+        candidates = np.arange(len(self.municipalities))
+        if province is not None:
+            candidates = candidates[self.muni_province == self._province_index.get(province, -2)]
+        order = np.argsort(-self.population[candidates], kind="stable")
+        return candidates[order[:limit]].tolist()
+
+    def province_of(self, index: int) -> Optional[str]:
+        row = self.muni_province[index]
+        return self.provinces[row] if row >= 0 else None
+
@@ -0,0 +1,218 @@
+"""
+Checkpointed pipeline runs
+
+On-disk state of multi-stage jobs (see generate_leads.py) under data/runs/<run_id>/:
+1. manifest.json holds the run parameters, the status and accumulated time of
+   every stage, and the run's stats so far
+2. A stage saves its output as an artifact before it is marked done, so the
+   next stage (in this process or a resumed one) reads it from disk
+3. Long stages append one JSON line per finished item (a city, a lead) and
+   skip recorded items when resumed
+4. open() reopens a run (by id, or the newest unfinished one); the job then
+   continues from its first stage that is not done
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+# Finished runs kept when a new run is created (unfinished ones are never pruned)
+RUNS_KEPT = 10
+
+COMPLETE = ("done", "skipped")
+
+
+def _write_json(path: str, data: Any):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(tmp, path)
+
+
+class PipelineRun:
+    """One run of a staged job and its artifacts"""
+
+    def __init__(self, runs_dir: str, run_id: str):
+        """
+        Args:
+            runs_dir: Directory holding one subdirectory per run
+            run_id: Existing run (use create() or open() to get one)
+        """
+        self.run_id = run_id
+        self.path = os.path.join(runs_dir, run_id)
+        self.manifest_path = os.path.join(self.path, "manifest.json")
+        self._lock = threading.Lock()
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+
+    @classmethod
+    def create(cls, runs_dir: str, stages: Sequence[str], params: Optional[Dict[str, Any]] = None,
+               keep: int = RUNS_KEPT) -> "PipelineRun":
+        """Start a new run (id YYYYmmdd_HHMMSS) and prune old finished runs
+
+        Args:
+            runs_dir: Directory holding one subdirectory per run
+            stages: Stage names, in execution order
+            params: Job parameters a resumed run reuses
+            keep: Finished runs to keep
+        """
+        prune_runs(runs_dir, keep)
+        now = datetime.now()
+        run_id = now.strftime("%Y%m%d_%H%M%S")
+        suffix = 1
+        while os.path.exists(os.path.join(runs_dir, run_id)):
+            suffix += 1
+            run_id = f"{now.strftime('%Y%m%d_%H%M%S')}_{suffix}"
+        path = os.path.join(runs_dir, run_id)
+        os.makedirs(path)
+        _write_json(os.path.join(path, "manifest.json"), {
+            "run_id": run_id,
+            "created_at": now.isoformat(),
+            "params": params or {},
+            "stages": {name: {"status": "pending", "seconds": 0.0} for name in stages},
+            "stats": {},
+        })
+        return cls(runs_dir, run_id)
+
+    @classmethod
+    def open(cls, runs_dir: str, run_id: Optional[str] = None) -> "PipelineRun":
+        """Reopen a run; without run_id, the newest one that has not finished
+
+        Raises:
+            FileNotFoundError: No such run (or no unfinished run)
+        """
+        if run_id is None:
+            unfinished = [r for r in list_runs(runs_dir) if not r["finished"]]
+            if not unfinished:
+                raise FileNotFoundError(f"No unfinished run in {runs_dir}")
+            run_id = unfinished[0]["run_id"]
+        if not os.path.exists(os.path.join(runs_dir, run_id, "manifest.json")):
+            raise FileNotFoundError(f"Unknown run: {run_id}")
+        return cls(runs_dir, run_id)
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self.manifest["params"]
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Stats carried across resumes (saved with every stage change)"""
+        return self.manifest["stats"]
+
+    @property
+    def finished(self) -> bool:
+        return all(s["status"] in COMPLETE for s in self.manifest["stages"].values())
+
+    def next_stage(self) -> Optional[str]:
+        """First stage that is not done or skipped"""
+        for name, stage in self.manifest["stages"].items():
+            if stage["status"] not in COMPLETE:
+                return name
+        return None
+
+    def is_complete(self, stage: str) -> bool:
+        return self.manifest["stages"][stage]["status"] in COMPLETE
+
+    def save_manifest(self):
+        with self._lock:
+            _write_json(self.manifest_path, self.manifest)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage attempt; it is marked done when the block exits cleanly
+
+        Time spent in failed attempts is kept, so a stage's seconds cover every
+        attempt across resumes.
+        """
+        entry = self.manifest["stages"][name]
+        entry.update(status="running", started_at=datetime.now().isoformat())
+        entry.pop("error", None)
+        self.save_manifest()
+        start = time.perf_counter()
+        try:
+            yield entry
+        except BaseException as e:
+            entry.update(status="failed", error=str(e) or type(e).__name__)
+            raise
+        else:
+            entry.update(status="done", finished_at=datetime.now().isoformat())
+        finally:
+            entry["seconds"] = round(entry["seconds"] + time.perf_counter() - start, 3)
+            entry["attempts"] = entry.get("attempts", 0) + 1
+            self.save_manifest()
+
+    def skip(self, name: str, reason: str):
+        self.manifest["stages"][name].update(status="skipped", reason=reason)
+        self.save_manifest()
+
+    def timings(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage status, seconds, attempts and item counts"""
+        keys = ("status", "seconds", "attempts", "items", "reason")
+        return {name: {k: s[k] for k in keys if k in s} for name, s in self.manifest["stages"].items()}
+
+    def save(self, artifact: str, data: Any):
+        """Write a JSON artifact atomically"""
+        _write_json(os.path.join(self.path, f"{artifact}.json"), data)
+
+    def load(self, artifact: str, default: Any = None) -> Any:
+        path = os.path.join(self.path, f"{artifact}.json")
+        if not os.path.exists(path):
+            return default
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def append(self, artifact: str, record: Dict[str, Any]):
+        """Append one record to a JSON-lines artifact (flushed immediately)"""
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock, open(os.path.join(self.path, f"{artifact}.jsonl"), "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+
+    def records(self, artifact: str) -> Iterator[Dict[str, Any]]:
+        """Records of a JSON-lines artifact, oldest first"""
+        path = os.path.join(self.path, f"{artifact}.jsonl")
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A crash mid-write leaves a partial last line; that item is redone
+                    continue
+
+
+def list_runs(runs_dir: str) -> List[Dict[str, Any]]:
+    """run_id, created_at, finished and next_stage of every run, newest first"""
+    if not os.path.isdir(runs_dir):
+        return []
+    runs = []
+    for run_id in os.listdir(runs_dir):
+        try:
+            run = PipelineRun(runs_dir, run_id)
+        except (OSError, ValueError):
+            continue
+        runs.append({
+            "run_id": run_id,
+            "created_at": run.manifest.get("created_at"),
+            "finished": run.finished,
+            "next_stage": run.next_stage(),
+        })
+    return sorted(runs, key=lambda r: (r["created_at"] or "", r["run_id"]), reverse=True)
+
+
+def prune_runs(runs_dir: str, keep: int = RUNS_KEPT) -> List[str]:
+    """Delete finished runs beyond the newest `keep`; returns the removed ids"""
+    finished = [r["run_id"] for r in list_runs(runs_dir) if r["finished"]]
+    removed = finished[keep:]
+    for run_id in removed:
+        shutil.rmtree(os.path.join(runs_dir, run_id), ignore_errors=True)
+    return removed
@@ -0,0 +1,207 @@
+"""
+Municipality -> province/territory resolution
+
+Builds a normalized-name index once and answers lookups in O(1):
+1. Manual overrides for major cities whose names repeat across provinces
+2. Explicit suffixes in the name itself ("Barrie, ON", "Sudbury (Ontario)")
+3. The GeoNames index written by extract_canada_municipalities.py
+   (canada_municipality_provinces.csv: municipality, province, population)
+
+Names found in several provinces resolve to the most populous candidate only
+when it clearly dominates; otherwise the lookup is ambiguous and returns None.
+Unknown names also return None rather than guessing a province.
+
+The index is generated, not committed (python extract_canada_municipalities.py
+--zip path/to/CA.zip). Until it exists, names that are not overrides or carry
+no suffix fall back to MISSING_INDEX_FALLBACK, as lookups did before the index.
+"""
+import csv
+import os
+import re
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..utils.config import get_data_path
+
+PROVINCES_FILE = get_data_path("canada_municipality_provinces.csv")
+
+# GeoNames admin1 codes for Canada
+ADMIN1_PROVINCES = {
+    "01": "Alberta",
+    "02": "British Columbia",
+    "03": "Manitoba",
+    "04": "New Brunswick",
+    "05": "Newfoundland and Labrador",
+    "07": "Nova Scotia",
+    "08": "Ontario",
+    "09": "Prince Edward Island",
+    "10": "Quebec",
+    "11": "Saskatchewan",
+    "12": "Yukon",
+    "13": "Northwest Territories",
+    "14": "Nunavut",
+}
+
+PROVINCE_ABBREVIATIONS = {
+    "AB": "Alberta", "BC": "British Columbia", "MB": "Manitoba", "NB": "New Brunswick",
+    "NL": "Newfoundland and Labrador", "NS": "Nova Scotia", "ON": "Ontario",
+    "PE": "Prince Edward Island", "PEI": "Prince Edward Island", "QC": "Quebec",
+    "SK": "Saskatchewan", "YT": "Yukon", "NT": "Northwest Territories", "NU": "Nunavut",
+}
+
+MANUAL_OVERRIDES = {
+    "Toronto": "Ontario",
+    "Montreal": "Quebec",
+    "Vancouver": "British Columbia",
+    "Calgary": "Alberta",
+    "Edmonton": "Alberta",
+    "Ottawa": "Ontario",
+    "Winnipeg": "Manitoba",
+    "Halifax": "Nova Scotia",
+    "St. John's": "Newfoundland and Labrador",
+    "Charlottetown": "Prince Edward Island",
+    "Fredericton": "New Brunswick",
+    "Regina": "Saskatchewan",
+    "Yellowknife": "Northwest Territories",
+    "Whitehorse": "Yukon",
+    "Iqaluit": "Nunavut",
+}
+
+# Province for names not covered by overrides/suffixes while the index file is
+# missing (the lead engine's service areas are mostly in Ontario)
+MISSING_INDEX_FALLBACK = "Ontario"
+
+# A duplicate name resolves to its most populous candidate only if that place is
+# at least this many times larger than the runner-up
+DOMINANCE_RATIO = 10
+
+
+def normalize_municipality(name: str) -> str:
+    """Normalized lookup key: accents, case, punctuation and Saint/Sainte folded"""
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = text.replace("&", " and ").replace("'", "").replace("’", "")
+    text = re.sub(r"[^a-z0-9]+", " ", text)
+    text = re.sub(r"\bsainte\b", "ste", text)
+    text = re.sub(r"\bsaint\b", "st", text)
+    return " ".join(text.split())
+
+
+def _province_lookup() -> Dict[str, str]:
+    lookup = {normalize_municipality(p): p for p in ADMIN1_PROVINCES.values()}
+    lookup.update({abbr.lower(): p for abbr, p in PROVINCE_ABBREVIATIONS.items()})
+    return lookup
+
+
+_PROVINCE_KEYS = _province_lookup()
+_SUFFIX = re.compile(r"^(.*?)\s*(?:,\s*|\(\s*)([^,()]+?)\s*\)?\s*$")
+
+
+def split_province_suffix(name: str) -> Tuple[str, Optional[str]]:
+    """Split "Barrie, ON" / "Sudbury (Ontario)" into (municipality, province)"""
+    match = _SUFFIX.match(name or "")
+    if match:
+        province = _PROVINCE_KEYS.get(normalize_municipality(match.group(2)))
+        if province:
+            return match.group(1), province
+    return name, None
+
+
+class MunicipalityResolver:
+    """Precomputed municipality -> province index keyed by normalized name"""
+
+    def __init__(self, entries: Iterable[Tuple[str, str, int]] = (),
+                 overrides: Optional[Dict[str, str]] = None, fallback: Optional[str] = None):
+        """
+        Args:
+            entries: (municipality, province, population) rows; duplicates allowed
+            overrides: Name -> province entries that win over the index
+            fallback: Province for names the index does not contain (ambiguous
+                names still return None)
+        """
+        self.fallback = fallback
+        self._candidates: Dict[str, Dict[str, int]] = {}
+        for name, province, population in entries:
+            if not name or not province:
+                continue
+            by_province = self._candidates.setdefault(normalize_municipality(name), {})
+            by_province[province] = max(by_province.get(province, 0), int(population or 0))
+        self._overrides = {normalize_municipality(k): v for k, v in (overrides or {}).items()}
+        self._resolved: Dict[str, Optional[str]] = {}
+        for key in set(self._candidates) | set(self._overrides):
+            self._resolved[key] = self._resolve_key(key)
+
+    def _resolve_key(self, key: str) -> Optional[str]:
+        if key in self._overrides:
+            return self._overrides[key]
+        ranked = sorted(self._candidates.get(key, {}).items(), key=lambda kv: kv[1], reverse=True)
+        if len(ranked) == 1:
+            return ranked[0][0]
+        if len(ranked) > 1 and ranked[0][1] > 0 and ranked[0][1] >= DOMINANCE_RATIO * ranked[1][1]:
+            return ranked[0][0]
+        return None
+
+    def __len__(self) -> int:
+        return len(self._resolved)
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Province/territory for a municipality name, or None if unknown or ambiguous"""
+        base, province = split_province_suffix(name)
+        if province:
+            return province
+        key = normalize_municipality(base)
+        if key in self._resolved:
+            return self._resolved[key]
+        return self.fallback
+
+    def candidates(self, name: str) -> List[str]:
+        """Every province containing a municipality with this name, most populous first"""
+        base, province = split_province_suffix(name)
+        if province:
+            return [province]
+        by_province = self._candidates.get(normalize_municipality(base), {})
+        return [p for p, _ in sorted(by_province.items(), key=lambda kv: kv[1], reverse=True)]
+
+    def is_ambiguous(self, name: str) -> bool:
+        return len(self.candidates(name)) > 1 and self.resolve(name) is None
+
+
+def load_resolver(path: str = PROVINCES_FILE) -> MunicipalityResolver:
+    """Build a resolver from the GeoNames province index (overrides plus MISSING_INDEX_FALLBACK if missing)"""
+    entries: List[Tuple[str, str, int]] = []
+    fallback = None
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                province = row.get("province", "")
+                province = ADMIN1_PROVINCES.get(province, province)
+                try:
+                    population = int(row.get("population") or 0)
+                except ValueError:
+                    population = 0
+                entries.append((row.get("municipality", ""), province, population))
+    else:
+        print(f"[Warning] Province index not found: {path} (run extract_canada_municipalities.py --zip CA.zip); "
+              f"unknown municipalities default to {MISSING_INDEX_FALLBACK}")
+        fallback = MISSING_INDEX_FALLBACK
+    return MunicipalityResolver(entries, MANUAL_OVERRIDES, fallback)
+
+
+_resolver: Optional[MunicipalityResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver() -> MunicipalityResolver:
+    """Process-wide resolver, built on first use"""
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = load_resolver()
+    return _resolver
+
+
+def get_province_for_municipality(muni: str) -> Optional[str]:
+    """Province/territory for a municipality, or None if unknown or ambiguous"""
+    return get_resolver().resolve(muni)
@@ -0,0 +1,142 @@
+"""
+Append-only sync journal
+
+JSON-lines record of sync runs (data/sync_journal.jsonl):
+1. One line per run, appended and flushed; nothing is rewritten. A line left
+   partial by an interrupted write is skipped on read and terminated before
+   the next append
+2. Entries carry stats, per-phase timings, rows moved, bytes transferred and
+   the remote cursor the next incremental sync resumes from
+3. tail() and last() read backwards from the end of the file, so the history
+   page and cursor lookups cost the same regardless of journal length
+4. A legacy sync_log.json is imported when the journal is first created
+   (the old file is left untouched)
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+_BLOCK = 64 * 1024
+
+
+class SyncJournal:
+    """JSON-lines journal of sync runs"""
+
+    def __init__(self, path: str, legacy_log: Optional[str] = None):
+        """
+        Args:
+            path: Journal file (created on first append)
+            legacy_log: Old sync_log.json to import if the journal does not exist yet
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        if legacy_log and os.path.exists(legacy_log) and not os.path.exists(path):
+            self.migrate_legacy(legacy_log)
+
+    def append(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Append one entry (timestamp added if missing) and return it"""
+        entry = dict(entry)
+        entry.setdefault("timestamp", datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"))
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "ab") as f:
+                # Terminate a partial line left by an interrupted write, so only it is lost
+                if f.tell() and not self._ends_with_newline():
+                    f.write(b"\n")
+                f.write(line.encode("utf-8"))
+                f.flush()
+        return entry
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _reverse_entries(self) -> Iterator[Dict[str, Any]]:
+        """Entries newest first, reading the file backwards in blocks"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            remainder = b""
+            while position > 0:
+                step = min(_BLOCK, position)
+                position -= step
+                f.seek(position)
+                lines = (f.read(step) + remainder).split(b"\n")
+                # The first piece may be the tail of a line that starts in an earlier block
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    entry = self._parse(line)
+                    if entry is not None:
+                        yield entry
+            entry = self._parse(remainder)
+            if entry is not None:
+                yield entry
+
+    @staticmethod
+    def _parse(line: bytes) -> Optional[Dict[str, Any]]:
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            # A run interrupted mid-write leaves a partial line; skip it
+            return None
+
+    def tail(self, n: int = 100) -> List[Dict[str, Any]]:
+        """Last n entries, oldest first"""
+        entries = []
+        for entry in self._reverse_entries():
+            if len(entries) >= n:
+                break
+            entries.append(entry)
+        return entries[::-1]
+
+    def last(self, key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Newest entry (that has `key`, if given)"""
+        for entry in self._reverse_entries():
+            if key is None or entry.get(key) is not None:
+                return entry
+        return None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Every entry, oldest first"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            for line in f:
+                entry = self._parse(line)
+                if entry is not None:
+                    yield entry
+
+    def migrate_legacy(self, legacy_log: str) -> int:
+        """Import history (and the sync cursor) from a sync_log.json file
+
+        Returns:
+            Number of entries written
+        """
+        with open(legacy_log, "r") as f:
+            log = json.load(f)
+        entries = [dict(e, migrated=True) for e in log.get("sync_history", [])]
+        cursor = log.get("remote_cursor")
+        if cursor is None and log.get("last_sync"):
+            cursor = {"updated_at": log["last_sync"], "id": None}
+        if cursor is not None:
+            if not entries:
+                entries.append({"timestamp": log.get("last_sync"), "migrated": True})
+            entries[-1]["cursor"] = cursor
+
+        tmp = self.path + ".tmp"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, default=str) + "\n")
+        os.replace(tmp, self.path)
+        return len(entries)
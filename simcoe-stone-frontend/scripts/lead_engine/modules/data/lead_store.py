@@ -0,0 +1,526 @@
+"""
+Embedded lead store
+
+SQLite database that is the system of record for lead records:
+1. One row per lead, keyed by the normalized (name, service_area) lead key
+2. Indexes on name, service_area, source and score for lookups and filters
+3. Point lookups, partial updates and transactional appends/replacements
+4. Columns follow the data: unknown fields are added as TEXT columns on write
+5. Change tracking for remote sync: local writes set the dirty flag and
+   updated_at; rows applied from the remote are stored clean
+6. Search: equality/score filters pushed into SQL, FTS5 full-text index on
+   name/email/address (kept current by triggers; bulk writes index their
+   rows in one statement), facet counts, pagination
+
+CSV is only an import/export format (see DataSyncManager).
+"""
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+KEY_COLUMN = "lead_key"
+DIRTY_COLUMN = "dirty"
+INTERNAL_COLUMNS = ("id", KEY_COLUMN, DIRTY_COLUMN)
+# Dropped from incoming frames on write (match_key is the old CSV dedup key)
+STRIPPED_COLUMNS = INTERNAL_COLUMNS + ("match_key",)
+
+# Core schema; anything else a caller writes becomes an extra TEXT column
+LEAD_COLUMNS: Dict[str, str] = {
+    "name": "TEXT",
+    "service_area": "TEXT",
+    "craft_type": "TEXT",
+    "phone": "TEXT",
+    "email": "TEXT",
+    "website": "TEXT",
+    "address": "TEXT",
+    "notes": "TEXT",
+    "source": "TEXT",
+    "status": "TEXT",
+    "score": "REAL",
+    "latitude": "REAL",
+    "longitude": "REAL",
+    "scraped_at": "TEXT",
+    "category": "TEXT",
+    "quality_score": "REAL",
+    "profile": "TEXT",
+    "enriched_by": "TEXT",
+    "updated_at": "TEXT",
+}
+INDEXED_COLUMNS = ("name", "service_area", "craft_type", "source", "score")
+FTS_COLUMNS = ("name", "email", "address")
+# Appends at least this large load the FTS index in one statement instead of per-row triggers
+FTS_BULK_ROWS = 1000
+
+# Columns returned for an empty store, matching the old empty-CSV frame
+EMPTY_COLUMNS = ["name", "service_area", "craft_type", "phone", "email", "website", "address", "notes", "source"]
+
+Records = Union[pd.DataFrame, Iterable[Dict[str, Any]]]
+
+
+def normalize_key_part(value: Any) -> str:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    return str(value).strip().lower()
+
+
+def lead_key(name: Any, service_area: Any) -> str:
+    """Normalized identity of a lead: "name|service_area", trimmed and lower-cased"""
+    return f"{normalize_key_part(name)}|{normalize_key_part(service_area)}"
+
+
+def lead_keys(df: pd.DataFrame) -> pd.Series:
+    """Vectorized lead_key over a frame with name/service_area columns"""
+    def part(column: str) -> pd.Series:
+        if column not in df.columns:
+            return pd.Series("", index=df.index)
+        return df[column].fillna("").astype(str).str.strip().str.lower()
+    return part("name") + "|" + part("service_area")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _row_hashes(df: pd.DataFrame, columns: Sequence[str]) -> np.ndarray:
+    """Content hash per row over `columns` (missing columns/values hash alike)"""
+    frame = df.reindex(columns=list(columns))
+    frame = frame.astype(object).where(frame.notna(), None).astype(str)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def fts_query(text: str) -> str:
+    """FTS5 MATCH expression: every word must appear, as a word prefix"""
+    return " ".join(f'"{token}"*' for token in re.findall(r"\w+", text))
+
+
+def _quote(column: str) -> str:
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _to_sql_value(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, (float, np.floating)) and np.isnan(value):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (dict, list, tuple, set)):
+        return str(value)
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    return value
+
+
+class LeadStore:
+    """SQLite-backed lead table, safe to share across threads"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._writes = 0
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            columns = ", ".join(f"{_quote(c)} {t}" for c, t in LEAD_COLUMNS.items())
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS leads (id INTEGER PRIMARY KEY, {KEY_COLUMN} TEXT NOT NULL UNIQUE, "
+                f"{DIRTY_COLUMN} INTEGER NOT NULL DEFAULT 1, {columns})")
+            # Stores created before change tracking: every row still needs a first push
+            if DIRTY_COLUMN not in self._table_columns():
+                self._conn.execute(f"ALTER TABLE leads ADD COLUMN {DIRTY_COLUMN} INTEGER NOT NULL DEFAULT 1")
+            for column in INDEXED_COLUMNS:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_leads_{column} ON leads ({_quote(column)})")
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_leads_{DIRTY_COLUMN} ON leads ({DIRTY_COLUMN}) WHERE {DIRTY_COLUMN} = 1")
+            self._fts = self._create_fts()
+        self._columns = self._table_columns()
+
+    def _create_fts(self) -> bool:
+        """External-content FTS5 index over FTS_COLUMNS; False if SQLite lacks FTS5"""
+        # INSERT OR REPLACE only fires the delete trigger with recursive triggers on
+        self._conn.execute("PRAGMA recursive_triggers = ON")
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leads_fts'").fetchone()
+        if exists:
+            # A store left without its triggers has a stale index: restore both
+            triggers = self._conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'leads_fts_%'").fetchone()[0]
+            if triggers < 3:
+                self._create_fts_triggers()
+                self._conn.execute("INSERT INTO leads_fts (leads_fts) VALUES ('rebuild')")
+            return True
+        try:
+            self._conn.execute(
+                f"CREATE VIRTUAL TABLE leads_fts USING fts5({', '.join(FTS_COLUMNS)}, content='leads', content_rowid='id')")
+        except sqlite3.OperationalError:
+            print("[Warning] SQLite has no FTS5; lead text search falls back to LIKE")
+            return False
+        self._create_fts_triggers()
+        # Index rows written before the FTS table existed
+        self._conn.execute("INSERT INTO leads_fts (leads_fts) VALUES ('rebuild')")
+        return True
+
+    def _create_fts_triggers(self):
+        columns = ", ".join(FTS_COLUMNS)
+        new_values = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+        old_values = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+        insert_new = f"INSERT INTO leads_fts (rowid, {columns}) VALUES (new.id, {new_values});"
+        delete_old = f"INSERT INTO leads_fts (leads_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+        self._conn.execute(f"CREATE TRIGGER IF NOT EXISTS leads_fts_ai AFTER INSERT ON leads BEGIN {insert_new} END")
+        self._conn.execute(f"CREATE TRIGGER IF NOT EXISTS leads_fts_ad AFTER DELETE ON leads BEGIN {delete_old} END")
+        self._conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS leads_fts_au AFTER UPDATE OF {columns} ON leads BEGIN {delete_old} {insert_new} END")
+
+    def _drop_fts_triggers(self):
+        """Drop the FTS triggers inside the caller's transaction
+
+        sqlite3 does not open its implicit transaction for DDL, so one is begun
+        here; a failed write then rolls the DROPs back with it, and other
+        connections never see the table without its triggers.
+        """
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN")
+        for name in ("ai", "ad", "au"):
+            self._conn.execute(f"DROP TRIGGER IF EXISTS leads_fts_{name}")
+
+    def _bulk_insert(self, df: pd.DataFrame, dirty: Any = 1) -> int:
+        """INSERT OR IGNORE many rows, indexing them for FTS in one statement
+
+        The per-row triggers are dropped for the duration of the caller's
+        transaction (see _drop_fts_triggers).
+        """
+        if not self._fts or len(df) < FTS_BULK_ROWS:
+            return self._write(df, "INSERT OR IGNORE", dirty)
+        columns = ", ".join(FTS_COLUMNS)
+        last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM leads").fetchone()[0]
+        self._drop_fts_triggers()
+        written = self._write(df, "INSERT OR IGNORE", dirty)
+        # New rows always get ids above the previous maximum
+        self._conn.execute(
+            f"INSERT INTO leads_fts (rowid, {columns}) SELECT id, {columns} FROM leads WHERE id > ?", (last_id,))
+        self._create_fts_triggers()
+        return written
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _table_columns(self) -> List[str]:
+        return [row[1] for row in self._conn.execute("PRAGMA table_info(leads)")]
+
+    def _ensure_columns(self, columns: Iterable[str]):
+        columns = list(columns)
+        if all(c in self._columns for c in columns):
+            return
+        # Another connection may have added the column since we last looked
+        self._columns = self._table_columns()
+        for column in [c for c in columns if c not in self._columns]:
+            try:
+                self._conn.execute(f"ALTER TABLE leads ADD COLUMN {_quote(column)} {LEAD_COLUMNS.get(column, 'TEXT')}")
+            except sqlite3.OperationalError as e:
+                if "duplicate column" not in str(e):
+                    raise
+        self._columns = self._table_columns()
+
+    @property
+    def data_columns(self) -> List[str]:
+        """Lead columns in table order (without id/key/dirty flag)"""
+        return [c for c in self._columns if c not in INTERNAL_COLUMNS]
+
+    @property
+    def generation(self) -> Tuple[int, int]:
+        """Changes whenever the table changes (writes through this store or
+        through another connection), for caches keyed on the store contents"""
+        with self._lock:
+            return self._writes, self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+    def keys(self) -> Set[str]:
+        """Every stored lead key"""
+        with self._lock:
+            return {row[0] for row in self._conn.execute(f"SELECT {KEY_COLUMN} FROM leads")}
+
+    def read_frame(self, where: Optional[str] = None, params: Sequence[Any] = (),
+                   columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Leads as a DataFrame, in insertion order
+
+        Args:
+            where: Optional SQL filter (e.g. "service_area = ?")
+            params: Parameters for `where`
+            columns: Columns to read (default: all lead columns)
+        """
+        with self._lock:
+            wanted = [c for c in (columns or self.data_columns) if c in self._columns]
+            sql = f"SELECT {', '.join(_quote(c) for c in wanted)} FROM leads"
+            if where:
+                sql += f" WHERE {where}"
+            df = pd.read_sql_query(sql + " ORDER BY id", self._conn, params=list(params))
+        if columns is not None:
+            return df
+        if df.empty:
+            return pd.DataFrame(columns=EMPTY_COLUMNS)
+        # Drop optional columns no row uses (e.g. extras added by other imports)
+        unused = [c for c in df.columns[df.isna().all()] if c not in EMPTY_COLUMNS]
+        return df.drop(columns=unused)
+
+    def _search_where(self, text: Optional[str], filters: Optional[Dict[str, Any]],
+                      min_score: Optional[float]) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, value in (filters or {}).items():
+            if column not in self._columns or value is None:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                values = list(value)
+                clauses.append(f"{_quote(column)} IN ({', '.join('?' for _ in values)})")
+                params.extend(values)
+            else:
+                clauses.append(f"{_quote(column)} = ?")
+                params.append(value)
+        if min_score is not None:
+            clauses.append("score >= ?")
+            params.append(min_score)
+        if text and text.strip():
+            if self._fts and fts_query(text):
+                clauses.append("id IN (SELECT rowid FROM leads_fts WHERE leads_fts MATCH ?)")
+                params.append(fts_query(text))
+            else:
+                like = f"%{text.strip()}%"
+                fields = [c for c in FTS_COLUMNS if c in self._columns]
+                clauses.append("(" + " OR ".join(f"{_quote(c)} LIKE ?" for c in fields) + ")")
+                params.extend([like] * len(fields))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def search(self, text: Optional[str] = None, filters: Optional[Dict[str, Any]] = None,
+               min_score: Optional[float] = None, order_by: str = "id", descending: bool = False,
+               limit: Optional[int] = 50, offset: int = 0,
+               columns: Optional[Sequence[str]] = None) -> Tuple[pd.DataFrame, int]:
+        """One page of matching leads plus the total number of matches
+
+        Args:
+            text: Full-text query over name/email/address (word prefixes, all must match)
+            filters: Column -> value (or list of values) equality filters
+            min_score: Lowest score to include
+            order_by: Sort column (unknown columns sort by insertion order)
+            descending: Sort direction
+            limit: Page size (None for every match)
+            offset: Rows to skip
+            columns: Columns to return (default: all lead columns)
+
+        Returns:
+            Tuple of (page DataFrame, total matches)
+        """
+        with self._lock:
+            where, params = self._search_where(text, filters, min_score)
+            total = self._conn.execute(f"SELECT COUNT(*) FROM leads{where}", params).fetchone()[0]
+            wanted = [c for c in (columns or self.data_columns) if c in self._columns]
+            order = _quote(order_by) if order_by in self._columns else "id"
+            direction = "DESC" if descending else "ASC"
+            sql = (f"SELECT {', '.join(_quote(c) for c in wanted)} FROM leads{where} "
+                   f"ORDER BY {order} IS NULL, {order} {direction}, id")
+            page_params = list(params)
+            if limit is not None:
+                sql += " LIMIT ? OFFSET ?"
+                page_params += [limit, offset]
+            df = pd.read_sql_query(sql, self._conn, params=page_params)
+        return df, total
+
+    def facets(self, columns: Sequence[str] = ("service_area", "craft_type", "source")) -> Dict[str, List[Tuple[Any, int]]]:
+        """(value, count) pairs per column, most common first (NULLs left out)"""
+        out: Dict[str, List[Tuple[Any, int]]] = {}
+        with self._lock:
+            for column in columns:
+                if column not in self._columns:
+                    out[column] = []
+                    continue
+                rows = self._conn.execute(
+                    f"SELECT {_quote(column)}, COUNT(*) AS n FROM leads WHERE {_quote(column)} IS NOT NULL "
+                    f"GROUP BY {_quote(column)} ORDER BY n DESC, {_quote(column)}").fetchall()
+                out[column] = [(value, n) for value, n in rows]
+        return out
+
+    def score_range(self) -> Tuple[Optional[float], Optional[float]]:
+        """Lowest and highest stored score"""
+        with self._lock:
+            return self._conn.execute("SELECT MIN(score), MAX(score) FROM leads").fetchone()
+
+    def get(self, name: str, service_area: str) -> Optional[Dict[str, Any]]:
+        """Point lookup by lead identity"""
+        with self._lock:
+            cur = self._conn.execute(f"SELECT * FROM leads WHERE {KEY_COLUMN} = ?", (lead_key(name, service_area),))
+            row = cur.fetchone()
+            if row is None:
+                return None
+            names = [d[0] for d in cur.description]
+        return {k: v for k, v in zip(names, row) if k not in INTERNAL_COLUMNS and v is not None}
+
+    def update(self, name: str, service_area: str, fields: Dict[str, Any]) -> bool:
+        """Partial update of one lead; returns False if it does not exist"""
+        fields = {k: v for k, v in fields.items() if k not in INTERNAL_COLUMNS}
+        if not fields:
+            return self.get(name, service_area) is not None
+        fields.setdefault("updated_at", _now())
+        key = lead_key(name, service_area)
+        new_key = lead_key(fields.get("name", name), fields.get("service_area", service_area))
+        with self._lock, self._conn:
+            self._ensure_columns(fields)
+            assignments = ", ".join(f"{_quote(c)} = ?" for c in fields)
+            cur = self._conn.execute(
+                f"UPDATE leads SET {assignments}, {KEY_COLUMN} = ?, {DIRTY_COLUMN} = 1 WHERE {KEY_COLUMN} = ?",
+                [_to_sql_value(v) for v in fields.values()] + [new_key, key])
+            self._writes += cur.rowcount
+            return cur.rowcount > 0
+
+    def _frame(self, records: Records) -> pd.DataFrame:
+        df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(list(records))
+        return df.drop(columns=[c for c in STRIPPED_COLUMNS if c in df.columns])
+
+    def _stamped(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Fill missing updated_at values with the current time (local changes)"""
+        now = _now()
+        if "updated_at" not in df.columns:
+            return df.assign(updated_at=now)
+        return df.assign(updated_at=df["updated_at"].astype(object).where(df["updated_at"].notna(), now))
+
+    def _write(self, df: pd.DataFrame, verb: str, dirty: Any = 1, on_conflict: str = "") -> int:
+        """Write rows with `verb` ("INSERT OR IGNORE", ...); dirty is a flag or per-row flags"""
+        if df.empty:
+            return 0
+        columns = list(df.columns)
+        self._ensure_columns(columns)
+        keys = lead_keys(df).tolist()
+        flags = np.broadcast_to(np.asarray(dirty, dtype=np.int64), (len(df),)).tolist()
+        values = df.astype(object).where(df.notna(), None).to_numpy()
+        rows = ([key, flag] + [_to_sql_value(v) for v in row] for key, flag, row in zip(keys, flags, values))
+        placeholders = ", ".join("?" for _ in range(len(columns) + 2))
+        sql = (f"{verb} INTO leads ({KEY_COLUMN}, {DIRTY_COLUMN}, {', '.join(_quote(c) for c in columns)}) "
+               f"VALUES ({placeholders}) {on_conflict}")
+        # rowcount leaves out the rows the FTS triggers write
+        written = self._conn.executemany(sql, rows).rowcount
+        self._writes += written
+        return written
+
+    def append(self, records: Records, replace: bool = False) -> int:
+        """Insert leads in one transaction
+
+        Args:
+            records: DataFrame or record dicts
+            replace: Overwrite leads that already exist (default: keep them)
+
+        Returns:
+            Number of rows written
+        """
+        df = self._stamped(self._frame(records))
+        with self._lock, self._conn:
+            if replace:
+                return self._write(df, "INSERT OR REPLACE")
+            return self._bulk_insert(df)
+
+    def replace_all(self, records: Records) -> int:
+        """Replace the whole table in one transaction (first of duplicate keys wins)
+
+        Rows whose content is unchanged keep their dirty flag and updated_at, so
+        saving a lightly edited frame only marks the edited rows for sync.
+        """
+        df = self._frame(records)
+        keys = lead_keys(df)
+        first = ~keys.duplicated().to_numpy()
+        skipped = len(df) - int(first.sum())
+        df, keys = df[first], keys[first]
+        with self._lock, self._conn:
+            self._ensure_columns(df.columns)
+            compared = [c for c in self.data_columns if c != "updated_at"]
+            old = pd.read_sql_query(
+                f"SELECT {KEY_COLUMN}, {DIRTY_COLUMN}, updated_at, {', '.join(_quote(c) for c in compared)} FROM leads",
+                self._conn)
+            positions = pd.Index(old[KEY_COLUMN]).get_indexer(keys)
+            matched = positions >= 0
+            unchanged = np.zeros(len(df), dtype=bool)
+            unchanged[matched] = _row_hashes(old, compared)[positions[matched]] == _row_hashes(df[matched], compared)
+            safe = np.where(matched, positions, 0)
+            dirty = np.where(unchanged, old[DIRTY_COLUMN].to_numpy()[safe] if len(old) else 1, 1)
+            stamps = old["updated_at"].to_numpy(dtype=object)[safe] if len(old) else np.full(len(df), None)
+            df = df.assign(updated_at=np.where(unchanged, stamps, _now()))
+            if self._fts:
+                # Empty the index up front instead of one trigger 'delete' per row
+                self._drop_fts_triggers()
+                self._conn.execute("INSERT INTO leads_fts (leads_fts) VALUES ('delete-all')")
+            self._writes += self._conn.execute("DELETE FROM leads").rowcount
+            if self._fts:
+                self._create_fts_triggers()
+            written = self._bulk_insert(df, dirty)
+        if skipped:
+            print(f"[Warning] Skipped {skipped} duplicate leads (same name and service area)")
+        return written
+
+    def dirty_frame(self) -> pd.DataFrame:
+        """Leads changed locally since they were last marked clean, with their lead key"""
+        with self._lock:
+            columns = [KEY_COLUMN] + self.data_columns
+            sql = f"SELECT {', '.join(_quote(c) for c in columns)} FROM leads WHERE {DIRTY_COLUMN} = 1 ORDER BY id"
+            return pd.read_sql_query(sql, self._conn)
+
+    def mark_clean(self, keys: Sequence[str], updated_at: Sequence[Any]) -> int:
+        """Clear the dirty flag of pushed rows not modified again since (matched on updated_at)"""
+        with self._lock, self._conn:
+            return self._conn.executemany(
+                f"UPDATE leads SET {DIRTY_COLUMN} = 0 WHERE {KEY_COLUMN} = ? AND updated_at IS ?",
+                zip(keys, [_to_sql_value(v) for v in updated_at])).rowcount
+
+    def dirty_state(self, keys: Sequence[str], chunk_size: int = 500) -> pd.DataFrame:
+        """lead_key/updated_at of the given keys that have unpushed local changes"""
+        keys = list(keys)
+        frames = []
+        with self._lock:
+            for i in range(0, len(keys), chunk_size):
+                chunk = keys[i:i + chunk_size]
+                sql = (f"SELECT {KEY_COLUMN}, updated_at FROM leads WHERE {DIRTY_COLUMN} = 1 "
+                       f"AND {KEY_COLUMN} IN ({', '.join('?' for _ in chunk)})")
+                frames.append(pd.read_sql_query(sql, self._conn, params=chunk))
+        if not frames:
+            return pd.DataFrame(columns=[KEY_COLUMN, "updated_at"])
+        return pd.concat(frames, ignore_index=True)
+
+    def apply_remote(self, records: Records) -> int:
+        """Upsert rows pulled from the remote; they are stored clean
+
+        Only the columns the remote rows carry are overwritten, and their
+        updated_at is kept as the remote reported it.
+        """
+        df = self._frame(records)
+        if df.empty:
+            return 0
+        assignments = ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in [DIRTY_COLUMN] + list(df.columns))
+        with self._lock, self._conn:
+            return self._write(df, "INSERT", 0, f"ON CONFLICT({KEY_COLUMN}) DO UPDATE SET {assignments}")
+
+    def delete(self, name: str, service_area: str) -> bool:
+        with self._lock, self._conn:
+            cur = self._conn.execute(f"DELETE FROM leads WHERE {KEY_COLUMN} = ?", (lead_key(name, service_area),))
+            self._writes += cur.rowcount
+            return cur.rowcount > 0
+
+    def import_csv(self, csv_path: str, replace: bool = False) -> int:
+        """Load a CSV export into the store (see append)"""
+        return self.append(pd.read_csv(csv_path), replace=replace)
+
+    def export_csv(self, csv_path: str) -> int:
+        """Write every lead to a CSV file; returns the row count"""
+        df = self.read_frame()
+        os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
+        tmp = csv_path + ".tmp"
+        df.to_csv(tmp, index=False)
+        os.replace(tmp, csv_path)
+        return len(df)
@@ -0,0 +1,269 @@
+"""
+Municipality-level census feature vectors
+
+Joins census subdivision (CSD) rows from the extracted Census Profile to the
+municipality index and reduces each municipality to a small numeric vector:
+1. Size and growth: population, growth %, dwellings, density
+2. Household signals: median age, median household income, ownership share
+3. Housing stock: single-detached share, pre-1961 / pre-1981 construction share,
+   share needing major repairs
+
+Rows come from census_data/census_csd.npy (see extract_census_population.py).
+Municipalities without a CSD match fall back to their province's row, and
+every row records which granularity it came from. Ranking and threshold
+filtering run on the matrix directly, with no LLM calls.
+"""
+import json
+import os
+import warnings
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..utils.config import get_data_path
+from .census_store import compile_threshold
+from .geography import normalize_municipality
+
+CENSUS_DATA_DIR = get_data_path("census_data")
+
+# Feature name -> (numerator characteristic id(s), denominator id or None), 2021 profile ids
+FEATURE_SPECS: Dict[str, Tuple[Union[int, Tuple[int, ...]], Optional[int]]] = {
+    "population": (1, None),
+    "growth_pct": (3, None),
+    "dwellings": (4, None),
+    "density_km2": (6, None),
+    "median_age": (40, None),
+    "median_household_income": (243, None),
+    "owner_share": (1415, 1414),
+    "single_detached_share": (42, 41),
+    "pre_1961_share": (1441, 1440),
+    "pre_1981_share": ((1441, 1442), 1440),
+    "major_repairs_share": (1451, 1449),
+}
+FEATURE_NAMES = list(FEATURE_SPECS)
+
+# Heavy-tailed counts are log-scaled before standardizing
+LOG_FEATURES = {"population", "dwellings", "density_km2"}
+
+# Masonry demand: older detached owner-occupied stock in growing, larger places
+DEFAULT_WEIGHTS = {
+    "population": 1.0,
+    "growth_pct": 0.5,
+    "median_household_income": 0.5,
+    "owner_share": 0.5,
+    "single_detached_share": 0.75,
+    "pre_1981_share": 1.0,
+    "major_repairs_share": 0.5,
+}
+
+GRANULARITY = ("none", "province", "csd")
+
+# First two digits of a CSD's SGC code (DGUID suffix) -> province/territory
+SGC_PROVINCES = {
+    "10": "Newfoundland and Labrador", "11": "Prince Edward Island", "12": "Nova Scotia",
+    "13": "New Brunswick", "24": "Quebec", "35": "Ontario", "46": "Manitoba",
+    "47": "Saskatchewan", "48": "Alberta", "59": "British Columbia", "60": "Yukon",
+    "61": "Northwest Territories", "62": "Nunavut",
+}
+
+
+def compute_features(matrix: np.ndarray, characteristic_ids: Sequence[int]) -> np.ndarray:
+    """Reduce a geography x characteristic matrix to geography x FEATURE_NAMES
+
+    Missing characteristics and zero denominators give NaN.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    col = {cid: i for i, cid in enumerate(characteristic_ids)}
+    nan = np.full(matrix.shape[0], np.nan)
+
+    def column(cid: int) -> np.ndarray:
+        return matrix[:, col[cid]] if cid in col else nan
+
+    out = np.empty((matrix.shape[0], len(FEATURE_NAMES)), dtype=np.float64)
+    for j, name in enumerate(FEATURE_NAMES):
+        numerator_ids, denominator_id = FEATURE_SPECS[name]
+        ids = numerator_ids if isinstance(numerator_ids, tuple) else (numerator_ids,)
+        values = np.sum([column(cid) for cid in ids], axis=0)
+        if denominator_id is not None:
+            denominator = column(denominator_id)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = np.where(denominator > 0, values / denominator, np.nan)
+        out[:, j] = values
+    return out
+
+
+def _load_level(level: str, census_dir: str):
+    matrix_path = os.path.join(census_dir, f"census_{level}.npy")
+    labels_path = os.path.join(census_dir, f"census_{level}.json")
+    if not (os.path.exists(matrix_path) and os.path.exists(labels_path)):
+        return None, None
+    with open(labels_path, "r", encoding="utf-8") as f:
+        labels = json.load(f)
+    matrix = np.load(matrix_path, mmap_mode="r")
+    return compute_features(matrix, labels["characteristic_ids"]), labels
+
+
+class MunicipalFeatures:
+    """Feature matrix aligned with a municipality list"""
+
+    def __init__(self, municipalities: Sequence[str], matrix: np.ndarray,
+                 granularity: Optional[Sequence[int]] = None):
+        self.municipalities = list(municipalities)
+        self.matrix = np.asarray(matrix, dtype=np.float64).reshape(len(self.municipalities), len(FEATURE_NAMES))
+        self.granularity = np.asarray(granularity if granularity is not None
+                                      else np.zeros(len(self.municipalities)), dtype=np.int8)
+        self._index: Dict[str, int] = {}
+        for i, m in enumerate(self.municipalities):
+            self._index.setdefault(m, i)
+            self._index.setdefault(normalize_municipality(m), i)
+        self._standardized: Optional[np.ndarray] = None
+        self._default_scores: Optional[np.ndarray] = None
+
+    def row(self, name: str) -> Optional[int]:
+        i = self._index.get(name)
+        return i if i is not None else self._index.get(normalize_municipality(name))
+
+    def vector(self, name: str) -> Optional[np.ndarray]:
+        """Feature vector (FEATURE_NAMES order) for a municipality, or None if unknown"""
+        i = self.row(name)
+        return None if i is None else self.matrix[i]
+
+    def features(self, name: str) -> Dict[str, float]:
+        """Non-missing features for a municipality, rounded for prompts/metadata"""
+        vec = self.vector(name)
+        if vec is None:
+            return {}
+        return {f: round(float(v), 4) for f, v in zip(FEATURE_NAMES, vec) if not np.isnan(v)}
+
+    def source(self, name: str) -> str:
+        i = self.row(name)
+        return GRANULARITY[self.granularity[i]] if i is not None else "none"
+
+    def describe(self, name: str) -> str:
+        """Compact one-line summary of a municipality's local signals"""
+        feats = self.features(name)
+        if not feats:
+            return "no census features"
+        parts = []
+        for key, value in feats.items():
+            if key.endswith("_share"):
+                parts.append(f"{key}={value:.0%}")
+            elif key == "growth_pct":
+                parts.append(f"{key}={value:+.1f}")
+            else:
+                parts.append(f"{key}={value:,.0f}")
+        return ", ".join(parts) + f" [{self.source(name)}]"
+
+    def _z(self) -> np.ndarray:
+        if self._standardized is None:
+            m = self.matrix.copy()
+            for j, name in enumerate(FEATURE_NAMES):
+                if name in LOG_FEATURES:
+                    m[:, j] = np.log1p(np.clip(m[:, j], 0, None))
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+                mean = np.nanmean(m, axis=0)
+                std = np.nanstd(m, axis=0)
+            z = (m - mean) / np.where(std > 0, std, 1)
+            # Missing values score as average
+            self._standardized = np.nan_to_num(z, nan=0.0)
+        return self._standardized
+
+    def scores(self, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Weighted sum of standardized features for every municipality"""
+        if weights is None:
+            if self._default_scores is None:
+                self._default_scores = self.scores(DEFAULT_WEIGHTS)
+            return self._default_scores
+        w = np.array([weights.get(f, 0.0) for f in FEATURE_NAMES])
+        return self._z() @ w
+
+    def score(self, name: str) -> Optional[float]:
+        """Default-weight local score for one municipality (None if unknown)"""
+        i = self.row(name)
+        return None if i is None else round(float(self.scores()[i]), 3)
+
+    def rank(self, names: Sequence[str], weights: Optional[Dict[str, float]] = None) -> List[Tuple[str, float]]:
+        """Order names by local score, highest first (unknown names last, order kept)"""
+        all_scores = self.scores(weights)
+        rows = [self.row(n) for n in names]
+        keyed = [(n, float(all_scores[r]) if r is not None else float("-inf")) for n, r in zip(names, rows)]
+        return sorted(keyed, key=lambda kv: kv[1], reverse=True)
+
+    def filter(self, names: Sequence[str], features: Union[str, Sequence[str]], threshold: str) -> List[str]:
+        """Names whose features all pass a threshold expression (see compile_threshold)"""
+        features = [features] if isinstance(features, str) else list(features)
+        unknown = [f for f in features if f not in FEATURE_NAMES]
+        if unknown or not features:
+            raise ValueError(f"Unknown feature: {', '.join(unknown) or '(none)'}")
+        columns = self.matrix[:, [FEATURE_NAMES.index(f) for f in features]]
+        passed = compile_threshold(threshold)(columns).all(axis=1)
+        rows = [self.row(n) for n in names]
+        return [n for n, r in zip(names, rows) if r is not None and passed[r]]
+
+    def metadata(self, name: str) -> Dict[str, float]:
+        """Non-missing features as feat_* keys, for vector store metadata"""
+        return {f"feat_{k}": v for k, v in self.features(name).items()}
+
+
+def build_municipal_features(
+    municipalities: Sequence[str],
+    province_of: Callable[[str], Optional[str]],
+    population_of: Optional[Callable[[str], int]] = None,
+    census_dir: str = CENSUS_DATA_DIR,
+) -> MunicipalFeatures:
+    """Join CSD (or, failing that, province) census features to a municipality list
+
+    Args:
+        municipalities: Municipality names
+        province_of: Municipality -> province resolver (disambiguates repeated CSD names)
+        population_of: Fallback population source when no CSD row matches
+        census_dir: Directory holding census_<level>.npy/.json
+
+    Returns:
+        MunicipalFeatures aligned with `municipalities`
+    """
+    n = len(municipalities)
+    out = np.full((n, len(FEATURE_NAMES)), np.nan)
+    granularity = np.zeros(n, dtype=np.int8)
+    rows = np.full(n, -1, dtype=np.int64)
+    prov_rows = np.full(n, -1, dtype=np.int64)
+
+    csd_features, csd_labels = _load_level("csd", census_dir)
+    prov_features, prov_labels = _load_level("province", census_dir)
+    provinces = [province_of(m) for m in municipalities]
+
+    if csd_features is not None:
+        by_name: Dict[str, List[int]] = {}
+        by_name_province: Dict[Tuple[str, Optional[str]], int] = {}
+        for i, (code, name) in enumerate(zip(csd_labels["geo_codes"], csd_labels["geo_names"])):
+            key = normalize_municipality(name)
+            by_name.setdefault(key, []).append(i)
+            by_name_province.setdefault((key, SGC_PROVINCES.get(code[9:11])), i)
+        for i, (m, prov) in enumerate(zip(municipalities, provinces)):
+            key = normalize_municipality(m)
+            hit = by_name_province.get((key, prov))
+            if hit is None and len(by_name.get(key, [])) == 1:
+                hit = by_name[key][0]
+            if hit is not None:
+                rows[i] = hit
+        matched = rows >= 0
+        out[matched] = csd_features[rows[matched]]
+        granularity[matched] = GRANULARITY.index("csd")
+
+    if prov_features is not None:
+        prov_index = {p: i for i, p in enumerate(prov_labels["geo_names"])}
+        prov_rows = np.array([prov_index.get(p, -1) if p else -1 for p in provinces], dtype=np.int64)
+        fallback = (rows < 0) & (prov_rows >= 0)
+        out[fallback] = prov_features[prov_rows[fallback]]
+        granularity[fallback] = GRANULARITY.index("province")
+        # Province-wide totals say nothing about the municipality's own size
+        out[np.ix_(fallback, [FEATURE_NAMES.index(f) for f in ("population", "dwellings", "density_km2")])] = np.nan
+
+    if population_of is not None:
+        pop_col = FEATURE_NAMES.index("population")
+        missing = np.isnan(out[:, pop_col])
+        pops = np.array([population_of(m) if need else 0 for m, need in zip(municipalities, missing)], dtype=np.float64)
+        out[missing & (pops > 0), pop_col] = pops[missing & (pops > 0)]
+
+    return MunicipalFeatures(municipalities, out, granularity)
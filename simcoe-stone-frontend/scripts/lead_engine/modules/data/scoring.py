@@ -0,0 +1,244 @@
+"""
+Vectorized lead scoring
+
+One engine for every lead score, computed column-wise over a batch of leads:
+1. Features are 0/1 columns derived from lead fields (present, contains, min_length)
+2. A profile is a base score plus feature weights, with optional clipping
+3. Profiles and weights come from the "scoring" section of data/config.json,
+   layered over the defaults below; the file is re-read when it changes
+
+Profiles:
+    contact     Scraper base score (phone/email/website)
+    lead        Quote/masonry-aware lead score, capped at 10
+    quality     Enrichment quality score on top of the existing score, 1-10
+    confidence  Places/website confidence from nested socials
+    social      Social media background check
+    simulated   Offline stand-in for the LLM analysis score
+"""
+import copy
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..utils.config import get_data_path
+
+CONFIG_PATH = get_data_path(os.path.join("data", "config.json"))
+
+# Feature name -> how to derive it. Dotted columns address nested dict fields.
+DEFAULT_FEATURES: Dict[str, Dict[str, Any]] = {
+    "phone": {"column": "phone", "op": "present"},
+    "email": {"column": "email", "op": "present"},
+    "website": {"column": "website", "op": "present"},
+    "address_detail": {"column": "address", "op": "min_length", "value": 11},
+    "masonry_interest": {"column": "service_interest", "op": "contains", "value": ["masonry", "stone"]},
+    "quote_source": {"column": "source", "op": "contains", "value": ["quote"]},
+    "logo": {"column": "socials.logo", "op": "present"},
+    "service_keywords": {"column": "socials.service_keywords", "op": "present"},
+    "recent_activity": {"column": "socials.recent_activity", "op": "present"},
+    "google_rating": {"column": "socials.google.rating", "op": "present"},
+    "google_reviews": {"column": "socials.google.reviews_count", "op": "present"},
+    "facebook": {"column": "socials", "op": "contains", "value": ["facebook"]},
+    "instagram": {"column": "socials", "op": "contains", "value": ["instagram"]},
+    "linkedin": {"column": "socials", "op": "contains", "value": ["linkedin"]},
+}
+
+DEFAULT_PROFILES: Dict[str, Dict[str, Any]] = {
+    "contact": {"base": 5, "weights": {"phone": 2, "email": 2, "website": 3}},
+    "lead": {"base": 5, "clip": [None, 10],
+             "weights": {"phone": 1, "email": 1, "website": 1, "masonry_interest": 1, "quote_source": 1}},
+    "quality": {"base": 5, "base_column": "score", "clip": [1, 10], "weights": {"phone": 1, "website": 1}},
+    "confidence": {"base": 0, "weights": {
+        "phone": 1, "email": 2, "website": 1, "logo": 1, "service_keywords": 1,
+        "recent_activity": 1, "google_rating": 1, "google_reviews": 1}},
+    "social": {"base": 0, "weights": {"website": 3, "facebook": 2, "instagram": 2, "linkedin": 3}},
+    "simulated": {"base": 5, "clip": [None, 10], "weights": {"phone": 1, "email": 1, "website": 2, "address_detail": 1}},
+}
+
+
+def _present(s: pd.Series) -> np.ndarray:
+    """Truthiness of each value (None/NaN/""/0/empty containers are False)"""
+    if pd.api.types.is_bool_dtype(s):
+        return s.to_numpy(dtype=bool)
+    if pd.api.types.is_numeric_dtype(s):
+        values = s.to_numpy(dtype=np.float64, na_value=np.nan)
+        return ~np.isnan(values) & (values != 0)
+    lengths = s.str.len()
+    present = lengths.fillna(0).to_numpy() > 0
+    other = (lengths.isna() & s.notna()).to_numpy()
+    if other.any():
+        present[other] = s[other].map(bool).to_numpy(dtype=bool)
+    return present
+
+
+def _text(s: pd.Series) -> pd.Series:
+    return s.fillna("").astype(str)
+
+
+def feature_column(df: pd.DataFrame, spec: Dict[str, Any]) -> np.ndarray:
+    """Evaluate one feature spec over a frame as a 0/1 float array"""
+    column = spec["column"]
+    if column not in df.columns:
+        return np.zeros(len(df))
+    s = df[column]
+    op = spec.get("op", "present")
+    if op == "present":
+        mask = _present(s)
+    elif op == "contains":
+        values = spec.get("value") or []
+        values = [values] if isinstance(values, str) else values
+        pattern = "|".join(re.escape(v.lower()) for v in values)
+        mask = _text(s).str.lower().str.contains(pattern, regex=True).to_numpy(dtype=bool) if pattern else np.zeros(len(df), bool)
+    elif op == "min_length":
+        mask = (_text(s).str.len() >= int(spec.get("value", 1))).to_numpy()
+    else:
+        raise ValueError(f"Unknown scoring op: {op}")
+    return mask.astype(np.float64)
+
+
+def _merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    merged = copy.deepcopy(base)
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+class ScoringEngine:
+    """Feature definitions plus named weight profiles"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            config: {"features": {...}, "profiles": {...}} layered over the defaults
+        """
+        config = config or {}
+        self.features = _merge(DEFAULT_FEATURES, config.get("features", {}))
+        self.profiles = _merge(DEFAULT_PROFILES, config.get("profiles", {}))
+        for name, profile in self.profiles.items():
+            unknown = set(profile.get("weights", {})) - set(self.features)
+            if unknown:
+                raise ValueError(f"Scoring profile {name!r} uses unknown features: {sorted(unknown)}")
+
+    def profile(self, name: str) -> Dict[str, Any]:
+        if name not in self.profiles:
+            raise ValueError(f"Unknown scoring profile: {name}")
+        return self.profiles[name]
+
+    def feature_frame(self, leads: Any, names: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """0/1 feature columns for a batch of leads"""
+        df = to_frame(leads)
+        names = list(names) if names is not None else list(self.features)
+        return pd.DataFrame({n: feature_column(df, self.features[n]) for n in names}, index=df.index)
+
+    def score(self, leads: Any, profile: str = "contact") -> np.ndarray:
+        """Integer scores for a batch of leads (DataFrame, Arrow table/batch or records)"""
+        df = to_frame(leads)
+        spec = self.profile(profile)
+        weights = spec.get("weights", {})
+        scores = np.full(len(df), float(spec.get("base", 0)))
+        base_column = spec.get("base_column")
+        if base_column and base_column in df.columns:
+            existing = pd.to_numeric(df[base_column], errors="coerce").to_numpy(dtype=np.float64)
+            scores = np.where(np.isnan(existing), scores, existing)
+        for name, weight in weights.items():
+            if weight:
+                scores += weight * feature_column(df, self.features[name])
+        low, high = (spec.get("clip") or [None, None])[:2]
+        if low is not None or high is not None:
+            scores = np.clip(scores, low, high)
+        return np.floor(scores + 0.5).astype(np.int64)
+
+    def apply(self, records: List[Dict[str, Any]], profile: str = "contact", field: str = "score") -> List[Dict[str, Any]]:
+        """Score a list of record dicts in one batch, writing `field` in place"""
+        if records:
+            for record, value in zip(records, self.score(records, profile)):
+                record[field] = int(value)
+        return records
+
+
+def to_frame(leads: Any) -> pd.DataFrame:
+    """DataFrame view of a batch: DataFrames pass through, Arrow is converted,
+    record dicts are flattened so nested fields become dotted columns"""
+    if isinstance(leads, pd.DataFrame):
+        return leads
+    if hasattr(leads, "to_pandas"):
+        return leads.to_pandas()
+    records = list(leads)
+    if not records:
+        return pd.DataFrame()
+    df = pd.json_normalize(records, max_level=2)
+    # Keep the unflattened dicts too, for substring features over the whole value
+    for column in {k for r in records for k, v in r.items() if isinstance(v, dict)}:
+        df[column] = [r.get(column) for r in records]
+    return df
+
+
+def load_scoring_config(path: str = CONFIG_PATH) -> Dict[str, Any]:
+    """The "scoring" section of config.json (empty if missing or unreadable)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("scoring") or {}
+    except (OSError, ValueError) as e:
+        if os.path.exists(path):
+            print(f"[Warning] Failed to read scoring config: {e}")
+        return {}
+
+
+_engine: Optional[ScoringEngine] = None
+_engine_mtime: Optional[float] = None
+_engine_lock = threading.Lock()
+
+
+def get_scoring_engine() -> ScoringEngine:
+    """Process-wide engine, rebuilt when config.json changes"""
+    global _engine, _engine_mtime
+    try:
+        mtime = os.path.getmtime(CONFIG_PATH)
+    except OSError:
+        mtime = None
+    if _engine is None or mtime != _engine_mtime:
+        with _engine_lock:
+            if _engine is None or mtime != _engine_mtime:
+                try:
+                    _engine = ScoringEngine(load_scoring_config())
+                except ValueError as e:
+                    print(f"[Warning] Invalid scoring config, using defaults: {e}")
+                    _engine = ScoringEngine()
+                _engine_mtime = mtime
+    return _engine
+
+
+def score_leads(leads: Any, profile: str = "contact") -> np.ndarray:
+    """Scores for a batch of leads with the configured engine"""
+    return get_scoring_engine().score(leads, profile)
+
+
+def score_lead(lead: Dict[str, Any], profile: str = "contact") -> int:
+    """Score for a single lead (prefer score_leads for batches)"""
+    return int(score_leads([lead], profile)[0])
+
+
+def apply_scores(records: List[Dict[str, Any]], profile: str = "contact", field: str = "score") -> List[Dict[str, Any]]:
+    """Write configured scores into a list of record dicts"""
+    return get_scoring_engine().apply(records, profile, field)
+
+
+def fill_missing_scores(df: pd.DataFrame, profile: str = "contact", field: str = "score") -> pd.DataFrame:
+    """Score rows whose `field` is missing (e.g. leads imported without a score)"""
+    if df.empty:
+        return df
+    current = pd.to_numeric(df[field], errors="coerce") if field in df.columns else pd.Series(np.nan, index=df.index)
+    missing = current.isna().to_numpy()
+    if missing.any():
+        current = current.copy()
+        current[missing] = score_leads(df[missing], profile)
+        df = df.copy()
+        df[field] = current
+    return df
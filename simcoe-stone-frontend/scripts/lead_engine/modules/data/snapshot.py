@@ -0,0 +1,270 @@
+"""
+Municipality/census snapshot for fast startup
+
+Compiles the text sources the app reads on every start into one binary file:
+1. canada_municipalities_population.csv -> sorted name index + population array
+2. census_province_wide.csv -> province index, column names, raw string matrix
+   and a float matrix (NaN where a cell is not numeric)
+3. canada_municipalities.txt -> municipality list in file order
+
+Layout: an 8-byte little-endian header length, a JSON header (format version,
+source fingerprints, array dtypes/shapes/offsets), then each array's raw bytes
+at a 64-byte aligned offset. Arrays are opened with np.memmap, so loading costs
+a header parse; the snapshot is rebuilt automatically when any source changes.
+
+Run as a script to (re)build it explicitly.
+"""
+import csv
+import json
+import os
+import struct
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+LEAD_ENGINE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CACHE_DIR = os.path.join(LEAD_ENGINE_DIR, "cache")
+SNAPSHOT_FILE = os.path.join(CACHE_DIR, "census_snapshot.bin")
+
+POPULATION_FILE = os.path.join(LEAD_ENGINE_DIR, "canada_municipalities_population.csv")
+CENSUS_WIDE_FILE = os.path.join(LEAD_ENGINE_DIR, "census_province_wide.csv")
+MUNICIPALITIES_FILE = os.path.join(LEAD_ENGINE_DIR, "canada_municipalities.txt")
+
+SNAPSHOT_VERSION = 1
+_ALIGN = 64
+_HEADER_LEN = struct.Struct("<Q")
+
+
+def default_sources() -> Dict[str, str]:
+    """Source files keyed by the role they play in the snapshot"""
+    return {
+        "population": POPULATION_FILE,
+        "census": CENSUS_WIDE_FILE,
+        "municipalities": MUNICIPALITIES_FILE,
+    }
+
+
+def _fingerprint(sources: Dict[str, str]) -> Dict[str, Any]:
+    """mtime/size per source; a missing file is recorded as None"""
+    out = {}
+    for key, path in sorted(sources.items()):
+        try:
+            st = os.stat(path)
+            out[key] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+        except OSError:
+            out[key] = None
+    return out
+
+
+def _to_float(value: str) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _str_array(values: List[str], shape=None) -> np.ndarray:
+    # Fixed-width unicode keeps the array memory-mappable
+    width = max([len(v) for v in values] + [1])
+    arr = np.array(values, dtype=f"<U{width}")
+    return arr.reshape(shape) if shape is not None else arr
+
+
+def _read_population(path: str):
+    pop_map: Dict[str, int] = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as pf:
+            for row in csv.DictReader(pf):
+                name = row.get("municipality")
+                try:
+                    pop = int(row.get("population", "0"))
+                except Exception:
+                    pop = 0
+                if name:
+                    pop_map[name] = max(pop_map.get(name, pop), pop)
+    names = sorted(pop_map)
+    return _str_array(names), np.array([pop_map[n] for n in names], dtype=np.int64)
+
+
+def _read_census(path: str):
+    provinces: List[str] = []
+    columns: List[str] = []
+    rows: List[List[str]] = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as cf:
+            reader = csv.reader(cf)
+            header = next(reader, [])
+            columns = header[1:]
+            for row in reader:
+                if not row:
+                    continue
+                row = (row + [""] * len(header))[:len(header)]
+                provinces.append(row[0])
+                rows.append(row[1:])
+    flat = [cell for row in rows for cell in row]
+    raw = _str_array(flat, (len(rows), len(columns)))
+    values = np.array([_to_float(c) for c in flat], dtype=np.float64).reshape(len(rows), len(columns))
+    return _str_array(provinces), _str_array(columns), raw, values
+
+
+def _read_municipalities(path: str) -> np.ndarray:
+    names: List[str] = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                muni = line.strip()
+                if muni and not muni.startswith("#"):
+                    names.append(muni)
+    return _str_array(names)
+
+
+def build_snapshot(path: str = SNAPSHOT_FILE, sources: Optional[Dict[str, str]] = None) -> str:
+    """Compile the source files into a snapshot, replacing any existing one atomically
+
+    Args:
+        path: Snapshot file to write
+        sources: Source paths by role (defaults to default_sources())
+
+    Returns:
+        Path of the written snapshot
+    """
+    sources = sources or default_sources()
+    fingerprint = _fingerprint(sources)  # taken before reading, so a concurrent edit forces a rebuild
+    names, populations = _read_population(sources["population"])
+    provinces, columns, raw, values = _read_census(sources["census"])
+    arrays = {
+        "muni_names": names,
+        "muni_population": populations,
+        "census_provinces": provinces,
+        "census_columns": columns,
+        "census_raw": raw,
+        "census_values": values,
+        "municipalities": _read_municipalities(sources["municipalities"]),
+    }
+
+    layout = {}
+    offset = 0
+    for key, arr in arrays.items():
+        layout[key] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += -(-arr.nbytes // _ALIGN) * _ALIGN
+    header = {"version": SNAPSHOT_VERSION, "sources": fingerprint, "built_at": time.time(), "arrays": layout}
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = -(-(_HEADER_LEN.size + len(header_bytes)) // _ALIGN) * _ALIGN
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER_LEN.pack(len(header_bytes)))
+        f.write(header_bytes)
+        for key, arr in arrays.items():
+            f.seek(data_start + layout[key]["offset"])
+            f.write(np.ascontiguousarray(arr).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+    return path
+
+
+def _read_header(path: str):
+    with open(path, "rb") as f:
+        (length,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+        header = json.loads(f.read(length).decode("utf-8"))
+    data_start = -(-(_HEADER_LEN.size + length) // _ALIGN) * _ALIGN
+    return header, data_start
+
+
+class Snapshot:
+    """Memory-mapped view of a compiled snapshot
+
+    Array attributes are read-only np.memmap views. Dictionary views matching the
+    legacy in-memory structures are built on request and cached.
+    """
+
+    def __init__(self, path: str, header: Dict[str, Any], data_start: int):
+        self.path = path
+        self.header = header
+        self._arrays: Dict[str, np.ndarray] = {}
+        for key, spec in header["arrays"].items():
+            shape = tuple(spec["shape"])
+            if 0 in shape:
+                self._arrays[key] = np.empty(shape, dtype=spec["dtype"])
+            else:
+                self._arrays[key] = np.memmap(path, dtype=spec["dtype"], mode="r",
+                                              offset=data_start + spec["offset"], shape=shape)
+        self._pop_map: Optional[Dict[str, int]] = None
+        self._census_map: Optional[Dict[str, Dict[str, str]]] = None
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        arrays = self.__dict__.get("_arrays", {})
+        if name in arrays:
+            return arrays[name]
+        raise AttributeError(name)
+
+    def population(self, name: str, default: int = 0) -> int:
+        """Population for a municipality via binary search on the sorted name index"""
+        names = self._arrays["muni_names"]
+        i = int(np.searchsorted(names, name))
+        if i < len(names) and names[i] == name:
+            return int(self._arrays["muni_population"][i])
+        return default
+
+    def pop_map(self) -> Dict[str, int]:
+        if self._pop_map is None:
+            self._pop_map = dict(zip(self._arrays["muni_names"].tolist(),
+                                     self._arrays["muni_population"].tolist()))
+        return self._pop_map
+
+    @property
+    def census_columns(self) -> List[str]:
+        return self._arrays["census_columns"].tolist()
+
+    def census_map(self) -> Dict[str, Dict[str, str]]:
+        if self._census_map is None:
+            columns = self.census_columns
+            self._census_map = {
+                province: dict(zip(columns, row))
+                for province, row in zip(self._arrays["census_provinces"].tolist(),
+                                         self._arrays["census_raw"].tolist())
+            }
+        return self._census_map
+
+    @property
+    def municipalities(self) -> List[str]:
+        return self._arrays["municipalities"].tolist()
+
+
+def is_stale(path: str = SNAPSHOT_FILE, sources: Optional[Dict[str, str]] = None) -> bool:
+    """True when the snapshot is missing, from another format version, or older than its sources"""
+    try:
+        header, _ = _read_header(path)
+    except (OSError, ValueError, struct.error):
+        return True
+    return (header.get("version") != SNAPSHOT_VERSION
+            or header.get("sources") != _fingerprint(sources or default_sources()))
+
+
+def load_snapshot(path: str = SNAPSHOT_FILE, sources: Optional[Dict[str, str]] = None,
+                  rebuild: bool = True) -> Snapshot:
+    """Open the snapshot, rebuilding it first if a source file changed
+
+    Args:
+        path: Snapshot file
+        sources: Source paths by role (defaults to default_sources())
+        rebuild: Rebuild a stale snapshot; when False a stale file is used as-is
+
+    Returns:
+        Snapshot backed by memory-mapped arrays
+    """
+    sources = sources or default_sources()
+    if rebuild and is_stale(path, sources):
+        start = time.perf_counter()
+        build_snapshot(path, sources)
+        print(f"[Snapshot] Rebuilt {os.path.basename(path)} in {time.perf_counter() - start:.2f}s")
+    header, data_start = _read_header(path)
+    return Snapshot(path, header, data_start)
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    out = build_snapshot()
+    print(f"Wrote {out} ({os.path.getsize(out):,} bytes) in {time.perf_counter() - start:.2f}s")
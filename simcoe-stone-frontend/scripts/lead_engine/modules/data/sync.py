@@ -2,18 +2,29 @@
 Data Synchronization Module
 
 This module handles synchronization between:
-1. Local CSV files and in-memory database
+1. The local lead store (SQLite, see lead_store.py) and in-memory DataFrames
 2. Local data and Supabase remote database
-3. Import/export of lead records with validation
+3. Import/export of lead records (CSV) with validation
 """
 
 import os
 import csv
 import json
 import logging
+import threading
+import time
 import pandas as pd
 from datetime import datetime
-from typing import Dict, List, Any, Tuple, Optional, Set
+from typing import Dict, List, Any, Tuple, Optional, Sequence, Set
+
+import numpy as np
+
+from .backups import BackupStore
+from .journal import SyncJournal
+from .lead_store import STRIPPED_COLUMNS, LeadStore, Records, lead_keys
+from .scoring import fill_missing_scores
+from .uploader import ChunkedUploader
+from .validation import LeadValidator, errors_to_records
 
 # Set up logging
 logging.basicConfig(
@@ -25,7 +36,18 @@ logger = logging.getLogger("DataSync")
 # Define default paths
 DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 DEFAULT_LEADS_CSV = os.path.join(DEFAULT_DATA_DIR, "lead_records.csv")
+DEFAULT_LEADS_DB = os.path.join(DEFAULT_DATA_DIR, "leads.sqlite3")
 DEFAULT_SYNC_LOG = os.path.join(DEFAULT_DATA_DIR, "sync_log.json")
+DEFAULT_SYNC_JOURNAL = os.path.join(DEFAULT_DATA_DIR, "sync_journal.jsonl")
+
+# Remote sync settings; the remote table needs id and server-stamped updated_at
+# columns and a unique constraint on REMOTE_CONFLICT_COLUMNS for upserts
+# (db/migrations/002_lead_engine_sync.sql)
+REMOTE_TABLE = "leads"
+REMOTE_CONFLICT_COLUMNS = "name,service_area"
+REMOTE_PAGE_SIZE = 1000
+CONFLICT_POLICIES = ("remote_wins", "local_wins", "newest_wins")
+SYNC_DIRECTIONS = ("both", "upload", "download")
 
 # Supabase integration (conditional import)
 try:
@@ -35,6 +57,78 @@ except ImportError:
     logger.warning("Supabase client not available. Remote sync disabled.")
     SUPABASE_AVAILABLE = False
 
+
+def _timestamps(values: pd.Series) -> pd.Series:
+    """Parse ISO timestamps (local "...Z" or remote "+00:00") as UTC; unparseable -> NaT"""
+    return pd.to_datetime(values, utc=True, errors="coerce", format="ISO8601")
+
+
+def merge_lead_frames(existing: pd.DataFrame, incoming: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """Merge incoming leads into existing ones by normalized name|service_area key
+    
+    Incoming rows matching an existing lead overwrite the columns they carry when
+    any value differs (NaN equals NaN); unmatched rows are appended. Columns the
+    lead store never keeps (STRIPPED_COLUMNS) are dropped from incoming first. Repeated keys
+    in the incoming frame keep their last row. Runs as a hash join plus column-wise
+    comparisons, so cost is linear in the number of rows.
+    
+    Args:
+        existing: Current leads
+        incoming: Leads to merge in
+        
+    Returns:
+        Tuple of (merged DataFrame, {"new", "updated", "unchanged"} counts)
+    """
+    incoming = incoming.drop(columns=[c for c in STRIPPED_COLUMNS if c in incoming.columns])
+    incoming_keys = lead_keys(incoming)
+    keep = ~incoming_keys.duplicated(keep="last").to_numpy()
+    incoming, incoming_keys = incoming[keep], incoming_keys[keep]
+    
+    existing_keys = lead_keys(existing)
+    first = ~existing_keys.duplicated().to_numpy()
+    position_of = pd.Series(np.arange(len(existing))[first], index=existing_keys[first].to_numpy())
+    positions = incoming_keys.map(position_of).to_numpy()
+    matched = ~np.isnan(positions)
+    
+    columns = list(incoming.columns)
+    new_values = incoming[matched][columns].to_numpy(dtype=object)
+    target = positions[matched].astype(np.int64)
+    equal = np.ones(new_values.shape, dtype=bool)
+    for j, col in enumerate(columns):
+        new_col = new_values[:, j]
+        if col in existing.columns:
+            old_col = existing[col].to_numpy(dtype=object)[target]
+            both_missing = pd.isna(new_col) & pd.isna(old_col)
+            with np.errstate(invalid="ignore"):
+                equal[:, j] = both_missing | (new_col == old_col)
+        else:
+            equal[:, j] = pd.isna(new_col)
+    changed = ~equal.all(axis=1)
+    
+    merged = existing.copy()
+    if changed.any():
+        rows = merged.index[target[changed]]
+        updates = incoming[matched][changed]
+        for col in columns:
+            values = updates[col]
+            if col not in merged.columns:
+                merged[col] = pd.Series(np.nan, index=merged.index, dtype=object)
+            elif merged[col].dtype != values.dtype:
+                merged[col] = merged[col].astype(object)
+            merged.loc[rows, col] = values.to_numpy()
+    
+    new_rows = incoming[~matched]
+    if len(new_rows):
+        merged = pd.concat([merged, new_rows], ignore_index=True)
+    
+    stats = {
+        "new": int((~matched).sum()),
+        "updated": int(changed.sum()),
+        "unchanged": int(matched.sum() - changed.sum()),
+    }
+    return merged, stats
+
+
 class DataSyncManager:
     """Manages data synchronization between local and remote storage"""
     
@@ -43,27 +137,41 @@ class DataSyncManager:
         data_dir: Optional[str] = None,
         leads_csv: Optional[str] = None,
         supabase_url: Optional[str] = None,
-        supabase_key: Optional[str] = None
+        supabase_key: Optional[str] = None,
+        leads_db: Optional[str] = None
     ):
         """Initialize the DataSyncManager
         
         Args:
             data_dir: Directory for data files
-            leads_csv: Path to leads CSV file
+            leads_csv: Path to the legacy leads CSV (imported into the store once)
             supabase_url: Supabase URL for remote sync
             supabase_key: Supabase API key for remote sync
+            leads_db: Path to the lead store (default: next to leads_csv)
         """
         # Set up paths
         self.data_dir = data_dir or DEFAULT_DATA_DIR
         self.leads_csv = leads_csv or DEFAULT_LEADS_CSV
+        if leads_db:
+            self.leads_db = leads_db
+        elif leads_csv:
+            self.leads_db = os.path.splitext(leads_csv)[0] + ".sqlite3"
+        else:
+            self.leads_db = DEFAULT_LEADS_DB
         self.sync_log_path = os.path.join(self.data_dir, "sync_log.json")
+        self.journal_path = os.path.join(self.data_dir, "sync_journal.jsonl")
+        self.dead_letter_path = os.path.join(self.data_dir, "sync_dead_letter.jsonl")
+        self.upload_options: Dict[str, Any] = {}
+        self.backups = BackupStore(os.path.join(self.data_dir, "backups"))
         
         # Create data directory if it doesn't exist
         os.makedirs(self.data_dir, exist_ok=True)
         
-        # Initialize sync log if it doesn't exist
-        if not os.path.exists(self.sync_log_path):
-            self._create_empty_sync_log()
+        # Open the lead store, seeding it from the legacy CSV on first use
+        self.store = _open_store(self.leads_db, self.leads_csv)
+        
+        # Append-only sync journal (imports an old sync_log.json once)
+        self.journal = SyncJournal(self.journal_path, legacy_log=self.sync_log_path)
         
         # Set up Supabase client if available
         self.supabase = None
@@ -77,34 +185,128 @@ class DataSyncManager:
                 logger.error(f"Failed to initialize Supabase client: {e}")
                 self.supabase_available = False
     
-    def _create_empty_sync_log(self):
-        """Create an empty sync log file"""
-        initial_log = {
-            "last_sync": None,
-            "sync_history": []
-        }
+    def load_leads(self) -> pd.DataFrame:
+        """Load every lead from the lead store
+        
+        Returns:
+            DataFrame with lead records
+        """
+        try:
+            df = self.store.read_frame()
+            logger.info(f"Loaded {len(df)} leads from {self.leads_db}")
+            return df
+        except Exception as e:
+            logger.error(f"Failed to load leads from store: {e}")
+            return pd.DataFrame(columns=[
+                "name", "service_area", "craft_type", "phone", "email", 
+                "website", "address", "notes", "source"
+            ])
+    
+    def save_leads(self, leads: pd.DataFrame) -> bool:
+        """Replace the contents of the lead store in one transaction
+        
+        Args:
+            leads: DataFrame with lead records
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            written = self.store.replace_all(leads)
+            logger.info(f"Saved {written} leads to {self.leads_db}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save leads to store: {e}")
+            return False
+    
+    def append_leads(self, leads: Records, replace: bool = False) -> int:
+        """Append leads in one transaction, skipping (or replacing) existing ones
         
-        with open(self.sync_log_path, 'w') as f:
-            json.dump(initial_log, f, indent=2)
+        Args:
+            leads: DataFrame or record dicts
+            replace: Overwrite leads with the same name and service area
+            
+        Returns:
+            Number of leads written
+        """
+        try:
+            written = self.store.append(leads, replace=replace)
+            logger.info(f"Appended {written} leads to {self.leads_db}")
+            return written
+        except Exception as e:
+            logger.error(f"Failed to append leads to store: {e}")
+            return 0
     
+    def get_lead(self, name: str, service_area: str) -> Optional[Dict[str, Any]]:
+        """Look up one lead by name and service area"""
+        return self.store.get(name, service_area)
+    
+    def update_lead(self, name: str, service_area: str, fields: Dict[str, Any]) -> bool:
+        """Update some fields of one lead; returns False if it does not exist"""
+        try:
+            return self.store.update(name, service_area, fields)
+        except Exception as e:
+            logger.error(f"Failed to update lead {name} ({service_area}): {e}")
+            return False
+    
+    def count_leads(self) -> int:
+        """Number of stored leads"""
+        return self.store.count()
+    
+    def lead_keys(self) -> Set[str]:
+        """Normalized name|service_area keys of every stored lead"""
+        return self.store.keys()
+
+    def search_leads(self, text: Optional[str] = None, filters: Optional[Dict[str, Any]] = None,
+                     min_score: Optional[float] = None, order_by: str = "id", descending: bool = False,
+                     limit: Optional[int] = 50, offset: int = 0) -> Tuple[pd.DataFrame, int]:
+        """One page of matching leads plus the total match count (see LeadStore.search)"""
+        return self.store.search(text, filters, min_score, order_by, descending, limit, offset)
+
+    def lead_facets(self, columns: Sequence[str] = ("service_area", "craft_type", "source")) -> Dict[str, List[Tuple[Any, int]]]:
+        """(value, count) pairs per filter column, most common first"""
+        return self.store.facets(columns)
+
+    def lead_score_range(self) -> Tuple[Optional[float], Optional[float]]:
+        """Lowest and highest stored lead score"""
+        return self.store.score_range()
+    
+    def score_missing_leads(self, profile: str = "contact") -> int:
+        """Score stored leads that have no score and write the scores back
+        
+        Search filters and sorts on the stored score, so leads imported without
+        one are scored in the store rather than only for display.
+        
+        Returns:
+            Number of leads scored
+        """
+        where = "score IS NULL" if "score" in self.store.data_columns else None
+        missing = self.store.read_frame(where)
+        if missing.empty:
+            return 0
+        # Drop updated_at so the rewritten rows are stamped (and synced) as local changes
+        scored = fill_missing_scores(missing, profile).drop(columns=["updated_at"], errors="ignore")
+        return self.store.append(scored, replace=True)
+
     def load_leads_from_csv(self, csv_path: Optional[str] = None) -> pd.DataFrame:
-        """Load leads from CSV file
+        """Load leads from a CSV file, or from the lead store when no path is given
         
         Args:
-            csv_path: Path to CSV file (if None, uses default)
+            csv_path: Path to CSV file (if None, reads the lead store)
             
         Returns:
             DataFrame with lead records
         """
-        path = csv_path or self.leads_csv
+        if csv_path is None or os.path.abspath(csv_path) == os.path.abspath(self.leads_csv):
+            return self.load_leads()
         
         try:
-            if os.path.exists(path):
-                df = pd.read_csv(path)
-                logger.info(f"Loaded {len(df)} leads from {path}")
+            if os.path.exists(csv_path):
+                df = pd.read_csv(csv_path)
+                logger.info(f"Loaded {len(df)} leads from {csv_path}")
                 return df
             else:
-                logger.warning(f"CSV file not found at {path}")
+                logger.warning(f"CSV file not found at {csv_path}")
                 # Return empty DataFrame with expected columns
                 return pd.DataFrame(columns=[
                     "name", "service_area", "craft_type", "phone", "email", 
@@ -120,52 +322,38 @@ class DataSyncManager:
             ])
     
     def save_leads_to_csv(self, leads: pd.DataFrame, csv_path: Optional[str] = None) -> bool:
-        """Save leads to CSV file
+        """Save leads to the lead store, or export them to a CSV file
         
         Args:
             leads: DataFrame with lead records
-            csv_path: Path to CSV file (if None, uses default)
+            csv_path: Path to CSV file (if None, saves to the lead store)
             
         Returns:
             True if successful, False otherwise
         """
-        path = csv_path or self.leads_csv
-        
-        try:
-            # Ensure data directory exists
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            
-            # Write to CSV
-            leads.to_csv(path, index=False)
-            logger.info(f"Saved {len(leads)} leads to {path}")
-            return True
-        
-        except Exception as e:
-            logger.error(f"Failed to save leads to CSV: {e}")
-            return False
+        if csv_path is None or os.path.abspath(csv_path) == os.path.abspath(self.leads_csv):
+            return self.save_leads(leads)
+        return self.export_leads_to_csv(leads, csv_path)
     
-    def validate_lead_data(self, leads: pd.DataFrame) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
-        """Validate lead data and return clean dataframe
+    def validate_lead_frame(
+        self,
+        leads: pd.DataFrame,
+        rules: Optional[List[str]] = None
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Validate lead data with vectorized rules and return clean dataframe
         
         Args:
             leads: DataFrame with lead records
+            rules: Names of validation rules to run (default: all registered rules)
             
         Returns:
-            Tuple of (cleaned DataFrame, list of validation errors)
+            Tuple of (cleaned DataFrame, error frame: row, rule, column, value, message)
         """
-        errors = []
+        errors = LeadValidator(rules).validate(leads)
         
         # Make a copy to avoid modifying the original
         df = leads.copy()
         
-        # Check for required columns
-        required_columns = ["name", "service_area", "craft_type"]
-        for col in required_columns:
-            if col not in df.columns:
-                errors.append({"error": f"Missing required column: {col}"})
-                # Add empty column
-                df[col] = ""
-        
         # Ensure all expected columns exist (add if missing)
         expected_columns = [
             "name", "service_area", "craft_type", "phone", "email", 
@@ -176,33 +364,25 @@ class DataSyncManager:
             if col not in df.columns:
                 df[col] = ""
         
-        # Check for duplicate names in same service area
-        duplicates = df.duplicated(subset=["name", "service_area"], keep=False)
-        if duplicates.any():
-            duplicate_records = df[duplicates]
-            for _, row in duplicate_records.iterrows():
-                errors.append({
-                    "error": "Duplicate record",
-                    "name": row["name"],
-                    "service_area": row["service_area"]
-                })
-        
-        # Validate email format if present
-        if "email" in df.columns:
-            # Simple regex for email validation
-            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            
-            for i, email in enumerate(df["email"]):
-                if email and not pd.isna(email) and not pd.Series(email).str.match(email_pattern).iloc[0]:
-                    errors.append({
-                        "error": "Invalid email format",
-                        "name": df.iloc[i]["name"] if "name" in df.columns else f"Row {i}",
-                        "email": email
-                    })
-        
-        # Return cleaned dataframe and errors
         return df, errors
     
+    def validate_lead_data(
+        self,
+        leads: pd.DataFrame,
+        rules: Optional[List[str]] = None
+    ) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+        """Validate lead data and return clean dataframe
+        
+        Args:
+            leads: DataFrame with lead records
+            rules: Names of validation rules to run (default: all registered rules)
+            
+        Returns:
+            Tuple of (cleaned DataFrame, list of validation errors)
+        """
+        df, errors = self.validate_lead_frame(leads, rules)
+        return df, errors_to_records(df, errors)
+    
     def import_leads_from_csv(
         self, 
         csv_path: str, 
@@ -231,64 +411,21 @@ class DataSyncManager:
             stats["total"] = len(new_leads)
             
             # Validate new leads
-            new_leads, validation_errors = self.validate_lead_data(new_leads)
+            new_leads, validation_errors = self.validate_lead_frame(new_leads)
             stats["errors"] = len(validation_errors)
             
             # If existing leads not provided, load from default location
             if existing_leads is None:
-                existing_leads = self.load_leads_from_csv()
+                existing_leads = self.load_leads()
             
             # If no existing leads, just return the new ones
             if len(existing_leads) == 0:
                 stats["new"] = len(new_leads)
                 return new_leads, stats
             
-            # Track updated records
-            updated_records = []
-            new_records = []
-            
-            # Check each new lead against existing data
-            for _, new_row in new_leads.iterrows():
-                # Look for matching record (by name and service area)
-                match = existing_leads[
-                    (existing_leads["name"] == new_row["name"]) & 
-                    (existing_leads["service_area"] == new_row["service_area"])
-                ]
-                
-                if len(match) > 0:
-                    # Compare to see if there are any differences
-                    match_row = match.iloc[0]
-                    changes = False
-                    
-                    for col in new_row.index:
-                        # Skip comparing NaN values
-                        if pd.isna(new_row[col]) and pd.isna(match_row[col]):
-                            continue
-                        
-                        # Check if values are different
-                        if new_row[col] != match_row[col]:
-                            changes = True
-                            break
-                    
-                    if changes:
-                        # Mark the existing record for update
-                        index = match.index[0]
-                        existing_leads.loc[index] = new_row
-                        updated_records.append(dict(new_row))
-                    else:
-                        stats["unchanged"] += 1
-                else:
-                    # Add as new record
-                    new_records.append(dict(new_row))
-            
-            # Append new records to existing leads
-            if new_records:
-                new_df = pd.DataFrame(new_records)
-                existing_leads = pd.concat([existing_leads, new_df], ignore_index=True)
-            
-            # Update stats
-            stats["new"] = len(new_records)
-            stats["updated"] = len(updated_records)
+            # Keyed merge on the normalized (name, service_area) key
+            existing_leads, merge_stats = merge_lead_frames(existing_leads, new_leads)
+            stats.update(merge_stats)
             
             return existing_leads, stats
         
@@ -314,7 +451,7 @@ class DataSyncManager:
         """
         try:
             # Ensure directory exists
-            os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+            os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
             
             # Save to CSV
             leads.to_csv(csv_path, index=False)
@@ -325,248 +462,312 @@ class DataSyncManager:
             logger.error(f"Failed to export leads to CSV: {e}")
             return False
     
-    def sync_with_supabase(self, leads: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, int]]:
-        """Synchronize leads with Supabase database
+    def sync_with_supabase(
+        self,
+        leads: Optional[pd.DataFrame] = None,
+        conflict_policy: str = "remote_wins",
+        direction: str = "both",
+        page_size: int = REMOTE_PAGE_SIZE
+    ) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """Incrementally synchronize the lead store with Supabase
+        
+        Pulls remote rows changed since the saved cursor (server-side updated_at
+        filter, keyset pagination on (updated_at, id)), then pushes only the
+        locally dirty rows. Remote rows touching a lead with unpushed local
+        changes are conflicts, resolved by `conflict_policy`:
+        remote_wins applies the remote row, local_wins keeps the local one (it is
+        pushed), newest_wins keeps whichever updated_at is later.
         
         Args:
-            leads: DataFrame with lead records
+            leads: Optional edited frame to save into the store before syncing
+            conflict_policy: One of CONFLICT_POLICIES
+            direction: "both", "upload" or "download"
+            page_size: Rows per remote page
             
         Returns:
-            Tuple of (synced DataFrame, sync stats)
+            Tuple of (synced DataFrame, sync stats); the frame is the whole
+            store when `leads` was given, otherwise the rows pulled from remote
         """
+        if conflict_policy not in CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy: {conflict_policy}")
+        if direction not in SYNC_DIRECTIONS:
+            raise ValueError(f"Unknown sync direction: {direction}")
+        
         stats = {
             "uploaded": 0,
             "downloaded": 0,
             "conflicts": 0,
             "errors": 0
         }
+        pulled: List[pd.DataFrame] = []
+        upload = None
+        timings = {"download_s": 0.0, "merge_s": 0.0, "upload_s": 0.0}
+        transferred = {"downloaded": 0, "uploaded": 0}
         
         if not self.supabase_available or not self.supabase:
             logger.warning("Supabase not available for sync")
-            return leads, stats
+            return leads if leads is not None else pd.DataFrame(), stats
+        
+        if leads is not None:
+            self.save_leads(leads)
+        
+        last = self.journal.last("cursor")
+        cursor = last["cursor"] if last else None
         
         try:
-            # Get last sync timestamp
-            sync_log = self._load_sync_log()
-            last_sync = sync_log.get("last_sync")
-            
-            # Fetch records from Supabase
-            response = self.supabase.table("leads").select("*").execute()
-            
-            if hasattr(response, "data"):
-                remote_data = response.data
-                remote_df = pd.DataFrame(remote_data)
-                
-                # Convert to same format as local data
-                if "id" in remote_df.columns:
-                    remote_df = remote_df.drop(columns=["id"])
-                
-                # Get records modified since last sync
-                if last_sync:
-                    # Convert last_sync to datetime
-                    last_sync_dt = datetime.fromisoformat(last_sync.replace("Z", "+00:00"))
-                    
-                    # Filter records modified since last sync
-                    if "updated_at" in remote_df.columns:
-                        remote_df["updated_at"] = pd.to_datetime(remote_df["updated_at"])
-                        new_remote = remote_df[remote_df["updated_at"] > last_sync_dt]
-                    else:
-                        # If no updated_at column, treat all as new
-                        new_remote = remote_df
-                else:
-                    # If no last sync, treat all as new
-                    new_remote = remote_df
-                
-                # Merge remote data with local data
-                if len(new_remote) > 0:
-                    # Track changes
-                    for _, remote_row in new_remote.iterrows():
-                        # Look for matching local record
-                        match = leads[
-                            (leads["name"] == remote_row["name"]) & 
-                            (leads["service_area"] == remote_row["service_area"])
-                        ]
-                        
-                        if len(match) > 0:
-                            # Check for conflicts
-                            index = match.index[0]
-                            
-                            # Update local record
-                            leads.loc[index] = remote_row
-                            stats["downloaded"] += 1
-                        else:
-                            # Add as new record
-                            leads = pd.concat([leads, pd.DataFrame([remote_row])], ignore_index=True)
-                            stats["downloaded"] += 1
-            
-            # Upload local data to Supabase
-            # Convert to list of dictionaries for upload
-            records_to_upload = leads.to_dict(orient="records")
-            
-            # Upload in batches
-            batch_size = 100
-            for i in range(0, len(records_to_upload), batch_size):
-                batch = records_to_upload[i:i+batch_size]
-                
-                try:
-                    # Use upsert to handle both inserts and updates
-                    response = self.supabase.table("leads").upsert(batch).execute()
+            if direction in ("both", "download"):
+                pages = self._remote_changes(cursor, page_size)
+                while True:
+                    start = time.perf_counter()
+                    page = next(pages, None)
+                    timings["download_s"] += time.perf_counter() - start
+                    if page is None:
+                        break
+                    rows, page_cursor, size = page
+                    transferred["downloaded"] += size
                     
-                    if hasattr(response, "data"):
-                        stats["uploaded"] += len(response.data)
-                    else:
-                        logger.warning(f"Unexpected response format: {response}")
-                
-                except Exception as e:
-                    logger.error(f"Failed to upload batch to Supabase: {e}")
-                    stats["errors"] += 1
-            
-            # Update sync log
-            self._update_sync_log(stats)
-            
-            return leads, stats
+                    start = time.perf_counter()
+                    applied, conflicts = self._apply_remote_page(rows, conflict_policy)
+                    timings["merge_s"] += time.perf_counter() - start
+                    # Only advance past a page once it is in the store
+                    cursor = page_cursor
+                    stats["downloaded"] += len(applied)
+                    stats["conflicts"] += conflicts
+                    pulled.append(applied)
+            
+            if direction in ("both", "upload"):
+                start = time.perf_counter()
+                upload = self._push_dirty(stats)
+                timings["upload_s"] += time.perf_counter() - start
+                if upload:
+                    transferred["uploaded"] = upload["bytes"]
         
         except Exception as e:
             logger.error(f"Failed to sync with Supabase: {e}")
-            return leads, stats
+            stats["errors"] += 1
+        
+        # Pages applied before a failure are kept, so the cursor still advances
+        self.journal.append({
+            "kind": "supabase_sync",
+            "direction": direction,
+            "conflict_policy": conflict_policy,
+            "stats": stats,
+            "timings": {k: round(v, 3) for k, v in timings.items()},
+            "bytes": transferred,
+            "cursor": cursor,
+            "upload": upload,
+        })
+        if leads is not None:
+            return self.load_leads(), stats
+        return (pd.concat(pulled, ignore_index=True) if pulled else pd.DataFrame()), stats
+    
+    def _remote_changes(self, cursor: Optional[Dict[str, Any]], page_size: int):
+        """Yield (page DataFrame, cursor after the page, approx. JSON bytes) for remote rows newer than cursor"""
+        while True:
+            query = self.supabase.table(REMOTE_TABLE).select("*")
+            if cursor and cursor.get("updated_at"):
+                ts = cursor["updated_at"]
+                if cursor.get("id") is None:
+                    query = query.gt("updated_at", ts)
+                else:
+                    query = query.or_(f'updated_at.gt."{ts}",and(updated_at.eq."{ts}",id.gt.{cursor["id"]})')
+            response = query.order("updated_at").order("id").limit(page_size).execute()
+            rows = getattr(response, "data", None) or []
+            if not rows:
+                return
+            last = rows[-1]
+            cursor = {"updated_at": last.get("updated_at"), "id": last.get("id")}
+            yield pd.DataFrame(rows), cursor, len(json.dumps(rows, default=str))
+            if len(rows) < page_size:
+                return
     
-    def _load_sync_log(self) -> Dict[str, Any]:
-        """Load sync log from file
+    def _apply_remote_page(self, page: pd.DataFrame, conflict_policy: str) -> Tuple[pd.DataFrame, int]:
+        """Resolve one page of remote rows against local dirty rows and store the winners
         
         Returns:
-            Dictionary with sync log data
+            Tuple of (rows applied locally, number of conflicts)
         """
-        try:
-            if os.path.exists(self.sync_log_path):
-                with open(self.sync_log_path, 'r') as f:
-                    return json.load(f)
-            else:
-                # Create empty sync log
-                self._create_empty_sync_log()
-                return {"last_sync": None, "sync_history": []}
-        
-        except Exception as e:
-            logger.error(f"Failed to load sync log: {e}")
-            return {"last_sync": None, "sync_history": []}
+        page = page.drop(columns=[c for c in ("id",) if c in page.columns])
+        keys = lead_keys(page)
+        keep = ~keys.duplicated(keep="last").to_numpy()
+        page, keys = page[keep], keys[keep]
+        
+        local = self.store.dirty_state(keys.tolist())
+        local_updated = keys.map(pd.Series(local["updated_at"].to_numpy(), index=local["lead_key"].to_numpy()))
+        conflict = keys.isin(local["lead_key"]).to_numpy()
+        
+        if conflict_policy == "remote_wins":
+            apply = np.ones(len(page), dtype=bool)
+        elif conflict_policy == "local_wins":
+            apply = ~conflict
+        else:
+            remote_ts = _timestamps(page["updated_at"] if "updated_at" in page.columns else pd.Series(None, index=page.index))
+            # The remote row wins unless the local change is known to be later
+            local_newer = (_timestamps(local_updated) > remote_ts).to_numpy()
+            apply = ~conflict | ~local_newer
+        
+        applied = page[apply]
+        self.store.apply_remote(applied)
+        return applied.reset_index(drop=True), int(conflict.sum())
     
-    def _update_sync_log(self, stats: Dict[str, int]):
-        """Update sync log with new sync information
+    def _push_dirty(self, stats: Dict[str, int]) -> Optional[Dict[str, Any]]:
+        """Upsert locally changed leads and mark them clean once accepted
         
-        Args:
-            stats: Dictionary with sync statistics
+        Returns:
+            Uploader report (throughput, p95 batch latency, ...), or None if nothing was dirty
         """
-        try:
-            # Load existing log
-            sync_log = self._load_sync_log()
-            
-            # Add new sync entry
-            now = datetime.utcnow().isoformat() + "Z"
-            sync_entry = {
-                "timestamp": now,
-                "stats": stats
-            }
-            
-            sync_log["last_sync"] = now
-            sync_log["sync_history"].append(sync_entry)
-            
-            # Limit history to 100 entries
-            if len(sync_log["sync_history"]) > 100:
-                sync_log["sync_history"] = sync_log["sync_history"][-100:]
-            
-            # Save to file
-            with open(self.sync_log_path, 'w') as f:
-                json.dump(sync_log, f, indent=2)
-        
-        except Exception as e:
-            logger.error(f"Failed to update sync log: {e}")
+        dirty = self.store.dirty_frame()
+        if dirty.empty:
+            return None
+        keys = dirty.pop("lead_key").tolist()
+        dirty = dirty.dropna(axis=1, how="all")
+        records = dirty.astype(object).where(dirty.notna(), None).to_dict(orient="records")
+        
+        def send(batch: List[Dict[str, Any]]):
+            # updated_at is stamped by the server; the local value only marks what was pushed
+            payload = [{k: v for k, v in record.items() if k != "updated_at"} for record in batch]
+            self.supabase.table(REMOTE_TABLE).upsert(payload, on_conflict=REMOTE_CONFLICT_COLUMNS).execute()
+        
+        def accepted(positions: List[int]):
+            self.store.mark_clean([keys[p] for p in positions], [records[p].get("updated_at") for p in positions])
+        
+        uploader = ChunkedUploader(send, dead_letter_path=self.dead_letter_path, **self.upload_options)
+        report = uploader.upload(records, on_success=accepted)
+        stats["uploaded"] += report["uploaded"]
+        stats["errors"] += report["failed"]
+        logger.info(f"Uploaded {report['uploaded']} leads at {report['rows_per_sec']} rows/s "
+                    f"(p95 batch {report['p95_latency_ms']} ms, {report['failed']} rejected)")
+        if report["aborted"]:
+            # Unsent leads stay dirty and go out on the next sync
+            stats["errors"] += 1
+            logger.warning(f"Upload stopped with {report['pending']} leads left dirty: {report['aborted']}")
+        return report
     
-    def get_sync_history(self) -> List[Dict[str, Any]]:
-        """Get sync history from log
+    def get_sync_history(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get the most recent sync journal entries
         
+        Args:
+            limit: Maximum number of entries
+            
         Returns:
-            List of sync history entries
+            List of sync history entries (oldest first)
         """
         try:
-            sync_log = self._load_sync_log()
-            return sync_log.get("sync_history", [])
+            return self.journal.tail(limit)
         
         except Exception as e:
             logger.error(f"Failed to get sync history: {e}")
             return []
     
-    def backup_leads(self, leads: pd.DataFrame) -> bool:
-        """Create a backup of leads data
+    def backup_leads(self, leads: pd.DataFrame, name: Optional[str] = None) -> bool:
+        """Snapshot leads into the deduplicated backup store and apply retention
         
         Args:
             leads: DataFrame with lead records
+            name: Optional label for the backup
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            # Create backup directory if it doesn't exist
-            backup_dir = os.path.join(self.data_dir, "backups")
-            os.makedirs(backup_dir, exist_ok=True)
-            
-            # Generate backup filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = os.path.join(backup_dir, f"leads_backup_{timestamp}.csv")
-            
-            # Save backup
-            leads.to_csv(backup_path, index=False)
-            logger.info(f"Created backup at {backup_path}")
+            snapshot = self.backups.create(leads, name=name)
+            removed = self.backups.apply_retention()
+            logger.info(
+                f"Created backup {snapshot['id']} ({snapshot['rows']} rows, {snapshot['new_bytes']} new bytes); "
+                f"expired {len(removed)}"
+            )
             return True
         
         except Exception as e:
             logger.error(f"Failed to create backup: {e}")
             return False
     
-    def get_backup_files(self) -> List[str]:
-        """Get list of available backup files
+    def get_backups(self) -> List[Dict[str, Any]]:
+        """Available backups, newest first, from the backup index
         
         Returns:
-            List of backup file paths
+            Dicts with path (pass to restore_from_backup), id, name, created_at and rows;
+            CSV backups not yet converted are listed with rows None
         """
         try:
-            backup_dir = os.path.join(self.data_dir, "backups")
-            
-            if not os.path.exists(backup_dir):
-                return []
-            
-            # Get all CSV files in backup directory
-            backup_files = [
-                os.path.join(backup_dir, f) 
-                for f in os.listdir(backup_dir) 
-                if f.startswith("leads_backup_") and f.endswith(".csv")
-            ]
-            
-            # Sort by modification time (newest first)
-            backup_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
-            
-            return backup_files
+            backups = [dict(s, path=os.path.join(self.backups.root, s["id"])) for s in self.backups.list()]
+            if os.path.isdir(self.backups.root):
+                for f in os.listdir(self.backups.root):
+                    if f.startswith("leads_backup_") and f.endswith(".csv"):
+                        path = os.path.join(self.backups.root, f)
+                        created = datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+                        backups.append({"id": f, "name": f, "path": path, "created_at": created, "rows": None})
+            backups.sort(key=lambda b: b["created_at"], reverse=True)
+            return backups
         
         except Exception as e:
-            logger.error(f"Failed to get backup files: {e}")
+            logger.error(f"Failed to list backups: {e}")
             return []
     
+    def convert_csv_backups(self) -> int:
+        """Convert leads_backup_*.csv files into snapshots and remove the CSVs
+        
+        Returns:
+            Number of backups converted
+        """
+        try:
+            converted = self.backups.migrate_legacy_backups()
+            logger.info(f"Converted {len(converted)} CSV backups into snapshots")
+            return len(converted)
+        
+        except Exception as e:
+            logger.error(f"Failed to convert CSV backups: {e}")
+            return 0
+    
+    def get_backup_files(self) -> List[str]:
+        """Get list of available backups
+        
+        Returns:
+            List of backup paths (newest first)
+        """
+        return [b["path"] for b in self.get_backups()]
+    
     def restore_from_backup(self, backup_path: str) -> pd.DataFrame:
-        """Restore leads from backup file
+        """Restore leads from a backup snapshot (or a legacy CSV backup)
         
         Args:
-            backup_path: Path to backup file
+            backup_path: Backup path from get_backup_files
             
         Returns:
             DataFrame with restored lead records
         """
         try:
-            if os.path.exists(backup_path):
+            if backup_path.endswith(".csv") and os.path.exists(backup_path):
                 df = pd.read_csv(backup_path)
-                logger.info(f"Restored {len(df)} leads from backup {backup_path}")
-                return df
             else:
-                logger.warning(f"Backup file not found: {backup_path}")
-                return pd.DataFrame()
+                df = self.backups.restore(os.path.basename(backup_path))
+            logger.info(f"Restored {len(df)} leads from backup {backup_path}")
+            return df
+        
+        except KeyError:
+            logger.warning(f"Backup not found: {backup_path}")
+            return pd.DataFrame()
         
         except Exception as e:
             logger.error(f"Failed to restore from backup: {e}")
-            return pd.DataFrame()
\ No newline at end of file
+            return pd.DataFrame()
+
+
+_stores: Dict[str, LeadStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _open_store(db_path: str, legacy_csv: Optional[str] = None) -> LeadStore:
+    """Shared LeadStore per database path, seeded from the legacy CSV when new"""
+    key = os.path.abspath(db_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = LeadStore(db_path)
+            if legacy_csv and os.path.exists(legacy_csv) and store.count() == 0:
+                try:
+                    imported = store.import_csv(legacy_csv)
+                    logger.info(f"Imported {imported} leads from {legacy_csv} into {db_path}")
+                except Exception as e:
+                    logger.error(f"Failed to import {legacy_csv} into the lead store: {e}")
+    return store
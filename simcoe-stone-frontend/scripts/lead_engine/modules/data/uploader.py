@@ -0,0 +1,203 @@
+"""
+Concurrent chunked uploader
+
+Sends record batches through a caller-supplied function (e.g. a Supabase upsert):
+1. Several chunks in flight on a thread pool
+2. Adaptive batch size: steered toward a target batch latency and capped by
+   serialized payload size
+3. Transient failures (connection errors, timeouts, 5xx/429) retry the whole
+   chunk with backoff; if they persist the upload stops and the unsent rows
+   are left for the next run
+4. Data errors (e.g. 4xx) bisect the chunk until single bad rows are isolated;
+   those go to a dead-letter JSON-lines file
+5. Report with rows/s throughput and p95 batch latency
+"""
+
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import httpx
+    TRANSIENT_ERRORS = (ConnectionError, TimeoutError, httpx.TransportError)
+except ImportError:
+    TRANSIENT_ERRORS = (ConnectionError, TimeoutError)
+
+logger = logging.getLogger("Uploader")
+
+Record = Dict[str, Any]
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP status carried by an exception (directly or on its response), if any"""
+    for source in (error, getattr(error, "response", None)):
+        status = getattr(source, "status_code", None)
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def is_transient(error: BaseException) -> bool:
+    """True for failures worth retrying as-is: network errors, timeouts, 5xx, 408 and 429"""
+    status = _status_code(error)
+    if status is not None:
+        return status >= 500 or status in (408, 429)
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+class ChunkedUploader:
+    """Uploads records in adaptive, concurrent, retried chunks"""
+
+    def __init__(
+        self,
+        send: Callable[[List[Record]], Any],
+        workers: int = 4,
+        batch_size: int = 100,
+        min_batch_size: int = 10,
+        max_batch_size: int = 1000,
+        target_latency: float = 1.0,
+        max_payload_bytes: int = 1_000_000,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5,
+        dead_letter_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            send: Uploads one batch; raises on failure
+            workers: Chunks in flight at once
+            batch_size: Initial rows per chunk
+            min_batch_size: Lower bound for adaptive sizing
+            max_batch_size: Upper bound for adaptive sizing
+            target_latency: Seconds per chunk the sizing aims for
+            max_payload_bytes: Cap on the JSON size of one chunk
+            max_retries: Extra attempts for a chunk after a transient failure before the upload stops
+            retry_backoff: Base delay (seconds) before a retry, doubled per attempt
+            dead_letter_path: JSON-lines file for rejected rows (None: only log them)
+        """
+        self.send = send
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.min_batch_size = max(1, min_batch_size)
+        self.max_batch_size = max(self.min_batch_size, max_batch_size)
+        self.target_latency = target_latency
+        self.max_payload_bytes = max_payload_bytes
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.dead_letter_path = dead_letter_path
+
+    def _adapt(self, rows: int, latency: float):
+        """Move the batch size halfway toward the size that would hit target_latency"""
+        ideal = rows * self.target_latency / max(latency, 1e-3)
+        size = int(0.5 * self.batch_size + 0.5 * ideal)
+        self.batch_size = min(self.max_batch_size, max(self.min_batch_size, size))
+
+    def _timed_send(self, batch: List[Record], attempt: int) -> float:
+        if attempt:
+            time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+        start = time.perf_counter()
+        self.send(batch)
+        return time.perf_counter() - start
+
+    def _dead_letter(self, records: List[Record], error: str):
+        logger.error(f"Rejected {len(records)} record(s): {error}")
+        if not self.dead_letter_path:
+            return
+        os.makedirs(os.path.dirname(self.dead_letter_path) or ".", exist_ok=True)
+        failed_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        with open(self.dead_letter_path, "a") as f:
+            for record in records:
+                f.write(json.dumps({"failed_at": failed_at, "error": error, "record": record}, default=str) + "\n")
+
+    def upload(
+        self,
+        records: Sequence[Record],
+        on_success: Optional[Callable[[List[int]], None]] = None
+    ) -> Dict[str, Any]:
+        """Upload every record
+
+        Args:
+            records: Rows to send
+            on_success: Called (on the calling thread) with the positions of each accepted chunk
+
+        Returns:
+            Report: uploaded, failed, batches, retries, bytes, elapsed_s,
+            rows_per_sec, p95_latency_ms, batch_size (final), aborted (the
+            transient error that stopped the upload, else None) and pending
+            (rows neither accepted nor dead-lettered)
+        """
+        sizes = [len(json.dumps(r, default=str)) for r in records]
+        report = {"uploaded": 0, "failed": 0, "batches": 0, "retries": 0, "bytes": 0, "aborted": None}
+        latencies: List[float] = []
+        retry: deque = deque()  # (positions, attempt) waiting to be resent
+        next_pos = 0
+        start = time.perf_counter()
+
+        def cut() -> List[int]:
+            nonlocal next_pos
+            end, payload = next_pos, 0
+            while end < len(records) and end - next_pos < self.batch_size:
+                if end > next_pos and payload + sizes[end] > self.max_payload_bytes:
+                    break
+                payload += sizes[end]
+                end += 1
+            chunk = list(range(next_pos, end))
+            next_pos = end
+            return chunk
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="uploader") as pool:
+            inflight = {}
+            while inflight or (not report["aborted"] and (retry or next_pos < len(records))):
+                while not report["aborted"] and len(inflight) < self.workers and (retry or next_pos < len(records)):
+                    positions, attempt = retry.popleft() if retry else (cut(), 0)
+                    batch = [records[p] for p in positions]
+                    inflight[pool.submit(self._timed_send, batch, attempt)] = (positions, attempt)
+
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    positions, attempt = inflight.pop(future)
+                    report["batches"] += 1
+                    try:
+                        latency = future.result()
+                    except Exception as e:
+                        if is_transient(e):
+                            if attempt < self.max_retries:
+                                retry.append((positions, attempt + 1))
+                                report["retries"] += 1
+                            elif not report["aborted"]:
+                                # The remote is down, not the rows: keep them for the next run
+                                report["aborted"] = str(e) or type(e).__name__
+                                logger.warning(f"Upload stopped after {attempt + 1} attempts: {report['aborted']}")
+                        elif len(positions) > 1:
+                            # Bisect to isolate the rows the remote rejects
+                            mid = len(positions) // 2
+                            retry.extend([(positions[:mid], 0), (positions[mid:], 0)])
+                            self.batch_size = max(self.min_batch_size, min(self.batch_size, mid))
+                            report["retries"] += 1
+                        else:
+                            report["failed"] += 1
+                            self._dead_letter([records[p] for p in positions], str(e))
+                        continue
+                    latencies.append(latency)
+                    report["uploaded"] += len(positions)
+                    report["bytes"] += sum(sizes[p] for p in positions)
+                    if attempt == 0:
+                        self._adapt(len(positions), latency)
+                    if on_success:
+                        on_success(positions)
+
+        elapsed = time.perf_counter() - start
+        report.update({
+            "elapsed_s": round(elapsed, 3),
+            "rows_per_sec": round(report["uploaded"] / elapsed, 1) if elapsed > 0 else 0.0,
+            "p95_latency_ms": round(float(np.percentile(latencies, 95)) * 1000, 1) if latencies else None,
+            "batch_size": self.batch_size,
+            "pending": len(records) - report["uploaded"] - report["failed"],
+        })
+        return report
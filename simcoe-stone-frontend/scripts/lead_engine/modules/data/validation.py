@@ -0,0 +1,170 @@
+"""
+Lead validation rules
+
+Every rule runs as column operations over the whole frame and reports the rows
+it rejects:
+1. required_columns  name / service_area / craft_type present
+2. email, phone, url Format checks on non-empty values
+3. duplicate_key     Repeated normalized (name, service_area) keys
+4. large_corp        Names/websites on the large-corporation blacklist
+
+Rules are functions (DataFrame -> error frame or None) registered with
+@register_rule; LeadValidator runs any subset of them and concatenates the
+results into one compact error frame (row, rule, column, value, message).
+"""
+import re
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..utils.config import BLACKLIST_DOMAINS, BLACKLIST_NAMES
+from .lead_store import lead_keys
+
+REQUIRED_COLUMNS = ["name", "service_area", "craft_type"]
+ERROR_COLUMNS = ["row", "rule", "column", "value", "message"]
+
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+URL_PATTERN = r'^(?:https?://)?(?:www\.)?[a-zA-Z0-9-]+(?:\.[a-zA-Z0-9-]+)*\.[a-zA-Z]{2,}(?::\d+)?(?:[/?#]\S*)?$'
+
+Rule = Callable[[pd.DataFrame], Optional[pd.DataFrame]]
+RULES: Dict[str, Rule] = {}
+
+
+def register_rule(name: str) -> Callable[[Rule], Rule]:
+    """Decorator adding a rule to RULES under `name`"""
+    def decorator(fn: Rule) -> Rule:
+        RULES[name] = fn
+        return fn
+    return decorator
+
+
+def error_frame(df: pd.DataFrame, mask, column: Optional[str], message: str) -> pd.DataFrame:
+    """Error rows for the positions where `mask` is True"""
+    mask = np.asarray(mask, dtype=bool)
+    rows = np.flatnonzero(mask)
+    values = df[column].to_numpy(dtype=object)[rows] if column in df.columns else np.full(len(rows), None, dtype=object)
+    return pd.DataFrame({"row": rows, "column": column, "value": values, "message": message})
+
+
+def _text(df: pd.DataFrame, column: str) -> pd.Series:
+    """Column as stripped strings ("" for missing); whole floats lose their ".0" """
+    s = df[column]
+    if pd.api.types.is_float_dtype(s) and s.dropna().mod(1).eq(0).all():
+        s = s.astype("Int64")
+    return s.astype(object).where(s.notna(), "").astype(str).str.strip()
+
+
+@register_rule("required_columns")
+def check_required_columns(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if not missing:
+        return None
+    return pd.DataFrame({"row": -1, "column": missing, "value": None,
+                         "message": [f"Missing required column: {c}" for c in missing]})
+
+
+@register_rule("email")
+def check_email(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    if "email" not in df.columns:
+        return None
+    email = _text(df, "email")
+    bad = email.ne("") & ~email.str.match(EMAIL_PATTERN)
+    return error_frame(df, bad, "email", "Invalid email format")
+
+
+@register_rule("phone")
+def check_phone(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    if "phone" not in df.columns:
+        return None
+    phone = _text(df, "phone")
+    # Numbers parsed from CSV may carry a float suffix ("7055550100.0")
+    digits = phone.str.replace(r"\.0+$", "", regex=True).str.replace(r"\D", "", regex=True)
+    valid = digits.str.len().eq(10) | (digits.str.len().eq(11) & digits.str.startswith("1"))
+    bad = phone.ne("") & ~valid
+    return error_frame(df, bad, "phone", "Invalid phone number")
+
+
+@register_rule("url")
+def check_url(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    if "website" not in df.columns:
+        return None
+    url = _text(df, "website")
+    bad = url.ne("") & ~url.str.match(URL_PATTERN)
+    return error_frame(df, bad, "website", "Invalid website URL")
+
+
+@register_rule("duplicate_key")
+def check_duplicates(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    if "name" not in df.columns or "service_area" not in df.columns:
+        return None
+    duplicated = lead_keys(df).duplicated(keep=False)
+    return error_frame(df, duplicated, "name", "Duplicate record")
+
+
+_CORP_NAMES = re.compile("|".join(re.escape(n) for n in sorted(BLACKLIST_NAMES, key=len, reverse=True)))
+_CORP_DOMAINS = re.compile("|".join(re.escape(d) for d in sorted(BLACKLIST_DOMAINS, key=len, reverse=True)))
+
+
+def large_corp_mask(df: pd.DataFrame) -> np.ndarray:
+    """Vectorized utils.config.is_large_corp over the name/website columns"""
+    mask = np.zeros(len(df), dtype=bool)
+    if "name" in df.columns:
+        mask |= _text(df, "name").str.lower().str.contains(_CORP_NAMES).to_numpy()
+    if "website" in df.columns:
+        mask |= _text(df, "website").str.lower().str.contains(_CORP_DOMAINS).to_numpy()
+    return mask
+
+
+@register_rule("large_corp")
+def check_large_corp(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    return error_frame(df, large_corp_mask(df), "name", "Large corporation (blacklisted)")
+
+
+class LeadValidator:
+    """Runs a set of registered rules over lead frames"""
+
+    def __init__(self, rules: Optional[Sequence[str]] = None, extra_rules: Optional[Dict[str, Rule]] = None):
+        """
+        Args:
+            rules: Names of registered rules to run (default: all of RULES)
+            extra_rules: Additional rules for this validator only
+        """
+        self.rules: Dict[str, Rule] = {}
+        for name in (rules if rules is not None else list(RULES)):
+            if name not in RULES:
+                raise ValueError(f"Unknown validation rule: {name}")
+            self.rules[name] = RULES[name]
+        self.rules.update(extra_rules or {})
+
+    def validate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """All rule violations as one frame (row = position in df, -1 for frame-level errors)"""
+        frames: List[pd.DataFrame] = []
+        for name, rule in self.rules.items():
+            errors = rule(df)
+            if errors is not None and len(errors):
+                frames.append(errors.assign(rule=name))
+        if not frames:
+            return pd.DataFrame({c: pd.Series(dtype="int64" if c == "row" else object) for c in ERROR_COLUMNS})
+        errors = pd.concat(frames, ignore_index=True)[ERROR_COLUMNS]
+        errors["rule"] = errors["rule"].astype("category")
+        errors["column"] = errors["column"].astype("category")
+        return errors
+
+
+def errors_to_records(df: pd.DataFrame, errors: pd.DataFrame) -> List[Dict[str, object]]:
+    """Error frame -> the list-of-dicts shape DataSyncManager has always returned"""
+    names = df["name"].to_numpy(dtype=object) if "name" in df.columns else None
+    areas = df["service_area"].to_numpy(dtype=object) if "service_area" in df.columns else None
+    records: List[Dict[str, object]] = []
+    for row, rule, column, value, message in errors[ERROR_COLUMNS].itertuples(index=False):
+        if row < 0:
+            records.append({"error": message})
+            continue
+        record: Dict[str, object] = {"error": message, "name": names[row] if names is not None else f"Row {row}"}
+        if rule == "duplicate_key" and areas is not None:
+            record["service_area"] = areas[row]
+        elif column != "name":
+            record[column] = value
+        records.append(record)
+    return records
@@ -14,6 +14,8 @@ from ..utils.config import (
 )
 from ..data.database import supabase, collection, save_to_chroma, check_duplicate
 from ..data.sync import DataSyncManager
+from ..data.business_counts import record_inserts
+from ..data.scoring import apply_scores
 from ..data.census import cluster_municipalities
 
 def get_city_bbox(city_name: str) -> Optional[Tuple[float, float, float, float]]:
@@ -86,17 +88,12 @@ def scrape_contractors_in_city(city_name: str, bbox: tuple) -> List[Dict[str, An
                         "craft_type": f"{tag_key}:{tag_value}",
                         "source": "OSM_Auto",
                         "status": "scraped",
-                        "score": 5,  # Base score
                         "latitude": lat,
                         "longitude": lon,
                         "scraped_at": datetime.now().isoformat(),
                         "type": "contractor"  # Type marker for Chroma
                     }
                     
-                    # Score based on available contact info
-                    if contractor["phone"]: contractor["score"] += 2
-                    if contractor["email"]: contractor["score"] += 2
-                    if contractor["website"]: contractor["score"] += 3
                     
                     # Deduplicate within this batch by name + service area
                     if not any(c.get("name") == contractor["name"] and c.get("service_area") == contractor["service_area"] for c in contractors):
@@ -108,7 +105,7 @@ def scrape_contractors_in_city(city_name: str, bbox: tuple) -> List[Dict[str, An
             print(f"[Warning] Failed OSM query {tag_key}={tag_value} in {city_name}: {e}")
             continue
     
-    return contractors[:MAX_PER_CITY]
+    return apply_scores(contractors[:MAX_PER_CITY], "contact")
 
 def automated_scraping_worker():
     """Background worker that continuously scrapes new businesses"""
@@ -135,13 +132,7 @@ def automated_scraping_worker():
             batch_scraped = 0
             sync = DataSyncManager()
             try:
-                existing_df = sync.load_leads_from_csv()
-                if not existing_df.empty:
-                    existing_df["match_key"] = (existing_df["name"].astype(str).str.strip().str.lower()
-                                                 + "|" + existing_df["service_area"].astype(str).str.strip().str.lower())
-                    existing_keys = set(existing_df["match_key"].tolist())
-                else:
-                    existing_keys = set()
+                existing_keys = sync.lead_keys()
             except Exception:
                 existing_keys = set()
 
@@ -218,28 +209,15 @@ def automated_scraping_worker():
                     scraping_stats["errors"] = scraping_stats["errors"][-10:]
                     continue
             
-            # Persist any locally pending leads (merge + dedup) so progress is not lost
+            # Keep per-municipality business counts current
+            record_inserts(pending_local_add)
+
+            # Persist any locally pending leads so progress is not lost; the
+            # store skips leads it already has (same name and service area)
             try:
                 if pending_local_add:
-                    new_df = None
-                    try:
-                        import pandas as pd
-                        new_df = pd.DataFrame(pending_local_add)
-                    except Exception:
-                        new_df = None
-                    if new_df is not None and not new_df.empty:
-                        print(f"[AutoScrape] Persisting locally: {len(new_df)} new leads")
-                        existing_df = sync.load_leads_from_csv()
-                        # Normalize match key for dedup
-                        new_df["match_key"] = (new_df["name"].astype(str).str.strip().str.lower()
-                                                + "|" + new_df["service_area"].astype(str).str.strip().str.lower())
-                        if not existing_df.empty and "match_key" in existing_df.columns:
-                            merged = pd.concat([existing_df, new_df], ignore_index=True)
-                            merged = merged.drop_duplicates(subset=["match_key"], keep="first")
-                        else:
-                            merged = pd.concat([existing_df, new_df], ignore_index=True)
-                            merged = merged.drop_duplicates(subset=["name","service_area"], keep="first")
-                        sync.save_leads_to_csv(merged)
+                    print(f"[AutoScrape] Persisting locally: {len(pending_local_add)} new leads")
+                    sync.append_leads(pending_local_add)
             except Exception as e:
                 print(f"[Warning] Local persist failed: {e}")
 
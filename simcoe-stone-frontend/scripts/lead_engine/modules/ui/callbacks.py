@@ -12,7 +12,7 @@ import dash_bootstrap_components as dbc
 
 from ..data.census import (
     census_map, census_columns, pop_map, business_count_map,
-    get_province_for_municipality, cluster_municipalities, municipalities
+    get_province_for_municipality, cluster_municipalities, census_store, municipal_features
 )
 from ..data.database import collection, supabase, load_contractor_leads
 from ..scraping.auto_scraper import (
@@ -21,8 +21,9 @@ from ..scraping.auto_scraper import (
 )
 from ..api.qa import (
     process_qa_query, enrich_contractor_with_llm, validate_social_media,
-    parse_llm_response
+    parse_llm_response, ollama, OLLAMA_MODEL
 )
+from enrichers.llm_gateway import SCORING
 
 def register_callbacks(app):
     """Register all callbacks with the Dash app"""
@@ -48,27 +49,13 @@ def register_callbacks(app):
         # Municipality search
         if lead_type == "municipality":
             batch_munis = cluster_municipalities[batch_start:batch_start+50]
-            filtered_munis = []
-            
-            for m in batch_munis:
-                census_vars = census_map.get(selected_province, {}) if selected_province else {}
-                passed = True
-                
-                for var in census_vars_selected or []:
-                    val = census_vars.get(var, "")
-                    if census_var_threshold:
-                        try:
-                            if census_var_threshold.startswith('>'):
-                                if float(val or 0) <= float(census_var_threshold[1:]):
-                                    passed = False
-                            elif census_var_threshold.startswith('<'):
-                                if float(val or 0) >= float(census_var_threshold[1:]):
-                                    passed = False
-                        except Exception:
-                            passed = False
-                            
-                if passed:
-                    filtered_munis.append(m)
+            filtered_munis = batch_munis
+            if census_vars_selected and census_var_threshold:
+                # Each municipality's own census features, not its province's
+                try:
+                    filtered_munis = municipal_features.filter(batch_munis, census_vars_selected, census_var_threshold)
+                except ValueError:
+                    filtered_munis = []
                     
             if not filtered_munis:
                 filtered_munis = batch_munis
@@ -97,7 +84,10 @@ def register_callbacks(app):
             if metas and isinstance(metas[0], list):
                 metas = metas[0]
                 
-            for doc, meta in zip(docs, metas):
+            # Rank on local census features before any LLM call
+            local_scores = dict(municipal_features.rank([m.get("name", "Unknown") for m in metas]))
+            ranked = sorted(zip(docs, metas), key=lambda dm: local_scores.get(dm[1].get("name", "Unknown"), 0.0), reverse=True)
+            for doc, meta in ranked:
                 name = meta.get("name", "Unknown")
                 pop = pop_map.get(name, "N/A")
                 business_count = business_count_map.get(name, "N/A")
@@ -111,13 +101,14 @@ def register_callbacks(app):
                         f"Population: {pop}\n"
                         f"Business count: {business_count}\n"
                         f"Province: {province}\n"
-                        f"Key census: {str(census_vars)[:300]}\n"
+                        f"Local census signals: {municipal_features.describe(name)}\n"
+                        f"Province census (context): {str(census_vars)[:200]}\n"
                         f"OSM density: {business_count}\n"
                         f"Consider economic activity, construction signals, and local business density.\n"
                         f"Return a score 1-10 and a short rationale."
                     )
                     
-                    response = ollama.generate(model=OLLAMA_MODEL, prompt=prompt)
+                    response = ollama.generate(model=OLLAMA_MODEL, prompt=prompt, priority=SCORING)
                     score, rationale = parse_llm_response(response["response"])
                     
                     census_display = html.Details([
@@ -385,25 +376,17 @@ def register_callbacks(app):
             return "Select a province/territory."
             
         try:
-            # Filter municipalities by province
+            # Most populous municipalities in the province, selected without a Python loop
             rows = []
-            for m in municipalities:
-                prov = get_province_for_municipality(m)
-                if prov != selected_province:
-                    continue
-                    
+            for i in census_store.top_by_population(selected_province, limit=20):
+                m = census_store.municipalities[i]
+                prov = census_store.province_of(i)
                 census_vars = census_map.get(prov, {})
                 pop = pop_map.get(m, "N/A")
                 val = census_vars.get(selected_var, "N/A") if selected_var else "N/A"
                 
                 rows.append({"Municipality": m, "Province": prov, "Population": pop, selected_var or "Census": val})
                 
-            # Sort by population descending
-            rows = sorted(rows, key=lambda r: int(r["Population"]) if str(r["Population"]).isdigit() else 0, reverse=True)
-            
-            # Show top 20
-            rows = rows[:20]
-            
             if not rows:
                 return dbc.Alert("No municipalities found for selection.", color="warning")
                 
@@ -448,10 +431,9 @@ def register_callbacks(app):
                 
                 if t == "municipality":
                     prov = get_province_for_municipality(name)
-                    census_vars = census_map.get(prov, {})
                     pop = pop_map.get(name, "N/A")
                     business_count = business_count_map.get(name, "N/A")
-                    enriched_context.append(f"Municipality: {name}, Province: {prov}, Population: {pop}, Business Count: {business_count}, Census: {str(census_vars)[:200]}")
+                    enriched_context.append(f"Municipality: {name}, Province: {prov}, Population: {pop}, Business Count: {business_count}, Census: {municipal_features.describe(name)}")
                     
                 elif t == "contractor":
                     social_score, social_details = validate_social_media(meta.get("website", ""), meta.get("socials", ""))
@@ -531,14 +513,14 @@ def register_callbacks(app):
                 
                 if t == "municipality":
                     prov = get_province_for_municipality(name)
-                    census_vars = census_map.get(prov, {})
                     pop = pop_map.get(name, "N/A")
                     business_count = business_count_map.get(name, "N/A")
                     
                     table_rows.append({
                         "Name": name, "Type": "Municipality", "Province": prov, 
                         "Population": pop, "Business Count": business_count,
-                        "Income": str(census_vars.get("Total - Household total income groups in 2020 for private households - 100% data", "N/A"))[:50],
+                        "Income": municipal_features.features(name).get("median_household_income", "N/A"),
+                        "Local Score": municipal_features.score(name),
                         "Score": meta.get("score", 0)
                     })
                     
@@ -7,6 +7,7 @@ import dash_bootstrap_components as dbc
 import dash_cytoscape as cyto
 
 from ..data.census import census_columns, census_map
+from ..data.municipal_features import FEATURE_NAMES
 
 # Initialize the Dash app with Bootstrap
 app = Dash(
@@ -52,12 +53,12 @@ app.layout = dbc.Container([
                             dbc.Input(id="batch-start", type="number", value=0, min=0, step=50, className="mb-3")
                         ], width=6),
                         dbc.Col([
-                            html.Label("Filter by Census Variable (municipality only):"),
+                            html.Label("Filter by Local Census Feature (municipality only):"),
                             dcc.Dropdown(
                                 id="census-var-dropdown",
-                                options=[{"label": col, "value": col} for col in census_columns[:50]],
+                                options=[{"label": f, "value": f} for f in FEATURE_NAMES],
                                 multi=True,
-                                placeholder="Select census variables to filter...",
+                                placeholder="Select census features to filter...",
                                 className="mb-3"
                             ),
                             html.Label("Threshold:"),
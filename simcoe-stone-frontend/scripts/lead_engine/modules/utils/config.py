@@ -1,6 +1,7 @@
 """
 Configuration module for the Contractor Lead Engine
 """
+import json
 import os
 from typing import Dict, Any, List
 
@@ -36,6 +37,24 @@ def get_data_path(filename: str) -> str:
     base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
     return os.path.join(base_dir, filename)
 
+def update_config_file(updates: Dict[str, Any], path: str) -> Dict[str, Any]:
+    """Merge top-level settings into a JSON config file, keeping every other section
+
+    Returns:
+        The config as written
+    """
+    cfg: Dict[str, Any] = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+    cfg.update(updates)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cfg, f, indent=2)
+    os.replace(tmp_path, path)
+    return cfg
+
 # Heuristics to exclude large corporations not likely to use services
 BLACKLIST_NAMES = {
     "home depot", "lowe", "lowe's", "canadian tire", "walmart", "costco",
@@ -27,6 +27,9 @@ import requests
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
+from modules.data.business_counts import record_inserts
+from modules.data.scoring import apply_scores
+
 load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
@@ -126,6 +129,7 @@ def fetch_osm_businesses(city: str) -> List[Dict[str, Any]]:
         # Only keep actionable leads: must have at least one of phone/email/website/socials
         if not (phone or email or website or socials):
             continue
+        craft_type = next((f"{k}:{v}" for k, v in OSM_QUERIES if tags.get(k) == v), None)
         record = {
             "name": name,
             "phone": phone,
@@ -137,23 +141,27 @@ def fetch_osm_businesses(city: str) -> List[Dict[str, Any]]:
             "source": "osm",
             "status": "prospect",
             "score": 0,
+            "craft_type": craft_type,
         }
         out.append(record)
         if len(out) >= MAX_PER_CITY:
             break
     time.sleep(SLEEP_BETWEEN_REQ)
-    return out
+    return apply_scores(out, "contact")
 
 
 def insert_supabase(records: List[Dict[str, Any]]) -> int:
-    count = 0
+    inserted = []
     for rec in records:
         try:
-            supabase.table("contractors_prospects").insert(rec).execute()
-            count += 1
+            # craft_type is only tracked locally (business counts), not in Supabase
+            payload = {k: v for k, v in rec.items() if k != "craft_type"}
+            supabase.table("contractors_prospects").insert(payload).execute()
+            inserted.append(rec)
         except Exception as e:
             logging.warning(f"Insert failed for {rec.get('name')}: {e}")
-    return count
+    record_inserts(inserted)
+    return len(inserted)
 
 
 def run(limit_cities: Optional[int] = 50):
@@ -9,15 +9,14 @@ import pandas as pd
 import streamlit as st
 from datetime import datetime
 
-from modules.data.sync import DataSyncManager
+from ui.data_layer import load_leads
 from ui.streamlit_components import render_page_header, render_metric_row, render_card
 
 
 def render_dashboard_page():
     render_page_header("Dashboard", "Overview of leads and activity", "📊")
 
-    sync = DataSyncManager()
-    leads = sync.load_leads_from_csv()
+    leads = load_leads()
 
     total = len(leads)
     high_priority = int((leads["score"] >= 8).sum()) if "score" in leads.columns else 0
@@ -16,15 +16,16 @@ import streamlit as st
 from datetime import datetime
 from typing import Dict, List, Any, Tuple, Optional
 
-# Import the data sync manager
+# Import the data sync manager and the shared data layer
 from modules.data.sync import DataSyncManager
+from ui.data_layer import count_leads, get_sync_manager, load_leads, load_sync_history
 
 def render_data_sync_page():
     """Render the data synchronization page in the Streamlit dashboard"""
     st.title("Data Synchronization")
     
-    # Initialize data sync manager
-    sync_manager = DataSyncManager()
+    # Shared data sync manager
+    sync_manager = get_sync_manager()
     
     # Create tabs for different sync operations
     tab1, tab2, tab3, tab4 = st.tabs([
@@ -59,7 +60,7 @@ def render_csv_import_export(sync_manager: DataSyncManager):
     st.header("Import/Export CSV Data")
     
     # Load current leads data
-    current_leads = sync_manager.load_leads_from_csv()
+    current_leads = load_leads(scored=False)
     
     col1, col2 = st.columns(2)
     
@@ -83,7 +84,7 @@ def render_csv_import_export(sync_manager: DataSyncManager):
                 
                 # Create temporary file
                 temp_file_path = os.path.join(
-                    os.path.dirname(sync_manager.leads_csv),
+                    sync_manager.data_dir,
                     f"temp_import_{int(time.time())}.csv"
                 )
                 
@@ -113,7 +114,7 @@ def render_csv_import_export(sync_manager: DataSyncManager):
                 
                 # Save button
                 if st.button("Save Changes"):
-                    if sync_manager.save_leads_to_csv(merged_leads):
+                    if sync_manager.save_leads(merged_leads):
                         st.success("Changes saved successfully!")
                     else:
                         st.error("Failed to save changes.")
@@ -207,11 +208,8 @@ def render_supabase_sync(sync_manager: DataSyncManager):
         
         return
     
-    # Load current leads data
-    current_leads = sync_manager.load_leads_from_csv()
-    
     # Display current data stats
-    st.write(f"Local data: {len(current_leads)} records")
+    st.write(f"Local data: {count_leads()} records")
     
     # Sync options
     st.subheader("Synchronization Options")
@@ -229,11 +227,17 @@ def render_supabase_sync(sync_manager: DataSyncManager):
         horizontal=True
     )
     
+    directions = {"Two-way sync": "both", "Upload only": "upload", "Download only": "download"}
+    policies = {"Remote wins": "remote_wins", "Local wins": "local_wins", "Newest wins": "newest_wins"}
+    
     # Start sync button
     if st.button("Start Synchronization"):
         with st.spinner("Synchronizing with Supabase..."):
-            # Perform sync
-            synced_leads, stats = sync_manager.sync_with_supabase(current_leads)
+            # Perform sync; changes are applied to the local lead store directly
+            synced_leads, stats = sync_manager.sync_with_supabase(
+                conflict_policy=policies[conflict_resolution],
+                direction=directions[sync_direction]
+            )
             
             # Display stats
             st.success("Synchronization completed!")
@@ -245,16 +249,10 @@ def render_supabase_sync(sync_manager: DataSyncManager):
             stat_cols[2].metric("Conflicts", stats["conflicts"])
             stat_cols[3].metric("Errors", stats["errors"])
             
-            # Show data preview
-            st.subheader("Updated Data Preview")
-            st.dataframe(synced_leads.head(10), use_container_width=True)
-            
-            # Save button
-            if st.button("Save Changes to Local"):
-                if sync_manager.save_leads_to_csv(synced_leads):
-                    st.success("Changes saved to local CSV!")
-                else:
-                    st.error("Failed to save changes.")
+            # Show the rows pulled from remote
+            if len(synced_leads) > 0:
+                st.subheader("Downloaded Changes")
+                st.dataframe(synced_leads.head(10), use_container_width=True)
 
 def render_backups_restore(sync_manager: DataSyncManager):
     """Render backups and restore interface
@@ -265,7 +263,7 @@ def render_backups_restore(sync_manager: DataSyncManager):
     st.header("Backups & Restore")
     
     # Load current leads data
-    current_leads = sync_manager.load_leads_from_csv()
+    current_leads = load_leads(scored=False)
     
     col1, col2 = st.columns(2)
     
@@ -283,7 +281,7 @@ def render_backups_restore(sync_manager: DataSyncManager):
         # Create backup button
         if st.button("Create Backup"):
             with st.spinner("Creating backup..."):
-                if sync_manager.backup_leads(current_leads):
+                if sync_manager.backup_leads(current_leads, name=backup_name or None):
                     st.success("Backup created successfully!")
                 else:
                     st.error("Failed to create backup.")
@@ -292,26 +290,32 @@ def render_backups_restore(sync_manager: DataSyncManager):
     with col2:
         st.subheader("Restore from Backup")
         
-        # Get available backups
-        backup_files = sync_manager.get_backup_files()
+        # Get available backups (read from the backup index)
+        backups = sync_manager.get_backups()
         
-        if not backup_files:
+        if not backups:
             st.info("No backup files found.")
         else:
-            # Get filenames only
-            backup_names = [os.path.basename(f) for f in backup_files]
-            
             # Select backup to restore
             selected_backup_idx = st.selectbox(
                 "Select Backup to Restore",
-                range(len(backup_names)),
-                format_func=lambda i: backup_names[i]
+                range(len(backups)),
+                format_func=lambda i: backups[i]["name"]
             )
             
             # Show backup info
-            selected_backup = backup_files[selected_backup_idx]
-            backup_time = datetime.fromtimestamp(os.path.getmtime(selected_backup))
+            selected = backups[selected_backup_idx]
+            selected_backup = selected["path"]
+            backup_time = datetime.fromisoformat(selected["created_at"])
             st.write(f"Backup Date: {backup_time.strftime('%Y-%m-%d %H:%M:%S')}")
+            if selected.get("rows") is not None:
+                st.write(f"Records: {selected['rows']}")
+            
+            # Old full-CSV backups can be folded into the snapshot store
+            csv_backups = [b for b in backups if b["path"].endswith(".csv")]
+            if csv_backups and st.button(f"Convert {len(csv_backups)} CSV backups to snapshots"):
+                converted = sync_manager.convert_csv_backups()
+                st.success(f"Converted {converted} backups")
             
             # Preview button
             if st.button("Preview Backup"):
@@ -327,7 +331,7 @@ def render_backups_restore(sync_manager: DataSyncManager):
                     
                     if not restored_data.empty:
                         # Save restored data
-                        if sync_manager.save_leads_to_csv(restored_data):
+                        if sync_manager.save_leads(restored_data):
                             st.success("Data restored successfully!")
                         else:
                             st.error("Failed to restore data.")
@@ -342,8 +346,9 @@ def render_sync_history(sync_manager: DataSyncManager):
     """
     st.header("Synchronization History")
     
-    # Get sync history
-    sync_history = sync_manager.get_sync_history()
+    # Get sync history (read from the end of the sync journal)
+    limit = st.number_input("Entries to show", min_value=10, max_value=1000, value=50, step=10)
+    sync_history = load_sync_history(int(limit))
     
     if not sync_history:
         st.info("No synchronization history found.")
@@ -373,6 +378,23 @@ def render_sync_history(sync_manager: DataSyncManager):
                 stat_cols[1].metric("Downloaded", stats.get("downloaded", 0))
                 stat_cols[2].metric("Conflicts", stats.get("conflicts", 0))
                 stat_cols[3].metric("Errors", stats.get("errors", 0))
+                
+                timings = entry.get("timings")
+                if timings:
+                    transferred = entry.get("bytes", {})
+                    st.caption(
+                        f"Download {timings.get('download_s', 0)}s, merge {timings.get('merge_s', 0)}s, "
+                        f"upload {timings.get('upload_s', 0)}s; "
+                        f"{transferred.get('downloaded', 0):,} bytes in, {transferred.get('uploaded', 0):,} bytes out"
+                    )
+                
+                upload = entry.get("upload")
+                if upload:
+                    st.caption(
+                        f"Upload: {upload.get('rows_per_sec', 0)} rows/s, "
+                        f"p95 batch latency {upload.get('p95_latency_ms')} ms, "
+                        f"{upload.get('failed', 0)} rejected"
+                    )
             
             # Import stats (for CSV import)
             elif "new" in stats:
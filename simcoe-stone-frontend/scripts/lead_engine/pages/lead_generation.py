@@ -1,7 +1,7 @@
 """
 Lead Generation Page
 
-Run scrapers to collect leads and save to CSV, with optional RAG update.
+Run scrapers to collect leads and save them to the lead store, with optional RAG update.
 """
 
 import os
@@ -14,21 +14,30 @@ if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
 from ui.streamlit_components import render_page_header, render_card
-from generate_leads import generate_leads, DEFAULT_CITIES
-from modules.data.sync import DataSyncManager
+from generate_leads import generate_leads, DEFAULT_CITIES, RUNS_DIR
+from modules.data.checkpoints import list_runs
+from ui.data_layer import count_leads
 
 
 def render_lead_generation_page():
     render_page_header("Lead Generation", "Scrape OSM and update leads", "🧭")
 
-    sync = DataSyncManager()
-    leads = sync.load_leads_from_csv()
-    st.caption(f"Current leads in CSV: {len(leads)}")
+    st.caption(f"Current leads in store: {count_leads()}")
 
     st.subheader("Run Scraper")
     cities = st.multiselect("Cities to scrape", DEFAULT_CITIES, default=["Toronto", "Mississauga", "Brampton"])
     update_rag = st.checkbox("Update RAG database", value=False)
 
+    unfinished = [r for r in list_runs(RUNS_DIR) if not r["finished"]]
+    if unfinished:
+        latest = unfinished[0]
+        st.warning(f"Run {latest['run_id']} did not finish (next stage: {latest['next_stage']}).")
+        if st.button("Resume Interrupted Run"):
+            with st.spinner(f"Resuming run {latest['run_id']}..."):
+                stats = generate_leads(resume=latest["run_id"])
+            st.success("Lead generation completed" if stats.get("completed") else "Run stopped again; it can be resumed")
+            st.json(stats)
+
     if st.button("Start Lead Generation", type="primary"):
         with st.spinner("Scraping and saving leads... this may take a while"):
             stats = generate_leads(cities=cities or None, save_to_csv=True, update_rag=update_rag)
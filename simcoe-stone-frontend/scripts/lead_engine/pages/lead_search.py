@@ -8,34 +8,56 @@ import streamlit as st
 import pandas as pd
 import os
 import sys
-from typing import Dict, List, Any
+from typing import Any, List, Optional, Tuple
 
 # Add the current directory to the path
 current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-# Import data sync module for loading leads
-from modules.data.sync import DataSyncManager
+# Cached store queries shared by the Streamlit pages
+from ui.data_layer import (
+    count_leads, count_matches, get_sync_manager, lead_facets, lead_score_range, score_stored_leads, search_leads
+)
+
+PAGE_SIZES = [25, 50, 100, 250]
+SORT_OPTIONS = {
+    "Score (high to low)": ("score", True),
+    "Score (low to high)": ("score", False),
+    "Name": ("name", False),
+    "Service Area": ("service_area", False),
+    "Newest": ("updated_at", True),
+}
+DISPLAY_COLUMNS = ["name", "service_area", "craft_type", "phone", "email", "website", "address", "score"]
+
+def _facet_select(label: str, values: List[Tuple[Any, int]]) -> Optional[str]:
+    """Selectbox over facet values, labelled with their counts; None means All"""
+    options = [None] + [value for value, _ in values]
+    counts = dict(values)
+    return st.selectbox(
+        label, options,
+        format_func=lambda v: "All" if v is None else f"{v} ({counts[v]})"
+    )
 
 def render_lead_search_page():
     """Render the lead search page"""
     st.header("Lead Search")
     st.write("Search and filter leads in the database.")
     
-    # Initialize data sync manager
-    sync_manager = DataSyncManager()
+    # Leads stored without a score get one, so the score filter, sort and display agree
+    score_stored_leads()
     
-    # Load current leads data
-    leads_df = sync_manager.load_leads_from_csv()
+    # Filter values and counts come from the store (re-read only when it changes)
+    total_leads = count_leads()
+    facets = lead_facets()
     
-    if leads_df.empty:
+    if not total_leads:
         st.warning("No leads found in the database.")
         st.info("Generate leads first using the Lead Generation feature.")
         return
     
     # Display total count
-    st.write(f"Found {len(leads_df)} leads in the database.")
+    st.write(f"Found {total_leads} leads in the database.")
     
     # Two column layout
     col1, col2 = st.columns([1, 3])
@@ -44,85 +66,54 @@ def render_lead_search_page():
     with col1:
         st.subheader("Filters")
         
-        # Service area filter
-        service_areas = ["All"] + sorted(leads_df["service_area"].unique().tolist())
-        selected_area = st.selectbox("Service Area", service_areas)
-        
-        # Craft type filter
-        craft_types = ["All"] + sorted(leads_df["craft_type"].unique().tolist())
-        selected_craft = st.selectbox("Craft Type", craft_types)
+        selected_area = _facet_select("Service Area", facets.get("service_area", []))
+        selected_craft = _facet_select("Craft Type", facets.get("craft_type", []))
+        selected_source = _facet_select("Source", facets.get("source", []))
         
-        # Score filter (if available)
-        if "score" in leads_df.columns:
-            min_score = int(leads_df["score"].min()) if not leads_df["score"].isna().all() else 0
-            max_score = int(leads_df["score"].max()) if not leads_df["score"].isna().all() else 10
-            
-            score_range = st.slider(
+        # Score filter over the stored scores
+        low, high = lead_score_range()
+        if low is not None and high is not None and int(low) < int(high):
+            min_score = st.slider(
                 "Minimum Score", 
-                min_value=min_score,
-                max_value=max_score,
-                value=min_score
+                min_value=int(low),
+                max_value=int(high),
+                value=int(low)
             )
+            min_score = None if min_score == int(low) else min_score
         else:
-            score_range = None
+            min_score = None
         
-        # Source filter
-        if "source" in leads_df.columns:
-            sources = ["All"] + sorted(leads_df["source"].unique().tolist())
-            selected_source = st.selectbox("Source", sources)
-        else:
-            selected_source = "All"
-        
-        # Text search
+        # Text search (word prefixes over name, email and address)
         search_text = st.text_input("Search", placeholder="Enter name, email, etc.")
         
-        # Apply filters button
-        st.button("Apply Filters", type="primary")
+        sort_label = st.selectbox("Sort by", list(SORT_OPTIONS))
+        page_size = st.selectbox("Results per page", PAGE_SIZES, index=1)
+    
+    query = {
+        "text": search_text or None,
+        "filters": {"service_area": selected_area, "craft_type": selected_craft, "source": selected_source},
+        "min_score": min_score,
+        "order_by": SORT_OPTIONS[sort_label][0],
+        "descending": SORT_OPTIONS[sort_label][1],
+    }
     
     # Results in right column
     with col2:
         st.subheader("Results")
         
-        # Apply filters to the dataframe
-        filtered_df = leads_df.copy()
-        
-        if selected_area != "All":
-            filtered_df = filtered_df[filtered_df["service_area"] == selected_area]
+        # Count the matches first so the page number can be bounded
+        total = count_matches(**query)
+        pages = max(1, -(-total // page_size))
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+        page_df, total = search_leads(**query, limit=page_size, offset=(int(page) - 1) * page_size)
         
-        if selected_craft != "All":
-            filtered_df = filtered_df[filtered_df["craft_type"] == selected_craft]
-        
-        if score_range is not None and "score" in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df["score"] >= score_range]
-        
-        if selected_source != "All" and "source" in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df["source"] == selected_source]
-        
-        if search_text:
-            # Search across all string columns
-            search_mask = pd.Series(False, index=filtered_df.index)
-            
-            for col in filtered_df.columns:
-                if filtered_df[col].dtype == 'object':
-                    search_mask = search_mask | filtered_df[col].astype(str).str.contains(search_text, case=False, na=False)
-            
-            filtered_df = filtered_df[search_mask]
-        
-        # Display filtered results
-        st.write(f"Showing {len(filtered_df)} leads")
-        
-        # Select columns to display
-        display_cols = [
-            "name", "service_area", "craft_type", "phone", 
-            "email", "website", "address"
-        ]
-        
-        if "score" in filtered_df.columns:
-            display_cols.append("score")
+        first = (int(page) - 1) * page_size + 1 if total else 0
+        st.write(f"Showing {first}-{first + len(page_df) - 1 if total else 0} of {total} leads (page {int(page)} of {pages})")
         
         # Display results
+        display_cols = [c for c in DISPLAY_COLUMNS if c in page_df.columns]
         st.dataframe(
-            filtered_df[display_cols], 
+            page_df[display_cols], 
             width='stretch',
             column_config={
                 "name": "Name",
@@ -136,28 +127,31 @@ def render_lead_search_page():
             }
         )
         
-        # Export filtered results
-        if not filtered_df.empty:
-            # Convert DataFrame to CSV
-            csv_data = filtered_df.to_csv(index=False)
-            
-            st.download_button(
-                label="Export Results to CSV",
-                data=csv_data,
-                file_name=f"lead_search_results.csv",
-                mime="text/csv"
-            )
+        # Export every match, built only on request
+        if total:
+            export_key = repr(sorted(query.items()))
+            if st.button(f"Prepare CSV export ({total} leads)"):
+                matches, _ = get_sync_manager().search_leads(**query, limit=None)
+                st.session_state["lead_search_export"] = (export_key, matches.to_csv(index=False))
+            export = st.session_state.get("lead_search_export")
+            if export and export[0] == export_key:
+                st.download_button(
+                    label="Export Results to CSV",
+                    data=export[1],
+                    file_name=f"lead_search_results.csv",
+                    mime="text/csv"
+                )
     
-    # Lead details section
+    # Lead details section (leads on the current page)
     st.subheader("Lead Details")
-    # Defensive session state for widget
-    if not filtered_df.empty:
-        lead_names = filtered_df["name"].tolist()
-        if "selected_lead" not in st.session_state:
-            st.session_state["selected_lead"] = lead_names[0] if lead_names else None
+    if not page_df.empty:
+        lead_names = page_df["name"].tolist()
+        # Defensive session state for widget: the previous pick may not be on this page
+        if st.session_state.get("selected_lead") not in lead_names:
+            st.session_state["selected_lead"] = lead_names[0]
         selected_lead = st.selectbox("Select a lead for details", lead_names, key="selected_lead")
         if selected_lead:
-            lead_data = filtered_df[filtered_df["name"] == selected_lead].iloc[0]
+            lead_data = page_df[page_df["name"] == selected_lead].iloc[0]
             st.markdown(f"""
             ### {lead_data['name']}
             **Service Area:** {lead_data['service_area']}  
@@ -167,23 +161,23 @@ def render_lead_search_page():
             **Website:** {lead_data['website']}  
             **Address:** {lead_data['address']}  
             """)
-            if "notes" in lead_data and lead_data["notes"]:
+            if "notes" in lead_data and pd.notna(lead_data["notes"]) and lead_data["notes"]:
                 st.markdown(f"**Notes:** {lead_data['notes']}")
             if "score" in lead_data:
                 st.markdown(f"**Score:** {lead_data['score']}")
             col1, col2, col3 = st.columns(3)
             with col1:
-                if lead_data["phone"]:
+                if pd.notna(lead_data["phone"]) and lead_data["phone"]:
                     st.button(f"📞 Call {lead_data['phone']}")
                 else:
                     st.button("📞 Call", disabled=True)
             with col2:
-                if lead_data["email"]:
+                if pd.notna(lead_data["email"]) and lead_data["email"]:
                     st.button(f"✉️ Email {lead_data['email']}")
                 else:
                     st.button("✉️ Email", disabled=True)
             with col3:
-                if lead_data["website"]:
+                if pd.notna(lead_data["website"]) and lead_data["website"]:
                     st.button("🌐 Visit Website")
                 else:
                     st.button("🌐 Visit Website", disabled=True)
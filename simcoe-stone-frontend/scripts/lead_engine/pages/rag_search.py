@@ -12,10 +12,11 @@ current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
+from ui.data_layer import get_rag_engine, rag_stats
 from ui.streamlit_components import render_page_header, render_card
 
 try:
-    from modules.data.rag import RAGEngine
+    from modules.data.rag import RAGEngine  # noqa: F401  (availability check)
     RAG_OK = True
 except Exception as e:
     RAG_OK = False
@@ -30,7 +31,7 @@ def render_rag_search_page():
         st.code(RAG_ERR)
         return
 
-    rag = RAGEngine()
+    rag = get_rag_engine()
 
     col1, col2 = st.columns([3, 1])
     with col1:
@@ -49,5 +50,5 @@ def render_rag_search_page():
                     st.json(item)
 
     st.subheader("Collections")
-    stats = rag.get_stats()
+    stats = rag_stats()
     st.json(stats)
@@ -10,7 +10,7 @@ import streamlit as st
 
 from ui.streamlit_components import render_page_header, render_card
 from modules.scraping.auto_scraper import start_automated_scraping, stop_automated_scraping
-from modules.utils.config import scraping_stats
+from modules.utils.config import scraping_stats, update_config_file
 
 CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "config.json")
 
@@ -25,11 +25,10 @@ def _load_config():
     return {}
 
 
-def _save_config(cfg: dict):
+def _save_config(cfg_update: dict):
+    # Merge into the file so sections this page doesn't edit (e.g. "scoring") survive
     try:
-        os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
-        with open(CONFIG_PATH, "w") as f:
-            json.dump(cfg, f, indent=2)
+        update_config_file(cfg_update, CONFIG_PATH)
         return True
     except Exception:
         return False
@@ -48,6 +47,16 @@ def render_settings_page():
     elif provider == "openai":
         st.info("OpenAI uses environment variable OPENAI_API_KEY; optional model override below")
         openai_model = st.text_input("OpenAI Model", value=cfg.get("openai_model", "gpt-4o-mini"))
+    cascade = st.checkbox(
+        "Cascade (heuristic first, LLM only for low-confidence leads)",
+        value=bool(cfg.get("enrichment_cascade", False)),
+        disabled=provider == "heuristic",
+    )
+    cascade_threshold = st.slider(
+        "Cascade confidence threshold", 0.0, 1.0,
+        value=float(cfg.get("cascade_threshold", 0.75)), step=0.05,
+        disabled=provider == "heuristic" or not cascade,
+    )
 
     st.subheader("Supabase Credentials")
     supabase_url = st.text_input("Supabase URL", value=cfg.get("supabase_url", ""))
@@ -62,6 +71,8 @@ def render_settings_page():
             "supabase_url": supabase_url,
             "supabase_key": supabase_key,
             "leads_csv": leads_csv,
+            "enrichment_cascade": cascade,
+            "cascade_threshold": cascade_threshold,
         }
         if provider == "ollama":
             cfg_update.update({"ollama_model": ollama_model, "ollama_host": ollama_host})
@@ -20,6 +20,8 @@ import hashlib
 import random
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List, Tuple
+from modules.data.business_counts import record_inserts
+from modules.data.scoring import apply_scores
 from modules.utils.config import (
     USER_AGENT,
     NOMINATIM_URL,
@@ -189,16 +191,11 @@ def scrape_osm_contractors(city_name: str, bbox: Tuple[float, float, float, floa
                         "craft_type": f"{tag_key}:{tag_value}",
                         "source": "OSM_Auto",
                         "status": "scraped",
-                        "score": 5,  # Base score
                         "latitude": lat,
                         "longitude": lon,
                         "scraped_at": datetime.now().isoformat()
                     }
                     
-                    # Score based on available contact info
-                    if contractor["phone"]: contractor["score"] += 2
-                    if contractor["email"]: contractor["score"] += 2
-                    if contractor["website"]: contractor["score"] += 3
                     
                     # Deduplicate based on name within the same service area
                     if not any(c["name"] == name and c.get("service_area") == city_name for c in contractors):
@@ -211,6 +208,8 @@ def scrape_osm_contractors(city_name: str, bbox: Tuple[float, float, float, floa
             logger.error(f"Error querying OSM for {tag_key}={tag_value} in {city_name}: {e}")
             time.sleep(DELAY_BETWEEN_REQUESTS * 2)  # Longer delay after error
     
+    apply_scores(contractors, "contact")
+
     # Cache the results
     if contractors:
         try:
@@ -381,6 +380,7 @@ def save_to_database(contractors: List[Dict[str, Any]], supabase_client=None, ch
     
     # Import only if available (to avoid dependency issues)
     if supabase_client:
+        inserted = []
         for contractor in contractors:
             try:
                 # Check if already exists
@@ -390,9 +390,11 @@ def save_to_database(contractors: List[Dict[str, Any]], supabase_client=None, ch
                     # Insert new contractor
                     supabase_client.table("contractors_prospects").insert(contractor).execute()
                     supabase_count += 1
+                    inserted.append(contractor)
                     logger.info(f"Added {contractor['name']} to Supabase")
             except Exception as e:
                 logger.error(f"Error adding {contractor['name']} to Supabase: {e}")
+        record_inserts(inserted)
     
     # Add to Chroma if available
     if chroma_collection:
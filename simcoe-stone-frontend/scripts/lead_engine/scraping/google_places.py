@@ -0,0 +1,243 @@
+"""
+Google Places Client
+
+Discovers contractors through the Places Text Search and Details APIs:
+1. Text search with page-token retry/backoff, stopping once enough results are in
+2. Detail lookups fanned out over a bounded thread pool
+3. Field masks limited to what the text-search result is missing (fewer
+   billed SKUs and smaller payloads)
+4. Per-place_id details cache with TTL, persisted in the cache directory
+   (only successful lookups are cached)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger("Google_Places")
+
+PLACES_BASE_URL = os.getenv("GOOGLE_PLACES_BASE_URL", "https://maps.googleapis.com/maps/api/place")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cache")
+DETAILS_CACHE_FILE = os.path.join(CACHE_DIR, "places_details.json")
+
+REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "15"))
+MAX_WORKERS = 8
+DETAILS_CACHE_TTL = 7 * 24 * 60 * 60  # Seconds
+MAX_PAGES = 3  # Text Search never returns more than 3 pages
+PAGE_TOKEN_DELAY = 1.0  # Initial wait before a fresh next_page_token is usable
+MAX_RETRIES = 4
+
+# Fields the lead engine reads from Place Details
+DETAIL_FIELDS = [
+    "name", "formatted_address", "formatted_phone_number", "international_phone_number",
+    "website", "rating", "user_ratings_total", "url", "types", "opening_hours",
+]
+
+
+class PlacesAPIError(RuntimeError):
+    """The Places API answered with a non-OK status (denied key, quota, bad id...)"""
+
+
+# Either phone format satisfies the lead record
+_PHONE_FIELDS = ("formatted_phone_number", "international_phone_number")
+
+
+def missing_fields(basic: Dict[str, Any], wanted: Optional[List[str]] = None) -> List[str]:
+    """Detail fields not already present in a text-search result
+
+    Args:
+        basic: Text-search result for a place
+        wanted: Fields the caller needs (defaults to DETAIL_FIELDS)
+
+    Returns:
+        Fields to request from Place Details
+    """
+    wanted = wanted or DETAIL_FIELDS
+    missing = []
+    for field in wanted:
+        value = basic.get(field)
+        if field == "opening_hours":
+            # Text search only carries open_now; weekday_text needs Details
+            if not (isinstance(value, dict) and value.get("weekday_text")):
+                missing.append(field)
+        elif field in _PHONE_FIELDS:
+            if not any(basic.get(f) for f in _PHONE_FIELDS):
+                missing.append(field)
+        elif value in (None, "", []):
+            missing.append(field)
+    return missing
+
+
+class PlacesClient:
+    """Places API client with concurrent, cached, field-minimized detail lookups"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = PLACES_BASE_URL,
+        max_workers: int = MAX_WORKERS,
+        timeout: int = REQUEST_TIMEOUT,
+        cache_ttl: int = DETAILS_CACHE_TTL,
+        cache_path: Optional[str] = DETAILS_CACHE_FILE,
+        page_token_delay: float = PAGE_TOKEN_DELAY,
+    ):
+        self.api_key = api_key if api_key is not None else os.getenv("GOOGLE_API_KEY")
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_path = cache_path
+        self.page_token_delay = page_token_delay
+        self._session = requests.Session()
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Dict[str, Any]] = self._load_cache()
+        self.stats = {"text_search_requests": 0, "details_requests": 0, "cache_hits": 0,
+                      "fields_requested": 0, "retries": 0}
+
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        if self.cache_path and os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning(f"Could not load details cache: {e}")
+        return {}
+
+    def save_cache(self):
+        """Persist the details cache, dropping expired entries"""
+        if not self.cache_path:
+            return
+        now = time.time()
+        with self._lock:
+            fresh = {k: v for k, v in self._cache.items() if now - v.get("fetched_at", 0) < self.cache_ttl}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp = f"{self.cache_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(fresh, f)
+            os.replace(tmp, self.cache_path)
+        except Exception as e:
+            logger.warning(f"Could not save details cache: {e}")
+
+    def _get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """GET a Places endpoint, backing off on rate limits and unready page tokens"""
+        params = dict(params, key=self.api_key)
+        delay = self.page_token_delay if "pagetoken" in params else 0.5
+        for attempt in range(MAX_RETRIES + 1):
+            resp = self._session.get(f"{self.base_url}/{endpoint}/json", params=params, timeout=self.timeout)
+            resp.raise_for_status()
+            data = resp.json()
+            status = data.get("status", "OK")
+            retryable = status == "OVER_QUERY_LIMIT" or (status == "INVALID_REQUEST" and "pagetoken" in params)
+            if not retryable or attempt == MAX_RETRIES:
+                return data
+            with self._lock:
+                self.stats["retries"] += 1
+            time.sleep(delay)
+            delay *= 2
+        return data
+
+    def text_search(self, query: str, max_results: int = 50) -> List[Dict[str, Any]]:
+        """Run a text search, following page tokens only while more results are needed
+
+        Args:
+            query: Search text, e.g. "masonry contractor near Barrie"
+            max_results: Stop once this many results are collected
+
+        Returns:
+            List of text-search results
+        """
+        out: List[Dict[str, Any]] = []
+        params: Dict[str, Any] = {"query": query}
+        for page in range(MAX_PAGES):
+            if page:
+                # A new token takes a moment to become valid; _get retries with backoff
+                time.sleep(self.page_token_delay)
+            data = self._get("textsearch", params)
+            self.stats["text_search_requests"] += 1
+            out.extend(data.get("results", []))
+            token = data.get("next_page_token")
+            if len(out) >= max_results or not token:
+                break
+            params = {"pagetoken": token}
+        return out[:max_results]
+
+    def place_details(self, place_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get Place Details, serving from cache when the cached entry covers the fields
+
+        Args:
+            place_id: Google place id
+            fields: Fields to request (defaults to DETAIL_FIELDS)
+
+        Returns:
+            Details result dictionary (may include cached extra fields)
+
+        Raises:
+            PlacesAPIError: The lookup did not return status OK (nothing is cached)
+        """
+        fields = list(fields or DETAIL_FIELDS)
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(place_id)
+            if entry and now - entry.get("fetched_at", 0) < self.cache_ttl:
+                needed = [f for f in fields if f not in entry.get("fields", [])]
+                if not needed:
+                    self.stats["cache_hits"] += 1
+                    return dict(entry["result"])
+                fields = needed
+            else:
+                entry = None
+
+        data = self._get("details", {"place_id": place_id, "fields": ",".join(fields)})
+        with self._lock:
+            self.stats["details_requests"] += 1
+            self.stats["fields_requested"] += len(fields)
+        status = data.get("status", "OK")
+        if status != "OK":
+            # Caching an empty result would hide the place for the whole TTL
+            message = data.get("error_message") or ""
+            logger.warning(f"Details lookup for {place_id} returned {status} {message}".rstrip())
+            raise PlacesAPIError(f"{status}: {message}" if message else status)
+        result = data.get("result", {}) or {}
+        with self._lock:
+            if entry:
+                merged = dict(entry["result"], **result)
+                known = sorted(set(entry.get("fields", [])) | set(fields))
+            else:
+                merged, known = result, sorted(fields)
+            self._cache[place_id] = {"result": merged, "fields": known, "fetched_at": now}
+        return dict(merged)
+
+    def details_for(self, basics: List[Dict[str, Any]], wanted: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Fill in missing detail fields for text-search results concurrently
+
+        Args:
+            basics: Text-search results
+            wanted: Fields the caller needs (defaults to DETAIL_FIELDS)
+
+        Returns:
+            One merged dictionary per input (text-search values, overlaid with details)
+        """
+        def fill(basic: Dict[str, Any]) -> Dict[str, Any]:
+            place_id = basic.get("place_id")
+            fields = missing_fields(basic, wanted)
+            if not place_id or not fields:
+                return dict(basic)
+            try:
+                return dict(basic, **self.place_details(place_id, fields))
+            except Exception as e:
+                logger.error(f"Details lookup failed for {basic.get('name')}: {e}")
+                return dict(basic)
+
+        if not basics:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(basics))) as pool:
+            merged = list(pool.map(fill, basics))
+        self.save_cache()
+        return merged
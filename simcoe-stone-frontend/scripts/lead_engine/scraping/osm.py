@@ -15,6 +15,7 @@ import logging
 import hashlib
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List, Tuple
+from modules.data.scoring import apply_scores
 from modules.utils.config import (
     USER_AGENT,
     NOMINATIM_URL,
@@ -204,16 +205,11 @@ def scrape_contractors(city_name: str, bbox: Tuple[float, float, float, float])
                         "craft_type": f"{tag_key}:{tag_value}",
                         "source": "OSM_Auto",
                         "status": "scraped",
-                        "score": 5,  # Base score
                         "latitude": lat,
                         "longitude": lon,
                         "scraped_at": datetime.now().isoformat()
                     }
                     
-                    # Score based on available contact info
-                    if contractor["phone"]: contractor["score"] += 2
-                    if contractor["email"]: contractor["score"] += 2
-                    if contractor["website"]: contractor["score"] += 3
                     
                     # Deduplicate based on name within the same service area
                     if not any(c["name"] == name and c.get("service_area") == city_name for c in contractors):
@@ -226,6 +222,8 @@ def scrape_contractors(city_name: str, bbox: Tuple[float, float, float, float])
             logger.error(f"Error querying OSM for {tag_key}={tag_value} in {city_name}: {e}")
             time.sleep(DELAY_BETWEEN_REQUESTS * 2)  # Longer delay after error
     
+    apply_scores(contractors, "contact")
+
     # Cache the results
     if contractors:
         try:
@@ -337,7 +335,6 @@ def search_nearby_contractors(lat: float, lon: float, radius_km: float = 5) -> L
                         "craft_type": f"{tag_key}:{tag_value}",
                         "source": "OSM_NearbySearch",
                         "status": "scraped",
-                        "score": 5,  # Base score
                         "latitude": element_lat,
                         "longitude": element_lon,
                         "distance_km": None,  # Will calculate below if coordinates available
@@ -366,10 +363,6 @@ def search_nearby_contractors(lat: float, lon: float, radius_km: float = 5) -> L
                         except Exception as e:
                             logger.warning(f"Error calculating distance: {e}")
                     
-                    # Score based on available contact info and distance
-                    if contractor["phone"]: contractor["score"] += 2
-                    if contractor["email"]: contractor["score"] += 2
-                    if contractor["website"]: contractor["score"] += 3
                     
                     # Deduplicate based on name
                     if not any(c["name"] == name for c in contractors):
@@ -382,6 +375,8 @@ def search_nearby_contractors(lat: float, lon: float, radius_km: float = 5) -> L
             logger.error(f"Error querying OSM for {tag_key}={tag_value} near ({lat}, {lon}): {e}")
             time.sleep(DELAY_BETWEEN_REQUESTS * 2)  # Longer delay after error
     
+    apply_scores(contractors, "contact")
+
     # Sort by distance if available
     contractors = sorted(contractors, key=lambda x: x.get("distance_km", float('inf')) if x.get("distance_km") is not None else float('inf'))
     
@@ -0,0 +1,464 @@
+"""
+Website Enrichment Crawler
+
+Fetches contractor websites and extracts enrichment signals:
+1. Concurrent fetching on an asyncio loop with per-domain politeness delays,
+   shared between crawlers through a DomainThrottle
+2. Streamed responses with a hard size cap and incremental decoding
+3. A single HTML parse pass collecting emails, social links, logo, recent
+   activity and visible text together
+4. Keyword scoring against a corpus-level IDF table that is updated once per
+   crawl batch and persisted in the cache directory
+5. Conditional-GET revalidation: ETag/Last-Modified and a content hash are kept
+   per URL, so unchanged sites cost a 304 (or a hash check) instead of a re-parse
+"""
+
+import asyncio
+import codecs
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+try:
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+except ImportError:
+    ENGLISH_STOP_WORDS = frozenset()
+
+logger = logging.getLogger("Website_Crawler")
+
+# Cache directory (shared with the OSM scraper)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cache")
+IDF_CACHE_FILE = os.path.join(CACHE_DIR, "keyword_idf.json")
+VALIDATOR_CACHE_FILE = os.path.join(CACHE_DIR, "website_validators.json")
+
+# Crawl parameters
+REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "15"))
+MAX_CONCURRENCY = 8
+PER_DOMAIN_DELAY = 1.0  # Seconds between requests to the same host
+MAX_RESPONSE_BYTES = 1_500_000
+CHUNK_SIZE = 16 * 1024
+USER_AGENT = "Mozilla/5.0"
+
+EMAIL_REGEX = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+TOKEN_REGEX = re.compile(r"[a-z][a-z'-]{3,}")
+SOCIAL_DOMAINS = ["instagram.com", "facebook.com", "tiktok.com", "linkedin.com", "x.com", "twitter.com", "youtube.com"]
+RECENT_ACTIVITY_HINTS = ["blog", "news", "post", "update"]
+KEYWORD_SERVICE_HINTS = [
+    "masonry", "stone", "chimney", "fireplace", "restoration", "repair", "construction",
+    "facade", "foundation", "wall", "patio", "outdoor", "indoor", "limestone", "granite",
+    "marble", "veneer", "custom"
+]
+STOP_WORDS = frozenset(ENGLISH_STOP_WORDS) | {
+    "about", "after", "also", "been", "from", "have", "here", "into", "more", "only", "other",
+    "over", "such", "than", "that", "their", "them", "then", "there", "these", "they", "this",
+    "those", "very", "what", "when", "where", "which", "will", "with", "your", "yours", "home",
+    "page", "contact", "copyright", "rights", "reserved", "menu", "click",
+}
+_SKIP_TEXT_TAGS = {"script", "style", "noscript", "template", "svg"}
+
+
+def empty_enrichment() -> Dict[str, Any]:
+    """Enrichment payload shape used when a site yields nothing"""
+    return {"emails": [], "links": {}, "logo": None, "service_keywords": [], "recent_activity": None}
+
+
+class _EnrichmentParser(HTMLParser):
+    """Single-pass collector for every enrichment signal on a page"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.emails = set()
+        self.links: Dict[str, str] = {}
+        self.logo: Optional[str] = None
+        self.first_image: Optional[str] = None
+        self.recent_activity: Optional[str] = None
+        self.text_parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TEXT_TAGS:
+            self._skip_depth += 1
+            return
+        attrs = dict(attrs)
+        if tag == "a":
+            href = (attrs.get("href") or "").strip()
+            if not href:
+                return
+            lowered = href.lower()
+            if lowered.startswith("mailto:"):
+                self.emails.update(EMAIL_REGEX.findall(href))
+                return
+            for domain in SOCIAL_DOMAINS:
+                if domain in lowered:
+                    self.links[domain.split(".")[0]] = href
+            if self.recent_activity is None and any(x in lowered for x in RECENT_ACTIVITY_HINTS):
+                self.recent_activity = lowered
+        elif tag == "img":
+            src = (attrs.get("src") or "").strip()
+            if not src:
+                return
+            if self.first_image is None:
+                self.first_image = src
+            if self.logo is None and ("logo" in src.lower() or "header" in src.lower()):
+                self.logo = src
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TEXT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        data = data.strip()
+        if data:
+            self.text_parts.append(data)
+            if "@" in data:
+                self.emails.update(EMAIL_REGEX.findall(data))
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.text_parts)
+
+
+class KeywordIDF:
+    """Document-frequency table for keyword scoring across the crawled corpus
+
+    Safe to share between crawlers running in different threads.
+    """
+
+    def __init__(self, path: Optional[str] = IDF_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.doc_count = 0
+        self.doc_freq: Counter = Counter()
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.doc_count = int(data.get("doc_count", 0))
+                self.doc_freq = Counter(data.get("doc_freq", {}))
+            except Exception as e:
+                logger.warning(f"Could not load IDF table from {path}: {e}")
+
+    def add_documents(self, token_sets: Iterable[Iterable[str]]):
+        """Add a batch of documents (one set of distinct tokens each)"""
+        with self._lock:
+            for tokens in token_sets:
+                self.doc_count += 1
+                self.doc_freq.update(set(tokens))
+
+    def idf(self, term: str) -> float:
+        # Smoothed IDF, same form as scikit-learn's default
+        return math.log((1 + self.doc_count) / (1 + self.doc_freq.get(term, 0))) + 1
+
+    def top_terms(self, counts: Counter, k: int = 5) -> List[str]:
+        total = sum(counts.values()) or 1
+        scored = sorted(counts.items(), key=lambda kv: (-(kv[1] / total) * self.idf(kv[0]), kv[0]))
+        return [term for term, _ in scored[:k]]
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with self._lock:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"doc_count": self.doc_count, "doc_freq": dict(self.doc_freq)}, f)
+                os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning(f"Could not save IDF table to {self.path}: {e}")
+
+
+class ValidatorCache:
+    """Per-URL HTTP validators, content hash and last enrichment payload
+
+    Safe to share between crawlers running in different threads.
+    """
+
+    def __init__(self, path: Optional[str] = VALIDATOR_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                logger.warning(f"Could not load validator cache from {path}: {e}")
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(url)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a cached URL"""
+        entry = self.entries.get(url) or {}
+        headers = {}
+        if entry.get("enrichment") is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, etag: Optional[str], last_modified: Optional[str], content_hash: str,
+              size: int, enrichment: Dict[str, Any]):
+        entry = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_hash": content_hash,
+            "size": size,
+            "enrichment": enrichment,
+            "checked_at": time.time(),
+        }
+        with self._lock:
+            self.entries[url] = entry
+
+    def touch(self, url: str):
+        with self._lock:
+            if url in self.entries:
+                self.entries[url]["checked_at"] = time.time()
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with self._lock:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self.entries, f)
+                os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning(f"Could not save validator cache to {self.path}: {e}")
+
+
+class DomainThrottle:
+    """Earliest next request time per domain
+
+    Safe to share between crawlers running in different threads (and event loops),
+    so concurrent per-city crawls stay polite to a host they have in common.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next: Dict[str, float] = {}
+
+    def reserve(self, domain: str, delay: float) -> float:
+        """Claim the next request slot for a domain; returns seconds to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(domain, 0.0))
+            self._next[domain] = start + delay
+            return start - now
+
+    def release(self, domain: str, delay: float):
+        """Push the domain's next slot to `delay` after a request finished"""
+        with self._lock:
+            self._next[domain] = max(self._next.get(domain, 0.0), time.monotonic() + delay)
+
+
+class _FetchResult:
+    """Outcome of one (possibly conditional) page fetch"""
+
+    __slots__ = ("status", "body", "encoding", "etag", "last_modified", "content_hash", "truncated")
+
+    def __init__(self, status: str, body: bytes = b"", encoding: Optional[str] = None,
+                 etag: Optional[str] = None, last_modified: Optional[str] = None, truncated: bool = False):
+        self.status = status  # "ok", "not_modified", "non_html"
+        self.body = body
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = hashlib.sha256(body).hexdigest() if body else ""
+        self.truncated = truncated
+
+
+def tokenize(text: str) -> Counter:
+    """Term counts for keyword scoring (lowercase words, stop words removed)"""
+    return Counter(t for t in TOKEN_REGEX.findall(text.lower()) if t not in STOP_WORDS)
+
+
+class WebsiteCrawler:
+    """Polite concurrent crawler producing website enrichment payloads"""
+
+    def __init__(
+        self,
+        concurrency: int = MAX_CONCURRENCY,
+        per_domain_delay: float = PER_DOMAIN_DELAY,
+        max_bytes: int = MAX_RESPONSE_BYTES,
+        timeout: int = REQUEST_TIMEOUT,
+        idf: Optional[KeywordIDF] = None,
+        validators: Optional[ValidatorCache] = None,
+        throttle: Optional[DomainThrottle] = None,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.per_domain_delay = per_domain_delay
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.idf = idf if idf is not None else KeywordIDF()
+        self.validators = validators if validators is not None else ValidatorCache()
+        self.throttle = throttle if throttle is not None else DomainThrottle()
+        self.stats = {
+            "fetched": 0, "failed": 0, "truncated": 0, "skipped_non_html": 0, "bytes": 0,
+            "not_modified": 0, "unchanged": 0, "parsed": 0, "bytes_saved": 0,
+        }
+        self._domain_locks: Dict[str, asyncio.Lock] = {}
+
+    def _fetch(self, url: str) -> _FetchResult:
+        """Stream a page (conditionally, if validators are cached) up to the size cap"""
+        headers = {"User-Agent": USER_AGENT}
+        headers.update(self.validators.conditional_headers(url))
+        with requests.get(url, timeout=self.timeout, headers=headers, stream=True) as r:
+            if r.status_code == 304:
+                return _FetchResult("not_modified")
+            r.raise_for_status()
+            content_type = r.headers.get("Content-Type", "text/html").lower()
+            if "html" not in content_type and "text" not in content_type:
+                return _FetchResult("non_html")
+            chunks = []
+            received = 0
+            truncated = False
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                if not chunk:
+                    continue
+                if received + len(chunk) > self.max_bytes:
+                    chunk = chunk[:self.max_bytes - received]
+                    truncated = True
+                received += len(chunk)
+                chunks.append(chunk)
+                if received >= self.max_bytes:
+                    break
+            return _FetchResult(
+                "ok", b"".join(chunks), r.encoding,
+                etag=r.headers.get("ETag"), last_modified=r.headers.get("Last-Modified"), truncated=truncated,
+            )
+
+    @staticmethod
+    def _parse(body: bytes, encoding: Optional[str]) -> _EnrichmentParser:
+        """Decode incrementally and feed the parser chunk by chunk"""
+        try:
+            decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        parser = _EnrichmentParser()
+        for start in range(0, len(body), CHUNK_SIZE):
+            parser.feed(decoder.decode(body[start:start + CHUNK_SIZE]))
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+        return parser
+
+    async def _polite_fetch(self, url: str, sem: asyncio.Semaphore) -> Optional[_FetchResult]:
+        domain = urlparse(url).netloc.lower()
+        lock = self._domain_locks.setdefault(domain, asyncio.Lock())
+        async with lock:
+            # Wait out the politeness delay without holding a fetch slot
+            wait = self.throttle.reserve(domain, self.per_domain_delay)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                async with sem:
+                    result = await asyncio.to_thread(self._fetch, url)
+                self.stats["fetched"] += 1
+                return result
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.warning(f"Website enrichment failed for {url}: {e}")
+                return None
+            finally:
+                self.throttle.release(domain, self.per_domain_delay)
+
+    def _build_enrichment(self, parser: _EnrichmentParser, counts: Counter) -> Dict[str, Any]:
+        text = parser.text.lower()
+        keywords = {kw for kw in KEYWORD_SERVICE_HINTS if kw in text}
+        keywords.update(self.idf.top_terms(counts, k=5))
+        return {
+            "emails": sorted(parser.emails),
+            "links": parser.links,
+            "logo": parser.logo or parser.first_image,
+            "service_keywords": sorted(keywords),
+            "recent_activity": parser.recent_activity,
+        }
+
+    async def crawl(self, urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Crawl websites concurrently, revalidating previously seen URLs
+
+        Args:
+            urls: Website URLs (duplicates are fetched once)
+
+        Returns:
+            Dictionary mapping each URL to its enrichment payload
+        """
+        unique = [u for u in dict.fromkeys(u for u in urls if u)]
+        # asyncio primitives belong to one event loop; crawl_sync starts a new loop per call
+        self._domain_locks = {}
+        sem = asyncio.Semaphore(self.concurrency)
+        fetched = await asyncio.gather(*(self._polite_fetch(u, sem) for u in unique))
+
+        results: Dict[str, Dict[str, Any]] = {}
+        to_parse = []
+        for url, res in zip(unique, fetched):
+            cached = self.validators.get(url)
+            if res is None:
+                results[url] = empty_enrichment()
+            elif res.status == "non_html":
+                self.stats["skipped_non_html"] += 1
+                results[url] = empty_enrichment()
+            elif res.status == "not_modified" and cached:
+                self.stats["not_modified"] += 1
+                self.stats["bytes_saved"] += cached.get("size", 0)
+                self.validators.touch(url)
+                results[url] = cached["enrichment"]
+            elif cached and cached.get("content_hash") == res.content_hash and cached.get("enrichment") is not None:
+                # Server ignored the validators but the page is byte-identical
+                self.stats["unchanged"] += 1
+                self.stats["bytes"] += len(res.body)
+                self.validators.store(url, res.etag, res.last_modified, res.content_hash,
+                                      len(res.body), cached["enrichment"])
+                results[url] = cached["enrichment"]
+            elif res.status == "ok":
+                self.stats["bytes"] += len(res.body)
+                self.stats["truncated"] += int(res.truncated)
+                to_parse.append((url, res, self._parse(res.body, res.encoding)))
+            else:
+                results[url] = empty_enrichment()
+
+        # Update the corpus statistics once for the whole batch, then score
+        counts = {url: tokenize(parser.text) for url, _, parser in to_parse}
+        if counts:
+            self.idf.add_documents(c.keys() for c in counts.values())
+            self.idf.save()
+        for url, res, parser in to_parse:
+            self.stats["parsed"] += 1
+            enrichment = self._build_enrichment(parser, counts[url])
+            self.validators.store(url, res.etag, res.last_modified, res.content_hash, len(res.body), enrichment)
+            results[url] = enrichment
+
+        self.validators.save()
+        return results
+
+    def crawl_sync(self, urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Blocking wrapper around `crawl()` for synchronous callers"""
+        return asyncio.run(self.crawl(urls))
+
+
+def enrich_websites(urls: Iterable[str], **kwargs) -> Dict[str, Dict[str, Any]]:
+    """Crawl a batch of websites and return enrichment payloads keyed by URL"""
+    return WebsiteCrawler(**kwargs).crawl_sync(urls)
+
+
+def enrich_website(url: str, **kwargs) -> Dict[str, Any]:
+    """Crawl a single website and return its enrichment payload"""
+    return enrich_websites([url], **kwargs).get(url, empty_enrichment())
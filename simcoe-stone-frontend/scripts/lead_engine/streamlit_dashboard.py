@@ -26,6 +26,7 @@ if current_dir not in sys.path:
 
 # Import UI components
 from ui.streamlit_components import setup_page_config, add_custom_css
+from ui.data_layer import render_timings_panel
 
 # Import page modules
 from pages.dashboard import render_dashboard_page
@@ -57,6 +58,7 @@ def main():
         import traceback
         st.error(f"Error rendering page '{selection}': {e}")
         st.code(traceback.format_exc())
+    render_timings_panel()
     st.sidebar.markdown("---")
     st.sidebar.markdown("© 2025 Simcoe Stone")
 
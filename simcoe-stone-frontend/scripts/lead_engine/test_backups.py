@@ -0,0 +1,95 @@
+"""
+Test script for deduplicated lead backup snapshots
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.data.backups import BackupStore
+from modules.data.sync import DataSyncManager
+
+
+def _leads(n):
+    return pd.DataFrame({
+        "name": [f"Contractor {i}" for i in range(n)],
+        "service_area": np.where(np.arange(n) % 2 == 0, "Barrie", "Orillia"),
+        "phone": [f"705-555-{i % 10000:04d}" for i in range(n)],
+        "score": np.arange(n) % 10,
+    })
+
+
+def test_snapshots_share_unchanged_chunks():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BackupStore(tmp)
+        leads = _leads(30000)
+        first = store.create(leads)
+        assert len(first["chunks"]) > 3 and first["new_bytes"] == first["bytes"]
+
+        # Append a few rows and edit one: only the touched chunks are written again
+        edited = pd.concat([leads, _leads(30010).iloc[30000:]], ignore_index=True)
+        edited.loc[100, "phone"] = "705-555-9999"
+        second = store.create(edited, name="after edit")
+        shared = set(first["chunks"]) & set(second["chunks"])
+        assert len(shared) >= len(first["chunks"]) - 2
+        assert second["new_bytes"] < second["bytes"] / 3
+
+        restored = store.restore(second["id"])
+        pd.testing.assert_frame_equal(restored, edited, check_dtype=False)
+        assert restored["score"].dtype == edited["score"].dtype
+        assert [s["name"] for s in store.list()] == ["after edit", first["id"]]
+
+
+def test_retention_and_chunk_gc():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BackupStore(tmp, retention={"keep_last": 2, "keep_daily": 3, "keep_weekly": 0})
+        start = datetime(2026, 1, 1, 9)
+        for i in range(6):
+            # Two snapshots per day over three days, each with different content
+            store.create(_leads(100 + i), created_at=start + timedelta(days=i // 2, hours=i % 2))
+        removed = store.apply_retention()
+        kept = [s["id"] for s in store.list()]
+        assert kept == ["20260103_100000", "20260103_090000", "20260102_100000", "20260101_100000"]
+        assert sorted(removed) == ["20260101_090000", "20260102_090000"]
+        chunk_files = [f for _, _, files in os.walk(store.chunk_dir) for f in files]
+        assert len(chunk_files) == 4
+
+
+def test_sync_manager_backup_api_and_csv_conversion():
+    with tempfile.TemporaryDirectory() as tmp:
+        backup_dir = os.path.join(tmp, "backups")
+        os.makedirs(backup_dir)
+        _leads(5).to_csv(os.path.join(backup_dir, "leads_backup_20250101_120000.csv"), index=False)
+        sync = DataSyncManager(data_dir=tmp, leads_csv=os.path.join(tmp, "lead_records.csv"))
+        assert sync.get_backup_files() == [os.path.join(backup_dir, "leads_backup_20250101_120000.csv")]
+
+        # CSV backups are left alone until converted explicitly
+        assert sync.backup_leads(_leads(3), name="manual")
+        assert len(sync.get_backup_files()) == 2 and sync.get_backup_files()[1].endswith(".csv")
+        assert sync.convert_csv_backups() == 1
+        files = sync.get_backup_files()
+        assert [os.path.basename(f) for f in files][1] == "20250101_120000"
+        assert not any(f.endswith(".csv") for f in os.listdir(backup_dir))
+        assert len(sync.restore_from_backup(files[0])) == 3
+        assert len(sync.restore_from_backup(files[1])) == 5
+        assert sync.restore_from_backup(os.path.join(backup_dir, "nope")).empty
+        sync.store.close()
+
+
+def main():
+    """Main test function"""
+    print("Testing backup snapshots...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Test script for the per-municipality business count table
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.data.business_counts import BusinessCountStore
+
+
+def test_record_inserts_accumulates_by_craft():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BusinessCountStore(os.path.join(tmp, "counts.sqlite3"))
+        store.record_inserts([
+            {"name": "A", "service_area": "Barrie", "craft_type": "craft:stonemason"},
+            {"name": "B", "service_area": "Barrie", "craft_type": "craft:carpenter"},
+            {"name": "C", "service_area": "Orillia"},
+            {"name": "D", "service_area": ""},
+        ])
+        assert store.record_inserts([{"name": "E", "craft_type": "craft:stonemason"}], municipality="Barrie") == 1
+        assert store.totals() == {"Barrie": 3, "Orillia": 1}
+        assert store.by_craft("Barrie") == {"Barrie": {"craft:stonemason": 2, "craft:carpenter": 1}}
+        assert store.by_craft()["Orillia"] == {"unknown": 1}
+        store.close()
+
+
+def test_backfill_from_log_is_incremental():
+    with tempfile.TemporaryDirectory() as tmp:
+        log = os.path.join(tmp, "osm_scraper.log")
+        with open(log, "w", encoding="utf-8") as f:
+            f.write("2024-01-01 INFO Barrie: inserted 4\n")
+            f.write("Found 7 contractors in Orillia\n")
+            f.write("2024-01-02 INFO Barrie: inserted 5\n")
+        store = BusinessCountStore(os.path.join(tmp, "counts.sqlite3"))
+        store.record_inserts([{"service_area": "Orillia"}])
+        # Orillia is already counted by the table, so only Barrie is imported
+        assert store.backfill_from_log(log) == 1
+        assert store.totals() == {"Barrie": 5, "Orillia": 1}
+        assert store.backfill_from_log(log) == 0
+        with open(log, "a", encoding="utf-8") as f:
+            f.write("Found 2 contractors in Midland\n")
+        assert store.backfill_from_log(log) == 1
+        assert store.totals()["Midland"] == 2
+        store.close()
+
+
+def main():
+    """Main test function"""
+    print("Testing business counts...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
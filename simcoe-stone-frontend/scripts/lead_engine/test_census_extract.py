@@ -0,0 +1,116 @@
+"""
+Test script for the streaming census profile extractor
+"""
+
+import csv
+import io
+import os
+import sys
+import tempfile
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extract_census_population import extract, load_level, member_pairs, read_geo_blocks
+
+GEOS = [
+    ("2021A000011124", "Canada", "Country"),
+    ("2021A000235", "Ontario", "Province"),
+    ("2021A00053543042", "Barrie", "Census subdivision"),
+    ("2021A000260", "Yukon", "Territory"),
+    ("2021A00056001009", "Whitehorse", "Census subdivision"),
+]
+CHARACTERISTICS = ["Population, 2021", "  Median age", "Median age"]
+
+
+def _member_texts(geos):
+    data = io.StringIO()
+    writer = csv.writer(data, lineterminator="\r\n")
+    writer.writerow(["CENSUS_YEAR", "DGUID", "ALT_GEO_CODE", "GEO_LEVEL", "GEO_NAME", "TNR_SF", "TNR_LF",
+                     "DATA_QUALITY_FLAG", "CHARACTERISTIC_ID", "CHARACTERISTIC_NAME", "CHARACTERISTIC_NOTE",
+                     "C1_COUNT_TOTAL", "SYMBOL"])
+    starts = io.StringIO()
+    starts_writer = csv.writer(starts, lineterminator="\r\n")
+    starts_writer.writerow(["Geo Code", "Geo Name", "Line Number"])
+    line = 2
+    for dguid, name, level in geos:
+        g = GEOS.index((dguid, name, level))
+        starts_writer.writerow([dguid, name, line])
+        for c, char in enumerate(CHARACTERISTICS):
+            value = "x" if (name, c) == ("Whitehorse", 1) else str(1000 * (g + 1) + c)
+            writer.writerow([2021, dguid, "", level, name, "", "", "", c + 1, char, "", value, ""])
+            line += 1
+    return data.getvalue().encode("latin1"), starts.getvalue().encode("latin1")
+
+
+def _write_zip(path, regions=None):
+    """One data/Geo_starting_row pair, or one pair per region like the CSD download"""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for region, geos in (regions or {"": GEOS}).items():
+            suffix = f"_{region}" if region else ""
+            data, starts = _member_texts(geos)
+            zf.writestr(f"98-401-X2021005_English_CSV_data{suffix}.csv", data)
+            zf.writestr(f"98-401-X2021005_Geo_starting_row{suffix}.CSV", starts)
+
+
+def test_geo_blocks_from_starting_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "profile.zip")
+        _write_zip(zip_path)
+        with zipfile.ZipFile(zip_path) as zf:
+            blocks = read_geo_blocks(zf)
+        assert [b[1] for b in blocks] == [g[1] for g in GEOS]
+        assert [b[2] for b in blocks] == [2, 5, 8, 11, 14]
+        assert all(b[3] == 3 for b in blocks)
+
+
+def test_extract_province_and_csd_levels():
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "profile.zip")
+        _write_zip(zip_path)
+        wide_csv = os.path.join(tmp, "wide.csv")
+        counts = extract(zip_path, os.path.join(tmp, "out"), wide_csv=wide_csv)
+        assert counts == {"province": 2, "csd": 2}
+
+        matrix, labels = load_level("csd", os.path.join(tmp, "out"))
+        assert labels["geo_names"] == ["Barrie", "Whitehorse"]
+        assert labels["characteristic_names"] == ["Population, 2021", "Median age", "Median age"]
+        assert matrix[0].tolist() == [3000.0, 3001.0, 3002.0]
+        assert matrix[1, 0] == 5000.0 and matrix[1, 1] != matrix[1, 1]  # non-numeric -> NaN
+
+        with open(wide_csv, "r", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        # Repeated characteristic names collapse to the last value, as in the old wide CSV
+        assert rows == [["province_territory", "Median age", "Population, 2021"],
+                        ["Ontario", "2002", "2000"], ["Yukon", "4002", "4000"]]
+
+
+def test_extract_regional_members():
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "profile.zip")
+        # Each regional member repeats the Canada row
+        _write_zip(zip_path, {"Territories": [GEOS[0]] + GEOS[3:], "Ontario": GEOS[:3]})
+        with zipfile.ZipFile(zip_path) as zf:
+            assert [data for _, data in member_pairs(zf)] == [
+                "98-401-X2021005_English_CSV_data_Ontario.csv", "98-401-X2021005_English_CSV_data_Territories.csv"]
+        counts = extract(zip_path, os.path.join(tmp, "out"), wide_csv=None)
+        assert counts == {"province": 2, "csd": 2}
+
+        matrix, labels = load_level("csd", os.path.join(tmp, "out"))
+        assert labels["geo_names"] == ["Barrie", "Whitehorse"]
+        assert matrix[0].tolist() == [3000.0, 3001.0, 3002.0] and matrix[1, 0] == 5000.0
+        _, labels = load_level("province", os.path.join(tmp, "out"))
+        assert labels["geo_names"] == ["Ontario", "Yukon"]
+
+
+def main():
+    """Main test function"""
+    print("Testing census extractor...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
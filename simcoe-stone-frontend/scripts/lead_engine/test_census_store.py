@@ -0,0 +1,91 @@
+"""
+Test script for the columnar census store and threshold expressions
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.data.census_store import CensusStore, compile_threshold
+from modules.data.snapshot import load_snapshot
+
+
+def _store():
+    provinces = ["Ontario", "Yukon", "Quebec"]
+    columns = ["Total - Age", "Median income"]
+    values = np.array([[14223942, 41000], [40232, np.nan], [8501833, 37000]], dtype=float)
+    munis = ["Barrie", "Whitehorse", "Laval", "Orillia", "Atlantis"]
+    provs = ["Ontario", "Yukon", "Quebec", "Ontario", None]
+    return CensusStore(provinces, columns, values, munis, provs, [147829, 28201, 438366, 33411, 5])
+
+
+def test_threshold_expressions():
+    values = np.array([5.0, 50.0, 500.0, np.nan])
+    assert compile_threshold(">10")(values).tolist() == [False, True, True, False]
+    assert compile_threshold("<= 50")(values).tolist() == [True, True, False, False]
+    assert compile_threshold("10..100")(values).tolist() == [False, True, False, False]
+    assert compile_threshold(">10 and <100 or =5")(values).tolist() == [True, True, False, False]
+    assert compile_threshold(">1,000 OR <6")(values).tolist() == [True, False, False, False]
+    # != is the one comparison NaN satisfies in numpy; missing values still never match
+    assert compile_threshold("!=5")(values).tolist() == [False, True, True, False]
+    assert compile_threshold("!=0")(np.array([np.nan, 0, 1])).tolist() == [False, False, True]
+    for bad in ("", "big", ">", "10..x"):
+        try:
+            compile_threshold(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad!r} should not parse")
+
+
+def test_filter_uses_each_municipality_province():
+    store = _store()
+    assert store.filter(["Total - Age"], ">1000000") == ["Barrie", "Laval", "Orillia"]
+    # Every variable must pass; Yukon's missing income (NaN) never matches
+    assert store.filter(["Total - Age", "Median income"], ">30000") == ["Barrie", "Laval", "Orillia"]
+    assert store.filter(["Median income"], ">40000 or <1", match="any") == ["Barrie", "Orillia"]
+    assert store.filter(["population"], "100000..500000") == ["Barrie", "Laval"]
+    # Restricting to a batch keeps the batch order
+    assert store.filter(["Total - Age"], ">1000000", names=["Orillia", "Whitehorse", "Nowhere", "Barrie"]) == ["Orillia", "Barrie"]
+    # A selected province applies its census row to every municipality
+    assert store.filter(["Total - Age"], "<50000", province="Yukon") == store.municipalities
+
+
+def test_top_by_population():
+    store = _store()
+    assert [store.municipalities[i] for i in store.top_by_population("Ontario")] == ["Barrie", "Orillia"]
+    assert [store.municipalities[i] for i in store.top_by_population(limit=2)] == ["Laval", "Barrie"]
+    assert store.top_by_population("Atlantis") == []
+    assert store.province_of(4) is None
+
+
+def test_from_snapshot():
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = {k: os.path.join(tmp, k) for k in ("population", "census", "municipalities")}
+        with open(sources["population"], "w", encoding="utf-8") as f:
+            f.write("municipality,population\nBarrie,147829\nWhitehorse,28201\n")
+        with open(sources["census"], "w", encoding="utf-8") as f:
+            f.write("province_territory,Total - Age\nOntario,14223942\nYukon,40232\n")
+        with open(sources["municipalities"], "w", encoding="utf-8") as f:
+            f.write("Whitehorse\nBarrie\nNewtown\n")
+        snap = load_snapshot(os.path.join(tmp, "snap.bin"), sources)
+        provinces = {"Barrie": "Ontario", "Whitehorse": "Yukon"}
+        store = CensusStore.from_snapshot(snap, snap.municipalities, provinces.get)
+        assert store.population.tolist() == [28201, 147829, 0]
+        assert store.filter(["Total - Age"], ">100000") == ["Barrie"]
+
+
+def main():
+    """Main test function"""
+    print("Testing census store...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
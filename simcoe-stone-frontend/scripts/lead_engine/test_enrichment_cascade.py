@@ -0,0 +1,83 @@
+"""
+Test script for the heuristic-first enrichment cascade
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from enrichers import selector
+from enrichers.llm_enricher import heuristic_confidence
+
+
+def test_heuristic_confidence_ranks_signals():
+    stone_both = heuristic_confidence({"name": "Barrie Stone Works", "craft_type": "craft:stonemason"})
+    stone_tag = heuristic_confidence({"name": "Barrie Works", "craft_type": "craft:stonemason"})
+    stone_name = heuristic_confidence({"name": "Stone Co"})
+    construction = heuristic_confidence({"name": "Acme Construction", "craft_type": "office:construction"})
+    trade = heuristic_confidence({"name": "Top Roofing", "craft_type": "craft:roofer"})
+    generic = heuristic_confidence({"name": "Acme"})
+    assert stone_both > stone_tag > stone_name > construction > generic > trade
+    assert all(0 <= c <= 1 for c in (stone_both, trade, generic))
+
+
+def test_cascade_accepts_escalates_and_counts():
+    llm_calls = []
+
+    def fake_ollama(lead, model=None, host=None):
+        llm_calls.append(lead["name"])
+        if lead["name"] == "Offline Tile":
+            return dict(lead, enriched_by="ollama_error")
+        return dict(lead, category="roofing", enriched_by="ollama")
+
+    saved = selector.enrich_lead_ollama
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "config.json")
+        with open(config_path, "w") as f:
+            json.dump({"enrichment_provider": "ollama", "enrichment_cascade": True, "cascade_threshold": 0.7}, f)
+        selector.enrich_lead_ollama = fake_ollama
+        selector.reset_cascade_stats()
+        try:
+            # Confident heuristic answer: no LLM call
+            accepted = selector.enrich_lead_with_selector(
+                {"name": "Barrie Stone Works", "craft_type": "craft:stonemason", "service_area": "Barrie"}, config_path)
+            assert accepted["enriched_by"] == "heuristic" and accepted["cascade_confidence"] >= 0.7
+            assert llm_calls == []
+
+            # Low confidence: escalated to the LLM
+            escalated = selector.enrich_lead_with_selector(
+                {"name": "Top Roofing", "craft_type": "craft:roofer", "service_area": "Orillia"}, config_path)
+            assert escalated["enriched_by"] == "ollama" and escalated["category"] == "roofing"
+            assert escalated["cascade_confidence"] < 0.7
+
+            # Escalation that fails falls back to the heuristic answer
+            fallback = selector.enrich_lead_with_selector(
+                {"name": "Offline Tile", "craft_type": "craft:tiler", "service_area": "Orillia"}, config_path)
+            assert fallback["enriched_by"] == "heuristic"
+            assert llm_calls == ["Top Roofing", "Offline Tile"]
+
+            stats = selector.get_cascade_stats()
+            assert (stats["total"], stats["escalated"], stats["escalation_failed"]) == (3, 2, 1)
+            assert stats["threshold"] == 0.7 and stats["escalation_rate"] == 0.6667
+            selector.reset_cascade_stats()
+            stats = selector.get_cascade_stats()
+            assert stats["total"] == 0 and stats["escalation_rate"] == 0.0 and stats["threshold"] == 0.7
+        finally:
+            selector.enrich_lead_ollama = saved
+            selector.reset_cascade_stats()
+
+
+def main():
+    """Main test function"""
+    print("Testing enrichment cascade...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Test script for the checkpointed lead generation pipeline
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generate_leads as gl
+from modules.data.checkpoints import PipelineRun, list_runs, prune_runs
+from modules.data.sync import DataSyncManager
+
+
+def test_resume_continues_from_failed_enrichment():
+    calls = {"scrape": [], "enrich": []}
+
+    def scrape(city, bbox):
+        calls["scrape"].append(city)
+        return [{"name": f"{city} Stone {i}", "service_area": city} for i in range(3)]
+
+    def enrich(lead, config_path):
+        calls["enrich"].append(lead["name"])
+        if len(calls["enrich"]) == 4 and fail["on"]:
+            raise RuntimeError("enricher went away")
+        return dict(lead, notes="enriched")
+
+    fail = {"on": True}
+    patched = {
+        "get_city_bbox": lambda city: (0, 0, 1, 1) if city != "Nowhere" else None,
+        "scrape_contractors": scrape,
+        "enrich_lead_with_selector": enrich,
+        "ENRICH_AVAILABLE": True,
+        "get_cascade_stats": lambda: {"total": 3, "escalated": 1, "escalation_failed": 0, "threshold": 0.75},
+        "reset_cascade_stats": lambda: None,
+    }
+    saved = {name: getattr(gl, name) for name in list(patched) + ["RUNS_DIR", "STATS_FILE", "DataSyncManager"]}
+    with tempfile.TemporaryDirectory() as tmp:
+        patched.update(
+            RUNS_DIR=os.path.join(tmp, "runs"),
+            STATS_FILE=os.path.join(tmp, "stats.json"),
+            DataSyncManager=lambda: DataSyncManager(data_dir=tmp, leads_csv=os.path.join(tmp, "leads.csv")),
+        )
+        for name, value in patched.items():
+            setattr(gl, name, value)
+        try:
+            stats = gl.generate_leads(cities=["Barrie", "Orillia", "Nowhere"], update_rag=False, per_hour_cap=5)
+            assert not stats["completed"]
+            assert stats["stages"]["scrape"]["status"] == "done" and stats["stages"]["enrich"]["status"] == "failed"
+            assert stats["cities_processed"] == 2 and stats["cities_failed"] == 1 and stats["total_leads"] == 6
+            assert len(list_runs(patched["RUNS_DIR"])) == 1
+
+            fail["on"] = False
+            stats = gl.generate_leads(resume="latest")
+            assert stats["completed"] and stats["new_leads"] == 5
+            # Cities and the three leads enriched before the failure are not redone
+            assert calls["scrape"] == ["Barrie", "Orillia"]
+            assert len(calls["enrich"]) == 6 and len(set(calls["enrich"])) == 5
+            assert stats["stages"]["enrich"]["attempts"] == 2 and stats["stages"]["index"]["status"] == "skipped"
+            # Cascade counters add up over both attempts of this run
+            assert stats["enrichment_cascade"]["total"] == 6 and stats["enrichment_cascade"]["escalation_rate"] == 0.3333
+
+            with open(patched["STATS_FILE"]) as f:
+                written = json.load(f)
+            assert set(written["stages"]) == set(gl.STAGES)
+            assert all(s["seconds"] >= 0 for s in written["stages"].values())
+            store = gl.DataSyncManager().store
+            assert store.count() == 5 and store.get("Barrie Stone 0", "Barrie")["notes"] == "enriched"
+            store.close()
+        finally:
+            for name, value in saved.items():
+                setattr(gl, name, value)
+
+
+def test_runs_artifacts_and_pruning():
+    with tempfile.TemporaryDirectory() as tmp:
+        run = PipelineRun.create(tmp, ["a", "b"], {"x": 1})
+        with run.stage("a") as stage:
+            run.save("out", [1, 2])
+            run.append("items", {"i": 1})
+            stage["items"] = 2
+        with open(os.path.join(run.path, "items.jsonl"), "a") as f:
+            f.write('{"i": 2')
+        reopened = PipelineRun.open(tmp)
+        assert reopened.run_id == run.run_id and reopened.next_stage() == "b"
+        assert reopened.load("out") == [1, 2] and list(reopened.records("items")) == [{"i": 1}]
+        assert reopened.params == {"x": 1}
+
+        reopened.skip("b", "not needed")
+        assert reopened.finished
+        second = PipelineRun.create(tmp, ["a"])
+        assert prune_runs(tmp, keep=0) == [run.run_id]
+        assert [r["run_id"] for r in list_runs(tmp)] == [second.run_id]
+
+
+def main():
+    """Main test function"""
+    print("Testing lead generation pipeline...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
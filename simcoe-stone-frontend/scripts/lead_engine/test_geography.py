@@ -0,0 +1,80 @@
+"""
+Test script for the municipality -> province resolver
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.data.geography import (
+    MANUAL_OVERRIDES, MISSING_INDEX_FALLBACK, MunicipalityResolver, load_resolver, normalize_municipality, split_province_suffix
+)
+
+ENTRIES = [
+    ("Barrie", "Ontario", 136063),
+    ("Trois-Rivières", "Quebec", 134413),
+    ("Richmond", "British Columbia", 198309),
+    ("Richmond", "Quebec", 3232),
+    ("Springfield", "Manitoba", 0),
+    ("Springfield", "Nova Scotia", 0),
+    ("Halifax", "Quebec", 0),
+]
+
+
+def test_normalize_municipality():
+    assert normalize_municipality("Trois-Rivières") == "trois rivieres"
+    assert normalize_municipality("  St. John's ") == normalize_municipality("Saint Johns")
+    assert normalize_municipality("Sainte-Anne-des-Monts") == "ste anne des monts"
+    assert split_province_suffix("Sudbury, ON") == ("Sudbury", "Ontario")
+    assert split_province_suffix("Moncton (New Brunswick)") == ("Moncton", "New Brunswick")
+    assert split_province_suffix("Barrie, Main St") == ("Barrie, Main St", None)
+
+
+def test_resolution_and_ambiguity():
+    resolver = MunicipalityResolver(ENTRIES, MANUAL_OVERRIDES)
+    assert resolver.resolve("barrie") == "Ontario"
+    assert resolver.resolve("Trois Rivieres") == "Quebec"
+    # Richmond BC dominates Richmond QC; Springfield is a genuine tie
+    assert resolver.resolve("Richmond") == "British Columbia"
+    assert resolver.resolve("Springfield") is None and resolver.is_ambiguous("Springfield")
+    assert resolver.candidates("Springfield") == ["Manitoba", "Nova Scotia"]
+    assert resolver.resolve("Springfield, NS") == "Nova Scotia"
+    # Overrides beat the index, and unknown names no longer fall back to Ontario
+    assert resolver.resolve("Halifax") == "Nova Scotia"
+    assert resolver.resolve("Atlantis") is None
+
+
+def test_load_resolver_reads_admin1_codes():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "provinces.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("municipality,province,population\nBarrie,08,136063\nKelowna,British Columbia,144576\n")
+        resolver = load_resolver(path)
+        assert resolver.resolve("Barrie") == "Ontario"
+        assert resolver.resolve("Kelowna") == "British Columbia"
+        assert resolver.resolve("Toronto") == "Ontario"
+        assert resolver.resolve("Atlantis") is None
+
+
+def test_missing_index_falls_back():
+    with tempfile.TemporaryDirectory() as tmp:
+        resolver = load_resolver(os.path.join(tmp, "missing.csv"))
+        assert resolver.resolve("Barrie") == MISSING_INDEX_FALLBACK
+        # Overrides and explicit suffixes still win
+        assert resolver.resolve("Vancouver") == "British Columbia"
+        assert resolver.resolve("Kelowna, BC") == "British Columbia"
+
+
+def main():
+    """Main test function"""
+    print("Testing municipality resolver...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
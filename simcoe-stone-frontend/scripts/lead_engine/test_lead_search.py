@@ -0,0 +1,125 @@
+"""
+Test script for lead store search (filters, full-text, facets, pagination)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.data.lead_store import LeadStore
+
+
+def test_filters_text_and_index_maintenance():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LeadStore(os.path.join(tmp, "leads.sqlite3"))
+        store.append([
+            {"name": "Barrie Stone Works", "service_area": "Barrie", "craft_type": "craft:stonemason",
+             "email": "info@stoneworks.ca", "score": 9, "source": "osm"},
+            {"name": "Wood Co", "service_area": "Orillia", "craft_type": "craft:carpenter",
+             "address": "12 Stonegate Rd", "score": 5, "source": "osm"},
+            {"name": "Lakeside Masonry", "service_area": "Barrie", "craft_type": "craft:stonemason",
+             "score": 7, "source": "google"},
+        ])
+        names = lambda df: df["name"].tolist()
+        assert names(store.search("ston")[0]) == ["Barrie Stone Works", "Wood Co"]
+        assert names(store.search("stoneworks.ca")[0]) == ["Barrie Stone Works"]
+        df, total = store.search(filters={"service_area": "Barrie"}, min_score=8)
+        assert names(df) == ["Barrie Stone Works"] and total == 1
+        df, total = store.search(filters={"source": ["osm", "google"]}, order_by="score", descending=True,
+                                 limit=2, offset=1)
+        assert names(df) == ["Lakeside Masonry", "Wood Co"] and total == 3
+        assert store.facets(["service_area", "source"]) == {
+            "service_area": [("Barrie", 2), ("Orillia", 1)], "source": [("osm", 2), ("google", 1)]}
+        assert store.score_range() == (5, 9)
+
+        # The full-text index follows updates, replacements and deletes
+        store.update("Wood Co", "Orillia", {"address": "1 Main St"})
+        store.append([{"name": "Lakeside Masonry", "service_area": "Barrie", "email": "hi@granite.ca"}], replace=True)
+        assert names(store.search("stonegate")[0]) == []
+        assert names(store.search("granite")[0]) == ["Lakeside Masonry"]
+        store.delete("Barrie Stone Works", "Barrie")
+        assert names(store.search("ston")[0]) == []
+        store.replace_all(store.read_frame())
+        assert names(store.search("granite")[0]) == ["Lakeside Masonry"]
+        store.close()
+
+
+def test_failed_bulk_write_keeps_index_triggers():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "leads.sqlite3")
+        store = LeadStore(path)
+        bulk = [{"name": f"Lead {i}", "service_area": "Barrie"} for i in range(1000)]
+        bulk[-1]["notes"] = object()  # cannot be bound: the write fails halfway
+        try:
+            store.append(bulk)
+        except Exception:
+            pass
+        else:
+            raise AssertionError("append should have failed")
+        assert store.count() == 0
+        triggers = store._conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger'").fetchone()[0]
+        assert triggers == 3
+        store.append([{"name": "Granite Works", "service_area": "Barrie"}])
+        assert store.search("granite")[1] == 1
+
+        # A store that lost its triggers gets them (and a rebuilt index) back on open
+        store._conn.execute("DROP TRIGGER leads_fts_ai")
+        store._conn.commit()
+        store.close()
+        store = LeadStore(path)
+        store.append([{"name": "Marble Co", "service_area": "Barrie"}])
+        assert store.search("marble")[1] == 1 and store.search("granite")[1] == 1
+        store.close()
+
+
+def test_search_stays_fast_at_100k_leads():
+    n = 100_000
+    rng = np.random.default_rng(0)
+    areas = np.array([f"Town {i}" for i in range(200)])
+    crafts = np.array(["craft:stonemason", "craft:carpenter", "craft:roofer", "shop:hardware"])
+    leads = pd.DataFrame({
+        "name": [f"Contractor {i} {'Stone' if i % 7 == 0 else 'Build'}" for i in range(n)],
+        "service_area": areas[rng.integers(0, len(areas), n)],
+        "craft_type": crafts[rng.integers(0, len(crafts), n)],
+        "email": [f"lead{i}@example.ca" for i in range(n)],
+        "source": np.where(np.arange(n) % 3 == 0, "google", "osm"),
+        "score": rng.integers(1, 11, n),
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LeadStore(os.path.join(tmp, "leads.sqlite3"))
+        store.append(leads)
+        start = time.perf_counter()
+        df, total = store.search("stone", filters={"service_area": "Town 5", "craft_type": "craft:stonemason"},
+                                 min_score=5, order_by="score", descending=True)
+        page_time = time.perf_counter() - start
+        assert total == len(df) or len(df) == 50
+        start = time.perf_counter()
+        df, total = store.search(filters={"source": "osm"}, limit=50, offset=5000)
+        assert len(df) == 50 and total == int((leads["source"] == "osm").sum())
+        filter_time = time.perf_counter() - start
+        start = time.perf_counter()
+        facets = store.facets()
+        facet_time = time.perf_counter() - start
+        assert sum(n for _, n in facets["craft_type"]) == 100_000
+        assert max(page_time, filter_time) < 0.5, (page_time, filter_time)
+        assert facet_time < 1.0, facet_time
+        store.close()
+
+
+def main():
+    """Main test function"""
+    print("Testing lead search...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
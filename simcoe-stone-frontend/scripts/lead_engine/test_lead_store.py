@@ -0,0 +1,114 @@
+"""
+Test script for the SQLite lead store behind DataSyncManager
+"""
+
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.data.lead_store import LeadStore
+from modules.data.sync import DataSyncManager
+
+
+def _leads():
+    return pd.DataFrame([
+        {"name": "Stone Co", "service_area": "Barrie", "craft_type": "craft:stonemason", "phone": "705-555-0100", "score": 9},
+        {"name": "Wood Co", "service_area": "Orillia", "craft_type": "craft:carpenter", "email": "w@wood.ca", "score": 5},
+    ])
+
+
+def test_point_lookup_update_and_append():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LeadStore(os.path.join(tmp, "leads.sqlite3"))
+        assert store.append(_leads()) == 2
+        assert store.get(" stone co ", "BARRIE")["phone"] == "705-555-0100"
+        assert store.update("Stone Co", "Barrie", {"status": "contacted", "rating": "A"})
+        lead = store.get("Stone Co", "Barrie")
+        assert lead["status"] == "contacted" and lead["rating"] == "A" and lead["score"] == 9
+        assert not store.update("Nobody", "Nowhere", {"status": "x"})
+        # Existing leads are kept unless replace=True
+        dup = [{"name": "Stone Co", "service_area": "Barrie", "phone": "1"}, {"name": "New Co", "service_area": "Midland"}]
+        assert store.append(dup) == 1
+        assert store.get("Stone Co", "Barrie")["phone"] == "705-555-0100"
+        store.append(dup[:1], replace=True)
+        assert store.get("Stone Co", "Barrie")["phone"] == "1"
+        assert store.count() == 3
+        assert store.read_frame("score >= ?", [5])["name"].tolist() == ["Wood Co"]
+        # The generation moves on writes from this store and from other connections
+        generation = store.generation
+        assert store.generation == generation
+        store.update("Wood Co", "Orillia", {"status": "won"})
+        assert store.generation != generation
+        generation = store.generation
+        other = LeadStore(store.path)
+        other.delete("New Co", "Midland")
+        other.close()
+        assert store.generation != generation
+        store.close()
+
+
+def test_extra_column_added_by_another_connection():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "leads.sqlite3")
+        first, second = LeadStore(path), LeadStore(path)
+        assert second.append([{"name": "Stone Co", "service_area": "Barrie", "type": "osm"}]) == 1
+        # `first` still has the old column list cached
+        assert first.append([{"name": "Wood Co", "service_area": "Orillia", "type": "google"}]) == 1
+        assert first.get("Wood Co", "Orillia")["type"] == "google"
+        first.close()
+        second.close()
+
+
+def test_sync_manager_uses_store_and_seeds_from_csv():
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, "lead_records.csv")
+        _leads().to_csv(legacy, index=False)
+        sync = DataSyncManager(data_dir=tmp, leads_csv=legacy)
+        assert sync.leads_db.endswith("lead_records.sqlite3")
+        assert sync.load_leads()["name"].tolist() == ["Stone Co", "Wood Co"]
+        # Saving replaces the store, not the CSV
+        assert sync.save_leads(_leads().iloc[:1])
+        assert sync.count_leads() == 1
+        assert len(pd.read_csv(legacy)) == 2
+        assert sync.lead_keys() == {"stone co|barrie"}
+        # CSV stays available as an export format
+        out = os.path.join(tmp, "export.csv")
+        assert sync.save_leads_to_csv(sync.load_leads(), out)
+        assert pd.read_csv(out)["name"].tolist() == ["Stone Co"]
+        sync.store.close()
+
+
+def test_missing_scores_are_written_back():
+    with tempfile.TemporaryDirectory() as tmp:
+        sync = DataSyncManager(data_dir=tmp, leads_csv=os.path.join(tmp, "lead_records.csv"))
+        sync.append_leads([
+            {"name": "Stone Co", "service_area": "Barrie", "phone": "705-555-0100", "score": 3},
+            {"name": "Wood Co", "service_area": "Orillia", "phone": "705-555-0101", "email": "w@wood.ca"},
+        ])
+        dirty = sync.store.dirty_frame()
+        sync.store.mark_clean(dirty["lead_key"].tolist(), dirty["updated_at"].tolist())
+        # Filtering and sorting see the score shown for imported, unscored leads
+        assert sync.search_leads(min_score=5)[1] == 0
+        assert sync.score_missing_leads() == 1 and sync.score_missing_leads() == 0
+        df, total = sync.search_leads(min_score=5, order_by="score", descending=True)
+        assert df["name"].tolist() == ["Wood Co"] and df["score"].tolist() == [9]
+        assert sync.get_lead("Stone Co", "Barrie")["score"] == 3
+        assert sync.store.dirty_frame()["name"].tolist() == ["Wood Co"]
+        sync.store.close()
+
+
+def main():
+    """Main test function"""
+    print("Testing lead store...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
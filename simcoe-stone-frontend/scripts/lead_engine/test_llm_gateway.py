@@ -0,0 +1,127 @@
+"""
+Test script for the local LLM gateway against a fake Ollama server
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from enrichers.llm_gateway import BATCH, INTERACTIVE, LLMGateway
+
+
+class FakeOllama(BaseHTTPRequestHandler):
+    """Minimal /api/generate endpoint that records request order"""
+
+    calls = []
+    delay = 0.05
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with FakeOllama.lock:
+            FakeOllama.calls.append(body)
+        if body.get("prompt"):
+            time.sleep(FakeOllama.delay)
+        out = json.dumps({"model": body.get("model"), "response": f"echo:{body.get('prompt', '')}", "done": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server():
+    FakeOllama.calls = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_interactive_overtakes_queued_batch():
+    server, host = _start_server()
+    gw = LLMGateway(host=host, workers=4, max_concurrency_per_model=1, keep_alive="5m")
+    try:
+        batch = [gw.submit("m1", f"batch-{i}", priority=BATCH) for i in range(4)]
+        time.sleep(0.01)
+        answer = gw.generate("m1", "question", priority=INTERACTIVE)
+        assert answer["response"] == "echo:question"
+        for f in batch:
+            f.result(timeout=5)
+        prompts = [c["prompt"] for c in FakeOllama.calls]
+        # Only the batch request already in flight may run before the interactive one
+        assert prompts.index("question") <= 1
+        assert all(c["keep_alive"] == "5m" for c in FakeOllama.calls)
+        metrics = gw.get_metrics()
+        assert metrics["completed"] == {"interactive": 1, "scoring": 0, "batch": 4}
+        assert metrics["max_queue_depth"] >= 4
+        assert sum(metrics["queue_depth"].values()) == 0
+    finally:
+        gw.shutdown()
+        server.shutdown()
+
+
+def test_per_model_concurrency_and_pinning():
+    server, host = _start_server()
+    gw = LLMGateway(host=host, workers=4, max_concurrency_per_model=2)
+    try:
+        assert gw.pin("m2")
+        peak = 0
+        futures = [gw.submit("m2", f"p{i}") for i in range(6)]
+        while not all(f.done() for f in futures):
+            peak = max(peak, gw.get_metrics()["in_flight"].get("m2", 0))
+            time.sleep(0.005)
+        assert 1 <= peak <= 2
+        assert FakeOllama.calls[0] == {"model": "m2", "keep_alive": -1}
+        assert all(c["keep_alive"] == -1 for c in FakeOllama.calls)
+        assert gw.get_metrics()["pinned"] == ["m2"]
+    finally:
+        gw.shutdown()
+        server.shutdown()
+
+
+def test_errors_are_reported_to_caller():
+    gw = LLMGateway(host="http://127.0.0.1:9", workers=1, timeout=2)
+    try:
+        gw.generate("m3", "unreachable", priority=INTERACTIVE)
+    except Exception:
+        assert gw.get_metrics()["errors"]["interactive"] == 1
+    else:
+        raise AssertionError("connection failure should propagate")
+    finally:
+        gw.shutdown()
+
+
+def test_cancelled_jobs_are_counted():
+    server, host = _start_server()
+    gw = LLMGateway(host=host, workers=1)
+    try:
+        futures = [gw.submit("m4", f"job-{i}") for i in range(3)]
+        assert all(f.cancel() for f in futures[1:])
+        futures[0].result(timeout=5)
+    finally:
+        gw.shutdown()
+        server.shutdown()
+    metrics = gw.get_metrics()
+    assert metrics["completed"]["batch"] == 1 and metrics["cancelled"]["batch"] == 2
+    assert [c["prompt"] for c in FakeOllama.calls] == ["job-0"]
+
+
+def main():
+    """Main test function"""
+    print("Testing LLM gateway...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Test script for municipality-level census feature vectors
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.data.municipal_features import FEATURE_NAMES, build_municipal_features
+
+CHAR_IDS = [1, 3, 4, 6, 40, 41, 42, 243, 1414, 1415, 1440, 1441, 1442, 1449, 1451]
+
+
+def _level(census_dir, level, codes, names, rows):
+    np.save(os.path.join(census_dir, f"census_{level}.npy"), np.array(rows, dtype=np.float64))
+    with open(os.path.join(census_dir, f"census_{level}.json"), "w", encoding="utf-8") as f:
+        json.dump({"geo_codes": codes, "geo_names": names, "characteristic_ids": CHAR_IDS}, f)
+
+
+def _row(pop, growth, detached_share, pre1961, pre1981, income):
+    households = 1000
+    return [pop, growth, pop / 2.5, 300, 41, households, detached_share * households, income,
+            households, 700, households, pre1961 * households, (pre1981 - pre1961) * households,
+            households, 60]
+
+
+def _features(tmp, munis, provinces):
+    _level(tmp, "csd",
+           ["2021A00053543042", "2021A00053520005", "2021A00051209034", "2021A00052466023"],
+           ["Barrie", "Toronto", "Richmond", "Richmond"],
+           [_row(147829, 8.1, 0.6, 0.1, 0.35, 98000), _row(2794356, 2.3, 0.23, 0.3, 0.55, 84000),
+            _row(3000, 1.0, 0.9, 0.5, 0.7, 61000), _row(3200, -1.0, 0.8, 0.4, 0.6, 59000)])
+    _level(tmp, "province", ["2021A000235", "2021A000259"], ["Ontario", "British Columbia"],
+           [_row(14223942, 5.8, 0.54, 0.2, 0.45, 91000), _row(5000879, 7.6, 0.42, 0.1, 0.4, 85000)])
+    return build_municipal_features(munis, provinces.get, {"Orillia": 33411}.get, census_dir=tmp)
+
+
+def test_csd_join_with_province_fallback():
+    with tempfile.TemporaryDirectory() as tmp:
+        munis = ["Barrie", "Orillia", "Richmond", "Kelowna", "Atlantis"]
+        provinces = {"Barrie": "Ontario", "Orillia": "Ontario", "Richmond": "Nova Scotia",
+                     "Kelowna": "British Columbia"}
+        feats = _features(tmp, munis, provinces)
+        assert feats.matrix.shape == (5, len(FEATURE_NAMES))
+
+        barrie = feats.features("barrie")
+        assert barrie["population"] == 147829 and barrie["pre_1981_share"] == 0.35
+        assert barrie["owner_share"] == 0.7 and feats.source("Barrie") == "csd"
+        # Richmond exists in two provinces; the resolver's province picks the NS row
+        assert feats.features("Richmond")["median_household_income"] == 61000
+        # Orillia has no CSD row: province shares, but its own GeoNames population
+        orillia = feats.features("Orillia")
+        assert feats.source("Orillia") == "province"
+        assert orillia["population"] == 33411 and orillia["median_household_income"] == 91000
+        assert "dwellings" not in orillia
+        assert feats.source("Atlantis") == "none" and feats.features("Atlantis") == {}
+        assert feats.vector("Nowhere") is None
+        assert "pre_1981_share=35%" in feats.describe("Barrie")
+
+
+def test_local_ranking_and_filtering():
+    with tempfile.TemporaryDirectory() as tmp:
+        munis = ["Barrie", "Toronto", "Richmond"]
+        feats = _features(tmp, munis, {"Barrie": "Ontario", "Toronto": "Ontario", "Richmond": "Nova Scotia"})
+        ranked = [name for name, _ in feats.rank(["Richmond", "Toronto", "Nowhere", "Barrie"])]
+        assert ranked[-1] == "Nowhere"
+        by_age = feats.rank(munis, weights={"pre_1981_share": 1.0})
+        assert [name for name, _ in by_age] == ["Richmond", "Toronto", "Barrie"]
+        assert feats.filter(munis, "population", ">100000") == ["Barrie", "Toronto"]
+        assert feats.filter(munis, "single_detached_share", "0.5..1") == ["Barrie", "Richmond"]
+        # Several features must all pass; each municipality is judged on its own row
+        assert feats.filter(munis, ["single_detached_share", "pre_1981_share"], ">0.3") == ["Barrie", "Richmond"]
+        assert feats.filter(munis, ["single_detached_share", "pre_1961_share"], ">0.3") == ["Richmond"]
+        for bad in (["population", "Total - Age"], []):
+            try:
+                feats.filter(munis, bad, ">0")
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"{bad} should be rejected")
+        assert feats.metadata("Barrie")["feat_pre_1981_share"] == 0.35 and feats.metadata("Atlantis") == {}
+        assert feats.score("Barrie") is not None and feats.score("Nowhere") is None
+
+
+def main():
+    """Main test function"""
+    print("Testing municipal features...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
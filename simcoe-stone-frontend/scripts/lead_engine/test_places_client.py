@@ -0,0 +1,157 @@
+"""
+Test script for the Google Places client against a local mock Places server
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from scraping.google_places import PlacesClient, missing_fields
+
+
+def _place(i):
+    return {
+        "place_id": f"p{i}",
+        "name": f"Stone Co {i}",
+        "formatted_address": f"{i} Main St, Barrie, ON",
+        "rating": 4.5,
+        "user_ratings_total": 10 + i,
+        "types": ["general_contractor"],
+        "opening_hours": {"open_now": True},
+    }
+
+
+class MockPlaces(BaseHTTPRequestHandler):
+    """Text search pages of 20 results; page tokens need one retry before they work"""
+
+    requests_log = []
+    token_attempts = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        with MockPlaces.lock:
+            MockPlaces.requests_log.append((url.path, params))
+        if url.path.endswith("/textsearch/json"):
+            token = params.get("pagetoken")
+            if token:
+                with MockPlaces.lock:
+                    MockPlaces.token_attempts[token] = MockPlaces.token_attempts.get(token, 0) + 1
+                    ready = MockPlaces.token_attempts[token] > 1
+                if not ready:
+                    return self._send({"status": "INVALID_REQUEST", "results": []})
+                page = int(token[-1])
+            else:
+                page = 0
+            body = {"status": "OK", "results": [_place(page * 20 + i) for i in range(20)]}
+            if page < 2:
+                body["next_page_token"] = f"tok{page + 1}"
+            return self._send(body)
+        if url.path.endswith("/details/json"):
+            if params["place_id"] == "denied":
+                return self._send({"status": "REQUEST_DENIED", "error_message": "The provided API key is invalid."})
+            fields = params.get("fields", "").split(",")
+            full = {
+                "website": f"https://example.com/{params['place_id']}",
+                "formatted_phone_number": "(705) 555-0100",
+                "international_phone_number": "+1 705-555-0100",
+                "url": "https://maps.google.com/?cid=1",
+                "opening_hours": {"weekday_text": ["Monday: 8AM-5PM"]},
+            }
+            return self._send({"status": "OK", "result": {f: full[f] for f in fields if f in full}})
+        self.send_response(404)
+        self.end_headers()
+
+    def _send(self, body):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server():
+    MockPlaces.requests_log = []
+    MockPlaces.token_attempts = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockPlaces)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_missing_fields_skips_text_search_values():
+    fields = missing_fields(_place(1))
+    assert set(fields) == {"formatted_phone_number", "international_phone_number", "website", "url", "opening_hours"}
+    assert "rating" not in fields and "name" not in fields
+
+
+def test_text_search_pagination_stops_early_and_retries_tokens():
+    server, base = _start_server()
+    try:
+        client = PlacesClient(api_key="k", base_url=base, cache_path=None, page_token_delay=0.01)
+        results = client.text_search("masonry contractor near Barrie", max_results=30)
+        assert len(results) == 30
+        assert client.stats["text_search_requests"] == 2  # third page never requested
+        assert client.stats["retries"] == 1  # tok1 was not ready on first use
+    finally:
+        server.shutdown()
+
+
+def test_concurrent_details_with_field_mask_and_cache():
+    server, base = _start_server()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, "details.json")
+            basics = [_place(i) for i in range(12)]
+            client = PlacesClient(api_key="k", base_url=base, cache_path=cache_path, max_workers=4)
+            merged = client.details_for(basics)
+            assert [m["place_id"] for m in merged] == [b["place_id"] for b in basics]
+            assert merged[3]["website"] == "https://example.com/p3"
+            assert merged[3]["rating"] == 4.5  # kept from text search
+            details_calls = [p for path, p in MockPlaces.requests_log if path.endswith("/details/json")]
+            assert len(details_calls) == 12
+            assert all("rating" not in p["fields"] and "name" not in p["fields"] for p in details_calls)
+
+            # A fresh client reuses the persisted cache
+            again = PlacesClient(api_key="k", base_url=base, cache_path=cache_path).details_for(basics)
+            assert again == merged
+            assert len([1 for path, _ in MockPlaces.requests_log if path.endswith("/details/json")]) == 12
+    finally:
+        server.shutdown()
+
+
+def test_failed_details_are_not_cached():
+    server, base = _start_server()
+    try:
+        client = PlacesClient(api_key="bad", base_url=base, cache_path=None)
+        basic = dict(_place(0), place_id="denied")
+        merged = client.details_for([basic])
+        assert merged == [basic]
+        assert "denied" not in client._cache
+        client.details_for([basic])
+        assert len([1 for path, _ in MockPlaces.requests_log if path.endswith("/details/json")]) == 2
+    finally:
+        server.shutdown()
+
+
+def main():
+    """Main test function"""
+    print("Testing Google Places client...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
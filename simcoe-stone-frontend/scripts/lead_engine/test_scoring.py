@@ -0,0 +1,94 @@
+"""
+Test script for the vectorized lead scoring engine
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.data.scoring import ScoringEngine, fill_missing_scores, load_scoring_config
+from modules.utils.config import update_config_file
+
+
+def test_profiles_match_previous_rules():
+    engine = ScoringEngine()
+    leads = [
+        {"name": "A", "phone": "705-555-0100", "email": "", "website": "https://a.ca"},
+        {"name": "B", "phone": None, "email": "b@b.ca", "website": float("nan")},
+        {"name": "C"},
+    ]
+    assert engine.score(leads, "contact").tolist() == [10, 7, 5]
+    quote = {"phone": "1", "email": "e", "website": "w", "service_interest": "Stone patio", "source": "Quote form"}
+    assert engine.score([quote], "lead").tolist() == [10]
+    assert engine.score([{"score": 9, "phone": "1", "website": "w"}, {"score": None}], "quality").tolist() == [10, 5]
+    record = {"phone": "1", "email": "e", "socials": {"logo": "x.png", "google": {"rating": 4.5, "reviews_count": 0}}}
+    assert engine.score([record], "confidence").tolist() == [5]
+    assert engine.score([{"website": "w", "socials": "Facebook, LinkedIn"}], "social").tolist() == [8]
+
+
+def test_config_overrides_and_validation():
+    engine = ScoringEngine({
+        "features": {"mason": {"column": "craft_type", "op": "contains", "value": "stonemason"}},
+        "profiles": {"contact": {"weights": {"phone": 0, "mason": 4}, "clip": [0, 8]}},
+    })
+    df = pd.DataFrame({"phone": ["1", ""], "email": ["e", ""], "website": ["", ""],
+                       "craft_type": ["craft:stonemason", "shop:hardware"]})
+    assert engine.score(df, "contact").tolist() == [8, 5]
+    try:
+        ScoringEngine({"profiles": {"contact": {"weights": {"nope": 1}}}})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown feature should be rejected")
+
+
+def test_settings_save_keeps_scoring_section():
+    scoring = {"profiles": {"contact": {"weights": {"phone": 4}}}}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data", "config.json")
+        update_config_file({"scoring": scoring, "enrichment_provider": "ollama"}, path)
+        # What the settings page saves: only the fields it edits
+        update_config_file({"enrichment_provider": "heuristic", "cascade_threshold": 0.5}, path)
+        with open(path) as f:
+            cfg = json.load(f)
+        assert cfg["enrichment_provider"] == "heuristic" and cfg["cascade_threshold"] == 0.5
+        assert load_scoring_config(path) == scoring
+
+
+def test_fill_missing_scores_keeps_existing():
+    df = pd.DataFrame({"name": ["A", "B"], "phone": ["1", "1"], "score": [3, np.nan]})
+    assert fill_missing_scores(df)["score"].tolist() == [3, 7]
+
+
+def test_batch_throughput():
+    n = 200_000
+    df = pd.DataFrame({
+        "phone": np.where(np.arange(n) % 2 == 0, "705-555-0100", ""),
+        "email": np.where(np.arange(n) % 3 == 0, "x@y.ca", None),
+        "website": np.where(np.arange(n) % 5 == 0, "https://x.ca", ""),
+    })
+    start = time.perf_counter()
+    scores = ScoringEngine().score(df, "contact")
+    elapsed = time.perf_counter() - start
+    assert scores[0] == 12 and scores[1] == 5
+    assert elapsed < 2.0, f"scored {n} leads in {elapsed:.2f}s"
+
+
+def main():
+    """Main test function"""
+    print("Testing lead scoring...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
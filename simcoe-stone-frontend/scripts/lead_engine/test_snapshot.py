@@ -0,0 +1,75 @@
+"""
+Test script for the compiled municipality/census snapshot
+"""
+
+import math
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.data.snapshot import build_snapshot, is_stale, load_snapshot
+
+
+def _write_sources(tmp):
+    sources = {
+        "population": os.path.join(tmp, "population.csv"),
+        "census": os.path.join(tmp, "census.csv"),
+        "municipalities": os.path.join(tmp, "municipalities.txt"),
+    }
+    with open(sources["population"], "w", encoding="utf-8") as f:
+        f.write("municipality,population\nBarrie,147829\nOrillia,33411\nBarrie,1000\nNowhere,n/a\n")
+    with open(sources["census"], "w", encoding="utf-8") as f:
+        f.write("province_territory,Total - Age,Median income\nOntario,14223942,41000\nYukon,40232,\n")
+    with open(sources["municipalities"], "w", encoding="utf-8") as f:
+        f.write("# All Canadian municipalities\nOrillia\n\nBarrie\n")
+    return sources
+
+
+def test_snapshot_matches_source_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = _write_sources(tmp)
+        snap = load_snapshot(os.path.join(tmp, "snap.bin"), sources)
+        assert snap.pop_map() == {"Barrie": 147829, "Nowhere": 0, "Orillia": 33411}
+        assert snap.population("Orillia") == 33411 and snap.population("Toronto") == 0
+        assert snap.municipalities == ["Orillia", "Barrie"]
+        assert snap.census_columns == ["Total - Age", "Median income"]
+        assert snap.census_map()["Yukon"] == {"Total - Age": "40232", "Median income": ""}
+        assert snap.census_values[0].tolist() == [14223942.0, 41000.0]
+        assert math.isnan(snap.census_values[1, 1])
+
+
+def test_rebuilds_when_a_source_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = _write_sources(tmp)
+        path = os.path.join(tmp, "snap.bin")
+        build_snapshot(path, sources)
+        assert not is_stale(path, sources)
+
+        with open(sources["municipalities"], "a", encoding="utf-8") as f:
+            f.write("Collingwood\n")
+        later = time.time() + 5
+        os.utime(sources["municipalities"], (later, later))
+        assert is_stale(path, sources)
+        assert load_snapshot(path, sources).municipalities == ["Orillia", "Barrie", "Collingwood"]
+        assert not is_stale(path, sources)
+
+        # rebuild=False serves the existing file even when sources moved on
+        with open(sources["population"], "a", encoding="utf-8") as f:
+            f.write("Collingwood,24811\n")
+        assert load_snapshot(path, sources, rebuild=False).population("Collingwood") == 0
+
+
+def main():
+    """Main test function"""
+    print("Testing census snapshot...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Test script for the structured output layer used by the LLM enrichers
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from enrichers.structured_output import (
+    LEAD_ENRICHMENT_SCHEMA,
+    StructuredOutputError,
+    generate_structured,
+    get_parse_stats,
+    parse_json_response,
+    reset_parse_stats,
+    validate_against_schema,
+)
+
+
+def test_parse_clean_json():
+    data, repaired = parse_json_response('{"category": "tile", "quality_score": 7}')
+    assert data["quality_score"] == 7
+    assert not repaired
+
+
+def test_parse_repairs_prose_fences_and_trailing_commas():
+    text = "Sure! Here you go:\n```json\n{'category': 'Stone Masonry', 'quality_score': '8/10',}\n```\nThanks"
+    data, repaired = parse_json_response(text)
+    assert repaired
+    clean = validate_against_schema(data, LEAD_ENRICHMENT_SCHEMA)
+    assert clean["category"] == "stone_masonry"
+    assert clean["quality_score"] == 8
+    assert clean["short_profile"] == ""
+
+
+def test_parse_repairs_truncated_object():
+    data, repaired = parse_json_response('{"category": "roofer", "quality_score": 6, "short_profile": "Roofs in Barr')
+    assert repaired
+    assert data["category"] == "roofer"
+
+
+def test_repairs_leave_string_contents_alone():
+    text = '{quality_score: 7, "short_profile": "None yet, call: 9am, ask: Bob", done: True,}'
+    data, repaired = parse_json_response(text)
+    assert repaired
+    assert data == {"quality_score": 7, "short_profile": "None yet, call: 9am, ask: Bob", "done": True}
+    # Truncated inside a string: the tail is still treated as string content
+    data, _ = parse_json_response('{category: "tile", "short_profile": "Tile, grout: True')
+    assert data == {"category": "tile", "short_profile": "Tile, grout: True"}
+
+
+def test_non_greedy_extraction():
+    data, _ = parse_json_response('{"category": "tile", "quality_score": 3} and later {"other": 1}')
+    assert data == {"category": "tile", "quality_score": 3}
+
+
+def test_missing_required_field_rejected():
+    try:
+        validate_against_schema({"category": "tile"}, LEAD_ENRICHMENT_SCHEMA)
+    except StructuredOutputError:
+        return
+    raise AssertionError("missing quality_score should fail validation")
+
+
+def test_retry_and_stats():
+    reset_parse_stats()
+    replies = iter(["I think this is a roofer.", '{"category": "roofer", "quality_score": 12}'])
+    result = generate_structured(lambda p: next(replies), "prompt", LEAD_ENRICHMENT_SCHEMA, model="fake", max_retries=1)
+    assert result["quality_score"] == 10  # clamped to schema maximum
+    stats = get_parse_stats()["fake"]
+    assert stats["attempts"] == 2 and stats["failed"] == 1 and stats["retried"] == 1
+    assert stats["failure_rate"] == 0.5
+
+
+def main():
+    """Main test function"""
+    print("Testing structured output layer...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+    print(f"Parse stats: {get_parse_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Test script for incremental Supabase sync (cursor pull, dirty push, conflicts)
+"""
+
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.data import lead_store
+from modules.data.sync import DataSyncManager
+
+
+class FakeTable:
+    """Just enough of the PostgREST query builder for sync_with_supabase"""
+
+    def __init__(self, remote):
+        self.remote = remote
+        self.filters = []
+        self.limit_n = None
+        self.payload = None
+
+    def select(self, _columns):
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda r: r[column] > value)
+        return self
+
+    def or_(self, expr):
+        ts, _, row_id = re.match(r'updated_at\.gt\."(.+?)",and\(updated_at\.eq\."(.+?)",id\.gt\.(\d+)\)', expr).groups()
+        self.filters.append(lambda r: r["updated_at"] > ts or (r["updated_at"] == ts and r["id"] > int(row_id)))
+        return self
+
+    def order(self, _column):
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def upsert(self, records, on_conflict):
+        assert on_conflict == "name,service_area"
+        self.payload = records
+        return self
+
+    def execute(self):
+        if self.payload is not None:
+            for record in self.payload:
+                self.remote.upsert(record)
+            return type("Response", (), {"data": self.payload})()
+        rows = sorted((r for r in self.remote.rows if all(f(r) for f in self.filters)),
+                      key=lambda r: (r["updated_at"], r["id"]))
+        self.remote.fetched += len(rows[:self.limit_n])
+        return type("Response", (), {"data": [dict(r) for r in rows[:self.limit_n]]})()
+
+
+class FakeSupabase:
+    """Remote leads table that assigns ids and keeps the updated_at a client sends
+
+    Without a client value it stamps its own clock, like the updated_at trigger.
+    """
+
+    def __init__(self):
+        self.rows = []
+        self.fetched = 0
+        self.clock = 0
+
+    def tick(self):
+        self.clock += 1
+        return f"2020-01-01T00:00:{self.clock:02d}+00:00"
+
+    def upsert(self, record):
+        for row in self.rows:
+            if (row["name"], row["service_area"]) == (record["name"], record["service_area"]):
+                row.update(record, updated_at=record.get("updated_at") or self.tick())
+                return
+        self.rows.append(dict(record, id=len(self.rows) + 1, updated_at=record.get("updated_at") or self.tick()))
+
+    def table(self, _name):
+        return FakeTable(self)
+
+
+def _manager(tmp, remote):
+    sync = DataSyncManager(data_dir=tmp, leads_csv=os.path.join(tmp, "lead_records.csv"))
+    sync.supabase, sync.supabase_available = remote, True
+    return sync
+
+
+def test_only_changes_move_after_first_sync():
+    with tempfile.TemporaryDirectory() as tmp:
+        remote = FakeSupabase()
+        for i in range(5):
+            remote.upsert({"name": f"Remote {i}", "service_area": "Barrie"})
+        sync = _manager(tmp, remote)
+        sync.append_leads([{"name": "Local", "service_area": "Orillia", "phone": "705-555-0100"}])
+
+        _, stats = sync.sync_with_supabase(page_size=2)
+        assert stats["downloaded"] == 5 and stats["uploaded"] == 1 and stats["errors"] == 0
+        assert sync.count_leads() == 6 and sync.store.dirty_frame().empty
+        assert len(remote.rows) == 6
+        entry = sync.get_sync_history()[-1]
+        assert entry["upload"]["uploaded"] == 1 and entry["upload"]["p95_latency_ms"] is not None
+        assert set(entry["timings"]) == {"download_s", "merge_s", "upload_s"}
+        assert entry["bytes"]["downloaded"] > 0 and entry["bytes"]["uploaded"] > 0
+
+        # The pushed row comes back once with its server timestamp, then nothing moves
+        sync.sync_with_supabase(page_size=2)
+        remote.fetched = 0
+        _, stats = sync.sync_with_supabase(page_size=2)
+        assert stats == {"uploaded": 0, "downloaded": 0, "conflicts": 0, "errors": 0}
+        assert remote.fetched == 0
+
+        # Saving a frame with one edited row only marks that row dirty
+        leads = sync.load_leads()
+        leads.loc[leads["name"] == "Remote 3", "phone"] = "705-555-0133"
+        sync.save_leads(leads)
+        assert sync.store.dirty_frame()["name"].tolist() == ["Remote 3"]
+        _, stats = sync.sync_with_supabase(direction="upload")
+        assert stats["uploaded"] == 1
+        assert [r["phone"] for r in remote.rows if r["name"] == "Remote 3"] == ["705-555-0133"]
+
+
+def test_server_stamps_pushed_leads():
+    with tempfile.TemporaryDirectory() as tmp:
+        remote = FakeSupabase()
+        remote.upsert({"name": "Remote 0", "service_area": "Barrie"})
+        for client in ("ahead", "behind"):
+            os.mkdir(os.path.join(tmp, client))
+        ahead = _manager(os.path.join(tmp, "ahead"), remote)
+        ahead.sync_with_supabase()
+
+        # A client whose clock is behind pushes a lead: the other client must still pull it
+        behind = _manager(os.path.join(tmp, "behind"), remote)
+        saved = lead_store._now
+        lead_store._now = lambda: "2019-12-31T00:00:00Z"
+        try:
+            behind.append_leads([{"name": "Late Co", "service_area": "Orillia"}])
+            _, stats = behind.sync_with_supabase(direction="upload")
+        finally:
+            lead_store._now = saved
+        assert stats["uploaded"] == 1 and behind.store.dirty_frame().empty
+        assert [r["updated_at"] > "2020" for r in remote.rows] == [True, True]
+        _, stats = ahead.sync_with_supabase(direction="download")
+        assert stats["downloaded"] == 1 and ahead.get_lead("Late Co", "Orillia") is not None
+
+
+def test_outage_leaves_leads_dirty():
+    with tempfile.TemporaryDirectory() as tmp:
+        remote = FakeSupabase()
+        sync = _manager(tmp, remote)
+        sync.upload_options = {"retry_backoff": 0}
+        sync.append_leads([{"name": "Local", "service_area": "Orillia"}])
+
+        def down(record):
+            raise ConnectionError("connection refused")
+
+        remote.upsert = down
+        _, stats = sync.sync_with_supabase(direction="upload")
+        assert stats["uploaded"] == 0 and stats["errors"] == 1
+        assert sync.store.dirty_frame()["name"].tolist() == ["Local"]
+        assert not os.path.exists(sync.dead_letter_path)
+
+
+def test_failed_page_is_pulled_again():
+    with tempfile.TemporaryDirectory() as tmp:
+        remote = FakeSupabase()
+        for i in range(5):
+            remote.upsert({"name": f"Remote {i}", "service_area": "Barrie"})
+        sync = _manager(tmp, remote)
+
+        # The second page fails to apply: the cursor must stop after the first
+        apply_remote = sync.store.apply_remote
+        calls = []
+
+        def flaky(records):
+            calls.append(len(records))
+            if len(calls) == 2:
+                raise OSError("disk full")
+            return apply_remote(records)
+
+        sync.store.apply_remote = flaky
+        _, stats = sync.sync_with_supabase(direction="download", page_size=2)
+        assert stats["errors"] == 1 and sync.count_leads() == 2
+
+        _, stats = sync.sync_with_supabase(direction="download", page_size=2)
+        assert stats["errors"] == 0 and stats["downloaded"] == 3
+        assert sync.count_leads() == 5
+
+
+def test_conflict_policies():
+    for policy, expected in [("remote_wins", "remote"), ("local_wins", "local"), ("newest_wins", "local")]:
+        with tempfile.TemporaryDirectory() as tmp:
+            remote = FakeSupabase()
+            remote.upsert({"name": "Stone Co", "service_area": "Barrie", "status": "new"})
+            sync = _manager(tmp, remote)
+            sync.sync_with_supabase()
+
+            remote.upsert({"name": "Stone Co", "service_area": "Barrie", "status": "remote"})
+            sync.update_lead("Stone Co", "Barrie", {"status": "local"})
+            _, stats = sync.sync_with_supabase(conflict_policy=policy)
+            assert stats["conflicts"] == 1
+            assert sync.get_lead("Stone Co", "Barrie")["status"] == expected
+            assert remote.rows[0]["status"] == expected, policy
+
+
+def main():
+    """Main test function"""
+    print("Testing incremental Supabase sync...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
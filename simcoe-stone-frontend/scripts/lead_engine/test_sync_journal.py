@@ -0,0 +1,67 @@
+"""
+Test script for the append-only sync journal
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.data.journal import SyncJournal
+from modules.data.sync import DataSyncManager
+
+
+def test_append_tail_and_last():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = SyncJournal(os.path.join(tmp, "sync_journal.jsonl"))
+        assert journal.tail() == [] and journal.last() is None
+        for i in range(5000):
+            journal.append({"run": i, "cursor": {"id": i} if i % 1000 == 0 else None, "note": "x" * (i % 50)})
+        # A crash mid-write leaves a partial last line
+        with open(journal.path, "a") as f:
+            f.write('{"run": 5000, "cur')
+        assert [e["run"] for e in journal.tail(3)] == [4997, 4998, 4999]
+        assert len(journal.tail(2000)) == 2000
+        assert journal.last()["run"] == 4999
+        assert journal.last("cursor")["cursor"] == {"id": 4000}
+        assert sum(1 for _ in journal) == 5000
+        # The next append starts a fresh line; only the partial entry is lost
+        journal.append({"run": 5001, "cursor": {"id": 5001}})
+        assert [e["run"] for e in journal.tail(2)] == [4999, 5001]
+        assert journal.last("cursor")["cursor"] == {"id": 5001}
+
+
+def test_legacy_sync_log_is_imported():
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, "sync_log.json")
+        with open(legacy, "w") as f:
+            json.dump({
+                "last_sync": "2025-09-09T16:47:44Z",
+                "remote_cursor": {"updated_at": "2025-09-09T16:47:40+00:00", "id": 12},
+                "sync_history": [{"timestamp": f"2025-09-0{d}T00:00:00Z", "stats": {"uploaded": d}} for d in (1, 2)],
+            }, f)
+        sync = DataSyncManager(data_dir=tmp, leads_csv=os.path.join(tmp, "lead_records.csv"))
+        history = sync.get_sync_history()
+        assert [e["stats"]["uploaded"] for e in history] == [1, 2]
+        assert sync.journal.last("cursor")["cursor"]["id"] == 12
+        assert os.path.exists(legacy)
+
+        # Runs are appended without touching earlier lines
+        sync.journal.append({"kind": "supabase_sync", "stats": {"uploaded": 3}, "timings": {"upload_s": 0.1}})
+        assert [e["stats"]["uploaded"] for e in sync.get_sync_history(2)] == [2, 3]
+        sync.store.close()
+
+
+def main():
+    """Main test function"""
+    print("Testing sync journal...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
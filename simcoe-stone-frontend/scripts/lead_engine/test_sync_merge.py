@@ -0,0 +1,88 @@
+"""
+Test script for keyed lead merges in DataSyncManager
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.data.sync import DataSyncManager, merge_lead_frames
+
+
+def test_merge_counts_new_updated_unchanged():
+    existing = pd.DataFrame([
+        {"name": "Stone Co", "service_area": "Barrie", "phone": "1", "score": 5.0},
+        {"name": "Wood Co", "service_area": "Orillia", "phone": np.nan, "score": 3.0},
+        {"name": "Tile Co", "service_area": "Midland", "phone": "3", "score": 4.0},
+    ])
+    incoming = pd.DataFrame([
+        {"name": "stone co ", "service_area": "BARRIE", "phone": "1", "score": 8.0},
+        {"name": "Wood Co", "service_area": "Orillia", "phone": np.nan, "score": 3.0},
+        {"name": "Brick Co", "service_area": "Barrie", "phone": "4", "score": 6.0},
+    ])
+    merged, stats = merge_lead_frames(existing, incoming)
+    assert stats == {"new": 1, "updated": 1, "unchanged": 1}
+    assert merged["score"].tolist() == [8.0, 3.0, 4.0, 6.0]
+    assert merged["name"].tolist() == ["stone co ", "Wood Co", "Tile Co", "Brick Co"]
+    # Input frames are not modified
+    assert existing.loc[0, "score"] == 5.0
+
+
+def test_reimporting_seed_csv_changes_nothing():
+    seed = os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules", "data", "lead_records.csv")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "leads.csv")
+        shutil.copy(seed, csv_path)
+        sync = DataSyncManager(data_dir=tmp, leads_csv=csv_path)
+        # The seed CSV carries match_key, which the store does not keep
+        _, stats = sync.import_leads_from_csv(csv_path, existing_leads=sync.load_leads())
+        assert stats["updated"] == 0 and stats["new"] == 0 and stats["unchanged"] == sync.count_leads()
+        sync.store.close()
+
+
+def test_import_returns_stats_dict():
+    with tempfile.TemporaryDirectory() as tmp:
+        sync = DataSyncManager(data_dir=tmp, leads_csv=os.path.join(tmp, "leads.csv"))
+        path = os.path.join(tmp, "import.csv")
+        pd.DataFrame([{"name": "A", "service_area": "Barrie", "craft_type": "x", "email": "bad"}]).to_csv(path, index=False)
+        existing = pd.DataFrame([{"name": "B", "service_area": "Barrie", "craft_type": "y"}])
+        merged, stats = sync.import_leads_from_csv(path, existing_leads=existing)
+        assert stats == {"total": 1, "new": 1, "updated": 0, "unchanged": 0, "errors": 1}
+        assert merged["name"].tolist() == ["B", "A"]
+        sync.store.close()
+
+
+def test_merge_scales_linearly():
+    n = 100_000
+    ids = np.arange(n)
+    existing = pd.DataFrame({"name": "Lead " + pd.Series(ids).astype(str), "service_area": "Barrie",
+                             "phone": "705", "score": 5.0})
+    incoming = existing.copy()
+    incoming["name"] = "Lead " + pd.Series(ids + n // 2).astype(str)
+    incoming.loc[:1000, "score"] = 9.0
+    start = time.perf_counter()
+    merged, stats = merge_lead_frames(existing, incoming)
+    elapsed = time.perf_counter() - start
+    assert stats == {"new": n // 2, "updated": 1001, "unchanged": n // 2 - 1001}
+    assert len(merged) == n + n // 2
+    assert elapsed < 10, f"merged {n}x{n} in {elapsed:.2f}s"
+
+
+def main():
+    """Main test function"""
+    print("Testing lead merge...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
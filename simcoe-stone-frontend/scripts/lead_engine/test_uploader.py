@@ -0,0 +1,120 @@
+"""
+Test script for the concurrent chunked uploader
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.data.uploader import ChunkedUploader
+
+
+def test_bisection_isolates_bad_rows():
+    records = [{"name": f"Lead {i}", "bad": i in (7, 130)} for i in range(250)]
+    accepted, lock = [], threading.Lock()
+
+    def send(batch):
+        if any(r["bad"] for r in batch):
+            raise ValueError("row rejected")
+        with lock:
+            accepted.extend(r["name"] for r in batch)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dead_letter = os.path.join(tmp, "dead.jsonl")
+        acked = []
+        uploader = ChunkedUploader(send, workers=3, batch_size=50, retry_backoff=0, dead_letter_path=dead_letter)
+        report = uploader.upload(records, on_success=acked.extend)
+        assert report["uploaded"] == 248 and report["failed"] == 2
+        assert sorted(acked) == [i for i in range(250) if i not in (7, 130)]
+        assert len(accepted) == 248
+        with open(dead_letter) as f:
+            rejected = [json.loads(line) for line in f]
+        assert sorted(r["record"]["name"] for r in rejected) == ["Lead 130", "Lead 7"]
+        assert rejected[0]["error"] == "row rejected"
+        assert report["p95_latency_ms"] is not None and report["rows_per_sec"] > 0
+
+
+def test_batch_size_adapts_to_latency_and_payload():
+    fast = ChunkedUploader(lambda batch: None, batch_size=10, max_batch_size=500, target_latency=0.5)
+    fast.upload([{"i": i} for i in range(5000)])
+    assert fast.batch_size == 500
+
+    slow = ChunkedUploader(lambda batch: time.sleep(0.002 * len(batch)), workers=1, batch_size=100,
+                           min_batch_size=5, target_latency=0.02)
+    slow.upload([{"i": i} for i in range(400)])
+    assert slow.batch_size < 30
+
+    sizes = []
+    capped = ChunkedUploader(lambda batch: sizes.append(len(batch)), workers=1, batch_size=100,
+                             max_payload_bytes=1000)
+    capped.upload([{"text": "x" * 90} for _ in range(50)])
+    assert max(sizes) <= 10
+
+
+def test_transient_failure_is_retried():
+    calls = {"n": 0}
+
+    def flaky(batch):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise ConnectionError("timeout")
+
+    report = ChunkedUploader(flaky, workers=1, batch_size=1, retry_backoff=0).upload([{"a": 1}])
+    assert report["uploaded"] == 1 and report["retries"] == 1 and report["failed"] == 0
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_outage_stops_upload_without_dead_letters():
+    sent = []
+
+    def flaky(batch):
+        sent.append(len(batch))
+        if len(sent) == 1:
+            raise HTTPError(503)  # retried whole, not split
+        if len(sent) >= 3:
+            raise ConnectionError("connection refused")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dead_letter = os.path.join(tmp, "dead.jsonl")
+        acked = []
+        uploader = ChunkedUploader(flaky, workers=1, batch_size=20, retry_backoff=0, dead_letter_path=dead_letter)
+        report = uploader.upload([{"i": i} for i in range(100)], on_success=acked.extend)
+        assert sent == [20, 20, 20, 20, 20]
+        assert acked == list(range(20)) and report["uploaded"] == 20
+        assert report["failed"] == 0 and report["pending"] == 80
+        assert report["aborted"] == "connection refused"
+        assert not os.path.exists(dead_letter)
+
+        # A 4xx is a data error: bisected down to the row and dead-lettered
+        def reject_three(batch):
+            if any(r["i"] == 3 for r in batch):
+                raise HTTPError(400)
+
+        uploader = ChunkedUploader(reject_three, workers=1, batch_size=8, retry_backoff=0, dead_letter_path=dead_letter)
+        report = uploader.upload([{"i": i} for i in range(8)])
+        assert report["uploaded"] == 7 and report["failed"] == 1 and report["aborted"] is None
+        with open(dead_letter) as f:
+            assert [json.loads(line)["record"] for line in f] == [{"i": 3}]
+
+
+def main():
+    """Main test function"""
+    print("Testing chunked uploader...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
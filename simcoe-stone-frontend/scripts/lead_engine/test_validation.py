@@ -0,0 +1,83 @@
+"""
+Test script for vectorized lead validation rules
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.data.validation import LeadValidator, errors_to_records, register_rule, error_frame, RULES
+from modules.utils.config import is_large_corp
+
+
+def _leads():
+    return pd.DataFrame([
+        {"name": "Stone Co", "service_area": "Barrie", "email": "a@stone.ca", "phone": "705-555-0100", "website": "https://stone.ca"},
+        {"name": "stone co", "service_area": "barrie ", "email": "nope", "phone": "555", "website": "not a url"},
+        {"name": "Home Depot #7", "service_area": "Orillia", "email": np.nan, "phone": 17055550100.0, "website": "homedepot.ca/store"},
+    ])
+
+
+def test_rules_report_compact_frame():
+    errors = LeadValidator().validate(_leads())
+    got = set(zip(errors["row"], errors["rule"]))
+    assert got == {
+        (-1, "required_columns"), (1, "email"), (1, "phone"), (1, "url"),
+        (0, "duplicate_key"), (1, "duplicate_key"), (2, "large_corp"),
+    }
+    assert list(errors.columns) == ["row", "rule", "column", "value", "message"]
+    assert LeadValidator(["email"]).validate(_leads())["value"].tolist() == ["nope"]
+
+
+def test_legacy_records_and_pluggable_rules():
+    df = _leads()
+    records = errors_to_records(df, LeadValidator(["required_columns", "duplicate_key", "email"]).validate(df))
+    assert {"error": "Missing required column: craft_type"} in records
+    assert {"error": "Duplicate record", "name": "Stone Co", "service_area": "Barrie"} in records
+    assert {"error": "Invalid email format", "name": "stone co", "email": "nope"} in records
+
+    extra = {"no_area": lambda d: error_frame(d, d["service_area"].str.strip().eq("Orillia"), "service_area", "Out of region")}
+    errors = LeadValidator([], extra_rules=extra).validate(df)
+    assert errors["row"].tolist() == [2] and errors["rule"].tolist() == ["no_area"]
+
+    @register_rule("test_always_ok")
+    def always_ok(d):
+        return None
+    try:
+        assert LeadValidator(["test_always_ok"]).validate(df).empty
+    finally:
+        RULES.pop("test_always_ok")
+
+
+def test_large_corp_matches_scalar_check():
+    df = _leads()
+    mask = LeadValidator(["large_corp"]).validate(df)["row"].tolist()
+    assert mask == [i for i, r in df.iterrows() if is_large_corp(r["name"], r["website"])]
+
+
+def test_validation_throughput():
+    n = 200_000
+    df = pd.concat([_leads().assign(craft_type="x")] * (n // 3), ignore_index=True)
+    start = time.perf_counter()
+    errors = LeadValidator().validate(df)
+    elapsed = time.perf_counter() - start
+    assert len(errors) > n
+    assert elapsed < 10, f"validated {len(df)} leads in {elapsed:.2f}s"
+
+
+def main():
+    """Main test function"""
+    print("Testing lead validation...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
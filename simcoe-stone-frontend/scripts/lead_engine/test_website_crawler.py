@@ -0,0 +1,163 @@
+"""
+Test script for the website enrichment crawler against a local HTTP server
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from scraping.website_crawler import DomainThrottle, KeywordIDF, ValidatorCache, WebsiteCrawler
+
+PAGES = {
+    "/mason": (
+        "<html><head><style>.logo{color:red}</style><script>var x='spam@tracker.io';</script></head>"
+        "<body><img src='/img/hero.jpg'><img src='/img/site-logo.png'>"
+        "<h1>Granite &amp; limestone chimney restoration</h1>"
+        "<p>Contact info@acmestone.ca for a quote. Flagstone flagstone flagstone patios.</p>"
+        "<a href='mailto:sales@acmestone.ca'>Email</a>"
+        "<a href='https://www.instagram.com/acmestone'>IG</a>"
+        "<a href='/Blog/latest'>Latest</a></body></html>"
+    ),
+    "/roofer": "<html><body><p>Shingle roofing and flagstone.</p></body></html>",
+    "/etag": "<html><body><p>Brick and stone veneer</p></body></html>",
+    "/static": "<html><body><p>Fieldstone walls</p><a href='https://x.com/fs'>x</a></body></html>",
+    "/big": "<html><body><p>" + "filler " * 50000 + "</p><a href='https://facebook.com/late'>fb</a></body></html>",
+}
+
+
+class FakeSite(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = PAGES.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        # Only /etag honours validators; /static ignores them like many CMS hosts
+        if self.path == "/etag" and self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if self.path == "/etag":
+            self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSite)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_single_pass_extraction_and_idf():
+    server, base = _start_server()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            idf = KeywordIDF(os.path.join(tmp, "idf.json"))
+            crawler = WebsiteCrawler(per_domain_delay=0, idf=idf, validators=ValidatorCache(path=None))
+            urls = [f"{base}/mason", f"{base}/roofer", f"{base}/missing"]
+            results = crawler.crawl_sync(urls)
+
+            mason = results[f"{base}/mason"]
+            assert mason["emails"] == ["info@acmestone.ca", "sales@acmestone.ca"]  # script text ignored
+            assert mason["links"] == {"instagram": "https://www.instagram.com/acmestone"}
+            assert mason["logo"] == "/img/site-logo.png"
+            assert mason["recent_activity"] == "/blog/latest"
+            assert {"granite", "limestone", "chimney", "restoration"} <= set(mason["service_keywords"])
+            assert "flagstone" in mason["service_keywords"]
+
+            assert results[f"{base}/missing"]["emails"] == []
+            assert crawler.stats["fetched"] == 2 and crawler.stats["failed"] == 1
+
+            # The IDF table is persisted once per batch and reused by the next crawler
+            reloaded = KeywordIDF(os.path.join(tmp, "idf.json"))
+            assert reloaded.doc_count == 2 and reloaded.doc_freq["flagstone"] == 2
+    finally:
+        server.shutdown()
+
+
+def test_size_cap_truncates_stream():
+    server, base = _start_server()
+    try:
+        crawler = WebsiteCrawler(per_domain_delay=0, max_bytes=20_000, idf=KeywordIDF(path=None),
+                                 validators=ValidatorCache(path=None))
+        result = crawler.crawl_sync([f"{base}/big"])[f"{base}/big"]
+        assert result["links"] == {}  # link sits past the cap
+        assert crawler.stats["truncated"] == 1
+        assert crawler.stats["bytes"] == 20_000
+    finally:
+        server.shutdown()
+
+
+def test_conditional_revalidation():
+    server, base = _start_server()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, "validators.json")
+            urls = [f"{base}/etag", f"{base}/static"]
+            first = WebsiteCrawler(per_domain_delay=0, idf=KeywordIDF(path=None),
+                                   validators=ValidatorCache(cache_path))
+            initial = first.crawl_sync(urls)
+            assert first.stats["parsed"] == 2 and first.stats["bytes_saved"] == 0
+
+            second = WebsiteCrawler(per_domain_delay=0, idf=KeywordIDF(path=None),
+                                    validators=ValidatorCache(cache_path))
+            again = second.crawl_sync(urls)
+            assert again == initial
+            assert second.stats["not_modified"] == 1  # ETag answered with 304
+            assert second.stats["unchanged"] == 1  # identical body, parse skipped
+            assert second.stats["parsed"] == 0
+            assert second.stats["bytes_saved"] == len(PAGES["/etag"])
+    finally:
+        server.shutdown()
+
+
+def test_domain_delay_does_not_hold_fetch_slots():
+    def crawler(throttle):
+        c = WebsiteCrawler(concurrency=1, per_domain_delay=0.3, idf=KeywordIDF(path=None),
+                           validators=ValidatorCache(path=None), throttle=throttle)
+        c._fetch = lambda url: started.append((url, time.monotonic())) or None
+        return c
+
+    started = []
+    crawler(DomainThrottle()).crawl_sync(["http://a.test/1", "http://a.test/2", "http://b.test/1"])
+    at = dict(started)
+    # b.test is fetched while a.test waits out its delay
+    assert at["http://b.test/1"] < at["http://a.test/2"]
+    assert at["http://a.test/2"] - at["http://a.test/1"] >= 0.29
+
+    # Crawlers on other threads sharing one throttle stay polite to a common host
+    started = []
+    shared = DomainThrottle()
+    threads = [threading.Thread(target=crawler(shared).crawl_sync, args=([f"http://a.test/{i}"],)) for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    first, second = sorted(t for _, t in started)
+    assert second - first >= 0.29
+
+
+def main():
+    """Main test function"""
+    print("Testing website crawler...")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name}: OK")
+
+
+if __name__ == "__main__":
+    main()
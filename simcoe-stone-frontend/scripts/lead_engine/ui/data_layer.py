@@ -0,0 +1,169 @@
+"""
+Shared data layer for the Streamlit pages
+
+Caches what the pages used to rebuild on every rerun:
+- One DataSyncManager and one RAGEngine per process (st.cache_resource)
+- Lead frames, facet counts and search pages keyed by the lead store
+  generation, so a rerun only re-reads the store after something has
+  written to it
+- Sync history keyed by the journal file's size/mtime, RAG collection stats
+  keyed by the Chroma database mtime
+- Per-session load timings, shown by render_timings_panel()
+
+Cached frames are shared between sessions: treat them as read-only.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from modules.data.scoring import fill_missing_scores
+from modules.data.sync import DataSyncManager
+
+_TIMINGS_KEY = "data_layer_timings"
+_MAX_TIMINGS = 50
+
+_cache: Dict[str, Tuple[Hashable, Any]] = {}
+_cache_lock = threading.Lock()
+
+
+def _record_timing(name: str, seconds: float, hit: bool):
+    timings = st.session_state.setdefault(_TIMINGS_KEY, [])
+    timings.append({
+        "load": name,
+        "ms": round(seconds * 1000, 1),
+        "cache": "hit" if hit else "miss",
+        "at": time.strftime("%H:%M:%S"),
+    })
+    del timings[:-_MAX_TIMINGS]
+
+
+def cached(name: str, version: Hashable, loader: Callable[[], Any]) -> Any:
+    """Value of loader(), reused until `version` changes
+
+    Args:
+        name: Cache slot (one value is kept per name)
+        version: Anything that changes when the underlying data changes
+        loader: Builds the value on a miss
+    """
+    start = time.perf_counter()
+    with _cache_lock:
+        entry = _cache.get(name)
+    if entry is not None and entry[0] == version:
+        _record_timing(name, time.perf_counter() - start, True)
+        return entry[1]
+    value = loader()
+    with _cache_lock:
+        _cache[name] = (version, value)
+    _record_timing(name, time.perf_counter() - start, False)
+    return value
+
+
+def _file_version(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        info = os.stat(path)
+        return info.st_mtime_ns, info.st_size
+    except OSError:
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def get_sync_manager() -> DataSyncManager:
+    """Process-wide DataSyncManager (the lead store it wraps is thread-safe)"""
+    return DataSyncManager()
+
+
+@st.cache_resource(show_spinner=False)
+def get_rag_engine():
+    """Process-wide RAGEngine; raises ImportError when the RAG stack is missing"""
+    from modules.data.rag import RAGEngine
+    return RAGEngine()
+
+
+def load_leads(scored: bool = True) -> pd.DataFrame:
+    """Every stored lead, with missing scores filled in unless scored=False"""
+    sync = get_sync_manager()
+    generation = sync.store.generation
+    if scored:
+        return cached("leads (scored)", generation, lambda: fill_missing_scores(sync.load_leads()))
+    return cached("leads", generation, sync.load_leads)
+
+
+def count_leads() -> int:
+    sync = get_sync_manager()
+    return cached("lead count", sync.store.generation, sync.count_leads)
+
+
+def lead_facets() -> Dict[str, List[Tuple[Any, int]]]:
+    """Filter values with counts for the search page"""
+    sync = get_sync_manager()
+    return cached("lead facets", sync.store.generation, sync.lead_facets)
+
+
+def lead_score_range() -> Tuple[Optional[float], Optional[float]]:
+    sync = get_sync_manager()
+    return cached("lead score range", sync.store.generation, sync.lead_score_range)
+
+
+def score_stored_leads() -> int:
+    """Write scores for stored leads that have none (see DataSyncManager.score_missing_leads)"""
+    sync = get_sync_manager()
+    return cached("stored scores", sync.store.generation, sync.score_missing_leads)
+
+
+def _query_version(query: Dict[str, Any]) -> Hashable:
+    return tuple(sorted((k, repr(v)) for k, v in query.items()))
+
+
+def count_matches(**query: Any) -> int:
+    """Number of leads matching `query` (DataSyncManager.search_leads filter arguments)"""
+    sync = get_sync_manager()
+    version = (sync.store.generation, _query_version(query))
+    return cached("lead search count", version, lambda: sync.search_leads(**query, limit=0)[1])
+
+
+def search_leads(**query: Any) -> Tuple[pd.DataFrame, int]:
+    """One page of leads matching `query` (DataSyncManager.search_leads arguments)
+
+    Only the last query is kept, which is what paging back and forth on one
+    search needs.
+    """
+    sync = get_sync_manager()
+    version = (sync.store.generation, _query_version(query))
+    return cached("lead search", version, lambda: sync.search_leads(**query))
+
+
+def load_sync_history(limit: int = 100) -> List[Dict[str, Any]]:
+    sync = get_sync_manager()
+    version = (_file_version(sync.journal_path), limit)
+    return cached("sync history", version, lambda: sync.get_sync_history(limit))
+
+
+def rag_stats() -> Dict[str, Any]:
+    rag = get_rag_engine()
+    version = _file_version(os.path.join(rag.persist_dir, "chroma.sqlite3"))
+    return cached("rag stats", version, rag.get_stats)
+
+
+def clear_caches():
+    """Drop cached frames and engine instances"""
+    with _cache_lock:
+        _cache.clear()
+    get_sync_manager.clear()
+    get_rag_engine.clear()
+
+
+def render_timings_panel():
+    """Sidebar panel listing this session's recent data loads"""
+    with st.sidebar.expander("Data load timings"):
+        timings = st.session_state.get(_TIMINGS_KEY)
+        if not timings:
+            st.caption("No data loaded yet")
+        else:
+            st.dataframe(pd.DataFrame(timings[::-1]), use_container_width=True, hide_index=True)
+        if st.button("Clear data caches"):
+            clear_caches()
@@ -15,6 +15,8 @@ import pandas as pd
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Union
 
+from modules.data.scoring import score_lead
+
 logger = logging.getLogger("DataUtils")
 
 def normalize_phone_number(phone: str) -> str:
@@ -50,28 +52,8 @@ def calculate_lead_score(lead_data: Dict[str, Any]) -> int:
     Returns:
         Score from 1-10 indicating lead quality
     """
-    score = 5  # Base score
-    
-    # Adjust based on available contact info
-    if lead_data.get("phone"):
-        score += 1
-    if lead_data.get("email"):
-        score += 1
-    if lead_data.get("website"):
-        score += 1
-    
-    # Adjust based on service interest if available
-    service = lead_data.get("service_interest", "").lower()
-    if service and ("masonry" in service or "stone" in service):
-        score += 1
-    
-    # Adjust based on lead source
-    source = lead_data.get("source", "").lower()
-    if "quote" in source:
-        score += 1
-    
-    # Cap at 10
-    return min(score, 10)
+    # Contact info, masonry interest and quote source; weights from config.json
+    return score_lead(lead_data, "lead")
 
 def load_csv_data(file_path: str) -> List[Dict[str, Any]]:
     """Load data from a CSV file